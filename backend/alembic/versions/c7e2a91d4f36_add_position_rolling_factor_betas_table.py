@@ -0,0 +1,45 @@
+"""Add position_rolling_factor_betas table for beta time series
+
+Revision ID: c7e2a91d4f36
+Revises: 129ae82e72ca
+Create Date: 2025-09-02 10:12:08.334915
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7e2a91d4f36'
+down_revision: Union[str, Sequence[str], None] = '129ae82e72ca'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # One row per position, window and date; all factor betas in a JSONB object
+    op.create_table('position_rolling_factor_betas',
+        sa.Column('id', sa.UUID(), nullable=False, server_default=sa.text('gen_random_uuid()')),
+        sa.Column('position_id', sa.UUID(), nullable=False),
+        sa.Column('window_days', sa.Integer(), nullable=False),
+        sa.Column('calculation_date', sa.Date(), nullable=False),
+        sa.Column('betas', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column('observations', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.text('now()')),
+        sa.ForeignKeyConstraint(['position_id'], ['positions.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        # Also serves (position, window, date range) lookups for beta-drift charts
+        sa.UniqueConstraint('position_id', 'window_days', 'calculation_date', name='uq_position_rolling_beta_window_date')
+    )
+    
+    op.create_index('idx_rolling_betas_calculation_date', 'position_rolling_factor_betas', ['calculation_date'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_rolling_betas_calculation_date', table_name='position_rolling_factor_betas')
+    op.drop_table('position_rolling_factor_betas')
@@ -0,0 +1,39 @@
+"""Add treasury_yields table for locally stored Treasury series
+
+Revision ID: e3f5a8c21b47
+Revises: c7e2a91d4f36
+Create Date: 2025-09-04 09:41:27.518203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3f5a8c21b47'
+down_revision: Union[str, Sequence[str], None] = 'c7e2a91d4f36'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # One row per series and observation date; synced incrementally from FRED
+    op.create_table('treasury_yields',
+        sa.Column('id', sa.UUID(), nullable=False, server_default=sa.text('gen_random_uuid()')),
+        sa.Column('series_id', sa.String(length=20), nullable=False),
+        sa.Column('date', sa.Date(), nullable=False),
+        sa.Column('value', sa.Numeric(precision=8, scale=4), nullable=False),
+        sa.Column('data_source', sa.String(length=20), nullable=False, server_default='fred'),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.text('now()')),
+        sa.PrimaryKeyConstraint('id'),
+        # Also serves (series, date range) reads
+        sa.UniqueConstraint('series_id', 'date', name='uq_treasury_yields_series_date')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('treasury_yields')
@@ -0,0 +1,34 @@
+"""Add data_versions table for cross-process cache invalidation
+
+Revision ID: f4b1c9d27e60
+Revises: e3f5a8c21b47
+Create Date: 2025-09-05 14:06:52.730914
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f4b1c9d27e60'
+down_revision: Union[str, Sequence[str], None] = 'e3f5a8c21b47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # One counter per scope ('market', 'portfolio:<id>'), advanced in the data's own transaction
+    op.create_table('data_versions',
+        sa.Column('scope', sa.String(length=100), nullable=False),
+        sa.Column('version', sa.BigInteger(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.text('now()')),
+        sa.PrimaryKeyConstraint('scope')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('data_versions')
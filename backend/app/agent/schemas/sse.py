@@ -2,7 +2,7 @@
 Server-Sent Events (SSE) schemas for Agent streaming
 """
 from typing import Dict, Any, Optional, List
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from app.agent.schemas.base import AgentBaseSchema
 
 
@@ -21,6 +21,9 @@ class SSEStartEvent(AgentBaseSchema):
 
 class SSEMessageEvent(AgentBaseSchema):
     """SSE message event data (text delta)"""
+    # Deltas are fragments of the reply; their leading/trailing spaces are content
+    model_config = ConfigDict(str_strip_whitespace=False)
+    
     delta: str = Field(..., description="Text chunk")
     role: str = "assistant"
 
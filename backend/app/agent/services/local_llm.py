@@ -0,0 +1,183 @@
+"""
+Local stand-in for the OpenAI chat completions API
+
+Replays a scripted conversation as streamed ``ChatCompletionChunk`` objects
+at a configurable token rate, so the chat stack (OpenAIService, ToolRegistry,
+sse_generator) can be exercised and load tested without network access.
+Enable it with AGENT_LLM_PROVIDER=local.
+
+A script is a list of steps. The step replayed for a request is the number of
+tool-call rounds since the latest user message, so step 0 answers the user and
+step 1 answers the first round of tool results. Each step streams its content
+and then, if it has any, its tool calls:
+
+    {"steps": [
+        {"content": "Let me look at your portfolio.",
+         "tool_calls": [{"name": "get_portfolio_complete",
+                         "arguments": {"portfolio_id": "{portfolio_id}"}}]},
+        {"content": "Your portfolio is ..."}
+    ]}
+
+``{portfolio_id}`` in tool arguments is replaced with the first UUID in the
+latest user message.
+"""
+import asyncio
+import json
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, Dict, List, Optional
+from uuid import uuid4
+
+from openai.types.chat.chat_completion_chunk import (
+    ChatCompletionChunk,
+    Choice,
+    ChoiceDelta,
+    ChoiceDeltaToolCall,
+    ChoiceDeltaToolCallFunction,
+)
+
+from app.config import settings
+from app.core.datetime_utils import utc_now
+
+# A token is a word with its leading whitespace - close enough to BPE counts for load planning
+_TOKEN = re.compile(r"\s*\S+")
+_UUID = re.compile(r"[0-9a-fA-F]{8}-(?:[0-9a-fA-F]{4}-){3}[0-9a-fA-F]{12}")
+
+
+def split_tokens(text: str) -> List[str]:
+    """Split text into the pieces the stand-in streams as individual deltas."""
+    return _TOKEN.findall(text)
+
+
+def count_tokens(text: str) -> int:
+    """Number of stand-in tokens in text."""
+    return len(split_tokens(text))
+
+
+@dataclass
+class ScriptStep:
+    """One scripted model response: streamed text followed by optional tool calls."""
+    content: str = ""
+    tool_calls: List[Dict[str, Any]] = field(default_factory=list)
+
+
+DEFAULT_SCRIPT = [
+    ScriptStep(
+        content="Let me pull up your portfolio.",
+        tool_calls=[
+            {"name": "get_portfolio_complete", "arguments": {"portfolio_id": "{portfolio_id}"}},
+            {"name": "get_portfolio_data_quality", "arguments": {"portfolio_id": "{portfolio_id}"}},
+        ],
+    ),
+    ScriptStep(
+        content=(
+            "Here is an overview of your portfolio. Your largest positions account for a "
+            "significant share of total exposure, so concentration is the main risk to watch. "
+            "Long exposure outweighs short exposure, leaving the book net long and sensitive "
+            "to broad market moves. Data quality is sufficient for the standard risk metrics, "
+            "although some positions have limited price history. Let me know if you would like "
+            "a breakdown by sector, factor exposures, or a closer look at any single position."
+        ),
+    ),
+]
+
+
+def load_script(path: str) -> List[ScriptStep]:
+    """Read a script file ({"steps": [...]}) into steps."""
+    payload = json.loads(Path(path).read_text())
+    return [
+        ScriptStep(content=step.get("content", ""), tool_calls=step.get("tool_calls", []))
+        for step in payload["steps"]
+    ]
+
+
+class LocalChatClient:
+    """
+    Drop-in for ``AsyncOpenAI`` as used by OpenAIService: only
+    ``chat.completions.create(..., stream=True)`` is implemented.
+    """
+
+    def __init__(
+        self,
+        script: Optional[List[ScriptStep]] = None,
+        tokens_per_second: float = settings.AGENT_LOCAL_LLM_TOKENS_PER_SEC,
+        first_token_ms: int = settings.AGENT_LOCAL_LLM_FIRST_TOKEN_MS
+    ):
+        if script is None:
+            script = load_script(settings.AGENT_LOCAL_LLM_SCRIPT) if settings.AGENT_LOCAL_LLM_SCRIPT else DEFAULT_SCRIPT
+        if not script:
+            raise ValueError("Local LLM script must have at least one step")
+        self.script = script
+        self.token_delay = 1 / tokens_per_second if tokens_per_second > 0 else 0.0
+        self.first_token_delay = first_token_ms / 1000
+        self.requests = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    async def create(
+        self,
+        *,
+        model: str,
+        messages: List[Dict[str, Any]],
+        stream: bool = False,
+        **kwargs
+    ) -> AsyncIterator[ChatCompletionChunk]:
+        if not stream:
+            raise ValueError("The local LLM stand-in only supports streaming completions")
+        self.requests += 1
+        step = self.script[min(self._tool_rounds(messages), len(self.script) - 1)]
+        return self._stream(step, model, self._latest_user_message(messages))
+
+    @staticmethod
+    def _tool_rounds(messages: List[Dict[str, Any]]) -> int:
+        rounds = 0
+        for message in reversed(messages):
+            if message.get("role") == "user":
+                break
+            if message.get("role") == "assistant" and message.get("tool_calls"):
+                rounds += 1
+        return rounds
+
+    @staticmethod
+    def _latest_user_message(messages: List[Dict[str, Any]]) -> str:
+        for message in reversed(messages):
+            if message.get("role") == "user":
+                return message.get("content") or ""
+        return ""
+
+    async def _stream(self, step: ScriptStep, model: str, user_message: str) -> AsyncIterator[ChatCompletionChunk]:
+        completion_id = f"chatcmpl-local-{uuid4().hex[:12]}"
+        created = int(utc_now().timestamp())
+
+        def chunk(delta: ChoiceDelta, finish_reason: Optional[str] = None) -> ChatCompletionChunk:
+            return ChatCompletionChunk(
+                id=completion_id,
+                object="chat.completion.chunk",
+                created=created,
+                model=model,
+                choices=[Choice(index=0, delta=delta, finish_reason=finish_reason)],
+            )
+
+        await asyncio.sleep(self.first_token_delay)
+        for i, token in enumerate(split_tokens(step.content)):
+            if i:
+                await asyncio.sleep(self.token_delay)
+            yield chunk(ChoiceDelta(role="assistant", content=token))
+
+        match = _UUID.search(user_message)
+        portfolio_id = match.group(0) if match else ""
+        for index, call in enumerate(step.tool_calls):
+            arguments = json.dumps(call.get("arguments", {})).replace("{portfolio_id}", portfolio_id)
+            yield chunk(ChoiceDelta(tool_calls=[ChoiceDeltaToolCall(
+                index=index,
+                id=f"call_{uuid4().hex[:12]}",
+                type="function",
+                function=ChoiceDeltaToolCallFunction(name=call["name"], arguments=""),
+            )]))
+            yield chunk(ChoiceDelta(tool_calls=[ChoiceDeltaToolCall(
+                index=index,
+                function=ChoiceDeltaToolCallFunction(arguments=arguments),
+            )]))
+
+        yield chunk(ChoiceDelta(), finish_reason="tool_calls" if step.tool_calls else "stop")
@@ -6,11 +6,14 @@ from typing import AsyncGenerator, Dict, Any, List, Optional
 from openai import AsyncOpenAI
 from openai.types.chat import ChatCompletionMessageParam, ChatCompletionToolParam
 import asyncio
+import time
 
 from app.config import settings
 from app.core.logging import get_logger
-from app.agent.tools.tool_registry import tool_registry
+from app.agent.tools.tool_registry import ToolRegistry, tool_registry
 from app.agent.prompts.prompt_manager import PromptManager
+from app.agent.services.local_llm import LocalChatClient
+from app.agent.services.sse_stream import ChatTurn, MessageDeltaBuffer, format_sse
 from app.agent.schemas.sse import (
     SSEStartEvent,
     SSEMessageEvent,
@@ -27,7 +30,11 @@ class OpenAIService:
     """Service for handling OpenAI API interactions"""
     
     def __init__(self):
-        self.client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
+        if settings.AGENT_LLM_PROVIDER == "local":
+            # Scripted offline stand-in (load tests, development without an API key)
+            self.client = LocalChatClient()
+        else:
+            self.client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
         self.prompt_manager = PromptManager()
         self.model = settings.MODEL_DEFAULT
         self.fallback_model = settings.MODEL_FALLBACK
@@ -249,19 +256,104 @@ class OpenAIService:
         
         return messages
     
+    async def _execute_tool_calls(
+        self,
+        registry: ToolRegistry,
+        tool_calls: List[Dict[str, Any]],
+        results: Dict[str, Dict[str, Any]],
+        conversation_id: Optional[str] = None,
+        turn: Optional[ChatTurn] = None
+    ) -> AsyncGenerator[str, None]:
+        """
+        Run the tool calls of one model turn concurrently
+        
+        At most AGENT_MAX_CONCURRENT_TOOLS calls run at once. tool_started and
+        tool_finished events are yielded as each call starts and completes,
+        with the measured duration. Results (or error payloads) are stored in
+        ``results`` by tool call id, and name and duration are recorded on
+        ``turn``. The conversation id scopes the tool result cache.
+        """
+        semaphore = asyncio.Semaphore(max(1, settings.AGENT_MAX_CONCURRENT_TOOLS))
+        events: asyncio.Queue = asyncio.Queue()
+        
+        async def run(tool_call: Dict[str, Any]) -> None:
+            function_name = tool_call["function"]["name"]
+            async with semaphore:
+                started = time.perf_counter()
+                try:
+                    function_args = json.loads(tool_call["function"]["arguments"] or "{}")
+                except json.JSONDecodeError as e:
+                    function_args = None
+                    result = {"error": f"Invalid tool arguments: {e}"}
+                
+                tool_started = SSEToolStartedEvent(
+                    tool_name=function_name,
+                    arguments=function_args or {}
+                )
+                await events.put(format_sse("tool_started", tool_started))
+                
+                if function_args is not None:
+                    try:
+                        result = await registry.dispatch_tool_call(
+                            function_name,
+                            function_args,
+                            ctx={"conversation_id": conversation_id}
+                        )
+                    except Exception as e:
+                        logger.error(f"Tool execution error: {e}")
+                        result = {"error": str(e)}
+                
+                results[tool_call["id"]] = result
+                tool_finished = SSEToolFinishedEvent(
+                    tool_name=function_name,
+                    result=result,
+                    duration_ms=int((time.perf_counter() - started) * 1000)
+                )
+                if turn is not None:
+                    turn.tool_calls.append({"name": function_name, "duration_ms": tool_finished.duration_ms})
+                await events.put(format_sse("tool_finished", tool_finished))
+        
+        async def run_all() -> None:
+            try:
+                await asyncio.gather(*(run(tool_call) for tool_call in tool_calls))
+            finally:
+                await events.put(None)  # End of events
+        
+        runner = asyncio.create_task(run_all())
+        try:
+            while (event := await events.get()) is not None:
+                yield event
+            await runner
+        finally:
+            runner.cancel()
+    
     async def stream_chat_completion(
         self,
         conversation_id: str,
         conversation_mode: str,
         message_text: str,
         message_history: List[Dict[str, Any]] = None,
-        portfolio_context: Optional[Dict[str, Any]] = None
+        portfolio_context: Optional[Dict[str, Any]] = None,
+        registry: Optional[ToolRegistry] = None,
+        turn: Optional[ChatTurn] = None
     ) -> AsyncGenerator[str, None]:
         """
         Stream chat completion with tool calling support
         
+        Tool calls are dispatched through ``registry`` (see create_tool_registry),
+        defaulting to the shared unauthenticated registry. Token deltas are
+        coalesced into message events (SSE_COALESCE_CHARS / SSE_COALESCE_MS).
+        Assistant text and tool call metadata are recorded on ``turn``.
+        
         Yields SSE formatted events
         """
+        registry = registry or tool_registry
+        turn = turn if turn is not None else ChatTurn()
+        buffer = MessageDeltaBuffer()
+        
+        def message_frame(text: str) -> str:
+            return format_sse("message", SSEMessageEvent(delta=text, role="assistant"))
+        
         try:
             # Build messages
             messages = self._build_messages(
@@ -280,7 +372,7 @@ class OpenAIService:
                 mode=conversation_mode,
                 model=self.model
             )
-            yield f"event: start\ndata: {json.dumps(start_event.model_dump())}\n\n"
+            yield format_sse("start", start_event)
             
             # Call OpenAI with streaming
             stream = await self.client.chat.completions.create(
@@ -301,84 +393,60 @@ class OpenAIService:
                 if not delta:
                     continue
                 
-                # Handle content streaming
+                # Handle content streaming (coalesced)
                 if delta.content:
                     current_content += delta.content
-                    message_event = SSEMessageEvent(
-                        delta=delta.content,
-                        role="assistant"
-                    )
-                    yield f"event: message\ndata: {json.dumps(message_event.model_dump())}\n\n"
+                    turn.content_parts.append(delta.content)
+                    if (text := buffer.add(delta.content)) is not None:
+                        yield message_frame(text)
                 
-                # Handle tool calls
+                # Handle tool calls (streamed in fragments; only the first carries the id)
                 if delta.tool_calls:
                     for tool_call_delta in delta.tool_calls:
-                        tool_call_id = tool_call_delta.id
-                        
-                        if tool_call_id not in tool_call_chunks:
-                            tool_call_chunks[tool_call_id] = {
-                                "id": tool_call_id,
+                        if tool_call_delta.index not in tool_call_chunks:
+                            tool_call_chunks[tool_call_delta.index] = {
+                                "id": tool_call_delta.id,
                                 "type": "function",
                                 "function": {
                                     "name": tool_call_delta.function.name if tool_call_delta.function else "",
                                     "arguments": ""
                                 }
                             }
+                        elif tool_call_delta.id:
+                            tool_call_chunks[tool_call_delta.index]["id"] = tool_call_delta.id
                         
                         # Accumulate function arguments
                         if tool_call_delta.function and tool_call_delta.function.arguments:
-                            tool_call_chunks[tool_call_id]["function"]["arguments"] += tool_call_delta.function.arguments
+                            tool_call_chunks[tool_call_delta.index]["function"]["arguments"] += tool_call_delta.function.arguments
                 
                 # Check for finish reason
                 if chunk.choices and chunk.choices[0].finish_reason == "tool_calls":
-                    # Execute tool calls
-                    for tool_call_id, tool_call in tool_call_chunks.items():
-                        function_name = tool_call["function"]["name"]
-                        function_args = json.loads(tool_call["function"]["arguments"])
-                        
-                        # Yield tool started event
-                        tool_started = SSEToolStartedEvent(
-                            tool_name=function_name,
-                            arguments=function_args
-                        )
-                        yield f"event: tool_started\ndata: {json.dumps(tool_started.model_dump())}\n\n"
-                        
-                        # Execute tool
-                        try:
-                            result = await tool_registry.dispatch(function_name, **function_args)
-                            
-                            # Yield tool finished event
-                            tool_finished = SSEToolFinishedEvent(
-                                tool_name=function_name,
-                                result=result,
-                                duration_ms=100  # TODO: Track actual duration
-                            )
-                            yield f"event: tool_finished\ndata: {json.dumps(tool_finished.model_dump())}\n\n"
-                            
-                            # Add tool response to messages for next iteration
-                            messages.append({
-                                "role": "tool",
-                                "tool_call_id": tool_call_id,
-                                "content": json.dumps(result)
-                            })
-                            
-                        except Exception as e:
-                            logger.error(f"Tool execution error: {e}")
-                            tool_finished = SSEToolFinishedEvent(
-                                tool_name=function_name,
-                                result={"error": str(e)},
-                                duration_ms=0
-                            )
-                            yield f"event: tool_finished\ndata: {json.dumps(tool_finished.model_dump())}\n\n"
+                    if (text := buffer.flush()) is not None:
+                        yield message_frame(text)
+                    
+                    tool_calls = list(tool_call_chunks.values())
+                    tool_results: Dict[str, Dict[str, Any]] = {}
+                    
+                    # Execute tool calls concurrently, forwarding events as they happen
+                    async for tool_event in self._execute_tool_calls(
+                        registry, tool_calls, tool_results, conversation_id, turn
+                    ):
+                        yield tool_event
                     
                     # Continue conversation with tool results
-                    if tool_call_chunks:
-                        # Add assistant message with tool calls to history
+                    if tool_calls:
+                        # Assistant message with the tool calls, then one response per call in call order
                         messages.append({
                             "role": "assistant",
                             "content": current_content or None,
-                            "tool_calls": list(tool_call_chunks.values())
+                            "tool_calls": tool_calls
                         })
+                        for tool_call in tool_calls:
+                            messages.append({
+                                "role": "tool",
+                                "tool_call_id": tool_call["id"],
+                                "content": json.dumps(tool_results[tool_call["id"]])
+                            })
                         
                         # Make another API call with tool results
                         continuation_stream = await self.client.chat.completions.create(
@@ -392,26 +460,30 @@ class OpenAIService:
                         async for cont_chunk in continuation_stream:
                             cont_delta = cont_chunk.choices[0].delta if cont_chunk.choices else None
                             if cont_delta and cont_delta.content:
-                                message_event = SSEMessageEvent(
-                                    delta=cont_delta.content,
-                                    role="assistant"
-                                )
-                                yield f"event: message\ndata: {json.dumps(message_event.model_dump())}\n\n"
+                                turn.content_parts.append(cont_delta.content)
+                                if (text := buffer.add(cont_delta.content)) is not None:
+                                    yield message_frame(text)
+            
+            if (text := buffer.flush()) is not None:
+                yield message_frame(text)
             
             # Send done event
             done_event = SSEDoneEvent(
                 tool_calls_count=len(tool_call_chunks),
                 total_tokens=0  # TODO: Track token usage
             )
-            yield f"event: done\ndata: {json.dumps(done_event.model_dump())}\n\n"
+            yield format_sse("done", done_event)
             
         except Exception as e:
             logger.error(f"OpenAI streaming error: {e}")
+            turn.error = str(e)
+            if (text := buffer.flush()) is not None:
+                yield message_frame(text)
             error_event = SSEErrorEvent(
                 message=str(e),
                 retryable=True
             )
-            yield f"event: error\ndata: {json.dumps(error_event.model_dump())}\n\n"
+            yield format_sse("error", error_event)
 
 
 # Singleton instance
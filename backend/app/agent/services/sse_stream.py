@@ -0,0 +1,70 @@
+"""
+SSE streaming helpers for the chat pipeline
+
+- format_sse: one SSE frame from an event schema (pydantic-core JSON encoding)
+- MessageDeltaBuffer: coalesces model token deltas into fewer message events
+- ChatTurn: structured record of what a streamed turn produced, so the caller
+  does not need to re-parse the SSE frames it forwards
+"""
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel
+
+from app.config import settings
+
+
+def format_sse(event: str, payload: BaseModel) -> str:
+    """Serialize an event schema as an SSE frame."""
+    return f"event: {event}\ndata: {payload.model_dump_json()}\n\n"
+
+
+class MessageDeltaBuffer:
+    """
+    Coalesces streamed text deltas on a size/time budget.
+
+    ``add`` returns the buffered text once it reaches ``max_chars`` or the
+    oldest buffered delta is ``max_ms`` old (checked as deltas arrive);
+    ``flush`` returns whatever is left, e.g. before a tool or done event.
+    """
+
+    def __init__(
+        self,
+        max_chars: int = settings.SSE_COALESCE_CHARS,
+        max_ms: int = settings.SSE_COALESCE_MS
+    ):
+        self.max_chars = max_chars
+        self.max_seconds = max_ms / 1000
+        self._parts: List[str] = []
+        self._size = 0
+        self._started = 0.0
+
+    def add(self, text: str) -> Optional[str]:
+        if not self._parts:
+            self._started = time.monotonic()
+        self._parts.append(text)
+        self._size += len(text)
+        if self._size >= self.max_chars or time.monotonic() - self._started >= self.max_seconds:
+            return self.flush()
+        return None
+
+    def flush(self) -> Optional[str]:
+        if not self._parts:
+            return None
+        text = "".join(self._parts)
+        self._parts.clear()
+        self._size = 0
+        return text
+
+
+@dataclass
+class ChatTurn:
+    """What a streamed chat turn produced: assistant text and tool call metadata."""
+    content_parts: List[str] = field(default_factory=list)
+    tool_calls: List[Dict[str, Any]] = field(default_factory=list)
+    error: Optional[str] = None
+
+    @property
+    def content(self) -> str:
+        return "".join(self.content_parts)
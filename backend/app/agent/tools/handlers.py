@@ -21,16 +21,19 @@ class PortfolioTools:
     This class is 100% portable across all AI providers (OpenAI, Anthropic, Gemini, etc.)
     """
     
-    def __init__(self, base_url: str = None, auth_token: str = None):
+    def __init__(self, base_url: str = None, auth_token: str = None, backend: Optional[Any] = None):
         """
         Initialize the tools with API configuration.
         
         Args:
             base_url: Base URL for the API (defaults to settings)
             auth_token: Bearer token for authentication
+            backend: In-process backend (e.g. InProcessToolBackend); requests it
+                cannot serve fall back to HTTP
         """
-        self.base_url = base_url or "http://localhost:8000"
+        self.base_url = base_url or settings.AGENT_API_BASE_URL
         self.auth_token = auth_token
+        self.backend = backend
         self.timeout = httpx.Timeout(3.0, connect=5.0)  # 3s read, 5s connect
         
     async def _make_request(
@@ -41,7 +44,8 @@ class PortfolioTools:
         retry_count: int = 2
     ) -> Dict[str, Any]:
         """
-        Make HTTP request to backend API with retry logic.
+        Make request to backend API: in-process when the backend serves the
+        endpoint, otherwise over HTTP with retry logic.
         
         Args:
             method: HTTP method (GET, POST, etc.)
@@ -52,6 +56,9 @@ class PortfolioTools:
         Returns:
             API response as dictionary
         """
+        if self.backend is not None and self.backend.resolve(method, endpoint) is not None:
+            return await self.backend.request(method, endpoint, params)
+        
         url = f"{self.base_url}{endpoint}"
         headers = {}
         if self.auth_token:
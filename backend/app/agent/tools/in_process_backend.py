@@ -0,0 +1,145 @@
+"""
+In-process backend for the agent tools.
+
+Serves the tools' /api/v1/data requests by calling the data endpoint functions
+directly instead of looping back over HTTP to the API. The caller is already
+authenticated, so there is no JSON round trip, JWT verification or user lookup
+per tool call. Results are JSON-encoded exactly as the HTTP response would be.
+"""
+import asyncio
+import inspect
+import re
+from functools import lru_cache
+from typing import Annotated, Any, Callable, Dict, List, Optional, Pattern, Tuple
+
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter, ValidationError
+from pydantic.fields import FieldInfo
+from pydantic_core import PydanticUndefined
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.schemas.auth import CurrentUser
+
+# Parameters injected by FastAPI dependencies; supplied by the backend itself
+INJECTED_PARAMS = ("current_user", "db")
+
+# Same budget as the HTTP read timeout of PortfolioTools
+IN_PROCESS_TIMEOUT_SECONDS = 3.0
+
+
+def _data_routes() -> List[Tuple[Pattern, Callable]]:
+    """Endpoint path patterns used by PortfolioTools mapped to their functions"""
+    # Imported lazily: the API package imports the agent (chat router) at import time
+    from app.api.v1 import data as data_api
+
+    prefix = "/api/v1/data"
+    routes = [
+        (r"/portfolio/(?P<portfolio_id>[^/]+)/complete", data_api.get_portfolio_complete),
+        (r"/portfolio/(?P<portfolio_id>[^/]+)/data-quality", data_api.get_portfolio_data_quality),
+        (r"/positions/details", data_api.get_positions_details),
+        (r"/positions/top/(?P<portfolio_id>[^/]+)", data_api.get_top_positions),
+        (r"/prices/historical/(?P<portfolio_id>[^/]+)", data_api.get_historical_prices),
+        (r"/prices/quotes", data_api.get_market_quotes),
+        (r"/factors/etf-prices", data_api.get_factor_etf_prices),
+    ]
+    return [(re.compile(f"^{prefix}{pattern}$"), endpoint) for pattern, endpoint in routes]
+
+
+@lru_cache(maxsize=None)
+def _parameter_adapters(function: Callable) -> Tuple[Tuple[str, TypeAdapter, Any], ...]:
+    """(name, validator, default) for each request parameter of an endpoint, built once per endpoint"""
+    adapters = []
+    for name, parameter in inspect.signature(function).parameters.items():
+        if name in INJECTED_PARAMS:
+            continue
+        annotation = parameter.annotation
+        default = parameter.default
+        if isinstance(default, FieldInfo):
+            # Keeps the Query constraints (le=, regex=, ...) in the validation
+            annotation = Annotated[annotation, default]
+            default = default.default
+        adapters.append((name, TypeAdapter(annotation), default))
+    return tuple(adapters)
+
+
+class InProcessToolBackend:
+    """
+    Dispatches tool requests to the data endpoint functions in this process.
+
+    Each request runs on its own session from ``session_factory`` (the data
+    endpoints close the session they are given, and tool calls of one turn may
+    run concurrently).
+    """
+
+    def __init__(
+        self,
+        current_user: CurrentUser,
+        session_factory: Optional[async_sessionmaker] = None,
+        timeout: float = IN_PROCESS_TIMEOUT_SECONDS
+    ):
+        if session_factory is None:
+            from app.database import AsyncSessionLocal
+            session_factory = AsyncSessionLocal
+        self.current_user = current_user
+        self.session_factory = session_factory
+        self.timeout = timeout
+        self._routes: Optional[List[Tuple[Pattern, Callable]]] = None
+
+    def resolve(self, method: str, endpoint: str) -> Optional[Tuple[Callable, Dict[str, str]]]:
+        """Endpoint function and path parameters for a request, or None if not served in-process"""
+        if method.upper() != "GET":
+            return None
+        if self._routes is None:
+            self._routes = _data_routes()
+        for pattern, function in self._routes:
+            match = pattern.match(endpoint)
+            if match:
+                return function, match.groupdict()
+        return None
+
+    async def request(
+        self,
+        method: str,
+        endpoint: str,
+        params: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Call the endpoint function for a request and return its JSON-encoded result.
+
+        Raises:
+            LookupError: No in-process route for the request
+            HTTPException: Raised by the endpoint, 422 for invalid parameters or
+                504 when the endpoint takes longer than the timeout
+        """
+        resolved = self.resolve(method, endpoint)
+        if resolved is None:
+            raise LookupError(f"No in-process route for {method} {endpoint}")
+        function, path_params = resolved
+
+        arguments = self._bind_arguments(function, {**(params or {}), **path_params})
+        try:
+            async with self.session_factory() as session:
+                result = await asyncio.wait_for(
+                    function(current_user=self.current_user, db=session, **arguments),
+                    timeout=self.timeout
+                )
+        except asyncio.TimeoutError:
+            raise HTTPException(status_code=504, detail=f"{endpoint} timed out after {self.timeout}s")
+        return jsonable_encoder(result)
+
+    @staticmethod
+    def _bind_arguments(function: Callable, values: Dict[str, Any]) -> Dict[str, Any]:
+        """Validate request values against the endpoint signature and its Query constraints, filling defaults"""
+        arguments = {}
+        for name, adapter, default in _parameter_adapters(function):
+            if name not in values:
+                if default is PydanticUndefined or default is inspect.Parameter.empty:
+                    raise HTTPException(status_code=422, detail=f"Missing required parameter: {name}")
+                arguments[name] = default
+                continue
+            try:
+                arguments[name] = adapter.validate_python(values[name])
+            except ValidationError as e:
+                raise HTTPException(status_code=422, detail=f"Invalid parameter {name}: {e}")
+        return arguments
@@ -0,0 +1,95 @@
+"""
+Per-conversation cache of agent tool results.
+
+The agent often repeats a tool call with the same arguments within one
+conversation. Successful results are cached under (conversation, tool,
+normalized arguments, data version). The data version (see
+app.core.data_version) advances with the commit of a batch run or price
+update and is read from the database at the start of every chat turn, so a
+turn never gets results from before an update committed earlier. Entries expire after AGENT_CACHE_TTL seconds and the least recently
+used entry is evicted once the cache is full.
+"""
+import copy
+import inspect
+import json
+from typing import Any, Callable, Dict, Tuple
+from uuid import UUID
+
+from app.config import settings
+from app.core.data_version import get_data_version
+from app.core.ttl_cache import TTLCache
+
+TOOL_RESULT_CACHE_MAXSIZE = 512  # entries across all conversations
+TOOL_RESULT_MAX_ENTRY_BYTES = 512 * 1024  # larger results are not cached
+
+# Tools whose results only change with stored data (quotes are live and never cached)
+CACHEABLE_TOOLS = frozenset({
+    "get_portfolio_complete",
+    "get_positions_details",
+    "get_prices_historical",
+    "get_portfolio_data_quality",
+    "get_factor_etf_prices",
+})
+
+
+def normalize_tool_arguments(handler: Callable, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Arguments of a tool call with the handler's defaults applied.
+
+    ``{"portfolio_id": p}`` and ``{"portfolio_id": p, "include_holdings": True}``
+    normalize to the same arguments; UUIDs are lower-cased and unknown extra
+    arguments (swallowed by the handlers' ``**kwargs``) are dropped.
+    """
+    signature = inspect.signature(handler)
+    known = {name: value for name, value in payload.items() if name in signature.parameters}
+    bound = signature.bind_partial(**known)
+    bound.apply_defaults()
+    arguments = {
+        name: value for name, value in bound.arguments.items()
+        if signature.parameters[name].kind is not inspect.Parameter.VAR_KEYWORD
+    }
+    if isinstance(arguments.get("portfolio_id"), str):
+        try:
+            arguments["portfolio_id"] = str(UUID(arguments["portfolio_id"]))
+        except ValueError:
+            pass
+    return arguments
+
+
+def _json_size(value: Any) -> int:
+    return len(json.dumps(value, default=str))
+
+
+class ToolResultCache(TTLCache):
+    """TTL + LRU cache of tool results keyed by conversation, call and data version."""
+
+    def __init__(
+        self,
+        ttl_seconds: float = settings.AGENT_CACHE_TTL,
+        maxsize: int = TOOL_RESULT_CACHE_MAXSIZE,
+        max_entry_bytes: int = TOOL_RESULT_MAX_ENTRY_BYTES
+    ):
+        # Callers may mutate what they receive
+        super().__init__(
+            ttl_seconds, maxsize,
+            copy_value=copy.deepcopy,
+            max_entry_size=max_entry_bytes,
+            sizeof=_json_size
+        )
+
+    @staticmethod
+    def make_key(conversation_id: str, tool_name: str, handler: Callable, payload: Dict[str, Any]) -> Tuple:
+        arguments = normalize_tool_arguments(handler, payload)
+        return (
+            str(conversation_id),
+            tool_name,
+            json.dumps(arguments, sort_keys=True, default=str),
+            get_data_version(arguments.get("portfolio_id")),
+        )
+
+
+_tool_result_cache = ToolResultCache()
+
+
+def get_tool_cache_stats() -> Dict[str, Any]:
+    """Hit/miss statistics of the tool result cache."""
+    return _tool_result_cache.info()
@@ -8,8 +8,12 @@ from datetime import datetime
 import logging
 from pydantic import BaseModel, ValidationError
 
+from app.config import settings
 from app.core.datetime_utils import utc_now, to_utc_iso8601
 from app.agent.tools.handlers import PortfolioTools
+from app.agent.tools.in_process_backend import InProcessToolBackend
+from app.agent.tools.tool_cache import CACHEABLE_TOOLS, ToolResultCache, _tool_result_cache
+from app.schemas.auth import CurrentUser
 
 logger = logging.getLogger(__name__)
 
@@ -37,6 +41,7 @@ class MetaInfo(BaseModel):
     retryable: bool = False
     retries: int = 0
     cache_hit: bool = False
+    cache: Optional[Dict[str, int]] = None
     request_id: Optional[str] = None
 
 
@@ -53,16 +58,23 @@ class ToolRegistry:
     Implements the ultra-thin handler pattern.
     """
     
-    def __init__(self, tools: Optional[PortfolioTools] = None, auth_token: Optional[str] = None):
+    def __init__(
+        self,
+        tools: Optional[PortfolioTools] = None,
+        auth_token: Optional[str] = None,
+        cache: Optional[ToolResultCache] = None
+    ):
         """
         Initialize the tool registry.
         
         Args:
             tools: PortfolioTools instance (will create if not provided)
             auth_token: Bearer token for API authentication
+            cache: Tool result cache (defaults to the shared cache)
         """
         self.tools = tools or PortfolioTools(auth_token=auth_token)
         self.auth_token = auth_token
+        self.cache = cache if cache is not None else _tool_result_cache
         
         # Registry mapping tool names to methods
         self.registry: Dict[str, Callable] = {
@@ -86,12 +98,14 @@ class ToolRegistry:
         Args:
             tool_name: Name of the tool to execute
             payload: Tool arguments
-            ctx: Optional context (user info, conversation id, etc.)
+            ctx: Optional context (user info, conversation id, etc.); with a
+                conversation_id, results of cacheable tools are cached
             
         Returns:
             Uniform envelope response with meta, data, and optional error
         """
-        request_id = ctx.get("request_id") if ctx else str(uuid4())
+        request_id = (ctx or {}).get("request_id") or str(uuid4())
+        conversation_id = (ctx or {}).get("conversation_id")
         start_time = utc_now()
         
         try:
@@ -121,8 +135,21 @@ class ToolRegistry:
                     request_id=request_id
                 )
             
-            # (c) Call underlying tool
+            # (c) Call underlying tool, or serve the result from the cache
             handler = self.registry[tool_name]
+            cache_key = None
+            if conversation_id and tool_name in CACHEABLE_TOOLS:
+                cache_key = self.cache.make_key(conversation_id, tool_name, handler, payload)
+                found, result = self.cache.get(cache_key)
+                if found:
+                    return self._format_success_envelope(
+                        data=result,
+                        requested_params=payload,
+                        request_id=request_id,
+                        cache_hit=True,
+                        cache_stats=self._cache_stats()
+                    )
+            
             result = await handler(**payload)
             
             # Check if the result is an error
@@ -135,11 +162,15 @@ class ToolRegistry:
                     request_id=request_id
                 )
             
+            if cache_key is not None:
+                self.cache.set(cache_key, result)
+            
             # (d) Wrap in uniform envelope
             return self._format_success_envelope(
                 data=result,
                 requested_params=payload,
-                request_id=request_id
+                request_id=request_id,
+                cache_stats=self._cache_stats() if cache_key is not None else None
             )
             
         except Exception as e:
@@ -157,7 +188,9 @@ class ToolRegistry:
         self,
         data: Any,
         requested_params: Dict[str, Any],
-        request_id: Optional[str] = None
+        request_id: Optional[str] = None,
+        cache_hit: bool = False,
+        cache_stats: Optional[Dict[str, int]] = None
     ) -> Dict[str, Any]:
         """
         Format successful response with uniform envelope.
@@ -166,6 +199,8 @@ class ToolRegistry:
             data: Tool response data
             requested_params: Original request parameters
             request_id: Request ID for tracking
+            cache_hit: Whether the data was served from the tool result cache
+            cache_stats: Tool result cache hit/miss counts (cacheable tools)
             
         Returns:
             Formatted response with meta and data
@@ -196,13 +231,19 @@ class ToolRegistry:
                 },
                 "retryable": False,
                 "retries": 0,
-                "cache_hit": False,
+                "cache_hit": cache_hit,
+                "cache": cache_stats,
                 "request_id": request_id
             },
             "data": data,
             "error": None
         }
     
+    def _cache_stats(self) -> Dict[str, int]:
+        """Hit/miss counts of the tool result cache for the response meta"""
+        stats = self.cache.info()
+        return {"hits": stats["hits"], "misses": stats["misses"]}
+    
     def _format_error_envelope(
         self,
         message: str,
@@ -282,5 +323,28 @@ class ToolRegistry:
         }
 
 
+def create_tool_registry(
+    current_user: Optional[CurrentUser] = None,
+    auth_token: Optional[str] = None
+) -> ToolRegistry:
+    """
+    Create a registry for one chat request.
+    
+    Tools run in-process as the authenticated caller unless AGENT_TOOL_BACKEND
+    is "http"; the bearer token is kept for the HTTP fallback.
+    
+    Args:
+        current_user: Authenticated user the tools act for
+        auth_token: Bearer token for HTTP requests
+        
+    Returns:
+        ToolRegistry bound to the caller
+    """
+    backend = None
+    if current_user is not None and settings.AGENT_TOOL_BACKEND == "inprocess":
+        backend = InProcessToolBackend(current_user)
+    return ToolRegistry(tools=PortfolioTools(auth_token=auth_token, backend=backend), auth_token=auth_token)
+
+
 # Create singleton instance
 tool_registry = ToolRegistry()
\ No newline at end of file
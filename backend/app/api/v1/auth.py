@@ -9,6 +9,7 @@ from uuid import uuid4
 
 from app.database import get_db
 from app.core.auth import verify_password, get_password_hash, create_token_response
+from app.core.auth_cache import invalidate_user
 from app.core.dependencies import get_current_user
 from app.models.users import User, Portfolio
 from app.schemas.auth import UserLogin, UserRegister, TokenResponse, UserResponse, CurrentUser
@@ -189,6 +190,9 @@ async def logout(
     
     auth_logger.info(f"Cleared auth cookie for user: {current_user.email}")
     
+    # Require a database lookup on the next request with any of the user's tokens
+    invalidate_user(current_user.id)
+    
     # Note: Client should also discard any stored Bearer tokens
     # In a future version, we could implement token blacklisting
     return {"message": "Successfully logged out", "success": True}
@@ -7,9 +7,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_
 from sqlalchemy.orm import selectinload
 import asyncio
-import json
-from typing import AsyncGenerator, List, Dict, Any
-from uuid import uuid4
+from typing import AsyncGenerator, List, Dict, Any, Optional
+from uuid import UUID, uuid4
 from datetime import datetime
 
 from app.database import get_db
@@ -24,7 +23,10 @@ from app.agent.schemas.sse import (
     SSEHeartbeatEvent
 )
 from app.agent.services.openai_service import openai_service
+from app.agent.services.sse_stream import ChatTurn, format_sse
+from app.agent.tools.tool_registry import create_tool_registry
 from app.services.portfolio_data_service import PortfolioDataService
+from app.core.data_version import refresh_data_versions
 from app.core.datetime_utils import utc_now
 from app.core.logging import get_logger
 from app.config import settings
@@ -66,7 +68,8 @@ async def sse_generator(
     message_text: str,
     conversation: Conversation,
     db: AsyncSession,
-    current_user: CurrentUser
+    current_user: CurrentUser,
+    auth_token: Optional[str] = None
 ) -> AsyncGenerator[str, None]:
     """
     Generate Server-Sent Events for the chat response using OpenAI.
@@ -88,18 +91,18 @@ async def sse_generator(
                     mode=new_mode,
                     model=settings.MODEL_DEFAULT
                 )
-                yield f"event: start\ndata: {json.dumps(start_event.model_dump())}\n\n"
+                yield format_sse("start", start_event)
                 
                 # Send mode change message
                 mode_change_msg = SSEMessageEvent(
                     delta=f"Mode changed to {new_mode}",
                     role="system"
                 )
-                yield f"event: message\ndata: {json.dumps(mode_change_msg.model_dump())}\n\n"
+                yield format_sse("message", mode_change_msg)
                 
                 # Send done event
                 done_event = SSEDoneEvent(tool_calls_count=0)
-                yield f"event: done\ndata: {json.dumps(done_event.model_dump())}\n\n"
+                yield format_sse("done", done_event)
                 return
         
         # Load message history
@@ -108,19 +111,16 @@ async def sse_generator(
         # Get portfolio context if available (stored in metadata)
         portfolio_context = None
         portfolio_id = conversation.meta_data.get("portfolio_id") if conversation.meta_data else None
+        try:
+            # Cached context and tool results are keyed on the data versions;
+            # read them once per turn so a batch run in another process is seen
+            async with db.begin_nested():
+                await refresh_data_versions(db, [portfolio_id] if portfolio_id else [])
+        except Exception as e:
+            logger.warning(f"Could not read data versions: {e}")
         if portfolio_id:
-            portfolio_service = PortfolioDataService(db)
             try:
-                portfolio_data = await portfolio_service.get_portfolio_complete(
-                    str(portfolio_id),
-                    include_holdings=False
-                )
-                if portfolio_data and not portfolio_data.get("error"):
-                    portfolio_context = {
-                        "portfolio_id": str(portfolio_id),
-                        "total_value": portfolio_data.get("portfolio", {}).get("total_value"),
-                        "position_count": portfolio_data.get("meta", {}).get("positions_count", 0)
-                    }
+                portfolio_context = await PortfolioDataService().get_portfolio_context(db, UUID(str(portfolio_id)))
             except Exception as e:
                 logger.warning(f"Could not load portfolio context: {e}")
         
@@ -135,50 +135,30 @@ async def sse_generator(
         db.add(user_message)
         await db.commit()
         
-        # Stream OpenAI response
-        assistant_content = ""
-        tool_calls_made = []
+        # Stream OpenAI response; the turn collects content and tool calls as they stream
+        turn = ChatTurn()
         
         async for sse_event in openai_service.stream_chat_completion(
             conversation_id=str(conversation.id),
             conversation_mode=conversation.mode,
             message_text=message_text,
             message_history=message_history,
-            portfolio_context=portfolio_context
+            portfolio_context=portfolio_context,
+            registry=create_tool_registry(current_user, auth_token),
+            turn=turn
         ):
-            # Forward the SSE event
             yield sse_event
-            
-            # Parse event to track content and tool calls
-            if "event: message" in sse_event:
-                try:
-                    data_line = sse_event.split("\ndata: ")[1].split("\n")[0]
-                    data = json.loads(data_line)
-                    if data.get("delta"):
-                        assistant_content += data["delta"]
-                except:
-                    pass
-            elif "event: tool_finished" in sse_event:
-                try:
-                    data_line = sse_event.split("\ndata: ")[1].split("\n")[0]
-                    data = json.loads(data_line)
-                    tool_calls_made.append({
-                        "name": data.get("tool_name"),
-                        "duration_ms": data.get("duration_ms")
-                    })
-                except:
-                    pass
         
         # Store assistant message
         assistant_message = ConversationMessage(
             id=uuid4(),
             conversation_id=conversation.id,
             role="assistant",
-            content=assistant_content,
+            content=turn.content,
             created_at=utc_now()
         )
-        if tool_calls_made:
-            assistant_message.tool_calls = tool_calls_made
+        if turn.tool_calls:
+            assistant_message.tool_calls = turn.tool_calls
         
         db.add(assistant_message)
         await db.commit()
@@ -188,10 +168,10 @@ async def sse_generator(
         
         # Send final done event if not already sent
         done_event = SSEDoneEvent(
-            tool_calls_count=len(tool_calls_made),
+            tool_calls_count=len(turn.tool_calls),
             latency_ms=latency_ms
         )
-        yield f"event: done\ndata: {json.dumps(done_event.model_dump())}\n\n"
+        yield format_sse("done", done_event)
         
     except Exception as e:
         logger.error(f"SSE generator error: {e}")
@@ -199,12 +179,13 @@ async def sse_generator(
             message=str(e),
             retryable=True
         )
-        yield f"event: error\ndata: {json.dumps(error_event.model_dump())}\n\n"
+        yield format_sse("error", error_event)
 
 
 @router.post("/send")
 async def send_message(
     request: MessageSend,
+    http_request: Request,
     db: AsyncSession = Depends(get_db),
     current_user: CurrentUser = Depends(get_current_user)
 ) -> StreamingResponse:
@@ -213,6 +194,7 @@ async def send_message(
     
     Args:
         request: MessageSend schema with conversation_id and text
+        http_request: Raw request (credentials for the HTTP tool fallback)
         db: Database session
         current_user: Authenticated user
         
@@ -242,12 +224,17 @@ async def send_message(
                 detail="Not authorized to access this conversation"
             )
         
+        # Caller's token (Bearer header or cookie) for tools served over HTTP
+        authorization = http_request.headers.get("Authorization", "")
+        auth_token = authorization[7:] if authorization.startswith("Bearer ") else http_request.cookies.get("auth_token")
+        
         # Create SSE generator
         generator = sse_generator(
             request.text,
             conversation,
             db,
-            current_user
+            current_user,
+            auth_token
         )
         
         # Return streaming response
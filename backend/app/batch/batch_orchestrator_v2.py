@@ -16,6 +16,9 @@ from app.database import AsyncSessionLocal
 from app.core.logging import get_logger
 from app.models.users import Portfolio
 from app.core.datetime_utils import utc_now
+from app.core.query_counter import count_queries, log_repeated_queries
+from app.core.data_version import mark_portfolio_data_changed, refresh_data_versions
+from app.reports.portfolio_report_generator import invalidate_report_data
 
 logger = get_logger(__name__)
 
@@ -58,6 +61,9 @@ class BatchOrchestratorV2:
     def __init__(self, max_retries: int = DEFAULT_MAX_RETRIES, session_timeout: int = DEFAULT_SESSION_TIMEOUT):
         self.max_retries = max_retries
         self.session_timeout = session_timeout
+        # FactorRunContext per portfolio for the current run: positions loaded by the
+        # aggregation job, factor betas by the factor job, reused by the later jobs
+        self._factor_contexts: Dict[str, Any] = {}
     
     async def run_daily_batch_sequence(
         self, 
@@ -176,6 +182,7 @@ class BatchOrchestratorV2:
             ("portfolio_aggregation", self._calculate_portfolio_aggregation, [portfolio_id]),
             ("greeks_calculation", self._calculate_greeks, [portfolio_id]),
             ("factor_analysis", self._calculate_factors, [portfolio_id]),
+            ("rolling_factor_betas", self._calculate_rolling_betas, [portfolio_id]),
             ("market_risk_scenarios", self._calculate_market_risk, [portfolio_id]),
             ("stress_testing", self._run_stress_tests, [portfolio_id]),
             ("portfolio_snapshot", self._create_snapshot, [portfolio_id]),
@@ -189,6 +196,9 @@ class BatchOrchestratorV2:
         job_sequence.append(("report_generation", self._generate_report, [portfolio_id]))
         
         # Execute jobs sequentially with isolated sessions
+        self._factor_contexts.pop(portfolio_id, None)
+        invalidate_report_data(portfolio_id)
+        await self._sync_data_versions(portfolio_id)
         for job_name, job_func, args in job_sequence:
             job_result = await self._execute_job_safely(
                 f"{job_name}_{portfolio_id}", 
@@ -203,8 +213,23 @@ class BatchOrchestratorV2:
                 logger.warning(f"Critical job {job_name} failed for {portfolio_name}, skipping remaining jobs")
                 break
         
+        self._factor_contexts.pop(portfolio_id, None)
+        # New calculations landed: results cached from the previous run are stale
+        await self._sync_data_versions(portfolio_id, advance=True)
         return results
     
+    async def _sync_data_versions(self, portfolio_id: str, advance: bool = False):
+        """Read the portfolio's committed data versions, or advance its version (all processes)"""
+        try:
+            async with self._get_isolated_session() as db:
+                if advance:
+                    mark_portfolio_data_changed(db, portfolio_id)
+                else:
+                    await refresh_data_versions(db, [portfolio_id])
+        except Exception as e:
+            # Caches keyed on the version then keep serving until their TTL passes
+            logger.warning(f"Could not sync data versions for portfolio {portfolio_id}: {e}")
+    
     async def _execute_job_safely(
         self, 
         job_name: str, 
@@ -222,19 +247,25 @@ class BatchOrchestratorV2:
                 logger.info(f"Starting job: {job_name} (attempt {attempt + 1})")
                 
                 # Execute job with isolated session
-                async with self._get_isolated_session() as db:
-                    if args:
-                        result = await job_func(db, *args)
-                    else:
-                        result = await job_func(db)
+                with count_queries(job_name) as query_stats:
+                    async with self._get_isolated_session() as db:
+                        if args:
+                            result = await job_func(db, *args)
+                        else:
+                            result = await job_func(db)
                 
                 duration = (utc_now() - start_time).total_seconds()
-                logger.info(f"Job {job_name} completed in {duration:.2f}s")
+                logger.info(
+                    f"Job {job_name} completed in {duration:.2f}s "
+                    f"({query_stats.count} statements)"
+                )
+                log_repeated_queries(query_stats)
                 
                 return {
                     'job_name': job_name,
                     'status': 'completed',
                     'duration_seconds': duration,
+                    'query_count': query_stats.count,
                     'result': result,
                     'timestamp': utc_now(),
                     'portfolio_name': portfolio_name,
@@ -335,11 +366,10 @@ class BatchOrchestratorV2:
     
     async def _update_position_values(self, db: AsyncSession, portfolio_id: str):
         """Update market values for all positions in portfolio"""
-        from app.calculations.market_data import update_position_market_values
+        from app.calculations.market_data import update_position_market_values_bulk
         from app.models.positions import Position
         from app.services.market_data_service import market_data_service
         from sqlalchemy import select
-        from decimal import Decimal
         
         # Get portfolio positions
         stmt = select(Position).where(
@@ -353,32 +383,22 @@ class BatchOrchestratorV2:
         if not positions:
             return {'message': 'No active positions', 'updated': 0}
         
+        # Latest cached price of every symbol in one query
+        prices = await market_data_service.get_cached_prices(
+            db,
+            list({position.symbol for position in positions})
+        )
+        
+        # Value all positions in memory and write them with one bulk UPDATE
+        update_results = await update_position_market_values_bulk(db, positions, prices)
+        
         updated_count = 0
         errors = []
-        
-        for position in positions:
-            try:
-                # Get cached price from market data cache
-                prices = await market_data_service.get_cached_prices(
-                    db, 
-                    [position.symbol]
-                )
-                
-                current_price = prices.get(position.symbol) if prices else None
-                
-                if current_price:
-                    # Update position market value
-                    await update_position_market_values(
-                        db, 
-                        position, 
-                        Decimal(str(current_price))
-                    )
-                    updated_count += 1
-                else:
-                    logger.warning(f"No price available for {position.symbol}")
-                    
-            except Exception as e:
-                error_msg = f"Failed to update {position.symbol}: {str(e)}"
+        for update_result in update_results:
+            if update_result['success']:
+                updated_count += 1
+            elif update_result['error'] != 'No price data available':
+                error_msg = f"Failed to update {update_result['symbol']}: {update_result['error']}"
                 logger.error(error_msg)
                 errors.append(error_msg)
         
@@ -394,49 +414,22 @@ class BatchOrchestratorV2:
     
     async def _calculate_portfolio_aggregation(self, db: AsyncSession, portfolio_id: str):
         """Portfolio aggregation job"""
-        from app.calculations.portfolio import calculate_portfolio_exposures
-        from app.models.positions import Position
-        from sqlalchemy import select
+        from app.calculations.portfolio import AggregationKey, calculate_portfolio_exposures
         
-        # Get portfolio positions
-        stmt = select(Position).where(
-            Position.portfolio_id == portfolio_id,
-            Position.deleted_at.is_(None),
-            Position.exit_date.is_(None)
-        )
-        result = await db.execute(stmt)
-        positions = result.scalars().all()
+        # Positions are loaded once here (after position values were updated)
+        # and the frame is reused by the factor, market risk and stress testing jobs
+        position_frame = await self._factor_context(portfolio_id).get_position_frame(db)
         
-        if not positions:
+        if len(position_frame) == 0:
             return {'message': 'No active positions', 'metrics': {}}
         
-        # Convert positions to format expected by calculate_portfolio_exposures
-        position_dicts = []
-        for pos in positions:
-            # Calculate exposure as market_value with correct sign
-            market_value = float(pos.market_value) if pos.market_value else 0
-            quantity = float(pos.quantity)
-            
-            # Market value is already signed (negative for shorts, positive for longs)
-            # So exposure equals market value
-            exposure = market_value
-            
-            position_dict = {
-                'symbol': pos.symbol,
-                'quantity': quantity,
-                'market_value': market_value,
-                'exposure': exposure,  # Add the missing exposure field
-                'last_price': float(pos.last_price) if pos.last_price else 0,
-                'position_type': pos.position_type.value if pos.position_type else 'LONG',
-                'strike_price': float(pos.strike_price) if pos.strike_price else None,
-                'expiration_date': pos.expiration_date
-            }
-            position_dicts.append(position_dict)
-        
-        exposures = calculate_portfolio_exposures(position_dicts)
+        exposures = calculate_portfolio_exposures(
+            position_frame.aggregation_records(),
+            cache_key=AggregationKey.for_portfolio("position_frame", portfolio_id)
+        )
         
         # For options portfolios, also calculate delta-adjusted exposure
-        has_options = any(p.strike_price is not None for p in positions)
+        has_options = bool(position_frame.is_option.any())
         
         return {
             'portfolio_id': portfolio_id,
@@ -491,25 +484,48 @@ class BatchOrchestratorV2:
             # Fallback with empty market data (will result in calculation failures)
             return await bulk_update_portfolio_greeks(db, portfolio_id, {})
     
+    def _factor_context(self, portfolio_id: str):
+        """FactorRunContext of a portfolio for the current run, created on first use"""
+        from app.calculations.factors import FactorRunContext
+        context = self._factor_contexts.get(portfolio_id)
+        if context is None:
+            context = FactorRunContext(portfolio_id=ensure_uuid(portfolio_id), calculation_date=date.today())
+            self._factor_contexts[portfolio_id] = context
+        return context
+    
     async def _calculate_factors(self, db: AsyncSession, portfolio_id: str):
         """Factor analysis job"""
-        from app.calculations.factors import calculate_factor_betas_hybrid
-        portfolio_uuid = ensure_uuid(portfolio_id)
-        return await calculate_factor_betas_hybrid(db, portfolio_uuid, date.today())
+        return await self._factor_context(portfolio_id).get_factor_analysis(db)
+    
+    async def _calculate_rolling_betas(self, db: AsyncSession, portfolio_id: str):
+        """Rolling factor betas job (today's 60/150/252-day betas per position)"""
+        from app.calculations.rolling_betas import calculate_rolling_factor_betas
+        today = date.today()
+        result = await calculate_rolling_factor_betas(db, ensure_uuid(portfolio_id), today, today)
+        # The beta series are persisted; keep the job result small
+        return {"dates": result["dates"], "records_stored": result["records_stored"]}
     
     async def _calculate_market_risk(self, db: AsyncSession, portfolio_id: str):
-        """Market risk scenarios job"""
+        """Market risk scenarios job (reuses the factor job's betas)"""
         from app.calculations.market_risk import calculate_portfolio_market_beta
         portfolio_uuid = ensure_uuid(portfolio_id)
-        return await calculate_portfolio_market_beta(db, portfolio_uuid, date.today())
+        return await calculate_portfolio_market_beta(
+            db, portfolio_uuid, date.today(),
+            context=self._factor_context(portfolio_id)
+        )
     
     async def _run_stress_tests(self, db: AsyncSession, portfolio_id: str):
         """Stress testing job"""
         from app.calculations.stress_testing import run_comprehensive_stress_test, save_stress_test_results
         portfolio_uuid = ensure_uuid(portfolio_id)
+        context = self._factor_context(portfolio_id)
         
         # Run stress tests
-        results = await run_comprehensive_stress_test(db, portfolio_uuid, date.today())
+        results = await run_comprehensive_stress_test(
+            db, portfolio_uuid, date.today(),
+            position_frame=await context.get_position_frame(db),
+            factor_exposures=context.latest_factor_exposures()
+        )
         
         # Save results to database
         if results and 'stress_test_results' in results:
@@ -520,8 +536,8 @@ class BatchOrchestratorV2:
     
     async def _create_snapshot(self, db: AsyncSession, portfolio_id: str):
         """Portfolio snapshot job"""
-        from app.calculations.snapshots import create_portfolio_snapshot
-        return await create_portfolio_snapshot(db, portfolio_id, date.today())
+        from app.calculations.bulk_snapshots import create_portfolio_snapshots_bulk
+        return await create_portfolio_snapshots_bulk(db, date.today(), [ensure_uuid(portfolio_id)])
     
     async def _calculate_correlations(self, db: AsyncSession, portfolio_id: str):
         """Position correlations job"""
@@ -540,21 +556,23 @@ class BatchOrchestratorV2:
         
         generator = PortfolioReportGenerator(db)
         portfolio_uuid = ensure_uuid(portfolio_id)
+        formats = ['md', 'json', 'csv']
         
-        # Generate all three formats
-        results = {}
-        for format_type in ['md', 'json', 'csv']:
-            try:
-                report = await generator.generate_report(
-                    portfolio_id=portfolio_uuid,
-                    report_date=date.today(),
-                    format=format_type
-                )
-                results[format_type] = "generated"
-            except Exception as e:
-                results[format_type] = f"failed: {str(e)}"
+        # Generate all three formats from one data collection
+        try:
+            file_paths = await generator.generate_reports(
+                portfolio_id=portfolio_uuid,
+                report_date=date.today(),
+                formats=formats,
+                parallel_queries=True  # The job's isolated session is only read
+            )
+        except Exception as e:
+            return {format_type: f"failed: {str(e)}" for format_type in formats}
         
-        return results
+        return {
+            format_type: "generated" if format_type in file_paths else "failed"
+            for format_type in formats
+        }
 
 
 # Create singleton instance
@@ -6,7 +6,10 @@ Contains quantitative calculations for portfolio analytics
 from .market_data import (
     calculate_position_market_value,
     calculate_daily_pnl,
-    fetch_and_cache_prices
+    fetch_and_cache_prices,
+    get_previous_trading_day_prices,
+    calculate_position_values_bulk,
+    update_position_market_values_bulk
 )
 
 from .greeks import (
@@ -20,18 +23,28 @@ from .portfolio import (
     calculate_delta_adjusted_exposure,
     aggregate_by_tags,
     aggregate_by_underlying,
-    clear_portfolio_cache
+    clear_portfolio_cache,
+    get_aggregation_cache_stats,
+    AggregationKey
 )
 
 from .snapshots import (
     create_portfolio_snapshot
 )
 
+from .bulk_snapshots import (
+    create_portfolio_snapshots_bulk,
+    backfill_portfolio_snapshots
+)
+
 __all__ = [
     # Market data calculations
     "calculate_position_market_value",
     "calculate_daily_pnl",
     "fetch_and_cache_prices",
+    "get_previous_trading_day_prices",
+    "calculate_position_values_bulk",
+    "update_position_market_values_bulk",
     
     # Greeks calculations
     "calculate_real_greeks",
@@ -44,7 +57,11 @@ __all__ = [
     "aggregate_by_tags",
     "aggregate_by_underlying",
     "clear_portfolio_cache",
+    "get_aggregation_cache_stats",
+    "AggregationKey",
     
     # Snapshot generation
-    "create_portfolio_snapshot"
+    "create_portfolio_snapshot",
+    "create_portfolio_snapshots_bulk",
+    "backfill_portfolio_snapshots"
 ]
\ No newline at end of file
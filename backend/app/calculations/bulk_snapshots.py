@@ -0,0 +1,633 @@
+"""
+Set-based portfolio snapshot generation
+
+Builds the PortfolioSnapshot rows of many portfolios at once. Instead of
+two queries per position (price, Greeks) and one per portfolio (previous
+snapshot), everything is loaded with a fixed number of set-based queries:
+
+1. active positions of every portfolio
+2. latest close per symbol as of the snapshot date
+3. Greeks of the active positions
+4. previous trading day's snapshots
+5. one multi-row INSERT ... ON CONFLICT DO UPDATE for all snapshots
+
+Aggregates are computed with grouped NumPy sums (np.bincount over a group
+code per position), so the same kernel serves one date across portfolios
+(create_portfolio_snapshots_bulk) and a whole date range per portfolio
+(backfill_portfolio_snapshots).
+"""
+import logging
+from dataclasses import dataclass
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from uuid import UUID, uuid4
+
+import numpy as np
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.calculations.portfolio import _to_decimal
+from app.calculations.position_frame import PositionFrame
+from app.constants.portfolio import GREEKS_DECIMAL_PLACES, MONETARY_DECIMAL_PLACES
+from app.models.market_data import MarketDataCache, PositionGreeks
+from app.models.positions import Position
+from app.models.snapshots import PortfolioSnapshot
+from app.models.users import Portfolio
+from app.utils.trading_calendar import trading_calendar
+
+logger = logging.getLogger(__name__)
+
+# Postgres caps bind parameters per statement at 32767; a snapshot row binds 19
+SNAPSHOT_UPSERT_CHUNK_SIZE = 1500
+RETURN_DECIMAL_PLACES = 6  # daily_return is Numeric(8, 6)
+
+SNAPSHOT_GREEKS = ("delta", "gamma", "theta", "vega", "rho")
+
+# Columns refreshed when a snapshot for (portfolio, date) already exists
+_SNAPSHOT_UPDATE_COLUMNS = (
+    "total_value", "cash_value", "long_value", "short_value",
+    "gross_exposure", "net_exposure", "daily_pnl", "daily_return", "cumulative_pnl",
+    "portfolio_delta", "portfolio_gamma", "portfolio_theta", "portfolio_vega",
+    "num_positions", "num_long_positions", "num_short_positions",
+)
+
+
+@dataclass
+class SnapshotAggregates:
+    """Per-group snapshot aggregates; every field is an array of length n_groups."""
+    gross_exposure: np.ndarray
+    net_exposure: np.ndarray
+    long_exposure: np.ndarray
+    short_exposure: np.ndarray
+    greeks: np.ndarray  # (n_groups, 5) in SNAPSHOT_GREEKS order
+    num_positions: np.ndarray
+    num_long: np.ndarray
+    num_short: np.ndarray
+
+
+def aggregate_snapshot_groups(
+    group_codes: np.ndarray,
+    n_groups: int,
+    exposure: np.ndarray,
+    greeks: Optional[np.ndarray],
+    quantity: np.ndarray
+) -> SnapshotAggregates:
+    """
+    Grouped snapshot aggregates, matching create_portfolio_snapshot.
+
+    Args:
+        group_codes: Group (e.g. portfolio) index of each position
+        n_groups: Number of groups
+        exposure: Signed exposure per position, NaN for unpriced positions
+        greeks: (n_positions, 5) Greeks, NaN rows for positions without Greeks;
+            None to skip Greeks (the caller adds them separately)
+        quantity: Signed quantity per position
+
+    Unpriced positions are left out of exposures and Greeks (the per-portfolio
+    path skips them) but still count towards the position counts.
+    """
+    priced = ~np.isnan(exposure)
+    value = np.where(priced, exposure, 0.0)
+
+    def group_sum(weights: np.ndarray) -> np.ndarray:
+        return np.bincount(group_codes, weights=weights, minlength=n_groups)
+
+    if greeks is None:
+        greek_totals = np.zeros((n_groups, len(SNAPSHOT_GREEKS)))
+    else:
+        greeks = np.where(priced[:, None] & ~np.isnan(greeks), greeks, 0.0)
+        greek_totals = np.column_stack([group_sum(greeks[:, i]) for i in range(len(SNAPSHOT_GREEKS))])
+
+    return SnapshotAggregates(
+        gross_exposure=group_sum(np.abs(value)),
+        net_exposure=group_sum(value),
+        long_exposure=group_sum(np.where(value > 0, value, 0.0)),
+        short_exposure=group_sum(np.where(value < 0, value, 0.0)),
+        greeks=greek_totals,
+        num_positions=np.bincount(group_codes, minlength=n_groups),
+        num_long=np.bincount(group_codes, weights=quantity > 0, minlength=n_groups).astype(np.int64),
+        num_short=np.bincount(group_codes, weights=quantity <= 0, minlength=n_groups).astype(np.int64),
+    )
+
+
+def snapshot_rows(
+    portfolio_ids: Sequence[UUID],
+    snapshot_dates: Sequence[date],
+    aggregates: SnapshotAggregates,
+    daily_pnl: np.ndarray,
+    daily_return: np.ndarray,
+    cumulative_pnl: np.ndarray
+) -> List[Dict[str, Any]]:
+    """PortfolioSnapshot insert rows, one per group, quantized like the ORM path."""
+    rows = []
+    money = MONETARY_DECIMAL_PLACES
+    for i, (portfolio_id, snapshot_date) in enumerate(zip(portfolio_ids, snapshot_dates)):
+        gross = _to_decimal(aggregates.gross_exposure[i], money)
+        rows.append({
+            "id": uuid4(),
+            "portfolio_id": portfolio_id,
+            "snapshot_date": snapshot_date,
+            "total_value": gross,
+            "cash_value": Decimal("0"),  # Fully invested assumption
+            "long_value": _to_decimal(aggregates.long_exposure[i], money),
+            "short_value": _to_decimal(aggregates.short_exposure[i], money),
+            "gross_exposure": gross,
+            "net_exposure": _to_decimal(aggregates.net_exposure[i], money),
+            "daily_pnl": _to_decimal(daily_pnl[i], money),
+            "daily_return": _to_decimal(daily_return[i], RETURN_DECIMAL_PLACES),
+            "cumulative_pnl": _to_decimal(cumulative_pnl[i], money),
+            "portfolio_delta": _to_decimal(aggregates.greeks[i, 0], GREEKS_DECIMAL_PLACES),
+            "portfolio_gamma": _to_decimal(aggregates.greeks[i, 1], GREEKS_DECIMAL_PLACES),
+            "portfolio_theta": _to_decimal(aggregates.greeks[i, 2], GREEKS_DECIMAL_PLACES),
+            "portfolio_vega": _to_decimal(aggregates.greeks[i, 3], GREEKS_DECIMAL_PLACES),
+            "num_positions": int(aggregates.num_positions[i]),
+            "num_long_positions": int(aggregates.num_long[i]),
+            "num_short_positions": int(aggregates.num_short[i]),
+        })
+    return rows
+
+
+async def upsert_portfolio_snapshots(db: AsyncSession, rows: List[Dict[str, Any]]) -> int:
+    """Insert or update snapshot rows with multi-row INSERT ... ON CONFLICT DO UPDATE."""
+    for start in range(0, len(rows), SNAPSHOT_UPSERT_CHUNK_SIZE):
+        stmt = pg_insert(PortfolioSnapshot).values(rows[start:start + SNAPSHOT_UPSERT_CHUNK_SIZE])
+        stmt = stmt.on_conflict_do_update(
+            constraint="uq_portfolio_snapshots_portfolio_date",
+            set_={column: stmt.excluded[column] for column in _SNAPSHOT_UPDATE_COLUMNS}
+        )
+        await db.execute(stmt)
+    return len(rows)
+
+
+async def load_latest_prices(db: AsyncSession, symbols: Iterable[str], as_of: date) -> Dict[str, float]:
+    """Most recent close on or before as_of for every symbol, in one query."""
+    symbols = list(set(symbols))
+    if not symbols:
+        return {}
+    latest = (
+        select(MarketDataCache.symbol, func.max(MarketDataCache.date).label("latest_date"))
+        .where(MarketDataCache.symbol.in_(symbols), MarketDataCache.date <= as_of)
+        .group_by(MarketDataCache.symbol)
+        .subquery()
+    )
+    stmt = select(MarketDataCache.symbol, MarketDataCache.close).join(
+        latest,
+        and_(MarketDataCache.symbol == latest.c.symbol, MarketDataCache.date == latest.c.latest_date)
+    )
+    result = await db.execute(stmt)
+    return {symbol: float(close) for symbol, close in result.all() if close is not None}
+
+
+async def load_position_greeks(db: AsyncSession, position_ids, as_of: date) -> Dict[str, List[float]]:
+    """Greeks calculated on as_of, keyed by position id (ids may be a list or a subquery)."""
+    stmt = select(
+        PositionGreeks.position_id,
+        *(getattr(PositionGreeks, name) for name in SNAPSHOT_GREEKS)
+    ).where(
+        PositionGreeks.position_id.in_(position_ids),
+        PositionGreeks.calculation_date == as_of
+    )
+    result = await db.execute(stmt)
+    return {
+        str(row[0]): [np.nan if value is None else float(value) for value in row[1:]]
+        for row in result.all()
+    }
+
+
+def _greeks_matrix(position_ids: Sequence[str], greeks_by_id: Dict[str, List[float]]) -> np.ndarray:
+    matrix = np.full((len(position_ids), len(SNAPSHOT_GREEKS)), np.nan)
+    for row, position_id in enumerate(position_ids):
+        values = greeks_by_id.get(position_id)
+        if values is not None:
+            matrix[row] = values
+    return matrix
+
+
+def _active_positions_query(portfolio_ids_query, calculation_date: date):
+    """Positions open on calculation_date in the given portfolios (same rule as _fetch_active_positions)."""
+    return select(
+        Position.portfolio_id,
+        Position.id,
+        Position.symbol,
+        Position.position_type,
+        Position.quantity,
+        Position.last_price,
+        Position.entry_price,
+        Position.market_value,
+    ).where(
+        Position.portfolio_id.in_(portfolio_ids_query),
+        Position.entry_date <= calculation_date,
+        or_(
+            Position.exit_date.is_(None),
+            Position.exit_date > calculation_date
+        ),
+        Position.deleted_at.is_(None)
+    )
+
+
+async def create_portfolio_snapshots_bulk(
+    db: AsyncSession,
+    calculation_date: date,
+    portfolio_ids: Optional[Sequence[UUID]] = None
+) -> Dict[str, Any]:
+    """
+    Create or update the snapshots of many portfolios for one date
+
+    Args:
+        db: Database session
+        calculation_date: Snapshot date (must be a trading day)
+        portfolio_ids: Portfolios to snapshot (defaults to every non-deleted portfolio)
+
+    Returns:
+        Dictionary with counts and warnings
+    """
+    logger.info(f"Creating bulk portfolio snapshots for {calculation_date}")
+
+    if not trading_calendar.is_trading_day(calculation_date):
+        logger.warning(f"{calculation_date} is not a trading day, skipping snapshots")
+        return {
+            "success": False,
+            "message": f"{calculation_date} is not a trading day",
+            "snapshots_written": 0
+        }
+
+    portfolio_filter = select(Portfolio.id).where(Portfolio.deleted_at.is_(None))
+    if portfolio_ids is not None:
+        portfolio_filter = portfolio_filter.where(Portfolio.id.in_(list(portfolio_ids)))
+
+    try:
+        # Query 1-2: portfolios and their active positions
+        portfolios = list((await db.execute(portfolio_filter)).scalars().all())
+        if not portfolios:
+            return {"success": True, "message": "No portfolios to snapshot", "snapshots_written": 0}
+        portfolio_index = {portfolio_id: i for i, portfolio_id in enumerate(portfolios)}
+
+        position_rows = (await db.execute(_active_positions_query(portfolio_filter, calculation_date))).all()
+        group_codes = np.fromiter((portfolio_index[row[0]] for row in position_rows), dtype=np.int64,
+                                  count=len(position_rows))
+        frame = PositionFrame.from_rows([tuple(row[1:]) for row in position_rows])
+
+        # Query 3-4: latest prices and Greeks for every active position
+        prices_by_symbol = await load_latest_prices(db, frame.symbols, calculation_date)
+        active_ids = select(_active_positions_query(portfolio_filter, calculation_date).subquery().c.id)
+        greeks_by_id = await load_position_greeks(db, active_ids, calculation_date)
+
+        prices = np.array([prices_by_symbol.get(symbol, np.nan) for symbol in frame.symbols], dtype=np.float64)
+        aggregates = aggregate_snapshot_groups(
+            group_codes,
+            len(portfolios),
+            exposure=frame.valued_at(prices),
+            greeks=_greeks_matrix(frame.ids, greeks_by_id),
+            quantity=frame.quantity
+        )
+
+        # Query 5: previous trading day's snapshots for P&L
+        total_value = np.round(aggregates.gross_exposure, MONETARY_DECIMAL_PLACES)
+        daily_pnl = np.zeros(len(portfolios))
+        daily_return = np.zeros(len(portfolios))
+        cumulative_pnl = np.zeros(len(portfolios))
+
+        previous_date = trading_calendar.get_previous_trading_day(calculation_date)
+        if previous_date:
+            previous_result = await db.execute(
+                select(
+                    PortfolioSnapshot.portfolio_id,
+                    PortfolioSnapshot.total_value,
+                    PortfolioSnapshot.cumulative_pnl
+                ).where(
+                    PortfolioSnapshot.portfolio_id.in_(portfolio_filter),
+                    PortfolioSnapshot.snapshot_date == previous_date
+                )
+            )
+            for portfolio_id, previous_total, previous_cumulative in previous_result.all():
+                i = portfolio_index[portfolio_id]
+                if aggregates.num_positions[i] == 0:
+                    continue  # zero snapshots carry no P&L, as in _create_zero_snapshot
+                previous_total = float(previous_total)
+                daily_pnl[i] = total_value[i] - previous_total
+                daily_return[i] = daily_pnl[i] / previous_total if previous_total != 0 else 0.0
+                cumulative_pnl[i] = float(previous_cumulative or 0) + daily_pnl[i]
+
+        # Query 6: one upsert for every snapshot
+        rows = snapshot_rows(
+            portfolios,
+            [calculation_date] * len(portfolios),
+            aggregates,
+            daily_pnl,
+            daily_return,
+            cumulative_pnl
+        )
+        written = await upsert_portfolio_snapshots(db, rows)
+        await db.commit()
+
+        unpriced = sorted({symbol for symbol in frame.symbols if symbol not in prices_by_symbol})
+        warnings = [f"No price data available for {symbol} as of {calculation_date}" for symbol in unpriced]
+
+        logger.info(
+            f"Bulk snapshots written: {written} portfolios, {len(frame)} positions, "
+            f"{len(unpriced)} unpriced symbols"
+        )
+        return {
+            "success": True,
+            "message": "Snapshots created successfully",
+            "snapshots_written": written,
+            "positions_processed": len(frame),
+            "warnings": warnings
+        }
+
+    except Exception as e:
+        logger.error(f"Error creating bulk portfolio snapshots: {str(e)}")
+        await db.rollback()
+        return {
+            "success": False,
+            "message": f"Error creating snapshots: {str(e)}",
+            "snapshots_written": 0
+        }
+
+
+def chain_pnl(
+    total_value: np.ndarray,
+    has_positions: np.ndarray,
+    seed_total: np.ndarray,
+    seed_cumulative: np.ndarray,
+    has_seed: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Daily P&L, daily return and cumulative P&L over consecutive trading days.
+
+    Vectorized equivalent of running _calculate_pnl day after day:
+    - daily P&L is the change in total value from the previous day's snapshot
+      (the seed snapshot before the first day, if any)
+    - a day without positions is a zero snapshot: no P&L, cumulative reset
+    - cumulative P&L is the running sum of daily P&L since the last reset
+
+    Args:
+        total_value: (n_portfolios, n_days) total value, rounded to cents
+        has_positions: (n_portfolios, n_days) whether the day had active positions
+        seed_total: (n_portfolios,) total value of the snapshot before the range
+        seed_cumulative: (n_portfolios,) cumulative P&L of that snapshot
+        has_seed: (n_portfolios,) whether that snapshot exists
+
+    Returns:
+        (daily_pnl, daily_return, cumulative_pnl), each (n_portfolios, n_days)
+    """
+    n_portfolios, n_days = total_value.shape
+    previous_total = np.empty_like(total_value)
+    previous_total[:, 0] = seed_total
+    previous_total[:, 1:] = total_value[:, :-1]
+
+    has_previous = np.ones_like(has_positions, dtype=bool)
+    has_previous[:, 0] = has_seed
+
+    earning = has_positions & has_previous
+    daily_pnl = np.where(earning, total_value - previous_total, 0.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        daily_return = np.where(earning & (previous_total != 0), daily_pnl / previous_total, 0.0)
+
+    # Running sum that restarts at every zero snapshot
+    running = np.cumsum(daily_pnl, axis=1) + np.where(has_seed, seed_cumulative, 0.0)[:, None]
+    reset = ~has_positions
+    day_index = np.broadcast_to(np.arange(n_days), (n_portfolios, n_days))
+    last_reset = np.maximum.accumulate(np.where(reset, day_index, -1), axis=1)
+    baseline = np.where(
+        last_reset >= 0,
+        np.take_along_axis(running, np.maximum(last_reset, 0), axis=1),
+        0.0
+    )
+    cumulative_pnl = running - baseline
+
+    return daily_pnl, daily_return, cumulative_pnl
+
+
+def _price_panel(
+    trading_days: np.ndarray,
+    symbols: Sequence[str],
+    seed_prices: Dict[str, float],
+    price_rows: Sequence[Tuple[str, date, Any]]
+) -> np.ndarray:
+    """
+    (n_symbols, n_days) close as of each trading day: the latest close on or
+    before that day, forward-filled from the seed price before the range.
+    """
+    symbol_index = {symbol: i for i, symbol in enumerate(symbols)}
+    n_days = len(trading_days)
+    # Column 0 holds the seed; close dated d lands on the first trading day >= d
+    panel = np.full((len(symbols), n_days + 1), np.nan)
+    for symbol, price in seed_prices.items():
+        panel[symbol_index[symbol], 0] = price
+    for symbol, price_date, close in price_rows:
+        if close is None:
+            continue
+        column = int(np.searchsorted(trading_days, np.datetime64(price_date, "D"), side="left")) + 1
+        if column <= n_days:
+            panel[symbol_index[symbol], column] = float(close)
+
+    # Forward fill along the date axis
+    filled_at = np.where(~np.isnan(panel), np.arange(n_days + 1), 0)
+    np.maximum.accumulate(filled_at, axis=1, out=filled_at)
+    panel = np.take_along_axis(panel, filled_at, axis=1)
+    return panel[:, 1:]
+
+
+async def backfill_portfolio_snapshots(
+    db: AsyncSession,
+    start_date: date,
+    end_date: date,
+    portfolio_ids: Optional[Sequence[UUID]] = None
+) -> Dict[str, Any]:
+    """
+    Rebuild the snapshots of a date range from position history and prices
+
+    Loads the price panel once, reconstructs each trading day's active
+    positions from entry_date/exit_date, aggregates every (portfolio, day)
+    with one grouped pass, chains daily and cumulative P&L from the snapshot
+    before start_date, and upserts all rows.
+
+    Args:
+        db: Database session
+        start_date: First date to rebuild
+        end_date: Last date to rebuild
+        portfolio_ids: Portfolios to rebuild (defaults to every non-deleted portfolio)
+
+    Returns:
+        Dictionary with counts and warnings
+    """
+    logger.info(f"Backfilling portfolio snapshots from {start_date} to {end_date}")
+
+    trading_days = trading_calendar.trading_days_array(start_date, end_date)
+    if len(trading_days) == 0:
+        return {"success": True, "message": "No trading days in range", "snapshots_written": 0}
+    days = trading_days.tolist()
+    n_days = len(days)
+
+    portfolio_filter = select(Portfolio.id).where(Portfolio.deleted_at.is_(None))
+    if portfolio_ids is not None:
+        portfolio_filter = portfolio_filter.where(Portfolio.id.in_(list(portfolio_ids)))
+
+    try:
+        portfolios = list((await db.execute(portfolio_filter)).scalars().all())
+        if not portfolios:
+            return {"success": True, "message": "No portfolios to backfill", "snapshots_written": 0}
+        portfolio_index = {portfolio_id: i for i, portfolio_id in enumerate(portfolios)}
+        n_portfolios = len(portfolios)
+
+        # Every position open at some point in the range
+        position_stmt = select(
+            Position.portfolio_id,
+            Position.entry_date,
+            Position.exit_date,
+            Position.id,
+            Position.symbol,
+            Position.position_type,
+            Position.quantity,
+            Position.last_price,
+            Position.entry_price,
+            Position.market_value,
+        ).where(
+            Position.portfolio_id.in_(portfolio_filter),
+            Position.entry_date <= end_date,
+            or_(
+                Position.exit_date.is_(None),
+                Position.exit_date > start_date
+            ),
+            Position.deleted_at.is_(None)
+        )
+        position_rows = (await db.execute(position_stmt)).all()
+        frame = PositionFrame.from_rows([tuple(row[3:]) for row in position_rows])
+        n_positions = len(frame)
+        portfolio_codes = np.fromiter((portfolio_index[row[0]] for row in position_rows), dtype=np.int64,
+                                      count=n_positions)
+
+        # Active day range of each position: entry_date <= day < exit_date
+        entry_dates = np.array([row[1] for row in position_rows], dtype="datetime64[D]")
+        first_day = np.searchsorted(trading_days, entry_dates, side="left")
+        last_day = np.array([
+            n_days if row[2] is None else np.searchsorted(trading_days, np.datetime64(row[2], "D"), side="left")
+            for row in position_rows
+        ], dtype=np.int64)
+
+        # Price panel: seed close before the range plus every close inside it
+        symbols = sorted(set(frame.symbols))
+        seed_prices = await load_latest_prices(db, symbols, start_date - timedelta(days=1))
+        price_rows = []
+        if symbols:
+            price_result = await db.execute(
+                select(MarketDataCache.symbol, MarketDataCache.date, MarketDataCache.close).where(
+                    MarketDataCache.symbol.in_(symbols),
+                    MarketDataCache.date >= start_date,
+                    MarketDataCache.date <= end_date
+                ).order_by(MarketDataCache.date)
+            )
+            price_rows = price_result.all()
+        panel = _price_panel(trading_days, symbols, seed_prices, price_rows)
+        symbol_index = {symbol: i for i, symbol in enumerate(symbols)}
+        symbol_rows = np.fromiter((symbol_index[symbol] for symbol in frame.symbols), dtype=np.int64,
+                                  count=n_positions)
+
+        # Expand to one entry per (position, active day)
+        span = np.clip(last_day - first_day, 0, None)
+        pair_position = np.repeat(np.arange(n_positions), span)
+        offsets = np.arange(span.sum()) - np.repeat(np.cumsum(span) - span, span)
+        pair_day = np.repeat(first_day, span) + offsets
+        pair_group = portfolio_codes[pair_position] * n_days + pair_day
+        pair_exposure = (
+            frame.quantity[pair_position]
+            * panel[symbol_rows[pair_position], pair_day]
+            * frame.multiplier[pair_position]
+        )
+
+        aggregates = aggregate_snapshot_groups(
+            pair_group,
+            n_portfolios * n_days,
+            exposure=pair_exposure,
+            greeks=None,
+            quantity=frame.quantity[pair_position]
+        )
+
+        # Greeks only exist for the date they were calculated on
+        greeks_stmt = select(
+            PositionGreeks.position_id,
+            PositionGreeks.calculation_date,
+            *(getattr(PositionGreeks, name) for name in SNAPSHOT_GREEKS)
+        ).where(
+            PositionGreeks.position_id.in_(select(position_stmt.subquery().c.id)),
+            PositionGreeks.calculation_date >= start_date,
+            PositionGreeks.calculation_date <= end_date
+        )
+        for position_id, calculation_date, *values in (await db.execute(greeks_stmt)).all():
+            row = frame.position_index.get(str(position_id))
+            day = int(np.searchsorted(trading_days, np.datetime64(calculation_date, "D")))
+            if row is None or day >= n_days or trading_days[day] != np.datetime64(calculation_date, "D"):
+                continue
+            if not (first_day[row] <= day < last_day[row]) or np.isnan(panel[symbol_rows[row], day]):
+                continue
+            group = portfolio_codes[row] * n_days + day
+            aggregates.greeks[group] += [0.0 if v is None else float(v) for v in values]
+
+        # Seed P&L from the snapshot on the trading day before the range
+        seed_total = np.zeros(n_portfolios)
+        seed_cumulative = np.zeros(n_portfolios)
+        has_seed = np.zeros(n_portfolios, dtype=bool)
+        previous_date = trading_calendar.get_previous_trading_day(days[0])
+        if previous_date:
+            seed_result = await db.execute(
+                select(
+                    PortfolioSnapshot.portfolio_id,
+                    PortfolioSnapshot.total_value,
+                    PortfolioSnapshot.cumulative_pnl
+                ).where(
+                    PortfolioSnapshot.portfolio_id.in_(portfolio_filter),
+                    PortfolioSnapshot.snapshot_date == previous_date
+                )
+            )
+            for portfolio_id, total, cumulative in seed_result.all():
+                i = portfolio_index[portfolio_id]
+                seed_total[i] = float(total)
+                seed_cumulative[i] = float(cumulative or 0)
+                has_seed[i] = True
+
+        shape = (n_portfolios, n_days)
+        total_value = np.round(aggregates.gross_exposure, MONETARY_DECIMAL_PLACES).reshape(shape)
+        has_positions = (aggregates.num_positions > 0).reshape(shape)
+        daily_pnl, daily_return, cumulative_pnl = chain_pnl(
+            total_value, has_positions, seed_total, seed_cumulative, has_seed
+        )
+
+        rows = snapshot_rows(
+            [portfolio for portfolio in portfolios for _ in range(n_days)],
+            days * n_portfolios,
+            aggregates,
+            daily_pnl.ravel(),
+            daily_return.ravel(),
+            cumulative_pnl.ravel()
+        )
+        written = await upsert_portfolio_snapshots(db, rows)
+        await db.commit()
+
+        unpriced = sorted(symbol for symbol, row in zip(symbols, panel) if np.isnan(row).all())
+        warnings = [f"No price data available for {symbol} between {start_date} and {end_date}" for symbol in unpriced]
+
+        logger.info(
+            f"Backfilled {written} snapshots: {n_portfolios} portfolios x {n_days} trading days, "
+            f"{n_positions} positions"
+        )
+        return {
+            "success": True,
+            "message": "Snapshots backfilled successfully",
+            "snapshots_written": written,
+            "trading_days": n_days,
+            "portfolios": n_portfolios,
+            "positions_processed": n_positions,
+            "warnings": warnings
+        }
+
+    except Exception as e:
+        logger.error(f"Error backfilling portfolio snapshots: {str(e)}")
+        await db.rollback()
+        return {
+            "success": False,
+            "message": f"Error backfilling snapshots: {str(e)}",
+            "snapshots_written": 0
+        }
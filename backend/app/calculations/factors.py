@@ -2,28 +2,121 @@
 Factor Analysis Calculation Functions - Section 1.4.4
 Implements 7-factor model with ETF proxies and regression analysis
 """
-from datetime import date, timedelta
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
 from decimal import Decimal
 from typing import Dict, List, Optional, Tuple, Any
-from uuid import UUID
+from uuid import UUID, uuid4
 import pandas as pd
 import numpy as np
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, delete
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 import statsmodels.api as sm
+from scipy import linalg, stats
 
 from app.models.positions import Position
-from app.models.market_data import MarketDataCache, PositionFactorExposure, FactorDefinition
+from app.models.market_data import MarketDataCache, PositionFactorExposure, FactorDefinition, FactorExposure
 from app.calculations.market_data import fetch_historical_prices
+from app.calculations.position_frame import PositionFrame
 from app.constants.factors import (
     FACTOR_ETFS, REGRESSION_WINDOW_DAYS, MIN_REGRESSION_DAYS, 
     BETA_CAP_LIMIT, POSITION_CHUNK_SIZE, QUALITY_FLAG_FULL_HISTORY, 
-    QUALITY_FLAG_LIMITED_HISTORY, OPTIONS_MULTIPLIER
+    QUALITY_FLAG_LIMITED_HISTORY,
+    REGRESSION_MODE_UNIVARIATE, REGRESSION_MODE_MULTIVARIATE, DEFAULT_REGRESSION_MODE,
+    FACTOR_DEFINITION_NAMES
 )
 from app.core.logging import get_logger
 
 logger = get_logger(__name__)
 
+# A position factor exposure row binds 7 parameters; Postgres allows 32767 per statement
+FACTOR_EXPOSURE_UPSERT_CHUNK_SIZE = 4000
+
+# FactorDefinition rows rarely change; loaded once per process
+_factor_definitions: Optional[Dict[str, Tuple[UUID, bool]]] = None
+
+
+async def _load_factor_definitions(db: AsyncSession) -> Dict[str, Tuple[UUID, bool]]:
+    global _factor_definitions
+    if _factor_definitions is None:
+        result = await db.execute(select(FactorDefinition.name, FactorDefinition.id, FactorDefinition.is_active))
+        _factor_definitions = {name: (factor_id, is_active) for name, factor_id, is_active in result.all()}
+        logger.info(f"Cached {len(_factor_definitions)} factor definitions")
+    return _factor_definitions
+
+
+async def get_factor_definition_ids(db: AsyncSession) -> Dict[str, UUID]:
+    """
+    Active factor definition ids keyed by model factor name ('Market', 'Value', ...)
+    
+    Definitions are queried once and cached for the process lifetime; call
+    clear_factor_definition_cache() after changing factor_definitions.
+    """
+    definitions = await _load_factor_definitions(db)
+    factor_ids = {}
+    for factor_name, definition_name in FACTOR_DEFINITION_NAMES.items():
+        factor_id, is_active = definitions.get(definition_name, (None, False))
+        if factor_id is None or not is_active:
+            logger.warning(f"Factor '{definition_name}' (original: '{factor_name}') not found in database")
+            continue
+        factor_ids[factor_name] = factor_id
+    return factor_ids
+
+
+async def get_factor_definition_names(db: AsyncSession) -> Dict[UUID, str]:
+    """FactorDefinition.name of every factor definition (active or not), keyed by id (cached)"""
+    definitions = await _load_factor_definitions(db)
+    return {factor_id: name for name, (factor_id, _) in definitions.items()}
+
+
+def clear_factor_definition_cache() -> None:
+    """Drop the cached factor definitions (e.g. after seeding)"""
+    global _factor_definitions
+    _factor_definitions = None
+
+
+@dataclass
+class FactorRunContext:
+    """
+    Positions and factor results of one portfolio for one calculation date
+    
+    Built once per portfolio per batch run so the factor, market risk and
+    stress testing stages load the positions once and calculate (and store)
+    the factor betas once; later stages reuse the results.
+    """
+    portfolio_id: UUID
+    calculation_date: date
+    position_frame: Optional[PositionFrame] = None
+    factor_analysis: Optional[Dict[str, Any]] = None
+    
+    async def get_position_frame(self, db: AsyncSession) -> PositionFrame:
+        """Active positions, loaded on first use"""
+        if self.position_frame is None:
+            self.position_frame = await PositionFrame.load(db, self.portfolio_id)
+        return self.position_frame
+    
+    async def get_factor_analysis(self, db: AsyncSession) -> Dict[str, Any]:
+        """calculate_factor_betas_hybrid results, calculated and stored on first use"""
+        if self.factor_analysis is None:
+            self.factor_analysis = await calculate_factor_betas_hybrid(
+                db=db,
+                portfolio_id=self.portfolio_id,
+                calculation_date=self.calculation_date,
+                position_frame=await self.get_position_frame(db)
+            )
+        return self.factor_analysis
+    
+    def latest_factor_exposures(self) -> Optional[Dict[str, Dict[str, Any]]]:
+        """
+        Portfolio factor exposures stored by this run, keyed by factor definition name
+        (None until the factor analysis has run)
+        """
+        if self.factor_analysis is None:
+            return None
+        portfolio_storage = self.factor_analysis['storage_results'].get('portfolio_storage')
+        return portfolio_storage['stored_exposures'] if portfolio_storage else None
+
 
 async def fetch_factor_returns(
     db: AsyncSession,
@@ -98,7 +191,8 @@ async def calculate_position_returns(
     portfolio_id: UUID,
     start_date: date,
     end_date: date,
-    use_delta_adjusted: bool = False
+    use_delta_adjusted: bool = False,
+    position_frame: Optional[PositionFrame] = None
 ) -> pd.DataFrame:
     """
     Calculate exposure-based daily returns for portfolio positions
@@ -109,6 +203,7 @@ async def calculate_position_returns(
         start_date: Start date for return calculation
         end_date: End date for return calculation
         use_delta_adjusted: If True, use delta-adjusted exposure for options
+        position_frame: Active positions of the portfolio, loaded if not provided
         
     Returns:
         DataFrame with dates as index and position IDs as columns, containing daily returns
@@ -124,22 +219,16 @@ async def calculate_position_returns(
     logger.info(f"Date range: {start_date} to {end_date}, Delta-adjusted: {use_delta_adjusted}")
     
     # Get active positions for the portfolio
-    stmt = select(Position).where(
-        and_(
-            Position.portfolio_id == portfolio_id,
-            Position.exit_date.is_(None)  # Only active positions
-        )
-    )
-    result = await db.execute(stmt)
-    positions = result.scalars().all()
+    if position_frame is None:
+        position_frame = await PositionFrame.load(db, portfolio_id)
     
-    if not positions:
+    if len(position_frame) == 0:
         logger.warning(f"No active positions found for portfolio {portfolio_id}")
         return pd.DataFrame()
     
     # Get unique symbols for price fetching
-    symbols = list(set(position.symbol for position in positions))
-    logger.info(f"Found {len(positions)} positions with {len(symbols)} unique symbols")
+    symbols = list(set(position_frame.symbols.tolist()))
+    logger.info(f"Found {len(position_frame)} positions with {len(symbols)} unique symbols")
     
     # Fetch historical prices for all symbols
     price_df = await fetch_historical_prices(
@@ -156,19 +245,19 @@ async def calculate_position_returns(
     # Calculate returns for each position
     position_returns = {}
     
-    for position in positions:
+    for position_id, symbol in zip(position_frame.ids, position_frame.symbols):
         try:
-            symbol = position.symbol.upper()
+            symbol = symbol.upper()
             
             if symbol not in price_df.columns:
-                logger.warning(f"No price data for position {position.id} ({symbol})")
+                logger.warning(f"No price data for position {position_id} ({symbol})")
                 continue
             
             # Get price series for this symbol
             prices = price_df[symbol].dropna()
             
             if len(prices) < 2:
-                logger.warning(f"Insufficient price data for position {position.id} ({symbol})")
+                logger.warning(f"Insufficient price data for position {position_id} ({symbol})")
                 continue
             
             # Compute daily returns from prices directly for clarity.
@@ -177,11 +266,11 @@ async def calculate_position_returns(
             returns = prices.pct_change().dropna()
             
             if not returns.empty:
-                position_returns[str(position.id)] = returns
-                logger.debug(f"Calculated returns for position {position.id}: {len(returns)} days")
+                position_returns[position_id] = returns
+                logger.debug(f"Calculated returns for position {position_id}: {len(returns)} days")
             
         except Exception as e:
-            logger.error(f"Error calculating returns for position {position.id}: {str(e)}")
+            logger.error(f"Error calculating returns for position {position_id}: {str(e)}")
             continue
     
     if not position_returns:
@@ -200,7 +289,9 @@ async def calculate_factor_betas_hybrid(
     db: AsyncSession,
     portfolio_id: UUID,
     calculation_date: date,
-    use_delta_adjusted: bool = False
+    use_delta_adjusted: bool = False,
+    position_frame: Optional[PositionFrame] = None,
+    regression_mode: str = DEFAULT_REGRESSION_MODE
 ) -> Dict[str, Any]:
     """
     Calculate portfolio factor betas using 252-day regression analysis
@@ -210,6 +301,9 @@ async def calculate_factor_betas_hybrid(
         portfolio_id: Portfolio ID to analyze
         calculation_date: Date for the calculation (end of regression window)
         use_delta_adjusted: Use delta-adjusted exposures for options
+        position_frame: Active positions of the portfolio, loaded if not provided
+        regression_mode: REGRESSION_MODE_UNIVARIATE (independent beta per factor) or
+            REGRESSION_MODE_MULTIVARIATE (all factors jointly, controls for factor correlation)
         
     Returns:
         Dictionary containing:
@@ -220,6 +314,9 @@ async def calculate_factor_betas_hybrid(
     """
     logger.info(f"Calculating factor betas for portfolio {portfolio_id} as of {calculation_date}")
     
+    if regression_mode not in (REGRESSION_MODE_UNIVARIATE, REGRESSION_MODE_MULTIVARIATE):
+        raise ValueError(f"Unknown regression mode: {regression_mode}")
+    
     # Define regression window
     end_date = calculation_date
     start_date = end_date - timedelta(days=REGRESSION_WINDOW_DAYS + 30)  # Extra buffer for trading days
@@ -237,13 +334,16 @@ async def calculate_factor_betas_hybrid(
         if factor_returns.empty:
             raise ValueError("No factor returns data available")
         
-        # Step 2: Fetch position returns
+        # Step 2: Fetch position returns (positions are loaded once for the whole run)
+        if position_frame is None:
+            position_frame = await PositionFrame.load(db, portfolio_id)
         position_returns = await calculate_position_returns(
             db=db,
             portfolio_id=portfolio_id,
             start_date=start_date,
             end_date=end_date,
-            use_delta_adjusted=use_delta_adjusted
+            use_delta_adjusted=use_delta_adjusted,
+            position_frame=position_frame
         )
         
         if position_returns.empty:
@@ -263,65 +363,21 @@ async def calculate_factor_betas_hybrid(
         position_returns_aligned = position_returns.loc[common_dates]
         
         # Step 4: Calculate factor betas for each position
-        position_betas = {}
-        regression_stats = {}
-        
-        for position_id in position_returns_aligned.columns:
-            position_betas[position_id] = {}
-            regression_stats[position_id] = {}
-            
-            try:
-                y_series = position_returns_aligned[position_id]
-                
-                # Run regression for each factor with pairwise NaN drop
-                for factor_name in factor_returns_aligned.columns:
-                    x_series = factor_returns_aligned[factor_name]
-                    pair = pd.concat([y_series, x_series], axis=1, keys=['y', 'x']).dropna()
-                    
-                    if len(pair) < MIN_REGRESSION_DAYS:
-                        position_betas[position_id][factor_name] = 0.0
-                        regression_stats[position_id][factor_name] = { 'r_squared': 0.0, 'p_value': 1.0, 'std_err': 0.0 }
-                        continue
-                    
-                    y = pair['y'].values
-                    X = pair['x'].values
-                    X_with_const = sm.add_constant(X)
-                    
-                    try:
-                        model = sm.OLS(y, X_with_const).fit()
-                        beta = model.params[1] if len(model.params) > 1 else 0.0
-                        original_beta = beta
-                        beta = max(-BETA_CAP_LIMIT, min(BETA_CAP_LIMIT, beta))
-                        
-                        # Log if cap was applied
-                        if abs(original_beta) > BETA_CAP_LIMIT:
-                            logger.warning(f"Beta capped for position {position_id}, factor {factor_name}: {original_beta:.3f} -> {beta:.3f}")
-                        
-                        position_betas[position_id][factor_name] = float(beta)
-                        regression_stats[position_id][factor_name] = {
-                            'r_squared': float(model.rsquared),
-                            'p_value': float(model.pvalues[1]) if len(model.pvalues) > 1 else 1.0,
-                            'std_err': float(model.bse[1]) if len(model.bse) > 1 else 0.0
-                        }
-                    except Exception as e:
-                        logger.error(f"OLS error for position {position_id}, factor {factor_name}: {str(e)}")
-                        position_betas[position_id][factor_name] = 0.0
-                        regression_stats[position_id][factor_name] = { 'r_squared': 0.0, 'p_value': 1.0, 'std_err': 0.0 }
-                
-            except Exception as e:
-                logger.error(f"Error calculating betas for position {position_id}: {str(e)}")
-                # Fill with zeros on error
-                for factor_name in factor_returns_aligned.columns:
-                    position_betas[position_id][factor_name] = 0.0
-                    regression_stats[position_id][factor_name] = {
-                        'r_squared': 0.0, 'p_value': 1.0, 'std_err': 0.0
-                    }
+        if regression_mode == REGRESSION_MODE_MULTIVARIATE:
+            position_betas, regression_stats = _multivariate_factor_betas(
+                position_returns_aligned, factor_returns_aligned
+            )
+        else:
+            position_betas, regression_stats = _univariate_factor_betas(
+                position_returns_aligned, factor_returns_aligned
+            )
         
         # Step 5: Calculate portfolio-level factor betas (exposure-weighted average)
         portfolio_betas = await _aggregate_portfolio_betas(
             db=db,
             portfolio_id=portfolio_id,
-            position_betas=position_betas
+            position_betas=position_betas,
+            position_frame=position_frame
         )
         
         # Step 6: Store factor exposures in database
@@ -343,38 +399,22 @@ async def calculate_factor_betas_hybrid(
         if portfolio_betas:
             logger.info("Storing portfolio factor exposures to database...")
             # Get portfolio exposures for dollar calculations
-            from app.calculations.portfolio import calculate_portfolio_exposures
-            from app.models.positions import Position
-            
-            stmt = select(Position).where(
-                and_(
-                    Position.portfolio_id == portfolio_id,
-                    Position.exit_date.is_(None)
-                )
-            )
-            result = await db.execute(stmt)
-            positions = result.scalars().all()
-            
-            position_dicts = []
-            for pos in positions:
-                market_value = float(pos.market_value) if pos.market_value else 0
-                position_dicts.append({
-                    'symbol': pos.symbol,
-                    'quantity': float(pos.quantity),
-                    'market_value': market_value,
-                    'exposure': market_value,
-                    'position_type': pos.position_type.value if pos.position_type else 'LONG',
-                    'last_price': float(pos.last_price) if pos.last_price else 0
-                })
+            from app.calculations.portfolio import AggregationKey, calculate_portfolio_exposures
             
-            portfolio_exposures = calculate_portfolio_exposures(position_dicts) if position_dicts else {}
+            # Same frame records as the orchestrator's aggregation job, so this is usually a cache hit
+            position_dicts = position_frame.aggregation_records()
+            portfolio_exposures = calculate_portfolio_exposures(
+                position_dicts,
+                cache_key=AggregationKey.for_portfolio("position_frame", portfolio_id)
+            ) if position_dicts else {}
             
             portfolio_storage = await aggregate_portfolio_factor_exposures(
                 db=db,
                 position_betas=position_betas,
                 portfolio_exposures=portfolio_exposures,
                 portfolio_id=portfolio_id,
-                calculation_date=calculation_date
+                calculation_date=calculation_date,
+                position_frame=position_frame
             )
             storage_results['portfolio_storage'] = portfolio_storage
             logger.info("Portfolio factor exposures stored successfully")
@@ -395,6 +435,7 @@ async def calculate_factor_betas_hybrid(
                 'start_date': common_dates[0] if len(common_dates) > 0 else start_date,
                 'end_date': common_dates[-1] if len(common_dates) > 0 else end_date,
                 'use_delta_adjusted': use_delta_adjusted,
+                'regression_mode': regression_mode,
                 'regression_window_days': REGRESSION_WINDOW_DAYS,
                 'portfolio_id': str(portfolio_id)
             },
@@ -412,6 +453,159 @@ async def calculate_factor_betas_hybrid(
 
 # Helper functions
 
+_EMPTY_REGRESSION_STATS = {'r_squared': 0.0, 'p_value': 1.0, 'std_err': 0.0}
+
+
+def _cap_beta(position_id: str, factor_name: str, beta: float) -> float:
+    """Clamp a beta to ±BETA_CAP_LIMIT, logging when the cap applies"""
+    capped = max(-BETA_CAP_LIMIT, min(BETA_CAP_LIMIT, beta))
+    if abs(beta) > BETA_CAP_LIMIT:
+        logger.warning(f"Beta capped for position {position_id}, factor {factor_name}: {beta:.3f} -> {capped:.3f}")
+    return capped
+
+
+def _univariate_factor_betas(
+    position_returns: pd.DataFrame,
+    factor_returns: pd.DataFrame
+) -> Tuple[Dict[str, Dict[str, float]], Dict[str, Dict[str, Dict[str, float]]]]:
+    """
+    Independent single-factor OLS of each position on each factor
+    
+    Returns:
+        (position_betas, regression_stats) keyed by position id, then factor name
+    """
+    position_betas = {}
+    regression_stats = {}
+    
+    for position_id in position_returns.columns:
+        position_betas[position_id] = {}
+        regression_stats[position_id] = {}
+        
+        try:
+            y_series = position_returns[position_id]
+            
+            # Run regression for each factor with pairwise NaN drop
+            for factor_name in factor_returns.columns:
+                x_series = factor_returns[factor_name]
+                pair = pd.concat([y_series, x_series], axis=1, keys=['y', 'x']).dropna()
+                
+                if len(pair) < MIN_REGRESSION_DAYS:
+                    position_betas[position_id][factor_name] = 0.0
+                    regression_stats[position_id][factor_name] = dict(_EMPTY_REGRESSION_STATS)
+                    continue
+                
+                y = pair['y'].values
+                X = pair['x'].values
+                X_with_const = sm.add_constant(X)
+                
+                try:
+                    model = sm.OLS(y, X_with_const).fit()
+                    beta = model.params[1] if len(model.params) > 1 else 0.0
+                    
+                    position_betas[position_id][factor_name] = float(_cap_beta(position_id, factor_name, beta))
+                    regression_stats[position_id][factor_name] = {
+                        'r_squared': float(model.rsquared),
+                        'p_value': float(model.pvalues[1]) if len(model.pvalues) > 1 else 1.0,
+                        'std_err': float(model.bse[1]) if len(model.bse) > 1 else 0.0
+                    }
+                except Exception as e:
+                    logger.error(f"OLS error for position {position_id}, factor {factor_name}: {str(e)}")
+                    position_betas[position_id][factor_name] = 0.0
+                    regression_stats[position_id][factor_name] = dict(_EMPTY_REGRESSION_STATS)
+            
+        except Exception as e:
+            logger.error(f"Error calculating betas for position {position_id}: {str(e)}")
+            # Fill with zeros on error
+            for factor_name in factor_returns.columns:
+                position_betas[position_id][factor_name] = 0.0
+                regression_stats[position_id][factor_name] = dict(_EMPTY_REGRESSION_STATS)
+    
+    return position_betas, regression_stats
+
+
+def _multivariate_factor_betas(
+    position_returns: pd.DataFrame,
+    factor_returns: pd.DataFrame
+) -> Tuple[Dict[str, Dict[str, float]], Dict[str, Dict[str, Dict[str, float]]]]:
+    """
+    Joint OLS of each position on all factors: r = a + F·b + e
+    
+    Every position shares the factor design matrix, so positions are grouped
+    by their set of usable days (rows where the position and all factors have
+    returns) and each group is solved with a single QR factorization of the
+    design matrix against all of its positions' return columns at once. In
+    practice almost every position shares one mask, so the whole portfolio
+    costs roughly one regression. Near-singular designs (perfectly collinear
+    factors) fall back to the pseudo-inverse.
+    
+    Returns:
+        (position_betas, regression_stats) keyed by position id, then factor name;
+        r_squared is the joint model R² and is the same for every factor of a position
+    """
+    factor_names = list(factor_returns.columns)
+    position_ids = list(position_returns.columns)
+    n_factors = len(factor_names)
+    
+    position_betas = {pid: {f: 0.0 for f in factor_names} for pid in position_ids}
+    regression_stats = {pid: {f: dict(_EMPTY_REGRESSION_STATS) for f in factor_names} for pid in position_ids}
+    if not position_ids or not n_factors:
+        return position_betas, regression_stats
+    
+    F = factor_returns.to_numpy(dtype=np.float64)
+    Y = position_returns.to_numpy(dtype=np.float64)
+    X = np.column_stack([np.ones(len(F)), F])
+    usable = ~np.isnan(Y) & ~np.isnan(F).any(axis=1)[:, None]
+    
+    # Group positions sharing the same usable-day mask
+    groups: Dict[bytes, List[int]] = {}
+    for column in range(Y.shape[1]):
+        groups.setdefault(np.packbits(usable[:, column]).tobytes(), []).append(column)
+    
+    for columns in groups.values():
+        mask = usable[:, columns[0]]
+        n_obs = int(mask.sum())
+        dof = n_obs - n_factors - 1
+        if n_obs < MIN_REGRESSION_DAYS or dof <= 0:
+            continue
+        
+        X_m = X[mask]
+        Y_m = Y[np.ix_(mask, columns)]
+        
+        Q, R = np.linalg.qr(X_m)
+        diagonal = np.abs(np.diag(R))
+        if diagonal.min() > diagonal.max() * 1e-10:
+            coefficients = linalg.solve_triangular(R, Q.T @ Y_m)
+            R_inv = linalg.solve_triangular(R, np.eye(R.shape[0]))
+            xtx_inv_diag = np.sum(R_inv ** 2, axis=1)
+        else:
+            logger.warning("Factor design matrix is near-singular; using pseudo-inverse for multivariate betas")
+            coefficients = np.linalg.pinv(X_m) @ Y_m
+            xtx_inv_diag = np.diag(np.linalg.pinv(X_m.T @ X_m))
+        
+        residuals = Y_m - X_m @ coefficients
+        ss_res = np.sum(residuals ** 2, axis=0)
+        ss_tot = np.sum((Y_m - Y_m.mean(axis=0)) ** 2, axis=0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            r_squared = np.where(ss_tot > 0, 1.0 - ss_res / ss_tot, 0.0)
+            std_err = np.sqrt(np.outer(xtx_inv_diag, ss_res / dof))
+            t_stats = np.where(std_err > 0, coefficients / std_err, 0.0)
+        p_values = 2.0 * stats.t.sf(np.abs(t_stats), dof)
+        
+        for j, column in enumerate(columns):
+            position_id = position_ids[column]
+            for i, factor_name in enumerate(factor_names, start=1):
+                position_betas[position_id][factor_name] = float(
+                    _cap_beta(position_id, factor_name, float(coefficients[i, j]))
+                )
+                regression_stats[position_id][factor_name] = {
+                    'r_squared': float(r_squared[j]),
+                    'p_value': float(p_values[i, j]),
+                    'std_err': float(std_err[i, j])
+                }
+    
+    return position_betas, regression_stats
+
+
 def _is_options_position(position: Position) -> bool:
     """Check if position is an options position"""
     from app.models.positions import PositionType
@@ -436,44 +630,22 @@ async def _get_position_delta(db: AsyncSession, position: Position) -> Optional[
 async def _aggregate_portfolio_betas(
     db: AsyncSession,
     portfolio_id: UUID,
-    position_betas: Dict[str, Dict[str, float]]
+    position_betas: Dict[str, Dict[str, float]],
+    position_frame: Optional[PositionFrame] = None
 ) -> Dict[str, float]:
     """
     Aggregate position-level betas to portfolio level using exposure weighting
     """
-    # Get current position exposures for weighting
-    stmt = select(Position).where(
-        and_(
-            Position.portfolio_id == portfolio_id,
-            Position.exit_date.is_(None)
-        )
-    )
-    result = await db.execute(stmt)
-    positions = result.scalars().all()
+    if position_frame is None:
+        position_frame = await PositionFrame.load(db, portfolio_id)
     
-    if not positions:
+    if len(position_frame) == 0:
         return {}
     
-    # Calculate exposure weights
-    total_exposure = Decimal('0')
-    position_weights = {}
-    
-    for position in positions:
-        # Simple exposure calculation for weighting
-        multiplier = OPTIONS_MULTIPLIER if _is_options_position(position) else 1
-        exposure = abs(position.quantity * (position.last_price or position.entry_price) * multiplier)
-        total_exposure += exposure
-        position_weights[str(position.id)] = exposure
-    
-    if total_exposure == 0:
+    # Weights by absolute notional (quantity × price × multiplier)
+    if position_frame.notional.sum() == 0:
         logger.warning("Total portfolio exposure is zero, using equal weights")
-        equal_weight = 1.0 / len(positions)
-        position_weights = {str(p.id): equal_weight for p in positions}
-        total_exposure = Decimal('1')
-    
-    # Normalize weights
-    for pos_id in position_weights:
-        position_weights[pos_id] = float(position_weights[pos_id] / total_exposure)
+    position_weights = position_frame.exposure_weights()
     
     # Calculate weighted average betas
     portfolio_betas = {}
@@ -522,68 +694,67 @@ async def store_position_factor_exposures(
     }
     
     try:
-        # First, delete any existing records for this calculation date to prevent duplicates
-        logger.info(f"Clearing existing factor exposures for date {calculation_date}")
-        position_ids = [UUID(pid) for pid in position_betas.keys()]
-        if position_ids:
-            delete_stmt = delete(PositionFactorExposure).where(
-                and_(
-                    PositionFactorExposure.position_id.in_(position_ids),
-                    PositionFactorExposure.calculation_date == calculation_date
-                )
-            )
-            await db.execute(delete_stmt)
-        
-        # Get factor definitions for ID mapping
-        stmt = select(FactorDefinition).where(FactorDefinition.is_active == True)
-        result = await db.execute(stmt)
-        factor_definitions = result.scalars().all()
-        
-        factor_name_to_id = {fd.name: fd.id for fd in factor_definitions}
-        
-        # Add mapping for factor name differences
-        factor_name_mapping = {
-            'Market': 'Market Beta',  # Map "Market" to "Market Beta" as in database
-            'Value': 'Value',
-            'Growth': 'Growth',
-            'Momentum': 'Momentum',
-            'Quality': 'Quality',
-            'Size': 'Size',
-            'Low Volatility': 'Low Volatility'
-        }
+        factor_ids = await get_factor_definition_ids(db)
         
+        rows = []
+        # Positions grouped by the set of factors stored for them in this run
+        positions_by_factor_set: Dict[frozenset, List[UUID]] = {}
         for position_id_str, factor_betas in position_betas.items():
             try:
                 position_id = UUID(position_id_str)
                 results["positions_processed"] += 1
                 
+                stored_factor_ids = set()
                 for factor_name, beta_value in factor_betas.items():
-                    # Map factor name if needed
-                    mapped_name = factor_name_mapping.get(factor_name, factor_name)
-                    
-                    if mapped_name not in factor_name_to_id:
-                        logger.warning(f"Factor '{mapped_name}' (original: '{factor_name}') not found in database")
+                    factor_id = factor_ids.get(factor_name)
+                    if factor_id is None:
                         continue
                     
-                    factor_id = factor_name_to_id[mapped_name]
-                    
-                    # Create new record (we already deleted existing ones)
-                    exposure_record = PositionFactorExposure(
-                        position_id=position_id,
-                        factor_id=factor_id,
-                        calculation_date=calculation_date,
-                        exposure_value=Decimal(str(beta_value)),
-                        quality_flag=quality_flag
-                    )
-                    db.add(exposure_record)
-                    
-                    results["records_stored"] += 1
+                    stored_factor_ids.add(factor_id)
+                    rows.append({
+                        "id": uuid4(),
+                        "position_id": position_id,
+                        "factor_id": factor_id,
+                        "calculation_date": calculation_date,
+                        "exposure_value": Decimal(str(beta_value)),
+                        "quality_flag": quality_flag
+                    })
+                positions_by_factor_set.setdefault(frozenset(stored_factor_ids), []).append(position_id)
                 
             except Exception as e:
                 error_msg = f"Error storing exposures for position {position_id_str}: {str(e)}"
                 logger.error(error_msg)
                 results["errors"].append(error_msg)
         
+        # A factor left out of this run must not keep an exposure from an earlier
+        # run for the same date (one DELETE per factor set, usually just one)
+        for kept_factor_ids, position_ids in positions_by_factor_set.items():
+            for chunk_start in range(0, len(position_ids), FACTOR_EXPOSURE_UPSERT_CHUNK_SIZE):
+                stmt = delete(PositionFactorExposure).where(
+                    PositionFactorExposure.position_id.in_(
+                        position_ids[chunk_start:chunk_start + FACTOR_EXPOSURE_UPSERT_CHUNK_SIZE]
+                    ),
+                    PositionFactorExposure.calculation_date == calculation_date
+                )
+                if kept_factor_ids:
+                    stmt = stmt.where(PositionFactorExposure.factor_id.notin_(kept_factor_ids))
+                await db.execute(stmt)
+        
+        # One multi-row upsert per chunk; replaces any exposures already stored for this date
+        for chunk_start in range(0, len(rows), FACTOR_EXPOSURE_UPSERT_CHUNK_SIZE):
+            stmt = pg_insert(PositionFactorExposure).values(
+                rows[chunk_start:chunk_start + FACTOR_EXPOSURE_UPSERT_CHUNK_SIZE]
+            )
+            stmt = stmt.on_conflict_do_update(
+                constraint="uq_position_factor_date",
+                set_={
+                    "exposure_value": stmt.excluded.exposure_value,
+                    "quality_flag": stmt.excluded.quality_flag
+                }
+            )
+            await db.execute(stmt)
+        results["records_stored"] = len(rows)
+        
         # Commit all changes
         await db.commit()
         logger.info(f"Stored {results['records_stored']} factor exposure records")
@@ -602,7 +773,8 @@ async def aggregate_portfolio_factor_exposures(
     position_betas: Dict[str, Dict[str, float]],
     portfolio_exposures: Dict[str, Any],
     portfolio_id: UUID,
-    calculation_date: date
+    calculation_date: date,
+    position_frame: Optional[PositionFrame] = None
 ) -> Dict[str, Any]:
     """
     Aggregate position-level factor exposures to portfolio level and store
@@ -626,6 +798,7 @@ async def aggregate_portfolio_factor_exposures(
         portfolio_exposures: Current portfolio exposures for weighting
         portfolio_id: Portfolio ID
         calculation_date: Date of calculation
+        position_frame: Active positions of the portfolio, loaded if not provided
         
     Returns:
         Dictionary with aggregation results
@@ -633,58 +806,22 @@ async def aggregate_portfolio_factor_exposures(
     logger.info(f"Aggregating portfolio factor exposures for portfolio {portfolio_id}")
     
     try:
-        # Get factor definitions
-        stmt = select(FactorDefinition).where(FactorDefinition.is_active == True)
-        result = await db.execute(stmt)
-        factor_definitions = result.scalars().all()
-        
-        factor_name_to_id = {fd.name: fd.id for fd in factor_definitions}
-        
-        # Add mapping for factor name differences
-        factor_name_mapping = {
-            'Market': 'Market Beta',
-            'Value': 'Value',
-            'Growth': 'Growth',
-            'Momentum': 'Momentum',
-            'Quality': 'Quality',
-            'Size': 'Size',
-            'Low Volatility': 'Low Volatility'
-        }
+        factor_ids = await get_factor_definition_ids(db)
         
         # Initialize factor dollar exposures
         factor_dollar_exposures = {}
         signed_portfolio_betas = {}
         magnitude_portfolio_betas = {}
         
-        # Get positions with their market values and types
-        from app.models.positions import Position, PositionType
-        pos_stmt = select(Position).where(
-            and_(
-                Position.portfolio_id == portfolio_id,
-                Position.deleted_at.is_(None)
-            )
-        )
-        pos_result = await db.execute(pos_stmt)
-        positions = pos_result.scalars().all()
-        
-        # Build position exposure map with correct signs
-        position_exposures = {}
-        for position in positions:
-            pos_id_str = str(position.id)
-            market_val = float(position.market_value) if position.market_value else 0
-            
-            # Apply sign based on position type
-            if position.position_type in [PositionType.SHORT, PositionType.SC, PositionType.SP]:
-                signed_exposure = -abs(market_val)
-            else:
-                signed_exposure = abs(market_val)
-            
-            position_exposures[pos_id_str] = signed_exposure
+        # Signed position exposures (sign from position type)
+        if position_frame is None:
+            position_frame = await PositionFrame.load(db, portfolio_id)
+        position_exposures = dict(zip(position_frame.ids, position_frame.signed_exposure.tolist()))
         
         # Calculate factor dollar exposures using position-level attribution
         gross_exposure = portfolio_exposures.get("gross_exposure", Decimal('0'))
         
-        for factor_name in factor_name_mapping.keys():
+        for factor_name in FACTOR_DEFINITION_NAMES:
             factor_dollar_exposure = 0.0
             signed_weighted_beta = 0.0
             magnitude_weighted_beta = 0.0
@@ -717,51 +854,47 @@ async def aggregate_portfolio_factor_exposures(
         # Use signed betas as the primary portfolio betas
         portfolio_betas = signed_portfolio_betas
         
-        # Store portfolio-level factor exposures
-        from app.models.market_data import FactorExposure
-        
-        records_stored = 0
+        # Store portfolio-level factor exposures with one multi-row upsert
+        updated_at = datetime.utcnow()
+        rows = []
+        stored_exposures = {}
         for factor_name, beta_value in portfolio_betas.items():
-            # Map factor name if needed
-            mapped_name = factor_name_mapping.get(factor_name, factor_name)
-            
-            if mapped_name not in factor_name_to_id:
-                logger.warning(f"Factor '{mapped_name}' (original: '{factor_name}') not found in database")
+            factor_id = factor_ids.get(factor_name)
+            if factor_id is None:
                 continue
             
-            factor_id = factor_name_to_id[mapped_name]
-            
             # Use the corrected dollar exposure
             exposure_dollar = factor_dollar_exposures.get(factor_name, 0)
             
-            # Check if record exists
-            existing = await db.execute(
-                select(FactorExposure).where(
-                    and_(
-                        FactorExposure.portfolio_id == portfolio_id,
-                        FactorExposure.factor_id == factor_id,
-                        FactorExposure.calculation_date == calculation_date
-                    )
-                )
+            rows.append({
+                "id": uuid4(),
+                "portfolio_id": portfolio_id,
+                "factor_id": factor_id,
+                "calculation_date": calculation_date,
+                "exposure_value": Decimal(str(beta_value)),
+                "exposure_dollar": Decimal(str(exposure_dollar)) if exposure_dollar else None,
+                "created_at": updated_at,
+                "updated_at": updated_at
+            })
+            # Same values (at column precision) as a later read of factor_exposures
+            stored_exposures[FACTOR_DEFINITION_NAMES[factor_name]] = {
+                "exposure_value": round(beta_value, 6),
+                "exposure_dollar": round(exposure_dollar, 2),
+                "calculation_date": calculation_date
+            }
+        
+        if rows:
+            stmt = pg_insert(FactorExposure).values(rows)
+            stmt = stmt.on_conflict_do_update(
+                constraint="uq_factor_exposures_portfolio_factor_date",
+                set_={
+                    "exposure_value": stmt.excluded.exposure_value,
+                    "exposure_dollar": stmt.excluded.exposure_dollar,
+                    "updated_at": stmt.excluded.updated_at
+                }
             )
-            existing_record = existing.scalar_one_or_none()
-            
-            if existing_record:
-                # Update existing record
-                existing_record.exposure_value = Decimal(str(beta_value))
-                existing_record.exposure_dollar = Decimal(str(exposure_dollar)) if exposure_dollar else None
-            else:
-                # Create new record
-                exposure_record = FactorExposure(
-                    portfolio_id=portfolio_id,
-                    factor_id=factor_id,
-                    calculation_date=calculation_date,
-                    exposure_value=Decimal(str(beta_value)),
-                    exposure_dollar=Decimal(str(exposure_dollar)) if exposure_dollar else None
-                )
-                db.add(exposure_record)
-            
-            records_stored += 1
+            await db.execute(stmt)
+        records_stored = len(rows)
         
         await db.commit()
         
@@ -771,6 +904,7 @@ async def aggregate_portfolio_factor_exposures(
             "factor_dollar_exposures": factor_dollar_exposures,
             "signed_portfolio_betas": signed_portfolio_betas,
             "magnitude_portfolio_betas": magnitude_portfolio_betas,
+            "stored_exposures": stored_exposures,
             "records_stored": records_stored,
             "calculation_date": calculation_date,
             "portfolio_id": str(portfolio_id)
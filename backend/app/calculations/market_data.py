@@ -4,14 +4,21 @@ Implements core position valuation and P&L calculations with database integratio
 """
 from datetime import date, datetime, timedelta
 from decimal import Decimal
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Dict, List, Optional, Any, Sequence, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, func
+from sqlalchemy import select, and_, func, update
+from sqlalchemy.orm.attributes import set_committed_value
+import numpy as np
 import pandas as pd
 
 from app.models.positions import Position, PositionType
 from app.models.market_data import MarketDataCache
+from app.calculations.portfolio import _to_decimal
+from app.calculations.position_frame import PositionFrame
+from app.constants.portfolio import MONETARY_DECIMAL_PLACES
 from app.services.market_data_service import market_data_service
+from app.utils.trading_calendar import trading_calendar
+from app.core.data_version import mark_portfolio_data_changed
 from app.core.logging import get_logger
 
 logger = get_logger(__name__)
@@ -87,6 +94,12 @@ async def calculate_position_market_value(
     return result
 
 
+def _previous_price_window_start(current_date: date, lookback_days: int) -> date:
+    """Earliest date of a lookback of `lookback_days` trading days before current_date"""
+    earliest_date = trading_calendar.offset_trading_day(current_date, -lookback_days)
+    return earliest_date or current_date - timedelta(days=lookback_days)
+
+
 async def get_previous_trading_day_price(
     db: AsyncSession, 
     symbol: str,
@@ -100,7 +113,7 @@ async def get_previous_trading_day_price(
         db: Database session
         symbol: Symbol to lookup
         current_date: Date to look before (defaults to today)
-        lookback_days: Number of days to look back (default 1 for previous trading day)
+        lookback_days: Number of trading days to look back (default 1 for previous trading day)
         
     Returns:
         Previous trading day closing price, or None if not found
@@ -108,8 +121,8 @@ async def get_previous_trading_day_price(
     if not current_date:
         current_date = date.today()
     
-    # Calculate the earliest date to search for
-    earliest_date = current_date - timedelta(days=lookback_days)
+    # Calculate the earliest date to search for (a Monday looks back to Friday)
+    earliest_date = _previous_price_window_start(current_date, lookback_days)
     
     logger.debug(f"Looking up price for {symbol} between {earliest_date} and {current_date}")
     
@@ -130,6 +143,56 @@ async def get_previous_trading_day_price(
         return None
 
 
+async def get_previous_trading_day_prices(
+    db: AsyncSession,
+    symbols: Sequence[str],
+    current_date: Optional[date] = None,
+    lookback_days: int = 1
+) -> Dict[str, Decimal]:
+    """
+    Batched get_previous_trading_day_price: one query for all symbols
+    
+    Args:
+        db: Database session
+        symbols: Symbols to lookup
+        current_date: Date to look before (defaults to today)
+        lookback_days: Number of trading days to look back (default 1 for previous trading day)
+        
+    Returns:
+        Dictionary mapping symbol (as given) to previous closing price; symbols without
+        a price in the window are omitted
+    """
+    if not symbols:
+        return {}
+    if not current_date:
+        current_date = date.today()
+    
+    earliest_date = _previous_price_window_start(current_date, lookback_days)
+    by_upper = {symbol.upper(): symbol for symbol in symbols}
+    
+    latest = (
+        select(MarketDataCache.symbol, func.max(MarketDataCache.date).label("latest_date"))
+        .where(
+            MarketDataCache.symbol.in_(list(by_upper)),
+            MarketDataCache.date < current_date,
+            MarketDataCache.date >= earliest_date
+        )
+        .group_by(MarketDataCache.symbol)
+        .subquery()
+    )
+    stmt = select(MarketDataCache.symbol, MarketDataCache.close).join(
+        latest,
+        and_(MarketDataCache.symbol == latest.c.symbol, MarketDataCache.date == latest.c.latest_date)
+    )
+    result = await db.execute(stmt)
+    prices = {by_upper[symbol]: close for symbol, close in result.all() if close is not None}
+    
+    missing = len(by_upper) - len(prices)
+    if missing:
+        logger.warning(f"No price found for {missing} of {len(by_upper)} symbols in {lookback_days} day lookback window")
+    return prices
+
+
 async def calculate_daily_pnl(
     db: AsyncSession,
     position: Position, 
@@ -321,6 +384,10 @@ async def update_position_market_values(
         position.unrealized_pnl = market_value_data["unrealized_pnl"]
         position.updated_at = datetime.utcnow()
         
+        # Cached aggregations (and other data derived from the portfolio) go stale
+        # when the caller commits these values
+        mark_portfolio_data_changed(db, position.portfolio_id)
+        
         # Combine all calculation results
         result = {
             **market_value_data,
@@ -344,6 +411,188 @@ async def update_position_market_values(
         }
 
 
+def calculate_position_values_bulk(
+    positions: Sequence[Position],
+    current_prices: Sequence[Decimal],
+    previous_prices: Sequence[Optional[Decimal]]
+) -> Dict[str, np.ndarray]:
+    """
+    Vectorized calculate_position_market_value + calculate_daily_pnl
+    
+    Args:
+        positions: Position objects
+        current_prices: Current price of each position
+        previous_prices: Previous trading day price of each position (None if unknown)
+        
+    Returns:
+        Dictionary of float64 arrays (one entry per position): market_value,
+        cost_basis, unrealized_pnl, multiplier, previous_value, daily_pnl,
+        price_change, daily_return and has_previous (bool). Daily fields are
+        zero where there is no previous price.
+    """
+    frame = PositionFrame.from_positions(positions)
+    current = np.array([float(price) for price in current_prices], dtype=np.float64)
+    previous = np.array(
+        [np.nan if price is None else float(price) for price in previous_prices], dtype=np.float64
+    )
+    has_previous = ~np.isnan(previous)
+    
+    market_value = frame.valued_at(current)
+    cost_basis = frame.valued_at(frame.entry_price)
+    previous_value = np.where(has_previous, frame.valued_at(previous), 0.0)
+    price_change = np.where(has_previous, current - previous, 0.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        daily_return = np.where(has_previous & (previous > 0), price_change / previous, 0.0)
+    
+    return {
+        "market_value": market_value,
+        "cost_basis": cost_basis,
+        "unrealized_pnl": market_value - cost_basis,
+        "multiplier": frame.multiplier,
+        "previous_value": previous_value,
+        "daily_pnl": np.where(has_previous, market_value - previous_value, 0.0),
+        "price_change": price_change,
+        "daily_return": daily_return,
+        "has_previous": has_previous,
+    }
+
+
+async def update_position_market_values_bulk(
+    db: AsyncSession,
+    positions: Sequence[Position],
+    current_prices: Dict[str, Decimal],
+    previous_prices: Optional[Dict[str, Decimal]] = None
+) -> List[Dict[str, Any]]:
+    """
+    Set-based update_position_market_values for many positions
+    
+    Values every priced position with array operations and persists
+    last_price / market_value / unrealized_pnl with a single bulk UPDATE
+    (executemany by primary key). Does not commit.
+    
+    Args:
+        db: Database session
+        positions: Position objects to update
+        current_prices: Current price by symbol
+        previous_prices: Previous trading day close by symbol (loaded with one
+            query when not given); falls back to position.last_price
+        
+    Returns:
+        List of update results, one per position in input order (same shape as
+        update_position_market_values)
+    """
+    if not positions:
+        return []
+    
+    if previous_prices is None:
+        previous_prices = await get_previous_trading_day_prices(
+            db, list({position.symbol for position in positions})
+        )
+    
+    results: List[Optional[Dict[str, Any]]] = [None] * len(positions)
+    priced_rows = []
+    for row, position in enumerate(positions):
+        if current_prices.get(position.symbol) is None:
+            logger.warning(f"No price available for {position.symbol}, skipping update")
+            results[row] = {
+                "position_id": position.id,
+                "symbol": position.symbol,
+                "success": False,
+                "error": "No price data available"
+            }
+        else:
+            priced_rows.append(row)
+    
+    if not priced_rows:
+        return results
+    
+    priced = [positions[row] for row in priced_rows]
+    current = [Decimal(str(current_prices[position.symbol])) for position in priced]
+    previous = [previous_prices.get(position.symbol, position.last_price) for position in priced]
+    
+    try:
+        values = calculate_position_values_bulk(priced, current, previous)
+        
+        updated_at = datetime.utcnow()
+        market_values = [_to_decimal(v, MONETARY_DECIMAL_PLACES) for v in values["market_value"].tolist()]
+        unrealized = [_to_decimal(v, MONETARY_DECIMAL_PLACES) for v in values["unrealized_pnl"].tolist()]
+        params = [
+            {
+                "id": position.id,
+                "last_price": current[i],
+                "market_value": market_values[i],
+                "unrealized_pnl": unrealized[i],
+                "updated_at": updated_at,
+            }
+            for i, position in enumerate(priced)
+        ]
+        await db.execute(update(Position), params)
+    except Exception as e:
+        logger.error(f"Error updating market values for {len(priced)} positions: {str(e)}")
+        for row, position in zip(priced_rows, priced):
+            results[row] = {
+                "position_id": position.id,
+                "symbol": position.symbol,
+                "success": False,
+                "error": str(e)
+            }
+        return results
+    
+    cost_basis = values["cost_basis"].tolist()
+    multiplier = values["multiplier"].tolist()
+    previous_value = values["previous_value"].tolist()
+    daily_pnl = values["daily_pnl"].tolist()
+    price_change = values["price_change"].tolist()
+    daily_return = values["daily_return"].tolist()
+    has_previous = values["has_previous"].tolist()
+    
+    # Cached aggregations (and other data derived from these portfolios) go stale
+    # when the caller commits these values
+    for portfolio_id in {position.portfolio_id for position in priced}:
+        mark_portfolio_data_changed(db, portfolio_id)
+    
+    for i, (row, position) in enumerate(zip(priced_rows, priced)):
+        # Keep the loaded objects in step with the rows just written
+        for column in ("last_price", "market_value", "unrealized_pnl", "updated_at"):
+            set_committed_value(position, column, params[i][column])
+        
+        result = {
+            "market_value": market_values[i],
+            "exposure": market_values[i],
+            "unrealized_pnl": unrealized[i],
+            "cost_basis": _to_decimal(cost_basis[i], MONETARY_DECIMAL_PLACES),
+            "price_per_share": current[i],
+            "multiplier": Decimal(int(multiplier[i])),
+            "position_id": position.id,
+            "symbol": position.symbol,
+            "update_timestamp": updated_at,
+            "success": True
+        }
+        if has_previous[i]:
+            result.update({
+                "daily_pnl": _to_decimal(daily_pnl[i], MONETARY_DECIMAL_PLACES),
+                "daily_return": Decimal(repr(daily_return[i])),
+                "price_change": _to_decimal(price_change[i], 4),
+                "previous_price": previous[i],
+                "previous_value": _to_decimal(previous_value[i], MONETARY_DECIMAL_PLACES),
+                "current_value": market_values[i]
+            })
+        else:
+            logger.warning(f"No previous price available for {position.symbol}, returning zero P&L")
+            result.update({
+                "daily_pnl": Decimal('0'),
+                "daily_return": Decimal('0'),
+                "price_change": Decimal('0'),
+                "previous_price": None,
+                "previous_value": Decimal('0'),
+                "current_value": Decimal('0'),
+                "error": "No previous price data available"
+            })
+        results[row] = result
+    
+    return results
+
+
 # Convenience function for bulk position updates
 async def bulk_update_position_values(
     db: AsyncSession,
@@ -351,7 +600,8 @@ async def bulk_update_position_values(
 ) -> List[Dict[str, Any]]:
     """
     Bulk update market values for multiple positions
-    Efficient batch processing for portfolio-wide updates
+    Efficient batch processing for portfolio-wide updates: one price fetch,
+    one previous-close query and one bulk UPDATE for all positions
     
     Args:
         db: Database session
@@ -371,22 +621,10 @@ async def bulk_update_position_values(
     # Fetch all prices in one batch
     prices = await fetch_and_cache_prices(db, symbols)
     
-    # Update each position
-    results = []
-    for position in positions:
-        current_price = prices.get(position.symbol)
-        
-        if current_price is not None:
-            result = await update_position_market_values(db, position, current_price)
-            results.append(result)
-        else:
-            logger.warning(f"No price available for {position.symbol}, skipping update")
-            results.append({
-                "position_id": position.id,
-                "symbol": position.symbol,
-                "success": False,
-                "error": "No price data available"
-            })
+    # Previous trading day closes for every symbol in one query
+    previous_prices = await get_previous_trading_day_prices(db, symbols)
+    
+    results = await update_position_market_values_bulk(db, positions, prices, previous_prices)
     
     # Commit all updates
     try:
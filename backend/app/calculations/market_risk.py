@@ -10,19 +10,18 @@ import pandas as pd
 import numpy as np
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_
-import statsmodels.api as sm
-from fredapi import Fred
 
 from app.models.positions import Position
 from app.models.market_data import MarketRiskScenario, PositionInterestRateBeta, FactorDefinition
 from app.models.users import Portfolio
-from app.calculations.factors import fetch_factor_returns, _aggregate_portfolio_betas
+from app.calculations.factors import fetch_factor_returns, _aggregate_portfolio_betas, FactorRunContext
+from app.calculations.position_frame import PositionFrame
 from app.constants.factors import (
     FACTOR_ETFS, REGRESSION_WINDOW_DAYS, MIN_REGRESSION_DAYS,
     BETA_CAP_LIMIT, OPTIONS_MULTIPLIER
 )
 from app.core.logging import get_logger
-from app.config import settings
+from app.services.treasury_yield_service import treasury_yield_service
 
 logger = get_logger(__name__)
 
@@ -55,7 +54,8 @@ TREASURY_SERIES = {
 async def calculate_portfolio_market_beta(
     db: AsyncSession,
     portfolio_id: UUID,
-    calculation_date: date
+    calculation_date: date,
+    context: Optional[FactorRunContext] = None
 ) -> Dict[str, Any]:
     """
     Calculate portfolio market beta using existing factor betas
@@ -64,35 +64,26 @@ async def calculate_portfolio_market_beta(
         db: Database session
         portfolio_id: Portfolio ID to analyze
         calculation_date: Date for the calculation
+        context: Factor run of the current batch; its positions and factor betas
+            are reused instead of being loaded and calculated again
         
     Returns:
         Dictionary containing market beta and factor breakdown
     """
     logger.info(f"Calculating portfolio market beta for portfolio {portfolio_id}")
     
+    if context is None:
+        context = FactorRunContext(portfolio_id=portfolio_id, calculation_date=calculation_date)
+    
     try:
         # Get active positions for the portfolio
-        stmt = select(Position).where(
-            and_(
-                Position.portfolio_id == portfolio_id,
-                Position.exit_date.is_(None)
-            )
-        )
-        result = await db.execute(stmt)
-        positions = result.scalars().all()
+        position_frame = await context.get_position_frame(db)
         
-        if not positions:
+        if len(position_frame) == 0:
             raise ValueError(f"No active positions found for portfolio {portfolio_id}")
         
         # Get existing factor betas (reuse from Section 1.4.4)
-        from app.calculations.factors import calculate_factor_betas_hybrid
-        
-        factor_analysis = await calculate_factor_betas_hybrid(
-            db=db,
-            portfolio_id=portfolio_id,
-            calculation_date=calculation_date,
-            use_delta_adjusted=False
-        )
+        factor_analysis = await context.get_factor_analysis(db)
         
         portfolio_betas = factor_analysis['factor_betas']
         
@@ -100,11 +91,7 @@ async def calculate_portfolio_market_beta(
         market_beta = portfolio_betas.get('Market', 0.0)  # 'Market' from SPY factor
         
         # Calculate portfolio value for exposure calculations
-        portfolio_value = Decimal('0')
-        for position in positions:
-            multiplier = OPTIONS_MULTIPLIER if _is_options_position(position) else 1
-            value = abs(position.quantity * (position.last_price or position.entry_price) * multiplier)
-            portfolio_value += value
+        portfolio_value = position_frame.notional.sum()
         
         results = {
             'portfolio_id': str(portfolio_id),
@@ -113,7 +100,7 @@ async def calculate_portfolio_market_beta(
             'portfolio_value': float(portfolio_value),
             'factor_breakdown': portfolio_betas,
             'data_quality': factor_analysis['data_quality'],
-            'positions_count': len(positions)
+            'positions_count': len(position_frame)
         }
         
         logger.info(f"Portfolio market beta calculated: {market_beta:.4f}")
@@ -128,7 +115,8 @@ async def calculate_market_scenarios(
     db: AsyncSession,
     portfolio_id: UUID,
     calculation_date: date,
-    scenarios: Optional[Dict[str, float]] = None
+    scenarios: Optional[Dict[str, float]] = None,
+    context: Optional[FactorRunContext] = None
 ) -> Dict[str, Any]:
     """
     Calculate portfolio P&L under various market scenarios using factor-based approach
@@ -138,6 +126,7 @@ async def calculate_market_scenarios(
         portfolio_id: Portfolio ID to analyze
         calculation_date: Date for the calculation
         scenarios: Optional custom scenarios (defaults to MARKET_SCENARIOS)
+        context: Factor run of the current batch (see calculate_portfolio_market_beta)
         
     Returns:
         Dictionary containing scenario results and storage information
@@ -152,7 +141,8 @@ async def calculate_market_scenarios(
         market_data = await calculate_portfolio_market_beta(
             db=db,
             portfolio_id=portfolio_id,
-            calculation_date=calculation_date
+            calculation_date=calculation_date,
+            context=context
         )
         
         market_beta = market_data['market_beta']
@@ -228,36 +218,23 @@ async def calculate_position_interest_rate_betas(
     logger.info(f"Calculating position interest rate betas for portfolio {portfolio_id}")
     
     try:
-        # Initialize FRED API
-        if not hasattr(settings, 'FRED_API_KEY') or not settings.FRED_API_KEY:
-            logger.warning("FRED API key not configured, using mock data for interest rate betas")
-            return await _calculate_mock_interest_rate_betas(db, portfolio_id, calculation_date)
-        
-        fred = Fred(api_key=settings.FRED_API_KEY)
-        
         # Get active positions
-        stmt = select(Position).where(
-            and_(
-                Position.portfolio_id == portfolio_id,
-                Position.exit_date.is_(None)
-            )
-        )
-        result = await db.execute(stmt)
-        positions = result.scalars().all()
+        position_frame = await PositionFrame.load(db, portfolio_id)
         
-        if not positions:
+        if len(position_frame) == 0:
             raise ValueError(f"No active positions found for portfolio {portfolio_id}")
         
-        # Fetch Treasury yield data
+        # Fetch Treasury yield data (locally stored, synced incrementally, shared across portfolios)
         end_date = calculation_date
         start_date = end_date - timedelta(days=REGRESSION_WINDOW_DAYS + 30)
         
         fred_series = TREASURY_SERIES.get(treasury_series, 'DGS10')
-        treasury_data = fred.get_series(
-            fred_series, 
-            observation_start=start_date, 
-            observation_end=end_date
-        )
+        treasury_data = await treasury_yield_service.get_series(db, fred_series, start_date, end_date)
+        
+        if treasury_data.empty:
+            logger.warning("No Treasury data available (FRED API key or fixtures not configured), "
+                           "using mock data for interest rate betas")
+            return await _calculate_mock_interest_rate_betas(db, portfolio_id, calculation_date)
         
         # Calculate Treasury yield changes (daily changes in basis points)
         treasury_changes = treasury_data.pct_change().dropna() * 10000  # Convert to basis points
@@ -273,7 +250,8 @@ async def calculate_position_interest_rate_betas(
             portfolio_id=portfolio_id,
             start_date=start_date,
             end_date=end_date,
-            use_delta_adjusted=False
+            use_delta_adjusted=False,
+            position_frame=position_frame
         )
         
         if position_returns.empty:
@@ -288,45 +266,35 @@ async def calculate_position_interest_rate_betas(
         treasury_aligned = treasury_changes.loc[common_dates]
         returns_aligned = position_returns.loc[common_dates]
         
-        # Calculate interest rate beta for each position
+        # Regress every position on Treasury changes at once:
+        # Position Return = α + β × Treasury Change + ε
+        ir_betas, r_squared = _interest_rate_betas(
+            returns_aligned.to_numpy(dtype=np.float64),
+            treasury_aligned.to_numpy(dtype=np.float64)
+        )
+        
+        # Cap beta to prevent extreme outliers
+        ir_betas = np.clip(ir_betas, -BETA_CAP_LIMIT, BETA_CAP_LIMIT)
+        
         position_ir_betas = {}
         records_to_store = []
         
-        for position_id in returns_aligned.columns:
-            try:
-                # Get position and treasury data
-                y = returns_aligned[position_id].values  # Position returns
-                x = treasury_aligned.values  # Treasury changes
-                
-                # Run OLS regression: Position Return = α + β × Treasury Change + ε
-                x_with_const = sm.add_constant(x)
-                model = sm.OLS(y, x_with_const).fit()
-                
-                # Extract interest rate beta (slope coefficient)
-                ir_beta = model.params[1] if len(model.params) > 1 else 0.0
-                r_squared = model.rsquared
-                
-                # Cap beta to prevent extreme outliers
-                ir_beta = max(-BETA_CAP_LIMIT, min(BETA_CAP_LIMIT, ir_beta))
-                
-                position_ir_betas[position_id] = {
-                    'ir_beta': float(ir_beta),
-                    'r_squared': float(r_squared)
-                }
-                
-                # Prepare record for database storage
-                record = PositionInterestRateBeta(
-                    position_id=UUID(position_id),
-                    ir_beta=Decimal(str(ir_beta)),
-                    r_squared=Decimal(str(r_squared)),
-                    calculation_date=calculation_date
-                )
-                records_to_store.append(record)
-                
-            except Exception as e:
-                logger.error(f"Error calculating IR beta for position {position_id}: {str(e)}")
-                # Set default values on error
-                position_ir_betas[position_id] = {'ir_beta': 0.0, 'r_squared': 0.0}
+        for position_id, ir_beta, position_r_squared in zip(
+            returns_aligned.columns, ir_betas.tolist(), r_squared.tolist()
+        ):
+            position_ir_betas[position_id] = {
+                'ir_beta': ir_beta,
+                'r_squared': position_r_squared
+            }
+            
+            # Prepare record for database storage
+            record = PositionInterestRateBeta(
+                position_id=UUID(position_id),
+                ir_beta=Decimal(str(ir_beta)),
+                r_squared=Decimal(str(position_r_squared)),
+                calculation_date=calculation_date
+            )
+            records_to_store.append(record)
         
         # Store results in database
         for record in records_to_store:
@@ -466,6 +434,39 @@ async def calculate_interest_rate_scenarios(
 
 # Helper functions
 
+def _interest_rate_betas(position_returns: np.ndarray, rate_changes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    OLS slope and R² of every position's returns on rate changes, vectorized
+    
+    Args:
+        position_returns: (n_days, n_positions) daily returns, NaN where missing
+        rate_changes: (n_days,) rate changes
+        
+    Returns:
+        (betas, r_squared), each (n_positions,). Days missing either series are
+        dropped per position; positions with fewer than two usable days or no
+        rate variance get 0.0.
+    """
+    x = rate_changes[:, None]
+    usable = ~np.isnan(position_returns) & ~np.isnan(x)
+    n = usable.sum(axis=0)
+    
+    with np.errstate(divide="ignore", invalid="ignore"):
+        x_mean = np.where(usable, x, 0.0).sum(axis=0) / n
+        y_mean = np.where(usable, position_returns, 0.0).sum(axis=0) / n
+        dx = np.where(usable, x - x_mean, 0.0)
+        dy = np.where(usable, position_returns - y_mean, 0.0)
+        sxx = (dx * dx).sum(axis=0)
+        syy = (dy * dy).sum(axis=0)
+        sxy = (dx * dy).sum(axis=0)
+        
+        valid = (n > 1) & (sxx > 0)
+        betas = np.where(valid, sxy / sxx, 0.0)
+        r_squared = np.where(valid & (syy > 0), sxy * sxy / (sxx * syy), 0.0)
+    
+    return betas, r_squared
+
+
 def _is_options_position(position: Position) -> bool:
     """Check if position is an options position"""
     from app.models.positions import PositionType
@@ -8,17 +8,22 @@ Key Design Decisions:
 - Use pre-calculated values (no recalculation)
 - Return Decimal types (convert to float at API layer)
 - Handle edge cases gracefully (empty portfolios, missing data)
-- Use pandas for performance with large portfolios
-- Cache results with 60-second TTL
+- Aggregate in float64 NumPy columns; quantize to Decimal only at the output
+- Cache results with 60-second TTL for callers that pass an AggregationKey
 """
 
+import copy
+import math
+from dataclasses import dataclass
 from decimal import Decimal
-from typing import Dict, List, Any, Optional, Union
-import pandas as pd
+from typing import Callable, Dict, List, Any, Optional, Union
+import numpy as np
 from functools import lru_cache, wraps
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 import logging
-from app.core.datetime_utils import utc_now
+from app.core.data_version import get_data_version
+from app.core.datetime_utils import utc_now, to_utc_iso8601
+from app.core.ttl_cache import TTLCache
 
 from app.constants.portfolio import (
     OPTIONS_POSITION_TYPES,
@@ -26,6 +31,7 @@ from app.constants.portfolio import (
     TAG_MODE_ANY,
     TAG_MODE_ALL,
     AGGREGATION_CACHE_TTL,
+    AGGREGATION_CACHE_MAXSIZE,
     MONETARY_DECIMAL_PLACES,
     GREEKS_DECIMAL_PLACES
 )
@@ -33,6 +39,72 @@ from app.constants.portfolio import (
 # Configure logging
 logger = logging.getLogger(__name__)
 
+GREEK_NAMES = ("delta", "gamma", "theta", "vega", "rho")
+
+# Extra decimal places kept when rounding float aggregates, to absorb summation
+# noise before the final quantize (inputs carry at most 4-6 decimal places)
+FLOAT_GUARD_DIGITS = 4
+
+
+def _as_float(value: Any, invalid: Optional[List[Any]] = None) -> float:
+    """Convert Decimal/str/int/None to float; missing values are 0.
+
+    Invalid or NaN values also become 0 so one bad row cannot poison a whole
+    aggregate, but they are never dropped silently: they are appended to
+    ``invalid`` for the caller to report, or logged here.
+    """
+    if value is None:
+        return 0.0
+    try:
+        result = float(value)
+    except (TypeError, ValueError):
+        result = math.nan
+    if math.isnan(result):
+        if invalid is not None:
+            invalid.append(value)
+        else:
+            logger.warning(f"Invalid numeric value {value!r} treated as 0")
+        return 0.0
+    return result
+
+
+def _float_column(values, name: str = "value") -> np.ndarray:
+    """Build a float64 column from an iterable of raw position values."""
+    invalid: List[Any] = []
+    column = np.fromiter((_as_float(v, invalid) for v in values), dtype=np.float64)
+    if invalid:
+        logger.warning(
+            f"{len(invalid)} invalid {name} value(s) treated as 0 (first: {invalid[0]!r})"
+        )
+    return column
+
+
+def _to_decimal(value: float, decimal_places: int) -> Decimal:
+    """Quantize a float aggregate to Decimal at the output boundary.
+
+    The aggregate is first rounded to a few guard digits so that binary
+    summation noise (e.g. 0.7549999998) cannot flip a half-cent rounding
+    decision, then converted through repr() and quantized exactly as the
+    equivalent Decimal sum would be. Adding 0.0 folds -0.0 into 0.0.
+    """
+    rounded = round(float(value), decimal_places + FLOAT_GUARD_DIGITS) + 0.0
+    return Decimal(repr(rounded)).quantize(Decimal(1).scaleb(-decimal_places))
+
+
+def _position_type_code(position: Dict) -> Any:
+    """Position type as its string code (handles Enum values like PositionType.LC)."""
+    position_type = position.get("position_type")
+    return getattr(position_type, "value", position_type)
+
+
+def _greeks_matrix(greeks_list: List[Optional[Dict]]) -> np.ndarray:
+    """(n_positions, 5) float64 matrix of Greeks; missing values are 0."""
+    matrix = np.zeros((len(greeks_list), len(GREEK_NAMES)), dtype=np.float64)
+    for row, greeks in enumerate(greeks_list):
+        if greeks:
+            matrix[row] = [_as_float(greeks.get(name)) for name in GREEK_NAMES]
+    return matrix
+
 
 def timed_lru_cache(seconds: int = AGGREGATION_CACHE_TTL, maxsize: int = 128):
     """LRU cache decorator with time-based expiration.
@@ -66,6 +138,78 @@ def timed_lru_cache(seconds: int = AGGREGATION_CACHE_TTL, maxsize: int = 128):
     return wrapper_cache
 
 
+@dataclass(frozen=True)
+class AggregationKey:
+    """Identity of a position set for the aggregation cache.
+
+    ``source`` names how the caller built the position dicts (e.g.
+    "position_frame", "snapshot", "report"), since different builders derive
+    exposures differently. Together with the portfolio's data version (see
+    app.core.data_version), which advances whenever position values or prices
+    are written, it identifies the position set without hashing its contents.
+    """
+    source: str
+    portfolio_id: str
+    as_of: Optional[date] = None
+
+    @classmethod
+    def for_portfolio(cls, source: str, portfolio_id: Any, as_of: Optional[date] = None) -> "AggregationKey":
+        return cls(source=source, portfolio_id=str(portfolio_id), as_of=as_of)
+
+
+def _hashable(value: Any) -> Any:
+    """Hashable, order-stable form of an extra aggregation argument."""
+    if isinstance(value, dict):
+        return tuple(sorted((str(k), _hashable(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple, set, frozenset)):
+        items = [_hashable(v) for v in value]
+        return tuple(sorted(items, key=repr)) if isinstance(value, (set, frozenset)) else tuple(items)
+    return getattr(value, "value", value)
+
+
+# Entries made stale by a data version bump are never looked up again and age
+# out through the TTL/LRU eviction
+_aggregation_cache = TTLCache(AGGREGATION_CACHE_TTL, AGGREGATION_CACHE_MAXSIZE)
+
+
+def cached_aggregation(func: Callable) -> Callable:
+    """Cache an aggregation function for callers that identify their position set.
+
+    Callers opt in with ``cache_key=AggregationKey(...)``; the cache key adds
+    the function name, the portfolio's current data version, the number of
+    positions and the remaining arguments. Calls without a cache_key are
+    computed directly - no per-call hashing of the positions. Cached results
+    are deep-copied on the way out so callers can mutate what they receive.
+    """
+    @wraps(func)
+    def wrapper(positions, *args, cache_key: Optional[AggregationKey] = None, **kwargs):
+        if cache_key is None:
+            return func(positions, *args, **kwargs)
+        key = (
+            func.__name__,
+            cache_key,
+            get_data_version(cache_key.portfolio_id),
+            len(positions),
+            _hashable(args),
+            _hashable(kwargs),
+        )
+        found, value = _aggregation_cache.get(key)
+        if not found:
+            value = func(positions, *args, **kwargs)
+            _aggregation_cache.set(key, value)
+        return copy.deepcopy(value)
+
+    wrapper.cache_info = _aggregation_cache.info
+    wrapper.cache_clear = _aggregation_cache.clear
+    return wrapper
+
+
+def get_aggregation_cache_stats() -> Dict[str, Any]:
+    """Hit/miss/eviction counters and current size of the aggregation cache."""
+    return _aggregation_cache.info()
+
+
+@cached_aggregation
 def calculate_portfolio_exposures(positions: List[Dict]) -> Dict[str, Any]:
     """Calculate portfolio exposure metrics from pre-calculated position values.
     
@@ -134,59 +278,31 @@ def calculate_portfolio_exposures(positions: List[Dict]) -> Dict[str, Any]:
         )
         positions = positions.get("positions", [])
     
-    # Convert to DataFrame for efficient calculations
-    df = pd.DataFrame(positions)
-    logger.debug(f"Exposure DF constructed with columns={list(df.columns)} and rows={len(df)}")
-    
-    # Normalize position_type to string code (handles Enum values like PositionType.LC)
-    if 'position_type' in df.columns:
-        df['position_type'] = df['position_type'].apply(lambda x: getattr(x, 'value', x))
-    
-    # Ensure numeric types and handle missing columns
-    df['exposure'] = df['exposure'].apply(lambda x: Decimal(str(x)) if x is not None else Decimal("0"))
-    
-    # Handle missing market_value column
-    if 'market_value' not in df.columns:
-        df['market_value'] = df['exposure'].apply(abs)
+    # Columnar float64 view of the positions
+    exposure = _float_column((p.get("exposure") for p in positions), "exposure")
+    if any("market_value" in p for p in positions):
+        market_value = _float_column((p.get("market_value") for p in positions), "market_value")
     else:
-        df['market_value'] = df['market_value'].apply(lambda x: Decimal(str(x)) if x is not None else Decimal("0"))
-    
-    # Calculate exposures
-    gross_exposure = df['exposure'].apply(abs).sum()
-    net_exposure = df['exposure'].sum()
-    
-    # Long/short exposures
-    long_mask = df['exposure'] > 0
-    short_mask = df['exposure'] < 0
+        market_value = np.abs(exposure)
+    position_types = [_position_type_code(p) for p in positions]
+    options_mask = np.fromiter((t in OPTIONS_POSITION_TYPES for t in position_types), dtype=bool)
+    stocks_mask = np.fromiter((t in STOCK_POSITION_TYPES for t in position_types), dtype=bool)
     
-    long_exposure = df.loc[long_mask, 'exposure'].sum() if long_mask.any() else Decimal("0")
-    short_exposure = df.loc[short_mask, 'exposure'].sum() if short_mask.any() else Decimal("0")
-    
-    # Position counts
-    long_count = int(long_mask.sum())
-    short_count = int(short_mask.sum())
-    
-    # Options vs stocks exposure
-    options_mask = df['position_type'].isin(OPTIONS_POSITION_TYPES)
-    stocks_mask = df['position_type'].isin(STOCK_POSITION_TYPES)
-    
-    options_exposure = df.loc[options_mask, 'exposure'].apply(abs).sum() if options_mask.any() else Decimal("0")
-    stock_exposure = df.loc[stocks_mask, 'exposure'].apply(abs).sum() if stocks_mask.any() else Decimal("0")
-    
-    # Notional exposure (sum of absolute market values)
-    notional = df['market_value'].apply(abs).sum()
+    abs_exposure = np.abs(exposure)
+    long_mask = exposure > 0
+    short_mask = exposure < 0
     
     # Build response with proper decimal precision
     result = {
-        "gross_exposure": gross_exposure.quantize(Decimal(f"0.{'0' * MONETARY_DECIMAL_PLACES}")),
-        "net_exposure": net_exposure.quantize(Decimal(f"0.{'0' * MONETARY_DECIMAL_PLACES}")),
-        "long_exposure": long_exposure.quantize(Decimal(f"0.{'0' * MONETARY_DECIMAL_PLACES}")),
-        "short_exposure": short_exposure.quantize(Decimal(f"0.{'0' * MONETARY_DECIMAL_PLACES}")),
-        "long_count": long_count,
-        "short_count": short_count,
-        "options_exposure": options_exposure.quantize(Decimal(f"0.{'0' * MONETARY_DECIMAL_PLACES}")),
-        "stock_exposure": stock_exposure.quantize(Decimal(f"0.{'0' * MONETARY_DECIMAL_PLACES}")),
-        "notional": notional.quantize(Decimal(f"0.{'0' * MONETARY_DECIMAL_PLACES}")),
+        "gross_exposure": _to_decimal(abs_exposure.sum(), MONETARY_DECIMAL_PLACES),
+        "net_exposure": _to_decimal(exposure.sum(), MONETARY_DECIMAL_PLACES),
+        "long_exposure": _to_decimal(exposure[long_mask].sum(), MONETARY_DECIMAL_PLACES),
+        "short_exposure": _to_decimal(exposure[short_mask].sum(), MONETARY_DECIMAL_PLACES),
+        "long_count": int(long_mask.sum()),
+        "short_count": int(short_mask.sum()),
+        "options_exposure": _to_decimal(abs_exposure[options_mask].sum(), MONETARY_DECIMAL_PLACES),
+        "stock_exposure": _to_decimal(abs_exposure[stocks_mask].sum(), MONETARY_DECIMAL_PLACES),
+        "notional": _to_decimal(np.abs(market_value).sum(), MONETARY_DECIMAL_PLACES),
         "metadata": {
             "calculated_at": to_utc_iso8601(utc_now()),
             "position_count": len(positions),
@@ -198,6 +314,7 @@ def calculate_portfolio_exposures(positions: List[Dict]) -> Dict[str, Any]:
     return result
 
 
+@cached_aggregation
 def aggregate_portfolio_greeks(positions: List[Dict]) -> Dict[str, Decimal]:
     """Aggregate portfolio-level Greeks from individual positions.
     
@@ -232,40 +349,18 @@ def aggregate_portfolio_greeks(positions: List[Dict]) -> Dict[str, Decimal]:
         )
         positions = positions.get("positions", [])
 
-    # Initialize totals
+    greeks_list = [position.get("greeks") for position in positions]
+    has_greeks = np.fromiter((g is not None for g in greeks_list), dtype=bool, count=len(greeks_list))
+    positions_with_greeks = int(has_greeks.sum())
+    positions_without_greeks = len(greeks_list) - positions_with_greeks
+    
+    # Sum Greeks column-wise across positions that have them
+    totals = _greeks_matrix(greeks_list).sum(axis=0)
     total_greeks = {
-        "delta": Decimal("0"),
-        "gamma": Decimal("0"),
-        "theta": Decimal("0"),
-        "vega": Decimal("0"),
-        "rho": Decimal("0")
+        greek_name: _to_decimal(totals[i], GREEKS_DECIMAL_PLACES)
+        for i, greek_name in enumerate(GREEK_NAMES)
     }
     
-    positions_with_greeks = 0
-    positions_without_greeks = 0
-    
-    # Sum Greeks from positions that have them
-    for position in positions:
-        greeks = position.get("greeks")
-        
-        if greeks is None:
-            positions_without_greeks += 1
-            continue
-            
-        positions_with_greeks += 1
-        
-        # Add each Greek value
-        for greek_name in total_greeks:
-            if greek_name in greeks and greeks[greek_name] is not None:
-                value = Decimal(str(greeks[greek_name]))
-                total_greeks[greek_name] += value
-    
-    # Apply precision
-    for greek_name in total_greeks:
-        total_greeks[greek_name] = total_greeks[greek_name].quantize(
-            Decimal(f"0.{'0' * GREEKS_DECIMAL_PLACES}")
-        )
-    
     # Add metadata
     total_greeks["metadata"] = {
         "calculated_at": to_utc_iso8601(utc_now()),
@@ -285,6 +380,7 @@ def aggregate_portfolio_greeks(positions: List[Dict]) -> Dict[str, Decimal]:
     return total_greeks
 
 
+@cached_aggregation
 def calculate_delta_adjusted_exposure(positions: List[Dict]) -> Dict[str, Decimal]:
     """Calculate delta-adjusted exposure for the portfolio.
     
@@ -323,36 +419,29 @@ def calculate_delta_adjusted_exposure(positions: List[Dict]) -> Dict[str, Decima
             }
         }
     
-    raw_exposure = Decimal("0")
-    delta_adjusted = Decimal("0")
-    positions_included = 0
-    positions_excluded = 0
+    exposure = _float_column((p.get("exposure") for p in positions), "exposure")
     
-    for position in positions:
-        exposure = Decimal(str(position.get("exposure", 0)))
-        raw_exposure += abs(exposure)
-        
-        # Get delta
+    # Options with Greeks use their delta; stocks use an implicit delta of 1.0
+    # (exposure is already signed); anything else has no delta and is excluded
+    delta = np.zeros(len(positions), dtype=np.float64)
+    included = np.zeros(len(positions), dtype=bool)
+    for i, position in enumerate(positions):
         greeks = position.get("greeks")
         if greeks and "delta" in greeks and greeks["delta"] is not None:
-            # Options with Greeks
-            delta = Decimal(str(greeks["delta"]))
-            delta_adjusted += exposure * delta
-            positions_included += 1
+            delta[i] = _as_float(greeks["delta"])
+            included[i] = True
         elif position.get("position_type") in STOCK_POSITION_TYPES:
-            # Stocks: use 1.0 or -1.0 based on position direction
-            if position["position_type"] == "LONG":
-                delta_adjusted += exposure  # exposure is already positive
-            else:  # SHORT
-                delta_adjusted += exposure  # exposure is already negative
-            positions_included += 1
-        else:
-            # Skip positions without delta info
-            positions_excluded += 1
+            delta[i] = 1.0
+            included[i] = True
+    
+    raw_exposure = np.abs(exposure).sum()
+    delta_adjusted = (exposure * delta).sum()
+    positions_included = int(included.sum())
+    positions_excluded = len(positions) - positions_included
     
     result = {
-        "raw_exposure": raw_exposure.quantize(Decimal(f"0.{'0' * MONETARY_DECIMAL_PLACES}")),
-        "delta_adjusted_exposure": delta_adjusted.quantize(Decimal(f"0.{'0' * MONETARY_DECIMAL_PLACES}")),
+        "raw_exposure": _to_decimal(raw_exposure, MONETARY_DECIMAL_PLACES),
+        "delta_adjusted_exposure": _to_decimal(delta_adjusted, MONETARY_DECIMAL_PLACES),
         "metadata": {
             "calculated_at": to_utc_iso8601(utc_now()),
             "positions_included": positions_included,
@@ -371,6 +460,7 @@ def calculate_delta_adjusted_exposure(positions: List[Dict]) -> Dict[str, Decima
     return result
 
 
+@cached_aggregation
 def aggregate_by_tags(
     positions: List[Dict],
     tag_filter: Optional[Union[str, List[str]]] = None,
@@ -412,10 +502,12 @@ def aggregate_by_tags(
     else:
         tag_filter_set = None
     
-    # Build tag aggregations
-    tag_aggregations = {}
+    # Build (position, tag) membership pairs; tags are ragged so this is one Python pass
+    tag_codes: Dict[str, int] = {}
+    member_positions: List[int] = []
+    member_tags: List[int] = []
     
-    for position in positions:
+    for index, position in enumerate(positions):
         position_tags = set(position.get("tags", []))
         
         # Skip if position has no tags
@@ -439,48 +531,38 @@ def aggregate_by_tags(
             # Only aggregate the filtered tags
             tags_to_aggregate = position_tags.intersection(tag_filter_set)
         
-        # Add position to each tag's aggregation
-        exposure = Decimal(str(position.get("exposure", 0)))
-        
         for tag in tags_to_aggregate:
-            if tag not in tag_aggregations:
-                tag_aggregations[tag] = {
-                    "positions": [],
-                    "gross_exposure": Decimal("0"),
-                    "net_exposure": Decimal("0"),
-                    "long_exposure": Decimal("0"),
-                    "short_exposure": Decimal("0"),
-                    "position_count": 0,
-                    "long_count": 0,
-                    "short_count": 0
-                }
-            
-            agg = tag_aggregations[tag]
-            agg["positions"].append(position)
-            agg["gross_exposure"] += abs(exposure)
-            agg["net_exposure"] += exposure
-            agg["position_count"] += 1
-            
-            if exposure > 0:
-                agg["long_exposure"] += exposure
-                agg["long_count"] += 1
-            elif exposure < 0:
-                agg["short_exposure"] += exposure
-                agg["short_count"] += 1
-    
-    # Format results and remove position lists
+            member_positions.append(index)
+            member_tags.append(tag_codes.setdefault(tag, len(tag_codes)))
+    
+    # Group sums over the membership pairs
+    n_tags = len(tag_codes)
+    exposure = _float_column((p.get("exposure") for p in positions), "exposure")
+    member_exposure = exposure[np.asarray(member_positions, dtype=np.int64)]
+    codes = np.asarray(member_tags, dtype=np.int64)
+    long_member = member_exposure > 0
+    short_member = member_exposure < 0
+    
+    gross = np.bincount(codes, weights=np.abs(member_exposure), minlength=n_tags)
+    net = np.bincount(codes, weights=member_exposure, minlength=n_tags)
+    long_exposure = np.bincount(codes, weights=np.where(long_member, member_exposure, 0.0), minlength=n_tags)
+    short_exposure = np.bincount(codes, weights=np.where(short_member, member_exposure, 0.0), minlength=n_tags)
+    position_count = np.bincount(codes, minlength=n_tags)
+    long_count = np.bincount(codes, weights=long_member, minlength=n_tags)
+    short_count = np.bincount(codes, weights=short_member, minlength=n_tags)
+    
+    # Format results with decimal precision
     result = {}
-    for tag, agg in tag_aggregations.items():
-        # Remove the temporary positions list
-        agg.pop("positions", None)
-        
-        # Apply decimal precision
-        agg["gross_exposure"] = agg["gross_exposure"].quantize(Decimal(f"0.{'0' * MONETARY_DECIMAL_PLACES}"))
-        agg["net_exposure"] = agg["net_exposure"].quantize(Decimal(f"0.{'0' * MONETARY_DECIMAL_PLACES}"))
-        agg["long_exposure"] = agg["long_exposure"].quantize(Decimal(f"0.{'0' * MONETARY_DECIMAL_PLACES}"))
-        agg["short_exposure"] = agg["short_exposure"].quantize(Decimal(f"0.{'0' * MONETARY_DECIMAL_PLACES}"))
-        
-        result[tag] = agg
+    for tag, code in tag_codes.items():
+        result[tag] = {
+            "gross_exposure": _to_decimal(gross[code], MONETARY_DECIMAL_PLACES),
+            "net_exposure": _to_decimal(net[code], MONETARY_DECIMAL_PLACES),
+            "long_exposure": _to_decimal(long_exposure[code], MONETARY_DECIMAL_PLACES),
+            "short_exposure": _to_decimal(short_exposure[code], MONETARY_DECIMAL_PLACES),
+            "position_count": int(position_count[code]),
+            "long_count": int(long_count[code]),
+            "short_count": int(short_count[code])
+        }
     
     # Add metadata
     metadata = {
@@ -488,21 +570,22 @@ def aggregate_by_tags(
         "tag_filter": tag_filter,
         "tag_mode": tag_mode,
         "total_positions": len(positions),
-        "tags_found": len(tag_aggregations),
+        "tags_found": n_tags,
         "warnings": []
     }
     
-    if not tag_aggregations:
+    if not tag_codes:
         metadata["warnings"].append("No positions matched the tag filter criteria")
     
     result["metadata"] = metadata
     
-    logger.info(f"Aggregated by tags: {len(tag_aggregations)} tags, "
+    logger.info(f"Aggregated by tags: {n_tags} tags, "
                 f"filter={tag_filter}, mode={tag_mode}")
     
     return result
 
 
+@cached_aggregation
 def aggregate_by_underlying(positions: List[Dict]) -> Dict[str, Dict]:
     """Aggregate positions by underlying symbol.
     
@@ -535,102 +618,78 @@ def aggregate_by_underlying(positions: List[Dict]) -> Dict[str, Dict]:
             }
         }
     """
-    underlying_aggregations = {}
+    # Resolve each position's underlying in one pass, then aggregate by group code
+    underlying_codes: Dict[str, int] = {}
+    kept: List[int] = []
+    codes_list: List[int] = []
     
-    for position in positions:
+    for index, position in enumerate(positions):
         # Determine underlying symbol
         position_type = position.get("position_type", "")
         if position_type in OPTIONS_POSITION_TYPES:
             underlying = position.get("underlying_symbol")
-        elif position_type in STOCK_POSITION_TYPES:
-            underlying = position.get("symbol")
         else:
-            # Unknown position type, try to get symbol anyway
+            # Stocks (and unknown position types) aggregate under their own symbol
             underlying = position.get("symbol")
         
-        
         if not underlying:
             logger.warning(f"Position missing underlying symbol: {position}")
             continue
         
-        # Initialize aggregation for this underlying
-        if underlying not in underlying_aggregations:
-            underlying_aggregations[underlying] = {
-                "gross_exposure": Decimal("0"),
-                "net_exposure": Decimal("0"),
-                "long_exposure": Decimal("0"),
-                "short_exposure": Decimal("0"),
-                "position_count": 0,
-                "stock_count": 0,
-                "option_count": 0,
-                "call_count": 0,
-                "put_count": 0,
-                "greeks": {
-                    "delta": Decimal("0"),
-                    "gamma": Decimal("0"),
-                    "theta": Decimal("0"),
-                    "vega": Decimal("0"),
-                    "rho": Decimal("0")
-                }
-            }
-        
-        agg = underlying_aggregations[underlying]
-        exposure = Decimal(str(position.get("exposure", 0)))
-        
-        # Update exposures
-        agg["gross_exposure"] += abs(exposure)
-        agg["net_exposure"] += exposure
-        agg["position_count"] += 1
-        
-        if exposure > 0:
-            agg["long_exposure"] += exposure
-        else:
-            agg["short_exposure"] += exposure
-        
-        # Count position types
-        position_type = position.get("position_type", "")
-        if position_type in STOCK_POSITION_TYPES:
-            agg["stock_count"] += 1
-        elif position_type in OPTIONS_POSITION_TYPES:
-            agg["option_count"] += 1
-            if position_type in ["LC", "SC"]:
-                agg["call_count"] += 1
-            else:
-                agg["put_count"] += 1
-        
-        # Aggregate Greeks if available
-        greeks = position.get("greeks")
-        if greeks:
-            for greek_name in agg["greeks"]:
-                if greek_name in greeks and greeks[greek_name] is not None:
-                    agg["greeks"][greek_name] += Decimal(str(greeks[greek_name]))
-    
-    # Format results
+        kept.append(index)
+        codes_list.append(underlying_codes.setdefault(underlying, len(underlying_codes)))
+    
+    n_groups = len(underlying_codes)
+    kept_positions = [positions[i] for i in kept]
+    codes = np.asarray(codes_list, dtype=np.int64)
+    exposure = _float_column((p.get("exposure") for p in kept_positions), "exposure")
+    position_types = [p.get("position_type", "") for p in kept_positions]
+    is_stock = np.fromiter((t in STOCK_POSITION_TYPES for t in position_types), dtype=bool, count=len(kept))
+    is_option = np.fromiter((t in OPTIONS_POSITION_TYPES for t in position_types), dtype=bool, count=len(kept))
+    is_call = is_option & np.fromiter((t in ("LC", "SC") for t in position_types), dtype=bool, count=len(kept))
+    is_long = exposure > 0
+    
+    gross = np.bincount(codes, weights=np.abs(exposure), minlength=n_groups)
+    net = np.bincount(codes, weights=exposure, minlength=n_groups)
+    long_exposure = np.bincount(codes, weights=np.where(is_long, exposure, 0.0), minlength=n_groups)
+    short_exposure = np.bincount(codes, weights=np.where(is_long, 0.0, exposure), minlength=n_groups)
+    position_count = np.bincount(codes, minlength=n_groups)
+    stock_count = np.bincount(codes, weights=is_stock, minlength=n_groups)
+    option_count = np.bincount(codes, weights=is_option, minlength=n_groups)
+    call_count = np.bincount(codes, weights=is_call, minlength=n_groups)
+    
+    greeks_matrix = _greeks_matrix([p.get("greeks") for p in kept_positions])
+    greeks_totals = np.zeros((n_groups, len(GREEK_NAMES)), dtype=np.float64)
+    np.add.at(greeks_totals, codes, greeks_matrix)
+    
+    # Format results with decimal precision
     result = {}
-    for underlying, agg in underlying_aggregations.items():
-        # Apply decimal precision
-        agg["gross_exposure"] = agg["gross_exposure"].quantize(Decimal(f"0.{'0' * MONETARY_DECIMAL_PLACES}"))
-        agg["net_exposure"] = agg["net_exposure"].quantize(Decimal(f"0.{'0' * MONETARY_DECIMAL_PLACES}"))
-        agg["long_exposure"] = agg["long_exposure"].quantize(Decimal(f"0.{'0' * MONETARY_DECIMAL_PLACES}"))
-        agg["short_exposure"] = agg["short_exposure"].quantize(Decimal(f"0.{'0' * MONETARY_DECIMAL_PLACES}"))
-        
-        # Format Greeks
-        for greek_name in agg["greeks"]:
-            agg["greeks"][greek_name] = agg["greeks"][greek_name].quantize(
-                Decimal(f"0.{'0' * GREEKS_DECIMAL_PLACES}")
-            )
-        
-        result[underlying] = agg
+    for underlying, code in underlying_codes.items():
+        result[underlying] = {
+            "gross_exposure": _to_decimal(gross[code], MONETARY_DECIMAL_PLACES),
+            "net_exposure": _to_decimal(net[code], MONETARY_DECIMAL_PLACES),
+            "long_exposure": _to_decimal(long_exposure[code], MONETARY_DECIMAL_PLACES),
+            "short_exposure": _to_decimal(short_exposure[code], MONETARY_DECIMAL_PLACES),
+            "position_count": int(position_count[code]),
+            "stock_count": int(stock_count[code]),
+            "option_count": int(option_count[code]),
+            "call_count": int(call_count[code]),
+            "put_count": int(option_count[code] - call_count[code]),
+            "greeks": {
+                greek_name: _to_decimal(greeks_totals[code, i], GREEKS_DECIMAL_PLACES)
+                for i, greek_name in enumerate(GREEK_NAMES)
+            }
+        }
     
     # Add metadata
     result["metadata"] = {
         "calculated_at": to_utc_iso8601(utc_now()),
         "total_positions": len(positions),
-        "underlyings_found": len(underlying_aggregations),
+        "underlyings_found": n_groups,
         "warnings": []
     }
     
-    logger.info(f"Aggregated by underlying: {len(underlying_aggregations)} symbols")
+    logger.info(f"Aggregated by underlying: {n_groups} symbols")
     
     return result
 
@@ -638,26 +697,6 @@ def aggregate_by_underlying(positions: List[Dict]) -> Dict[str, Dict]:
 # Cache clearing utility
 def clear_portfolio_cache():
     """Clear all cached portfolio aggregation results."""
-    # Clear cache for all cached functions
-    if hasattr(calculate_portfolio_exposures, 'cache_clear'):
-        calculate_portfolio_exposures.cache_clear()
-    if hasattr(aggregate_portfolio_greeks, 'cache_clear'):
-        aggregate_portfolio_greeks.cache_clear()
-    if hasattr(calculate_delta_adjusted_exposure, 'cache_clear'):
-        calculate_delta_adjusted_exposure.cache_clear()
-    if hasattr(aggregate_by_tags, 'cache_clear'):
-        aggregate_by_tags.cache_clear()
-    if hasattr(aggregate_by_underlying, 'cache_clear'):
-        aggregate_by_underlying.cache_clear()
+    _aggregation_cache.clear()
     
     logger.info("Cleared all portfolio aggregation caches")
-
-
-# TODO: Future enhancement for historical analysis
-# def aggregate_portfolio_historical(positions: List[Dict], as_of_date: datetime) -> Dict[str, Any]:
-#     """Calculate aggregations for a specific historical date.
-#     
-#     This function would filter positions to those active on the given date
-#     and use historical market data for calculations.
-#     """
-#     pass
\ No newline at end of file
@@ -0,0 +1,243 @@
+"""
+Columnar position representation shared by the calculation engines
+
+A PositionFrame holds the active positions of one portfolio as parallel NumPy
+arrays (struct-of-arrays) instead of a list of ORM objects or per-position
+dicts. Multiplier, sign and exposure are derived once, vectorized, so the
+aggregation, factor, stress and snapshot engines all work from the same
+numbers without touching ORM attributes or converting Decimals per position.
+
+Build it once per portfolio per batch run (``PositionFrame.load``) and pass
+it to the engines; each engine falls back to loading its own frame when none
+is supplied.
+"""
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Any, Dict, List, Optional, Sequence
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.constants.portfolio import (
+    OPTIONS_MULTIPLIER,
+    OPTIONS_POSITION_TYPES,
+    POSITION_TYPE_LONG,
+    POSITION_TYPE_SHORT,
+    POSITION_TYPE_LONG_CALL,
+    POSITION_TYPE_LONG_PUT,
+    POSITION_TYPE_SHORT_CALL,
+    POSITION_TYPE_SHORT_PUT,
+    STOCK_MULTIPLIER,
+)
+from app.models.positions import Position
+
+# Position type codes; index into this tuple is the type code stored in the frame
+POSITION_TYPE_CODES = (
+    POSITION_TYPE_LONG,
+    POSITION_TYPE_SHORT,
+    POSITION_TYPE_LONG_CALL,
+    POSITION_TYPE_LONG_PUT,
+    POSITION_TYPE_SHORT_CALL,
+    POSITION_TYPE_SHORT_PUT,
+)
+_TYPE_CODE_BY_NAME = {name: code for code, name in enumerate(POSITION_TYPE_CODES)}
+_OPTION_CODES = np.array([_TYPE_CODE_BY_NAME[t] for t in sorted(OPTIONS_POSITION_TYPES)], dtype=np.int8)
+_SHORT_CODES = np.array(
+    [_TYPE_CODE_BY_NAME[t] for t in (POSITION_TYPE_SHORT, POSITION_TYPE_SHORT_CALL, POSITION_TYPE_SHORT_PUT)],
+    dtype=np.int8
+)
+
+# Columns read from the positions table (no ORM objects are materialized)
+_POSITION_COLUMNS = (
+    Position.id,
+    Position.symbol,
+    Position.position_type,
+    Position.quantity,
+    Position.last_price,
+    Position.entry_price,
+    Position.market_value,
+)
+
+
+def _nullable_float(value: Any) -> float:
+    return np.nan if value is None else float(value)
+
+
+def _type_name(position_type: Any) -> str:
+    """Position type as its string code; missing types are treated as LONG (as before)."""
+    if position_type is None:
+        return POSITION_TYPE_LONG
+    return getattr(position_type, "value", position_type)
+
+
+@dataclass(frozen=True)
+class PositionFrame:
+    """Active positions of a portfolio as parallel arrays.
+
+    Attributes:
+        portfolio_id: Portfolio the positions belong to (None when built from a list)
+        ids: Position ids as strings
+        symbols: Position symbols
+        type_codes: int8 index into POSITION_TYPE_CODES
+        quantity: Signed quantity
+        last_price: Last price, NaN when unknown
+        entry_price: Entry price
+        market_value: Stored market value, NaN when not yet calculated
+        multiplier: Contract multiplier (100 for options, 1 for stocks)
+    """
+    portfolio_id: Optional[UUID]
+    ids: np.ndarray
+    symbols: np.ndarray
+    type_codes: np.ndarray
+    quantity: np.ndarray
+    last_price: np.ndarray
+    entry_price: np.ndarray
+    market_value: np.ndarray
+    multiplier: np.ndarray
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[Sequence[Any]], portfolio_id: Optional[UUID] = None) -> "PositionFrame":
+        """Build from (id, symbol, position_type, quantity, last_price, entry_price, market_value) rows."""
+        n = len(rows)
+        ids = np.empty(n, dtype=object)
+        symbols = np.empty(n, dtype=object)
+        type_codes = np.empty(n, dtype=np.int8)
+        quantity = np.empty(n, dtype=np.float64)
+        last_price = np.empty(n, dtype=np.float64)
+        entry_price = np.empty(n, dtype=np.float64)
+        market_value = np.empty(n, dtype=np.float64)
+
+        for i, (position_id, symbol, position_type, qty, last, entry, value) in enumerate(rows):
+            ids[i] = str(position_id)
+            symbols[i] = symbol
+            type_codes[i] = _TYPE_CODE_BY_NAME[_type_name(position_type)]
+            quantity[i] = float(qty)
+            last_price[i] = _nullable_float(last)
+            entry_price[i] = _nullable_float(entry)
+            market_value[i] = _nullable_float(value)
+
+        multiplier = np.where(
+            np.isin(type_codes, _OPTION_CODES), float(OPTIONS_MULTIPLIER), float(STOCK_MULTIPLIER)
+        )
+        return cls(
+            portfolio_id=portfolio_id,
+            ids=ids,
+            symbols=symbols,
+            type_codes=type_codes,
+            quantity=quantity,
+            last_price=last_price,
+            entry_price=entry_price,
+            market_value=market_value,
+            multiplier=multiplier,
+        )
+
+    @classmethod
+    def from_positions(cls, positions: Sequence[Position], portfolio_id: Optional[UUID] = None) -> "PositionFrame":
+        """Build from already-loaded Position objects."""
+        return cls.from_rows(
+            [
+                (p.id, p.symbol, p.position_type, p.quantity, p.last_price, p.entry_price, p.market_value)
+                for p in positions
+            ],
+            portfolio_id=portfolio_id,
+        )
+
+    @classmethod
+    async def load(cls, db: AsyncSession, portfolio_id: UUID) -> "PositionFrame":
+        """Load the active (not exited, not deleted) positions of a portfolio."""
+        stmt = select(*_POSITION_COLUMNS).where(
+            Position.portfolio_id == portfolio_id,
+            Position.exit_date.is_(None),
+            Position.deleted_at.is_(None)
+        )
+        result = await db.execute(stmt)
+        return cls.from_rows(result.all(), portfolio_id=portfolio_id)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @cached_property
+    def position_index(self) -> Dict[str, int]:
+        """Row number of each position id."""
+        return {position_id: row for row, position_id in enumerate(self.ids)}
+
+    @cached_property
+    def is_option(self) -> np.ndarray:
+        return np.isin(self.type_codes, _OPTION_CODES)
+
+    @cached_property
+    def is_short(self) -> np.ndarray:
+        """SHORT stock and short options (SC, SP)."""
+        return np.isin(self.type_codes, _SHORT_CODES)
+
+    @cached_property
+    def sign(self) -> np.ndarray:
+        """-1 for short position types, +1 otherwise."""
+        return np.where(self.is_short, -1.0, 1.0)
+
+    @cached_property
+    def price(self) -> np.ndarray:
+        """Last price, falling back to entry price when the last price is missing or zero."""
+        missing = np.isnan(self.last_price) | (self.last_price == 0)
+        return np.where(missing, self.entry_price, self.last_price)
+
+    @cached_property
+    def market_value_or_zero(self) -> np.ndarray:
+        return np.nan_to_num(self.market_value, nan=0.0)
+
+    @cached_property
+    def signed_exposure(self) -> np.ndarray:
+        """Stored market value with the sign implied by the position type."""
+        return self.sign * np.abs(self.market_value_or_zero)
+
+    @cached_property
+    def notional(self) -> np.ndarray:
+        """Absolute notional |quantity x price x multiplier| at last (or entry) price."""
+        return np.abs(self.quantity * np.nan_to_num(self.price) * self.multiplier)
+
+    @cached_property
+    def position_types(self) -> List[str]:
+        return [POSITION_TYPE_CODES[code] for code in self.type_codes]
+
+    def valued_at(self, prices: np.ndarray) -> np.ndarray:
+        """Signed market values (quantity x price x multiplier) at the given prices."""
+        return self.quantity * prices * self.multiplier
+
+    def gross_market_value(self) -> float:
+        """Absolute total market value; positions without a stored value are priced at last price."""
+        has_value = ~np.isnan(self.market_value)
+        has_price = ~has_value & ~np.isnan(self.last_price)
+        computed = self.sign * self.quantity * np.nan_to_num(self.last_price) * self.multiplier
+        total = self.market_value[has_value].sum() + computed[has_price].sum()
+        return abs(float(total))
+
+    def exposure_weights(self) -> Dict[str, float]:
+        """Position weights by absolute notional (|quantity x price x multiplier|), equal if all zero."""
+        if len(self) == 0:
+            return {}
+        total = self.notional.sum()
+        if total == 0:
+            weights = np.full(len(self), 1.0 / len(self))
+        else:
+            weights = self.notional / total
+        return dict(zip(self.ids, weights.tolist()))
+
+    def aggregation_records(self) -> List[Dict[str, Any]]:
+        """Per-position dicts in the shape expected by app.calculations.portfolio."""
+        market_value = self.market_value_or_zero.tolist()
+        last_price = np.nan_to_num(self.last_price).tolist()
+        quantity = self.quantity.tolist()
+        return [
+            {
+                'id': self.ids[i],
+                'symbol': self.symbols[i],
+                'quantity': quantity[i],
+                'market_value': market_value[i],
+                'exposure': market_value[i],  # stored market value is already signed
+                'last_price': last_price[i],
+                'position_type': position_type,
+            }
+            for i, position_type in enumerate(self.position_types)
+        ]
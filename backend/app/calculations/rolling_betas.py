@@ -0,0 +1,270 @@
+"""
+Rolling-window factor beta time series
+
+Produces a beta series per position and factor for each window in
+ROLLING_BETA_WINDOWS (trading days) instead of a single beta for one
+calculation_date. Each window is an online regression: the running sums
+n, Σx, Σy, Σx², Σxy are kept as cumulative sums over the whole range, so the
+window ending on day t is cumsum[t] - cumsum[t - window]. That adds the new
+day's row and removes the expired one without refitting, so a full history
+costs the same as a handful of single-date regressions.
+
+Betas are the same univariate OLS slopes (with intercept, pairwise NaN drop,
+±BETA_CAP_LIMIT cap) as calculate_factor_betas_hybrid in its default mode.
+Results are stored one row per (position, window, date) with all factor
+betas in a JSONB object (PositionRollingFactorBeta), which keeps beta-drift
+chart reads to a single index range scan.
+"""
+from datetime import date, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.calculations.factors import calculate_position_returns, fetch_factor_returns
+from app.constants.factors import (
+    BETA_CAP_LIMIT, FACTOR_ETFS, MIN_REGRESSION_DAYS, ROLLING_BETA_WINDOWS
+)
+from app.core.logging import get_logger
+from app.models.market_data import PositionRollingFactorBeta
+from app.utils.trading_calendar import trading_calendar
+
+logger = get_logger(__name__)
+
+# A rolling beta row binds 5 parameters; stay well below the 32767 limit
+ROLLING_BETA_UPSERT_CHUNK_SIZE = 5000
+# Positions regressed together; bounds the (days x positions x factors) work arrays
+ROLLING_BETA_POSITION_CHUNK_SIZE = 64
+BETA_DECIMAL_PLACES = 6  # Same precision as PositionFactorExposure.exposure_value
+
+
+def _window_sums(values: np.ndarray, window: int) -> np.ndarray:
+    """Sum over the trailing `window` rows ending at each row (axis 0)."""
+    cumulative = np.cumsum(values, axis=0)
+    sums = cumulative.copy()
+    sums[window:] -= cumulative[:-window]
+    return sums
+
+
+def rolling_factor_betas(
+    position_returns: np.ndarray,
+    factor_returns: np.ndarray,
+    window: int,
+    min_observations: Optional[int] = None,
+    output_start: int = 0
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Rolling univariate OLS slope of every position on every factor
+
+    Args:
+        position_returns: (n_days, n_positions) daily returns, NaN where missing
+        factor_returns: (n_days, n_factors) daily returns, NaN where missing
+        window: Window length in rows (trading days)
+        min_observations: Usable days required for a beta
+            (default: min(window, MIN_REGRESSION_DAYS))
+        output_start: First row to return betas for; earlier rows only feed the
+            windows (e.g. the look-back loaded before a daily update)
+
+    Returns:
+        (betas, observations), each (n_days - output_start, n_positions, n_factors). betas is NaN
+        where the window has fewer than min_observations usable days or the
+        factor has no variance; betas are capped at ±BETA_CAP_LIMIT.
+    """
+    if min_observations is None:
+        min_observations = min(window, MIN_REGRESSION_DAYS)
+
+    y = position_returns[:, :, None]
+    x = factor_returns[:, None, :]
+    usable = ~np.isnan(y) & ~np.isnan(x)
+    y = np.where(usable, y, 0.0)
+    x = np.where(usable, x, 0.0)
+
+    rows = slice(output_start, None)
+    n = _window_sums(usable.astype(np.float64), window)[rows]
+    sum_x = _window_sums(x, window)[rows]
+    sum_y = _window_sums(y, window)[rows]
+    sum_xx = _window_sums(x * x, window)[rows]
+    sum_xy = _window_sums(x * y, window)[rows]
+
+    covariance = n * sum_xy - sum_x * sum_y
+    variance = n * sum_xx - sum_x * sum_x
+    # Cumulative-sum differences leave rounding noise where the true variance is zero
+    degenerate = variance <= 1e-12 * np.maximum(n * sum_xx, np.finfo(np.float64).tiny)
+    valid = (n >= min_observations) & ~degenerate
+    with np.errstate(divide="ignore", invalid="ignore"):
+        betas = np.where(valid, covariance / variance, np.nan)
+
+    return np.clip(betas, -BETA_CAP_LIMIT, BETA_CAP_LIMIT), n.astype(np.int64)
+
+
+def _beta_rows(
+    position_ids: Sequence[str],
+    factor_names: Sequence[str],
+    dates: Sequence[date],
+    window: int,
+    betas: np.ndarray,
+    observations: np.ndarray
+) -> List[Dict[str, Any]]:
+    """Rows for PositionRollingFactorBeta; (date, position) pairs without any beta are skipped."""
+    rows = []
+    rounded = np.round(betas, BETA_DECIMAL_PLACES)
+    has_beta = ~np.isnan(betas).all(axis=2)
+    for day, position in zip(*np.nonzero(has_beta)):
+        values = rounded[day, position]
+        rows.append({
+            "position_id": UUID(position_ids[position]),
+            "window_days": window,
+            "calculation_date": dates[day],
+            "betas": {
+                factor: float(value)
+                for factor, value in zip(factor_names, values.tolist())
+                if not np.isnan(value)
+            },
+            "observations": int(observations[day, position].min()),
+        })
+    return rows
+
+
+async def store_rolling_factor_betas(db: AsyncSession, rows: List[Dict[str, Any]]) -> int:
+    """Insert or update rolling beta rows with multi-row INSERT ... ON CONFLICT DO UPDATE."""
+    for start in range(0, len(rows), ROLLING_BETA_UPSERT_CHUNK_SIZE):
+        stmt = pg_insert(PositionRollingFactorBeta).values(rows[start:start + ROLLING_BETA_UPSERT_CHUNK_SIZE])
+        stmt = stmt.on_conflict_do_update(
+            constraint="uq_position_rolling_beta_window_date",
+            set_={"betas": stmt.excluded.betas, "observations": stmt.excluded.observations}
+        )
+        await db.execute(stmt)
+    return len(rows)
+
+
+async def calculate_rolling_factor_betas(
+    db: AsyncSession,
+    portfolio_id: UUID,
+    start_date: date,
+    end_date: date,
+    windows: Iterable[int] = ROLLING_BETA_WINDOWS,
+    persist: bool = True
+) -> Dict[str, Any]:
+    """
+    Rolling factor beta series for every active position of a portfolio
+
+    Returns for the longest window before start_date are loaded once and
+    shared by all windows. Positions are regressed in chunks of
+    ROLLING_BETA_POSITION_CHUNK_SIZE, so memory stays bounded for large
+    portfolios and long backfills. For a daily update (the batch's
+    rolling_factor_betas job) pass start_date == end_date; for a history
+    backfill pass the whole range.
+
+    Args:
+        db: Database session
+        portfolio_id: Portfolio ID to analyze
+        start_date: First date to produce betas for
+        end_date: Last date to produce betas for
+        windows: Window lengths in trading days
+        persist: Store the series in position_rolling_factor_betas (and commit)
+
+    Returns:
+        Dictionary containing:
+        - betas: {window: {position_id: DataFrame (dates x factors)}}
+        - dates: Trading days covered
+        - records_stored: Rows written (0 when persist is False)
+    """
+    windows = sorted(set(windows))
+    logger.info(
+        f"Calculating rolling factor betas for portfolio {portfolio_id} "
+        f"from {start_date} to {end_date}, windows {windows}"
+    )
+
+    # One extra trading day: the first return needs the prior close
+    fetch_start = trading_calendar.offset_trading_day(start_date, -(windows[-1] + 1))
+    if fetch_start is None:
+        fetch_start = start_date - timedelta(days=int(windows[-1] * 1.5) + 10)
+
+    factor_returns = await fetch_factor_returns(db, list(FACTOR_ETFS.values()), fetch_start, end_date)
+    position_returns = await calculate_position_returns(db, portfolio_id, fetch_start, end_date)
+    if factor_returns.empty or position_returns.empty:
+        logger.warning(f"No return data for rolling betas of portfolio {portfolio_id}")
+        return {"betas": {}, "dates": [], "records_stored": 0}
+
+    common_dates = factor_returns.index.intersection(position_returns.index)
+    factor_returns = factor_returns.loc[common_dates]
+    position_returns = position_returns.loc[common_dates]
+
+    dates = [timestamp.date() for timestamp in common_dates]
+    # Dates are sorted, so the requested range is one contiguous block of rows
+    output_rows = [i for i, day in enumerate(dates) if start_date <= day <= end_date]
+    output_dates = [dates[i] for i in output_rows]
+    if not output_rows:
+        logger.warning(f"No trading days with returns between {start_date} and {end_date}")
+        return {"betas": {}, "dates": [], "records_stored": 0}
+    output_start, output_end = output_rows[0], output_rows[-1] + 1
+    factor_names = list(factor_returns.columns)
+    position_ids = list(position_returns.columns)
+
+    Y = position_returns.to_numpy(dtype=np.float64)[:output_end]
+    X = factor_returns.to_numpy(dtype=np.float64)[:output_end]
+
+    series: Dict[int, Dict[str, pd.DataFrame]] = {window: {} for window in windows}
+    rows: List[Dict[str, Any]] = []
+    for chunk_start in range(0, len(position_ids), ROLLING_BETA_POSITION_CHUNK_SIZE):
+        chunk = slice(chunk_start, chunk_start + ROLLING_BETA_POSITION_CHUNK_SIZE)
+        chunk_ids = position_ids[chunk]
+        for window in windows:
+            betas, observations = rolling_factor_betas(Y[:, chunk], X, window, output_start=output_start)
+            for column, position_id in enumerate(chunk_ids):
+                series[window][position_id] = pd.DataFrame(
+                    betas[:, column, :], index=output_dates, columns=factor_names
+                )
+            if persist:
+                rows.extend(_beta_rows(chunk_ids, factor_names, output_dates, window, betas, observations))
+
+    records_stored = 0
+    if persist and rows:
+        try:
+            records_stored = await store_rolling_factor_betas(db, rows)
+            await db.commit()
+        except Exception as e:
+            logger.error(f"Error storing rolling factor betas: {str(e)}")
+            await db.rollback()
+            raise
+
+    logger.info(
+        f"Rolling factor betas calculated: {len(position_ids)} positions, {len(output_dates)} days, "
+        f"{len(windows)} windows, {records_stored} rows stored"
+    )
+    return {"betas": series, "dates": output_dates, "records_stored": records_stored}
+
+
+async def get_rolling_beta_history(
+    db: AsyncSession,
+    position_id: UUID,
+    window: int,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None
+) -> pd.DataFrame:
+    """
+    Stored beta series of one position for one window (e.g. for a beta-drift chart)
+
+    Returns:
+        DataFrame indexed by calculation_date with one column per factor
+    """
+    stmt = select(PositionRollingFactorBeta.calculation_date, PositionRollingFactorBeta.betas).where(
+        PositionRollingFactorBeta.position_id == position_id,
+        PositionRollingFactorBeta.window_days == window
+    )
+    if start_date:
+        stmt = stmt.where(PositionRollingFactorBeta.calculation_date >= start_date)
+    if end_date:
+        stmt = stmt.where(PositionRollingFactorBeta.calculation_date <= end_date)
+    result = await db.execute(stmt.order_by(PositionRollingFactorBeta.calculation_date))
+    records = result.all()
+
+    if not records:
+        return pd.DataFrame(columns=list(FACTOR_ETFS))
+    return pd.DataFrame.from_records(
+        [betas for _, betas in records], index=[day for day, _ in records]
+    ).reindex(columns=list(FACTOR_ETFS))
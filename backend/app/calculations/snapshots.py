@@ -7,18 +7,21 @@ from decimal import Decimal
 from typing import Dict, List, Optional, Any
 from uuid import UUID
 
+import numpy as np
+
 from sqlalchemy import select, and_, or_
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
 
-from app.models.positions import Position, PositionType
+from app.models.positions import Position
 from app.models.snapshots import PortfolioSnapshot
-from app.models.market_data import PositionGreeks
 from app.calculations.portfolio import (
+    AggregationKey,
     calculate_portfolio_exposures,
     aggregate_portfolio_greeks
 )
-from app.calculations.market_data import calculate_position_market_value
+from app.calculations.bulk_snapshots import SNAPSHOT_GREEKS, load_latest_prices, load_position_greeks
+from app.calculations.position_frame import PositionFrame
 from app.utils.trading_calendar import trading_calendar
 
 logger = logging.getLogger(__name__)
@@ -75,10 +78,11 @@ async def create_portfolio_snapshot(
             f"Prepared {len(positions_list)} positions for aggregation; "
             f"warnings={len(position_data.get('warnings', []))}"
         )
-        aggregations = calculate_portfolio_exposures(positions_list)
+        cache_key = AggregationKey.for_portfolio("snapshot", portfolio_id, calculation_date)
+        aggregations = calculate_portfolio_exposures(positions_list, cache_key=cache_key)
         
         # Step 4: Aggregate Greeks
-        greeks = aggregate_portfolio_greeks(positions_list)
+        greeks = aggregate_portfolio_greeks(positions_list, cache_key=cache_key)
         
         # Step 5: Calculate P&L
         pnl_data = await _calculate_pnl(db, portfolio_id, calculation_date, aggregations['gross_exposure'])
@@ -152,68 +156,41 @@ async def _prepare_position_data(
     position_data = []
     warnings = []
     
-    # Import needed for price lookup
-    from app.models.market_data import MarketDataCache
-    from sqlalchemy import select, and_
+    frame = PositionFrame.from_positions(positions)
     
-    for position in positions:
-        try:
-            # First, get the price for this position as of calculation_date
-            price_query = select(MarketDataCache.close).where(
-                and_(
-                    MarketDataCache.symbol == position.symbol,
-                    MarketDataCache.date <= calculation_date
-                )
-            ).order_by(MarketDataCache.date.desc()).limit(1)
-            
-            price_result = await db.execute(price_query)
-            current_price = price_result.scalar_one_or_none()
-            
-            if current_price is None:
-                warnings.append(f"No price data available for {position.symbol} as of {calculation_date}")
-                continue
-            
-            # Calculate market value with correct function signature
-            market_value_result = await calculate_position_market_value(
-                position=position,
-                current_price=Decimal(str(current_price))
-            )
-            
-            # Fetch Greeks if available
-            greeks_query = select(PositionGreeks).where(
-                and_(
-                    PositionGreeks.position_id == position.id,
-                    PositionGreeks.calculation_date == calculation_date
-                )
-            )
-            greeks_result = await db.execute(greeks_query)
-            greeks_record = greeks_result.scalar_one_or_none()
-            
-            greeks = None
-            if greeks_record:
-                greeks = {
-                    "delta": greeks_record.delta,
-                    "gamma": greeks_record.gamma,
-                    "theta": greeks_record.theta,
-                    "vega": greeks_record.vega,
-                    "rho": greeks_record.rho
-                }
-            elif _is_options_position(position):
-                warnings.append(f"Missing Greeks for options position {position.symbol}")
-            
-            position_data.append({
-                "id": position.id,
-                "symbol": position.symbol,
-                "quantity": position.quantity,
-                "market_value": market_value_result["market_value"],  # Always positive
-                "exposure": market_value_result["exposure"],          # Signed value (negative for shorts)
-                "position_type": position.position_type,
-                "greeks": greeks
-            })
-            
-        except Exception as e:
-            logger.error(f"Error processing position {position.id}: {str(e)}")
-            warnings.append(f"Error processing position {position.symbol}: {str(e)}")
+    # Latest price per symbol and Greeks per position, one query each
+    prices_by_symbol = await load_latest_prices(db, frame.symbols, calculation_date)
+    greeks_by_id = await load_position_greeks(db, [position.id for position in positions], calculation_date)
+    
+    prices = np.array([prices_by_symbol.get(symbol, np.nan) for symbol in frame.symbols], dtype=np.float64)
+    
+    # Signed market value (quantity × price × multiplier) for every priced position
+    market_values = frame.valued_at(prices)
+    position_types = frame.position_types
+    
+    for row, position_id in enumerate(frame.ids):
+        symbol = frame.symbols[row]
+        if np.isnan(prices[row]):
+            warnings.append(f"No price data available for {symbol} as of {calculation_date}")
+            continue
+        
+        greeks = None
+        greeks_values = greeks_by_id.get(position_id)
+        if greeks_values is not None:
+            greeks = dict(zip(SNAPSHOT_GREEKS, greeks_values))
+        elif frame.is_option[row]:
+            warnings.append(f"Missing Greeks for options position {symbol}")
+        
+        market_value = float(market_values[row])
+        position_data.append({
+            "id": position_id,
+            "symbol": symbol,
+            "quantity": float(frame.quantity[row]),
+            "market_value": market_value,
+            "exposure": market_value,  # Signed value (negative for shorts)
+            "position_type": position_types[row],
+            "greeks": greeks
+        })
     
     return {
         "positions": position_data,
@@ -378,11 +355,3 @@ async def _create_zero_snapshot(
     await db.commit()
     
     return snapshot
-
-
-def _is_options_position(position: Position) -> bool:
-    """Check if position is an options position"""
-    return position.position_type in [
-        PositionType.LC, PositionType.LP, 
-        PositionType.SC, PositionType.SP
-    ]
\ No newline at end of file
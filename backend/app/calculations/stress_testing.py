@@ -14,9 +14,10 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_
 
 from app.models.positions import Position
-from app.models.market_data import FactorDefinition, PositionFactorExposure, FactorExposure, StressTestScenario, StressTestResult
+from app.models.market_data import PositionFactorExposure, FactorExposure, StressTestScenario, StressTestResult
 from app.models.users import Portfolio
-from app.calculations.factors import fetch_factor_returns
+from app.calculations.factors import fetch_factor_returns, get_factor_definition_names
+from app.calculations.position_frame import PositionFrame
 from app.constants.factors import FACTOR_ETFS, REGRESSION_WINDOW_DAYS
 from app.core.logging import get_logger
 
@@ -30,12 +31,12 @@ STRESS_MAGNITUDE_CAP = 1.0
 OPTIONS_CONTRACT_MULTIPLIER = 100  # Standard options contract size
 
 
-def calculate_portfolio_market_value(positions) -> float:
+def calculate_portfolio_market_value(positions: Union[PositionFrame, List[Position]]) -> float:
     """
     Calculate total portfolio market value correctly handling options and short positions.
     
     Args:
-        positions: List of Position objects
+        positions: PositionFrame, or a list of Position objects
         
     Returns:
         Absolute portfolio market value (gross exposure)
@@ -46,36 +47,11 @@ def calculate_portfolio_market_value(positions) -> float:
         - Handles SHORT positions correctly (negative values)
         - Returns absolute value for stress testing (gross exposure)
     """
-    total = 0.0
+    if not isinstance(positions, PositionFrame):
+        positions = PositionFrame.from_positions(positions)
     
-    for pos in positions:
-        # Use pre-calculated market value if available
-        if pos.market_value is not None:
-            total += float(pos.market_value)
-        elif pos.last_price is not None:
-            # Calculate market value based on position type
-            quantity = float(pos.quantity)
-            price = float(pos.last_price)
-            
-            # Apply options contract multiplier
-            if pos.position_type.name in ['LC', 'LP', 'SC', 'SP']:
-                multiplier = OPTIONS_CONTRACT_MULTIPLIER
-            else:
-                multiplier = 1
-            
-            # Apply sign for short positions
-            # Note: SHORT stock and short options (SC, SP) are negative
-            if pos.position_type.name in ['SHORT', 'SC', 'SP']:
-                sign = -1
-            else:
-                sign = 1
-            
-            market_value = sign * quantity * price * multiplier
-            total += market_value
-    
-    # Return absolute value (gross exposure) for stress testing
     # Stress tests apply to total portfolio exposure regardless of long/short mix
-    return abs(total)
+    return positions.gross_market_value()
 
 
 async def calculate_factor_correlation_matrix(
@@ -245,11 +221,52 @@ def load_stress_scenarios(config_path: Optional[Path] = None) -> Dict[str, Any]:
         raise
 
 
+async def get_latest_factor_exposures(
+    db: AsyncSession,
+    portfolio_id: UUID,
+    calculation_date: date
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Most recent portfolio factor exposures on or before calculation_date
+    
+    Returns:
+        Dictionary mapping factor definition names to exposure_value (beta),
+        exposure_dollar and calculation_date
+    """
+    stmt = select(FactorExposure).where(
+        and_(
+            FactorExposure.portfolio_id == portfolio_id,
+            FactorExposure.calculation_date <= calculation_date
+        )
+    ).order_by(FactorExposure.calculation_date.desc()).limit(50)  # Get recent exposures
+    
+    result = await db.execute(stmt)
+    factor_exposures = result.scalars().all()
+    
+    # Keep the most recent exposure of each factor
+    factor_names = await get_factor_definition_names(db)
+    latest_exposures = {}
+    for exposure in factor_exposures:
+        # Map factor id to factor name
+        factor_name = factor_names.get(exposure.factor_id)
+        
+        if factor_name and factor_name not in latest_exposures:
+            latest_exposures[factor_name] = {
+                'exposure_value': float(exposure.exposure_value),
+                'exposure_dollar': float(exposure.exposure_dollar) if exposure.exposure_dollar else 0.0,
+                'calculation_date': exposure.calculation_date
+            }
+    
+    return latest_exposures
+
+
 async def calculate_direct_stress_impact(
     db: AsyncSession,
     portfolio_id: UUID,
     scenario_config: Dict[str, Any],
-    calculation_date: date
+    calculation_date: date,
+    position_frame: Optional[PositionFrame] = None,
+    factor_exposures: Optional[Dict[str, Dict[str, Any]]] = None
 ) -> Dict[str, Any]:
     """
     Calculate direct impact of stress scenario without factor correlations
@@ -259,6 +276,8 @@ async def calculate_direct_stress_impact(
         portfolio_id: Portfolio ID to analyze
         scenario_config: Single scenario configuration from JSON
         calculation_date: Date for calculation
+        position_frame: Active positions of the portfolio, loaded if not provided
+        factor_exposures: Result of get_latest_factor_exposures, loaded if not provided
         
     Returns:
         Dictionary containing direct stress impact results
@@ -267,51 +286,23 @@ async def calculate_direct_stress_impact(
     
     try:
         # Get portfolio market value
-        from app.models.positions import Position
-        positions_stmt = select(Position).where(
-            and_(
-                Position.portfolio_id == portfolio_id,
-                Position.deleted_at.is_(None)  # Active positions have no deletion date
-            )
-        )
-        positions_result = await db.execute(positions_stmt)
-        positions = positions_result.scalars().all()
+        if position_frame is None:
+            position_frame = await PositionFrame.load(db, portfolio_id)
         
         # Calculate portfolio market value using proper helper
-        portfolio_market_value = calculate_portfolio_market_value(positions)
+        portfolio_market_value = calculate_portfolio_market_value(position_frame)
         
         if portfolio_market_value <= 0:
             logger.warning(f"Portfolio {portfolio_id} has no market value")
             portfolio_market_value = 1.0  # Avoid division by zero
         
-        # Get portfolio factor exposures
-        stmt = select(FactorExposure).where(
-            and_(
-                FactorExposure.portfolio_id == portfolio_id,
-                FactorExposure.calculation_date <= calculation_date
-            )
-        ).order_by(FactorExposure.calculation_date.desc()).limit(50)  # Get recent exposures
-        
-        result = await db.execute(stmt)
-        factor_exposures = result.scalars().all()
+        # Get the most recent portfolio factor exposures
+        if factor_exposures is None:
+            factor_exposures = await get_latest_factor_exposures(db, portfolio_id, calculation_date)
         
         if not factor_exposures:
             raise ValueError(f"No factor exposures found for portfolio {portfolio_id}")
-        
-        # Get the most recent factor exposures
-        latest_exposures = {}
-        for exposure in factor_exposures:
-            # Get factor definition to map to factor name
-            stmt = select(FactorDefinition).where(FactorDefinition.id == exposure.factor_id)
-            result = await db.execute(stmt)
-            factor_def = result.scalar_one_or_none()
-            
-            if factor_def and factor_def.name not in latest_exposures:
-                latest_exposures[factor_def.name] = {
-                    'exposure_value': float(exposure.exposure_value),
-                    'exposure_dollar': float(exposure.exposure_dollar) if exposure.exposure_dollar else 0.0,
-                    'calculation_date': exposure.calculation_date
-                }
+        latest_exposures = factor_exposures
         
         # Factor name mapping (scenario names -> database factor names)
         FACTOR_NAME_MAP = {
@@ -398,7 +389,9 @@ async def calculate_correlated_stress_impact(
     portfolio_id: UUID,
     scenario_config: Dict[str, Any],
     correlation_matrix: Dict[str, Dict[str, float]],
-    calculation_date: date
+    calculation_date: date,
+    position_frame: Optional[PositionFrame] = None,
+    factor_exposures: Optional[Dict[str, Dict[str, Any]]] = None
 ) -> Dict[str, Any]:
     """
     Calculate total stress impact including cross-factor correlations
@@ -409,6 +402,8 @@ async def calculate_correlated_stress_impact(
         scenario_config: Single scenario configuration from JSON
         correlation_matrix: Factor correlation matrix from calculate_factor_correlation_matrix()
         calculation_date: Date for calculation
+        position_frame: Active positions of the portfolio, loaded if not provided
+        factor_exposures: Result of get_latest_factor_exposures, loaded if not provided
         
     Returns:
         Dictionary containing correlated stress impact results
@@ -416,54 +411,30 @@ async def calculate_correlated_stress_impact(
     logger.info(f"Calculating correlated stress impact for scenario: {scenario_config.get('name')}")
     
     try:
+        if position_frame is None:
+            position_frame = await PositionFrame.load(db, portfolio_id)
+        if factor_exposures is None:
+            factor_exposures = await get_latest_factor_exposures(db, portfolio_id, calculation_date)
+        
         # First get direct impact
         direct_results = await calculate_direct_stress_impact(
             db=db,
             portfolio_id=portfolio_id,
             scenario_config=scenario_config,
-            calculation_date=calculation_date
+            calculation_date=calculation_date,
+            position_frame=position_frame,
+            factor_exposures=factor_exposures
         )
         
         # Get portfolio market value
-        from app.models.positions import Position
-        positions_stmt = select(Position).where(
-            and_(
-                Position.portfolio_id == portfolio_id,
-                Position.deleted_at.is_(None)  # Active positions have no deletion date
-            )
-        )
-        positions_result = await db.execute(positions_stmt)
-        positions = positions_result.scalars().all()
-        
-        portfolio_market_value = calculate_portfolio_market_value(positions)
+        portfolio_market_value = calculate_portfolio_market_value(position_frame)
         
         if portfolio_market_value <= 0:
             logger.warning(f"Portfolio {portfolio_id} has no market value")
             portfolio_market_value = 1.0  # Avoid division by zero
         
-        # Get portfolio factor exposures (reuse from direct calculation)
-        stmt = select(FactorExposure).where(
-            and_(
-                FactorExposure.portfolio_id == portfolio_id,
-                FactorExposure.calculation_date <= calculation_date
-            )
-        ).order_by(FactorExposure.calculation_date.desc()).limit(50)
-        
-        result = await db.execute(stmt)
-        factor_exposures = result.scalars().all()
-        
-        # Map factor exposures by name
-        latest_exposures = {}
-        for exposure in factor_exposures:
-            stmt = select(FactorDefinition).where(FactorDefinition.id == exposure.factor_id)
-            result = await db.execute(stmt)
-            factor_def = result.scalar_one_or_none()
-            
-            if factor_def and factor_def.name not in latest_exposures:
-                latest_exposures[factor_def.name] = {
-                    'exposure_value': float(exposure.exposure_value),
-                    'exposure_dollar': float(exposure.exposure_dollar) if exposure.exposure_dollar else 0.0
-                }
+        # Portfolio factor exposures (same as the direct calculation)
+        latest_exposures = factor_exposures
         
         # Calculate correlated impacts
         shocked_factors = scenario_config.get('shocked_factors', {})
@@ -564,7 +535,9 @@ async def run_comprehensive_stress_test(
     portfolio_id: UUID,
     calculation_date: date,
     scenario_filter: Optional[List[str]] = None,
-    config_path: Optional[Path] = None
+    config_path: Optional[Path] = None,
+    position_frame: Optional[PositionFrame] = None,
+    factor_exposures: Optional[Dict[str, Dict[str, Any]]] = None
 ) -> Dict[str, Any]:
     """
     Run comprehensive stress test for all scenarios
@@ -575,6 +548,9 @@ async def run_comprehensive_stress_test(
         calculation_date: Date for calculation
         scenario_filter: Optional list of scenario categories to include
         config_path: Optional path to custom scenario configuration
+        position_frame: Active positions of the portfolio, loaded if not provided
+        factor_exposures: Portfolio factor exposures by factor name (e.g. from the
+            factor run of the same batch), loaded if not provided
         
     Returns:
         Dictionary containing complete stress test results
@@ -597,6 +573,12 @@ async def run_comprehensive_stress_test(
         if not portfolio:
             raise ValueError(f"Portfolio {portfolio_id} not found")
         
+        # Positions and factor exposures are loaded once and shared by every scenario
+        if position_frame is None:
+            position_frame = await PositionFrame.load(db, portfolio_id)
+        if factor_exposures is None:
+            factor_exposures = await get_latest_factor_exposures(db, portfolio_id, calculation_date)
+        
         # Run stress tests for all active scenarios
         stress_results = {
             'direct_impacts': {},
@@ -634,7 +616,9 @@ async def run_comprehensive_stress_test(
                         db=db,
                         portfolio_id=portfolio_id,
                         scenario_config=scenario_config,
-                        calculation_date=calculation_date
+                        calculation_date=calculation_date,
+                        position_frame=position_frame,
+                        factor_exposures=factor_exposures
                     )
                     stress_results['direct_impacts'][category][scenario_id] = direct_result
                     
@@ -644,7 +628,9 @@ async def run_comprehensive_stress_test(
                         portfolio_id=portfolio_id,
                         scenario_config=scenario_config,
                         correlation_matrix=correlation_matrix,
-                        calculation_date=calculation_date
+                        calculation_date=calculation_date,
+                        position_frame=position_frame,
+                        factor_exposures=factor_exposures
                     )
                     stress_results['correlated_impacts'][category][scenario_id] = correlated_result
                     
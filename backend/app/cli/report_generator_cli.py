@@ -25,12 +25,16 @@ Examples:
     
     # Generate for all portfolios
     python -m app.cli.report_generator_cli generate-all --format json,csv
+    
+    # Month-end run: 8 portfolios at a time, rendering on 4 processes
+    python -m app.cli.report_generator_cli generate-all --workers 8 --render-processes 4
 """
 
 import argparse
 import asyncio
 import json
 import sys
+import time
 from datetime import date, datetime
 from pathlib import Path
 from typing import List, Optional, Set
@@ -38,7 +42,14 @@ from uuid import UUID
 
 from app.database import get_async_session
 from app.models.users import Portfolio
-from app.reports.portfolio_report_generator import PortfolioReportGenerator
+from app.reports.portfolio_report_generator import (
+    REPORT_BULK_WORKERS,
+    PortfolioReportGenerator,
+    ReportRequest,
+    ReportRunResult,
+    generate_portfolio_report,
+    generate_reports_bulk,
+)
 from app.core.logging import get_logger
 from sqlalchemy import select
 
@@ -140,6 +151,18 @@ class ReportGeneratorCLI:
             default="reports",
             help="Output directory for reports (default: reports/)"
         )
+        generate_all_parser.add_argument(
+            "--workers",
+            type=int,
+            default=REPORT_BULK_WORKERS,
+            help=f"Portfolios generated concurrently (default: {REPORT_BULK_WORKERS})"
+        )
+        generate_all_parser.add_argument(
+            "--render-processes",
+            type=int,
+            default=None,
+            help="Processes rendering reports (default: one per CPU; 0 renders in this process)"
+        )
         generate_all_parser.add_argument(
             "--verbose",
             action="store_true",
@@ -225,51 +248,43 @@ class ReportGeneratorCLI:
                 if verbose:
                     print(f"✅ Found portfolio: {portfolio.name}")
                 
-                # Generate reports
+                # Generate reports (data is collected once for all formats)
                 generator = PortfolioReportGenerator(db)
                 results = {}
                 
-                for format_type in formats:
-                    try:
-                        if verbose:
-                            print(f"   Generating {format_type.upper()}...", end=" ")
-                        
-                        if no_write:
-                            # For dry run, just validate we can generate
-                            from app.reports.portfolio_report_generator import ReportRequest
-                            request = ReportRequest(
-                                portfolio_id=str(portfolio_uuid),
-                                as_of=report_date,
-                                formats={format_type},
-                                write_to_disk=False
-                            )
-                            from app.reports.portfolio_report_generator import generate_portfolio_report
-                            artifacts = await generate_portfolio_report(db, request)
-                            
-                            if artifacts and format_type in artifacts:
-                                results[format_type] = "generated (dry run)"
-                                if verbose:
-                                    print("✅")
-                            else:
-                                results[format_type] = "failed"
-                                if verbose:
-                                    print("❌")
-                        else:
-                            # Normal generation with file writing
-                            file_path = await generator.generate_report(
-                                portfolio_id=portfolio_uuid,
-                                report_date=report_date,
-                                format=format_type
-                            )
-                            results[format_type] = file_path
-                            if verbose:
-                                print("✅")
+                try:
+                    if verbose:
+                        print(f"   Generating {', '.join(fmt.upper() for fmt in sorted(formats))}...", end=" ")
                     
-                    except Exception as e:
-                        logger.error(f"Failed to generate {format_type}: {str(e)}")
-                        results[format_type] = f"error: {str(e)}"
-                        if verbose:
-                            print(f"❌ ({str(e)})")
+                    if no_write:
+                        # For dry run, just validate we can generate
+                        request = ReportRequest(
+                            portfolio_id=str(portfolio_uuid),
+                            as_of=report_date,
+                            formats=formats,
+                            write_to_disk=False
+                        )
+                        artifacts = await generate_portfolio_report(db, request)
+                        for format_type in formats:
+                            results[format_type] = "generated (dry run)" if format_type in artifacts else "failed"
+                    else:
+                        # Normal generation with file writing
+                        file_paths = await generator.generate_reports(
+                            portfolio_id=portfolio_uuid,
+                            report_date=report_date,
+                            formats=formats
+                        )
+                        for format_type in formats:
+                            results[format_type] = file_paths.get(format_type, "error: not generated")
+                    
+                    if verbose:
+                        print("✅" if all("error" not in str(r) and r != "failed" for r in results.values()) else "❌")
+                
+                except Exception as e:
+                    logger.error(f"Failed to generate reports: {str(e)}")
+                    results = {format_type: f"error: {str(e)}" for format_type in formats}
+                    if verbose:
+                        print(f"❌ ({str(e)})")
             
             # Summary
             if verbose:
@@ -297,47 +312,60 @@ class ReportGeneratorCLI:
         formats: Set[str] = None,
         no_write: bool = False,
         output_dir: str = "reports",
-        verbose: bool = False
+        verbose: bool = False,
+        workers: int = REPORT_BULK_WORKERS,
+        render_processes: Optional[int] = None
     ) -> bool:
-        """Generate reports for all portfolios."""
+        """Generate reports for all portfolios with a bounded worker pool."""
         async with get_async_session() as db:
-            stmt = select(Portfolio).order_by(Portfolio.name)
+            stmt = select(Portfolio.id, Portfolio.name).order_by(Portfolio.name)
             result = await db.execute(stmt)
-            portfolios = result.scalars().all()
-            
-            if not portfolios:
-                print("No portfolios found")
-                return False
-            
-            print(f"\n📊 Generating reports for {len(portfolios)} portfolios...")
-            print("=" * 60)
-            
-            success_count = 0
-            failed_count = 0
-            
-            for portfolio in portfolios:
-                print(f"\n▶️  {portfolio.name}")
-                
-                success = await self.generate_report(
-                    portfolio_id=str(portfolio.id),
-                    as_of=as_of,
-                    formats=formats,
-                    no_write=no_write,
-                    output_dir=output_dir,
-                    verbose=verbose
-                )
-                
-                if success:
-                    success_count += 1
-                else:
-                    failed_count += 1
-            
-            print("\n" + "=" * 60)
-            print(f"✅ Successfully generated: {success_count}/{len(portfolios)} portfolios")
-            if failed_count > 0:
-                print(f"❌ Failed: {failed_count} portfolios")
-            
-            return failed_count == 0
+            portfolio_names = {str(portfolio_id): name for portfolio_id, name in result.all()}
+        
+        if not portfolio_names:
+            print("No portfolios found")
+            return False
+        
+        report_date = as_of or date.today()
+        print(f"\n📊 Generating reports for {len(portfolio_names)} portfolios "
+              f"({workers} workers, as of {report_date})...")
+        print("=" * 60)
+        
+        def report_progress(run: ReportRunResult) -> None:
+            name = portfolio_names[run.portfolio_id]
+            if run.success:
+                print(f"  ✅ {name}: {', '.join(fmt.upper() for fmt in run.formats)} in {run.seconds:.2f}s")
+                if verbose:
+                    for fmt, path in run.files.items():
+                        print(f"     {fmt.upper()}: {path}")
+            else:
+                print(f"  ❌ {name}: {run.error} ({run.seconds:.2f}s)")
+        
+        started = time.perf_counter()
+        runs = await generate_reports_bulk(
+            portfolio_names,
+            as_of=report_date,
+            formats=formats or {"md", "json", "csv"},
+            write_to_disk=not no_write,
+            max_workers=workers,
+            render_processes=render_processes,
+            on_result=report_progress
+        )
+        elapsed = time.perf_counter() - started
+        
+        success_count = sum(1 for run in runs if run.success)
+        failed_count = len(runs) - success_count
+        durations = sorted(run.seconds for run in runs)
+        
+        print("\n" + "=" * 60)
+        print(f"✅ Successfully generated: {success_count}/{len(runs)} portfolios")
+        if failed_count > 0:
+            print(f"❌ Failed: {failed_count} portfolios")
+        print(f"⏱️  Total: {elapsed:.2f}s, {len(runs) / elapsed if elapsed else 0:.2f} portfolios/s")
+        print(f"   Per portfolio: mean {sum(durations) / len(durations):.2f}s, "
+              f"median {durations[len(durations) // 2]:.2f}s, max {durations[-1]:.2f}s")
+        
+        return failed_count == 0
     
     def run(self, args: Optional[List[str]] = None) -> int:
         """Run CLI with given arguments."""
@@ -417,13 +445,22 @@ class ReportGeneratorCLI:
                     print(f"   Valid formats: {', '.join(valid_formats)}")
                     return 1
                 
+                if parsed_args.workers < 1:
+                    print("❌ Error: --workers must be at least 1")
+                    return 1
+                if parsed_args.render_processes is not None and parsed_args.render_processes < 0:
+                    print("❌ Error: --render-processes must be 0 or more")
+                    return 1
+                
                 success = loop.run_until_complete(
                     self.generate_all(
                         as_of=report_date,
                         formats=formats,
                         no_write=parsed_args.no_write,
                         output_dir=parsed_args.output_dir,
-                        verbose=parsed_args.verbose
+                        verbose=parsed_args.verbose,
+                        workers=parsed_args.workers,
+                        render_processes=parsed_args.render_processes
                     )
                 )
                 return 0 if success else 1
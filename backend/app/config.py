@@ -18,11 +18,14 @@ class Settings(BaseSettings):
     
     # Database settings
     DATABASE_URL: str = Field(..., env="DATABASE_URL")
+    DB_POOL_SIZE: int = Field(default=5, env="DB_POOL_SIZE")
+    DB_MAX_OVERFLOW: int = Field(default=10, env="DB_MAX_OVERFLOW")  # Extra connections beyond the pool
     
     # Market data API keys
     POLYGON_API_KEY: str = Field(..., env="POLYGON_API_KEY")
     POLYGON_PLAN: str = Field(default="free", env="POLYGON_PLAN")  # free, starter, developer, advanced
     FRED_API_KEY: str = Field(default="", env="FRED_API_KEY")  # Optional for Treasury data
+    TREASURY_FIXTURE_DIR: str = Field(default="", env="TREASURY_FIXTURE_DIR")  # Offline mode: <series>.csv files instead of FRED
     
     # New market data providers (Section 1.4.9)
     FMP_API_KEY: str = Field(default="", env="FMP_API_KEY")  # Financial Modeling Prep
@@ -47,12 +50,23 @@ class Settings(BaseSettings):
     MODEL_DEFAULT: str = Field(default="gpt-4o", env="MODEL_DEFAULT")
     MODEL_FALLBACK: str = Field(default="gpt-4o-mini", env="MODEL_FALLBACK")
     AGENT_CACHE_TTL: int = Field(default=600, env="AGENT_CACHE_TTL")
+    AGENT_TOOL_BACKEND: str = Field(default="inprocess", env="AGENT_TOOL_BACKEND")  # inprocess | http
+    AGENT_MAX_CONCURRENT_TOOLS: int = Field(default=4, env="AGENT_MAX_CONCURRENT_TOOLS")  # Per model turn
+    AGENT_API_BASE_URL: str = Field(default="http://localhost:8000", env="AGENT_API_BASE_URL")  # HTTP tool backend
+    AGENT_LLM_PROVIDER: str = Field(default="openai", env="AGENT_LLM_PROVIDER")  # openai | local (scripted stand-in)
+    AGENT_LOCAL_LLM_SCRIPT: str = Field(default="", env="AGENT_LOCAL_LLM_SCRIPT")  # JSON script path (default script if empty)
+    AGENT_LOCAL_LLM_TOKENS_PER_SEC: float = Field(default=50.0, env="AGENT_LOCAL_LLM_TOKENS_PER_SEC")
+    AGENT_LOCAL_LLM_FIRST_TOKEN_MS: int = Field(default=300, env="AGENT_LOCAL_LLM_FIRST_TOKEN_MS")
     SSE_HEARTBEAT_INTERVAL_MS: int = Field(default=15000, env="SSE_HEARTBEAT_INTERVAL_MS")
+    SSE_COALESCE_MS: int = Field(default=30, env="SSE_COALESCE_MS")  # Max age of buffered message text
+    SSE_COALESCE_CHARS: int = Field(default=64, env="SSE_COALESCE_CHARS")  # Flush message text at this size
     
     # JWT settings
     SECRET_KEY: str = Field(..., env="SECRET_KEY")
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    AUTH_USER_CACHE_TTL: int = Field(default=60, env="AUTH_USER_CACHE_TTL")  # Seconds; 0 disables
+    AUTH_CACHE_DECODED_JWT: bool = Field(default=False, env="AUTH_CACHE_DECODED_JWT")  # Skip re-verifying seen tokens
     
     # CORS settings
     ALLOWED_ORIGINS: List[str] = [
@@ -65,6 +79,10 @@ class Settings(BaseSettings):
     BATCH_PROCESSING_ENABLED: bool = True
     MARKET_DATA_UPDATE_INTERVAL: int = 3600  # 1 hour in seconds
     
+    # Query instrumentation (debug) - per-request statement counts and N+1 warnings
+    QUERY_COUNT_DEBUG: bool = Field(default=False, env="QUERY_COUNT_DEBUG")
+    QUERY_REPEAT_THRESHOLD: int = Field(default=5, env="QUERY_REPEAT_THRESHOLD")
+    
     class Config:
         env_file = ".env"
         case_sensitive = True
@@ -7,6 +7,14 @@ REGRESSION_WINDOW_DAYS = 150  # Adjusted for FMP API data availability (was 252
 MIN_REGRESSION_DAYS = 60      # 3-month minimum data requirement
 BETA_CAP_LIMIT = 3.0         # Cap factor betas at ±3 to prevent outliers
 
+# Regression modes
+REGRESSION_MODE_UNIVARIATE = "univariate"      # One OLS per position per factor (independent betas)
+REGRESSION_MODE_MULTIVARIATE = "multivariate"  # One OLS per position on all factors jointly
+DEFAULT_REGRESSION_MODE = REGRESSION_MODE_UNIVARIATE
+
+# Rolling beta windows (trading days) for beta time series
+ROLLING_BETA_WINDOWS = (60, 150, 252)
+
 # Batch processing parameters
 POSITION_CHUNK_SIZE = 1000   # Process positions in chunks for large portfolios
 
@@ -25,6 +33,17 @@ FACTOR_ETFS = {
     "Low Volatility": "USMV"  # Low Volatility factor
 }
 
+# Model factor name -> FactorDefinition.name (as seeded in the database)
+FACTOR_DEFINITION_NAMES = {
+    "Market": "Market Beta",
+    "Value": "Value",
+    "Growth": "Growth",
+    "Momentum": "Momentum",
+    "Quality": "Quality",
+    "Size": "Size",
+    "Low Volatility": "Low Volatility"
+}
+
 # Factor types
 FACTOR_TYPE_STYLE = "style"
 FACTOR_TYPE_SECTOR = "sector"
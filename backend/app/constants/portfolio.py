@@ -15,6 +15,7 @@ PERCENTAGE_DECIMAL_PLACES = 2  # Precision for percentage values
 
 # Cache settings
 AGGREGATION_CACHE_TTL = 60  # Cache time-to-live in seconds for aggregation results
+AGGREGATION_CACHE_MAXSIZE = 256  # Maximum cached aggregation results (LRU eviction beyond this)
 
 # Default values for missing data
 DEFAULT_SECTOR = "Unknown"
@@ -3,6 +3,7 @@ Authentication utilities for SigmaSight Backend
 """
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any
+from uuid import uuid4
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 
@@ -37,6 +38,7 @@ def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta]
         expire = datetime.utcnow() + timedelta(hours=24)  # Default 24 hours
     
     to_encode.update({"exp": expire})
+    to_encode.setdefault("jti", uuid4().hex)  # Token id (auth user cache key)
     
     try:
         encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
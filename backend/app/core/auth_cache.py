@@ -0,0 +1,116 @@
+"""
+In-process cache of authenticated users
+
+get_current_user runs on every authenticated request, including every SSE
+request and agent tool call. Validated ``CurrentUser`` objects are cached for
+AUTH_USER_CACHE_TTL seconds, keyed by token subject and token id (``jti``, or
+a digest of the token for tokens issued without one), so repeated requests
+skip the users-table lookup. Entries are dropped when the user logs out or any
+update to the user row (e.g. deactivation) is flushed in this process; other
+worker processes see such changes once their entries expire.
+
+With AUTH_CACHE_DECODED_JWT the decoded token payload is cached as well
+(never beyond the token's ``exp``), saving the signature check on repeat
+requests.
+"""
+import hashlib
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import event
+
+from app.config import settings
+from app.core.auth import verify_token
+from app.core.ttl_cache import TTLCache
+from app.models.users import User
+from app.schemas.auth import CurrentUser
+
+AUTH_CACHE_MAXSIZE = 4096
+# Longest token lifetime issued by create_access_token
+DECODED_TOKEN_CACHE_TTL = 24 * 3600  # seconds
+
+
+def token_digest(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def auth_cache_key(payload: Dict[str, Any], token: str) -> Tuple[str, str]:
+    """(subject, token id) for a decoded token."""
+    return str(payload.get("sub")), str(payload.get("jti") or token_digest(token))
+
+
+class AuthUserCache(TTLCache):
+    """TTL + LRU cache of validated users keyed by (subject, token id)."""
+
+    def __init__(self, ttl_seconds: float = settings.AUTH_USER_CACHE_TTL, maxsize: int = AUTH_CACHE_MAXSIZE):
+        # Callers may mutate what they receive
+        super().__init__(ttl_seconds, maxsize, copy_value=lambda user: user.model_copy())
+
+    def invalidate_user(self, user_id: Any) -> int:
+        """Drop every entry of a user; returns the number dropped."""
+        return self.invalidate_prefix(str(user_id))
+
+
+class DecodedTokenCache:
+    """Decoded JWT payloads keyed by token digest, served only until the token expires."""
+
+    def __init__(self, maxsize: int = AUTH_CACHE_MAXSIZE):
+        # The TTL only bounds the entry lifetime; each payload's exp decides
+        self._payloads = TTLCache(DECODED_TOKEN_CACHE_TTL, maxsize)
+
+    def decode(self, token: str) -> Optional[Dict[str, Any]]:
+        """verify_token, answered from the cache for tokens seen before."""
+        digest = token_digest(token)
+        found, payload = self._payloads.get(digest)
+        if found:
+            # exp is a POSIX timestamp; naive utc_now() would be read as local time
+            if payload["exp"] > time.time():
+                return payload
+            self._payloads.invalidate(digest)
+
+        payload = verify_token(token)
+        # Tokens without an expiry are always re-verified
+        if payload is not None and payload.get("exp"):
+            self._payloads.set(digest, payload)
+        return payload
+
+    def clear(self) -> None:
+        self._payloads.clear()
+
+
+_auth_user_cache = AuthUserCache()
+_decoded_token_cache = DecodedTokenCache()
+
+
+def decode_token(token: str) -> Optional[Dict[str, Any]]:
+    """Verify and decode a JWT, through the decoded-token cache if AUTH_CACHE_DECODED_JWT is set."""
+    if settings.AUTH_CACHE_DECODED_JWT:
+        return _decoded_token_cache.decode(token)
+    return verify_token(token)
+
+
+def get_cached_user(payload: Dict[str, Any], token: str) -> Optional[CurrentUser]:
+    """User validated earlier for this token, or None."""
+    _, user = _auth_user_cache.get(auth_cache_key(payload, token))
+    return user
+
+
+def cache_user(payload: Dict[str, Any], token: str, user: CurrentUser) -> None:
+    """Remember a validated user for further requests with the same token."""
+    _auth_user_cache.set(auth_cache_key(payload, token), user)
+
+
+def invalidate_user(user_id: Any) -> int:
+    """Forget cached authentications of a user (logout, deactivation, profile change)."""
+    return _auth_user_cache.invalidate_user(user_id)
+
+
+def get_auth_cache_stats() -> Dict[str, Any]:
+    """Hit/miss statistics of the authenticated user cache."""
+    return _auth_user_cache.info()
+
+
+@event.listens_for(User, "after_update")
+def _invalidate_updated_user(mapper, connection, target: User) -> None:
+    # Any flushed change to the row (is_active, email, ...) must not be masked by the cache
+    invalidate_user(target.id)
@@ -0,0 +1,116 @@
+"""
+Data versions for cache invalidation across processes
+
+A portfolio's version advances when the batch recalculates it or its position
+values are updated; the market data version advances whenever prices are
+written to the market data cache. The versions live in the data_versions
+table and are advanced in the same transaction as the data they describe, so
+no process can read a new version before the data behind it is committed.
+
+Caches of derived data (e.g. agent tool results) put the versions in their
+keys, so new data makes older entries unreachable and they age out through
+the cache's TTL/LRU eviction. Key construction is synchronous and reads the
+versions this process last saw: its own commits publish them immediately,
+and request handlers read them from the database once per request with
+``refresh_data_versions``.
+
+Usage:
+    mark_portfolio_data_changed(db, portfolio_id)  # next to the writes
+    await db.commit()  # advances the version with the data
+
+    await refresh_data_versions(db, portfolio_id)  # once per request
+    key = (tool_name, args, get_data_version(portfolio_id))
+"""
+import threading
+from typing import Any, Dict, Iterable, Mapping, Optional, Tuple
+
+from sqlalchemy import event, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app.models.snapshots import DataVersion
+
+MARKET_DATA_SCOPE = "market"
+
+# Session.info keys: scopes to advance at commit, versions written by the commit
+_PENDING_SCOPES = "data_version_pending"
+_WRITTEN_VERSIONS = "data_version_written"
+
+_lock = threading.Lock()
+_versions: Dict[str, int] = {}
+
+
+def portfolio_scope(portfolio_id: Any) -> str:
+    return f"portfolio:{str(portfolio_id).lower()}"
+
+
+def _sync_session(db: Any) -> Session:
+    # AsyncSession wraps the Session that commits and fires the events
+    return getattr(db, "sync_session", db)
+
+
+def _mark(db: Any, scope: str) -> None:
+    _sync_session(db).info.setdefault(_PENDING_SCOPES, set()).add(scope)
+
+
+def mark_market_data_changed(db: Any) -> None:
+    """Advance the market data version when ``db`` commits (new prices are being stored)."""
+    _mark(db, MARKET_DATA_SCOPE)
+
+
+def mark_portfolio_data_changed(db: Any, portfolio_id: Any) -> None:
+    """Advance a portfolio's version when ``db`` commits (its data is being refreshed)."""
+    _mark(db, portfolio_scope(portfolio_id))
+
+
+def record_data_versions(versions: Mapping[str, int]) -> None:
+    """Remember committed versions in this process; versions never move backwards."""
+    with _lock:
+        for scope, version in versions.items():
+            if version > _versions.get(scope, 0):
+                _versions[scope] = version
+
+
+def get_data_version(portfolio_id: Optional[Any] = None) -> Tuple[int, int]:
+    """(market data version, portfolio version) for data derived from a portfolio, or prices only."""
+    with _lock:
+        portfolio_version = _versions.get(portfolio_scope(portfolio_id), 0) if portfolio_id else 0
+        return _versions.get(MARKET_DATA_SCOPE, 0), portfolio_version
+
+
+async def refresh_data_versions(db: Any, portfolio_ids: Iterable[Any] = ()) -> None:
+    """Read the committed market data version and those of ``portfolio_ids`` (one query)."""
+    scopes = [MARKET_DATA_SCOPE, *(portfolio_scope(portfolio_id) for portfolio_id in portfolio_ids)]
+    result = await db.execute(
+        select(DataVersion.scope, DataVersion.version).where(DataVersion.scope.in_(scopes))
+    )
+    record_data_versions({scope: version for scope, version in result.all()})
+
+
+@event.listens_for(Session, "before_commit")
+def _write_pending_versions(session: Session) -> None:
+    scopes = session.info.pop(_PENDING_SCOPES, None)
+    if not scopes:
+        return
+    insert = sqlite_insert if session.get_bind().dialect.name == "sqlite" else pg_insert
+    # Sorted, so concurrent commits lock the version rows in the same order
+    stmt = insert(DataVersion).values([{"scope": scope, "version": 1} for scope in sorted(scopes)])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[DataVersion.scope],
+        set_={"version": DataVersion.version + 1, "updated_at": stmt.excluded.updated_at},
+    ).returning(DataVersion.scope, DataVersion.version)
+    session.info[_WRITTEN_VERSIONS] = dict(session.execute(stmt).all())
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_written_versions(session: Session) -> None:
+    versions = session.info.pop(_WRITTEN_VERSIONS, None)
+    if versions:
+        record_data_versions(versions)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending_versions(session: Session) -> None:
+    session.info.pop(_PENDING_SCOPES, None)
+    session.info.pop(_WRITTEN_VERSIONS, None)
@@ -8,7 +8,7 @@ from sqlalchemy import select
 from uuid import UUID
 from typing import Optional
 
-from app.core.auth import verify_token
+from app.core.auth_cache import cache_user, decode_token, get_cached_user
 from app.database import get_db
 from app.models.users import User
 from app.schemas.auth import CurrentUser
@@ -52,7 +52,7 @@ async def get_current_user(
     
     try:
         # Verify and decode the JWT token (same logic regardless of source)
-        payload = verify_token(token)
+        payload = decode_token(token)
         if payload is None:
             auth_logger.warning(f"Token verification failed (auth method: {auth_method})")
             raise credentials_exception
@@ -75,6 +75,12 @@ async def get_current_user(
         auth_logger.error(f"Token validation error: {e} (auth method: {auth_method})")
         raise credentials_exception
     
+    # Serve recently validated users from the cache
+    cached_user = get_cached_user(payload, token)
+    if cached_user is not None:
+        auth_logger.debug(f"User authenticated from cache: {cached_user.email} (method: {auth_method})")
+        return cached_user
+    
     # Get user from database
     try:
         stmt = select(User).where(User.id == user_id)
@@ -92,11 +98,13 @@ async def get_current_user(
                 detail="Inactive user"
             )
         
-        # Log successful authentication with method used
+        # Log successful authentication with method used (once per cache lifetime)
         auth_logger.info(f"User authenticated successfully: {user.email} (method: {auth_method})")
         
         # Return CurrentUser schema
-        return CurrentUser.model_validate(user)
+        current_user = CurrentUser.model_validate(user)
+        cache_user(payload, token, current_user)
+        return current_user
         
     except HTTPException:
         raise
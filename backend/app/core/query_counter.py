@@ -0,0 +1,171 @@
+"""
+Query counting and N+1 detection for API requests and batch jobs
+
+Counts SQL statements issued inside a scope through SQLAlchemy's
+``before_cursor_execute`` event. Statements are normalized into "shapes"
+(literals and bind parameters collapsed) so that the same query issued once
+per row shows up as a single repeated shape.
+
+Usage:
+    with count_queries() as stats:
+        await do_work(db)
+    stats.count, stats.repeated()
+
+    # In tests - fail if an endpoint exceeds its statement budget
+    with assert_max_queries(5):
+        client.get("/api/v1/data/portfolio/.../complete")
+"""
+import re
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# A statement shape seen at least this many times in one scope is reported
+DEFAULT_REPEAT_THRESHOLD = 5
+
+QUERY_COUNT_HEADER = "X-Query-Count"
+QUERY_REPEATED_HEADER = "X-Query-Repeated"
+
+_current_stats: ContextVar[Optional["QueryStats"]] = ContextVar(
+    "query_counter_stats", default=None
+)
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_BIND_PARAM = re.compile(r"\$\d+|%\([^)]+\)s|%s|:\w+|\?")
+_IN_LIST = re.compile(r"\bIN\s*\((?:\s*\?\s*,?)+\)", re.IGNORECASE)
+_POSTCOMPILE = re.compile(r"\(?__\[POSTCOMPILE_\w+\]\)?")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_statement(statement: str) -> str:
+    """Collapse literals, bind parameters and IN-lists so repeated queries compare equal."""
+    shape = _STRING_LITERAL.sub("?", statement)
+    shape = _BIND_PARAM.sub("?", shape)
+    shape = _POSTCOMPILE.sub("(?)", shape)
+    shape = _NUMBER_LITERAL.sub("?", shape)
+    shape = _IN_LIST.sub("IN (?)", shape)
+    return _WHITESPACE.sub(" ", shape).strip()
+
+
+@dataclass
+class QueryStats:
+    """Statements counted within one request or job scope."""
+    label: Optional[str] = None
+    count: int = 0
+    shapes: Counter = field(default_factory=Counter)
+    parent: Optional["QueryStats"] = field(default=None, repr=False)
+
+    def record(self, statement: str) -> None:
+        self.count += 1
+        self.shapes[normalize_statement(statement)] += 1
+        if self.parent is not None:
+            self.parent.record(statement)
+
+    def repeated(self, threshold: int = DEFAULT_REPEAT_THRESHOLD) -> List[Tuple[str, int]]:
+        """Statement shapes issued at least ``threshold`` times (likely N+1 loops)."""
+        return [(shape, n) for shape, n in self.shapes.most_common() if n >= threshold]
+
+    def summary(self, threshold: int = DEFAULT_REPEAT_THRESHOLD, limit: int = 3) -> Dict[str, object]:
+        return {
+            "label": self.label,
+            "count": self.count,
+            "distinct": len(self.shapes),
+            "repeated": [
+                {"statement": shape[:200], "count": n}
+                for shape, n in self.repeated(threshold)[:limit]
+            ],
+        }
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised when a scope issues more statements than its budget allows."""
+
+    def __init__(self, stats: QueryStats, budget: int):
+        self.stats = stats
+        self.budget = budget
+        lines = [f"{stats.count} statements issued, budget is {budget}"]
+        for shape, n in stats.shapes.most_common(5):
+            lines.append(f"  {n}x {shape[:200]}")
+        super().__init__("\n".join(lines))
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.record(statement)
+
+
+def install_query_counter() -> None:
+    """Register the statement listener on all engines. Safe to call repeatedly."""
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    """Stats for the active counting scope, if any."""
+    return _current_stats.get()
+
+
+@contextmanager
+def count_queries(label: Optional[str] = None) -> Iterator[QueryStats]:
+    """
+    Count statements executed inside the block.
+
+    Works from sync and async code: the active stats object lives in a
+    ContextVar, which SQLAlchemy propagates into its greenlet-driven
+    async execution. Statements in a nested scope (e.g. the per-request
+    middleware inside a load test's per-turn scope) also count in the
+    enclosing one.
+    """
+    install_query_counter()
+    stats = QueryStats(label=label, parent=_current_stats.get())
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+@contextmanager
+def assert_max_queries(budget: int, label: Optional[str] = None) -> Iterator[QueryStats]:
+    """Fail with QueryBudgetExceeded if the block issues more than ``budget`` statements."""
+    with count_queries(label) as stats:
+        yield stats
+    if stats.count > budget:
+        raise QueryBudgetExceeded(stats, budget)
+
+
+def log_repeated_queries(stats: QueryStats, threshold: int = DEFAULT_REPEAT_THRESHOLD) -> None:
+    """Warn about statement shapes that look like per-row (N+1) queries."""
+    for shape, n in stats.repeated(threshold):
+        logger.warning(
+            f"Possible N+1 in {stats.label or 'scope'}: {n}x {shape[:200]}"
+        )
+
+
+async def query_count_middleware(request, call_next):
+    """
+    HTTP middleware (debug only) that reports per-request statement counts.
+
+    Adds ``X-Query-Count`` and ``X-Query-Repeated`` response headers. Streaming
+    responses report the statements issued before the headers were sent.
+    """
+    from app.config import settings
+
+    threshold = settings.QUERY_REPEAT_THRESHOLD
+    with count_queries(f"{request.method} {request.url.path}") as stats:
+        response = await call_next(request)
+    response.headers[QUERY_COUNT_HEADER] = str(stats.count)
+    response.headers[QUERY_REPEATED_HEADER] = str(len(stats.repeated(threshold)))
+    log_repeated_queries(stats, threshold)
+    return response
@@ -0,0 +1,150 @@
+"""
+Thread-safe TTL + LRU cache shared by the in-memory caches of the backend
+
+Entries expire ``ttl_seconds`` after they are stored and the least recently
+used entry is evicted once ``maxsize`` entries are held. Keys are usually
+tuples whose leading items identify an owner (a portfolio, a user, a
+conversation), so everything of one owner can be dropped with
+``invalidate_prefix``.
+
+Usage:
+    cache = TTLCache(ttl_seconds=60, maxsize=256, copy_value=copy.deepcopy)
+    found, value = cache.get((portfolio_id, "exposures"))
+    if not found:
+        value = compute()
+        cache.set((portfolio_id, "exposures"), value)
+    cache.invalidate_prefix(portfolio_id)
+"""
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from app.core.datetime_utils import utc_now
+
+
+@dataclass
+class CacheStats:
+    """Hit/miss counters of a TTLCache."""
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    oversized: int = 0
+
+    def as_dict(self, size: int) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "oversized": self.oversized,
+            "size": size,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+class TTLCache:
+    """
+    TTL + LRU cache with hit/miss statistics.
+
+    Args:
+        ttl_seconds: Lifetime of an entry; 0 or less disables the cache
+        maxsize: Entries kept before the least recently used one is evicted
+        copy_value: Applied to values on the way in and out (e.g. copy.deepcopy)
+            when callers may mutate what they store or receive
+        max_entry_size: Values whose ``sizeof`` exceeds this are not stored
+        sizeof: Size of a value, required with max_entry_size
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float,
+        maxsize: int,
+        copy_value: Optional[Callable[[Any], Any]] = None,
+        max_entry_size: Optional[int] = None,
+        sizeof: Optional[Callable[[Any], int]] = None
+    ):
+        if max_entry_size is not None and sizeof is None:
+            raise ValueError("max_entry_size requires sizeof")
+        self.ttl_seconds = ttl_seconds
+        self.maxsize = maxsize
+        self.copy_value = copy_value
+        self.max_entry_size = max_entry_size
+        self.sizeof = sizeof
+        self.stats = CacheStats()
+        self._entries: "OrderedDict[Hashable, Tuple[datetime, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0
+
+    def get(self, key: Hashable) -> Tuple[bool, Any]:
+        """(True, value) for a live entry, otherwise (False, None)."""
+        if not self.enabled:
+            return False, None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats.misses += 1
+                return False, None
+            stored_at, value = entry
+            if utc_now() - stored_at > timedelta(seconds=self.ttl_seconds):
+                del self._entries[key]
+                self.stats.expirations += 1
+                self.stats.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.stats.hits += 1
+        return True, self._copy(value)
+
+    def set(self, key: Hashable, value: Any) -> bool:
+        """Store a value; returns False if the cache is disabled or the value is too large."""
+        if not self.enabled:
+            return False
+        if self.max_entry_size is not None and self.sizeof(value) > self.max_entry_size:
+            with self._lock:
+                self.stats.oversized += 1
+            return False
+        value = self._copy(value)
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (utc_now(), value)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.stats.evictions += 1
+        return True
+
+    def invalidate(self, key: Hashable) -> bool:
+        """Drop one entry; returns whether it was present."""
+        with self._lock:
+            return self._entries.pop(key, None) is not None
+
+    def invalidate_prefix(self, *prefix: Any) -> int:
+        """Drop every tuple key starting with ``prefix``; returns the number dropped."""
+        width = len(prefix)
+        with self._lock:
+            keys = [
+                key for key in self._entries
+                if isinstance(key, tuple) and key[:width] == prefix
+            ]
+            for key in keys:
+                del self._entries[key]
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def info(self) -> Dict[str, Any]:
+        with self._lock:
+            return self.stats.as_dict(len(self._entries))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _copy(self, value: Any) -> Any:
+        return self.copy_value(value) if self.copy_value is not None else value
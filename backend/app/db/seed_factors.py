@@ -106,6 +106,10 @@ async def seed_factors(db: AsyncSession) -> None:
         print(f"Created factor: {factor_data['name']}")
     
     await db.commit()
+    
+    # Factor ids are cached by the factor calculations; pick up the new rows
+    from app.calculations.factors import clear_factor_definition_cache
+    clear_factor_definition_cache()
     print("Factor seeding completed!")
 
 
@@ -7,6 +7,7 @@ from fastapi.middleware.cors import CORSMiddleware
 from app.config import settings
 from app.api.v1.router import api_router
 from app.core.logging import setup_logging, api_logger
+from app.core.query_counter import query_count_middleware
 
 # Initialize logging
 setup_logging()
@@ -29,6 +30,10 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-request statement counts (debug only)
+if settings.QUERY_COUNT_DEBUG:
+    app.middleware("http")(query_count_middleware)
+
 # Include API router
 app.include_router(api_router, prefix="/api")
 
@@ -5,8 +5,8 @@ SQLAlchemy models for SigmaSight Backend
 # Import all models to ensure they are registered with SQLAlchemy
 from app.models.users import User, Portfolio
 from app.models.positions import Position, Tag, PositionType, TagType, position_tags
-from app.models.market_data import MarketDataCache, PositionGreeks, FactorDefinition, FactorExposure, PositionFactorExposure, FundHoldings
-from app.models.snapshots import PortfolioSnapshot, BatchJob, BatchJobSchedule
+from app.models.market_data import MarketDataCache, PositionGreeks, FactorDefinition, FactorExposure, PositionFactorExposure, PositionRollingFactorBeta, TreasuryYield, FundHoldings
+from app.models.snapshots import PortfolioSnapshot, BatchJob, BatchJobSchedule, DataVersion
 from app.models.modeling import ModelingSessionSnapshot
 from app.models.history import ExportHistory
 from app.models.correlations import CorrelationCalculation, CorrelationCluster, CorrelationClusterPosition, PairwiseCorrelation
@@ -30,12 +30,15 @@ __all__ = [
     "FactorDefinition",
     "FactorExposure",
     "PositionFactorExposure",
+    "PositionRollingFactorBeta",
+    "TreasuryYield",
     "FundHoldings",
     
     # Snapshots module
     "PortfolioSnapshot",
     "BatchJob",
     "BatchJobSchedule",
+    "DataVersion",
     
     # Modeling module
     "ModelingSessionSnapshot",
@@ -148,6 +148,28 @@ class PositionFactorExposure(Base):
     )
 
 
+class PositionRollingFactorBeta(Base):
+    """Rolling-window factor betas - one row per position, window and date holding all factor betas"""
+    __tablename__ = "position_rolling_factor_betas"
+    
+    id: Mapped[UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid4)
+    position_id: Mapped[UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("positions.id"), nullable=False)
+    window_days: Mapped[int] = mapped_column(Integer, nullable=False)  # Regression window in trading days (60, 150, 252)
+    calculation_date: Mapped[date] = mapped_column(Date, nullable=False)  # Last day of the window
+    betas: Mapped[Dict] = mapped_column(JSONB, nullable=False)  # {"Market": 1.02, "Value": 0.41, ...}
+    observations: Mapped[int] = mapped_column(Integer, nullable=False)  # Fewest usable days across factors
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
+    
+    # Relationships
+    position: Mapped["Position"] = relationship("Position", back_populates="rolling_factor_betas")
+    
+    __table_args__ = (
+        UniqueConstraint('position_id', 'window_days', 'calculation_date',
+                        name='uq_position_rolling_beta_window_date'),
+        Index('idx_rolling_betas_calculation_date', 'calculation_date'),
+    )
+
+
 class MarketRiskScenario(Base):
     """Market risk scenarios - stores portfolio scenario results"""
     __tablename__ = "market_risk_scenarios"
@@ -169,6 +191,22 @@ class MarketRiskScenario(Base):
     )
 
 
+class TreasuryYield(Base):
+    """Treasury yield observations - local store of FRED series used for interest rate betas"""
+    __tablename__ = "treasury_yields"
+    
+    id: Mapped[UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid4)
+    series_id: Mapped[str] = mapped_column(String(20), nullable=False)  # FRED series, e.g. 'DGS10'
+    date: Mapped[date] = mapped_column(Date, nullable=False)
+    value: Mapped[Decimal] = mapped_column(Numeric(8, 4), nullable=False)  # Yield in percent
+    data_source: Mapped[str] = mapped_column(String(20), nullable=False, default='fred')  # 'fred' or 'fixture'
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
+    
+    __table_args__ = (
+        UniqueConstraint('series_id', 'date', name='uq_treasury_yields_series_date'),
+    )
+
+
 class PositionInterestRateBeta(Base):
     """Position interest rate betas - stores position-level interest rate sensitivities"""
     __tablename__ = "position_interest_rate_betas"
@@ -75,6 +75,7 @@ class Position(Base):
     greeks: Mapped[Optional["PositionGreeks"]] = relationship("PositionGreeks", back_populates="position", uselist=False)
     factor_exposures: Mapped[List["PositionFactorExposure"]] = relationship("PositionFactorExposure", back_populates="position")
     interest_rate_betas: Mapped[List["PositionInterestRateBeta"]] = relationship("PositionInterestRateBeta", back_populates="position")
+    rolling_factor_betas: Mapped[List["PositionRollingFactorBeta"]] = relationship("PositionRollingFactorBeta", back_populates="position")
     
     __table_args__ = (
         Index('ix_positions_portfolio_id', 'portfolio_id'),
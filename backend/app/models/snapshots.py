@@ -4,7 +4,7 @@ Portfolio snapshots and batch job models
 from datetime import datetime, date
 from uuid import uuid4
 from decimal import Decimal
-from sqlalchemy import String, DateTime, ForeignKey, Index, Numeric, Date, UniqueConstraint, JSON
+from sqlalchemy import BigInteger, String, DateTime, ForeignKey, Index, Numeric, Date, UniqueConstraint, JSON, func
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from typing import Optional, Dict, Any
@@ -113,3 +113,18 @@ class BatchJobSchedule(Base):
         Index('ix_batch_job_schedules_is_active', 'is_active'),
         Index('ix_batch_job_schedules_next_run_at', 'next_run_at'),
     )
+
+
+class DataVersion(Base):
+    """Data versions - counters advanced in the same transaction as the data they describe
+
+    One row per scope: 'market' for stored prices and 'portfolio:<id>' for a
+    portfolio's positions and calculations. In-memory caches put the versions in
+    their keys (see app.core.data_version), so every process stops serving
+    results derived from older data once it has read the new version.
+    """
+    __tablename__ = "data_versions"
+    
+    scope: Mapped[str] = mapped_column(String(100), primary_key=True)
+    version: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
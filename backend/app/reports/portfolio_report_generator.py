@@ -11,14 +11,20 @@ File structure: reports/{slugified_portfolio_name}_{date}/
 """
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
+import multiprocessing
 import re
-from dataclasses import dataclass
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass, field
 from datetime import date, datetime
 from pathlib import Path
-from typing import Any, Dict, Iterable, Literal, Mapping, Optional, TypedDict
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Literal, Mapping, Optional, Tuple, TypedDict
+from app.config import settings
 from app.core.datetime_utils import utc_now, to_utc_iso8601, to_iso_date
+from app.core.ttl_cache import TTLCache
 
 # TYPE-CHECKING ONLY imports to avoid importing heavy deps at module import time
 from typing import TYPE_CHECKING
@@ -29,6 +35,17 @@ if TYPE_CHECKING:  # pragma: no cover
 
 logger = logging.getLogger(__name__)
 
+# Collected report data is reused for reruns of the same report within this window
+REPORT_DATA_CACHE_TTL = 900  # seconds
+REPORT_DATA_CACHE_MAXSIZE = 256  # portfolios x anchor dates
+
+# Bulk generation: each report collects with up to this many queries at once,
+# each on its own pooled connection
+REPORT_COLLECTION_QUERIES = 6
+# Portfolios reported concurrently, sized so all their collection queries fit in
+# the engine's pool plus overflow (2 with the default 5 + 10)
+REPORT_BULK_WORKERS = max(1, (settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW) // REPORT_COLLECTION_QUERIES)
+
 
 class PortfolioReportGenerator:
     """Portfolio Report Generator class wrapper for async report generation."""
@@ -37,33 +54,45 @@ class PortfolioReportGenerator:
         """Initialize the generator with a database session."""
         self.db = db
     
-    async def generate_report(
+    async def generate_reports(
         self,
         portfolio_id: str,
         report_date: date,
-        format: Literal["md", "json", "csv"] = "md"
-    ) -> str:
-        """Generate report using instance method."""
-        # Create ReportRequest object
+        formats: Iterable[AllowedFormat] = ("md", "json", "csv"),
+        use_cache: bool = True,
+        parallel_queries: bool = False
+    ) -> Dict[str, str]:
+        """Generate several formats from a single data collection and write them.
+        
+        Pass parallel_queries=True only when this generator's session is
+        read-only (see ReportRequest.parallel_queries).
+        
+        Returns:
+            Dict mapping each generated format to its file path
+        """
         request = ReportRequest(
             portfolio_id=str(portfolio_id),
             as_of=report_date,
-            formats={format},
-            write_to_disk=True
+            formats=frozenset(formats),
+            write_to_disk=True,
+            use_cache=use_cache,
+            parallel_queries=parallel_queries
         )
+        _, written_files = await _generate_report_files(self.db, request)
+        return {fmt: str(path) for fmt, path in written_files.items()}
+    
+    async def generate_report(
+        self,
+        portfolio_id: str,
+        report_date: date,
+        format: Literal["md", "json", "csv"] = "md"
+    ) -> str:
+        """Generate report using instance method."""
+        file_paths = await self.generate_reports(portfolio_id, report_date, formats={format})
         
-        # Call the main generate function which handles file writing internally
-        artifacts = await generate_portfolio_report(self.db, request)
-        
-        # Return success/failure message
-        if artifacts and format in artifacts:
-            # Build expected file path
-            from pathlib import Path
-            portfolio_slug = artifacts.get("meta", {}).get("portfolio_slug", "unknown")
-            report_dir = Path("reports") / f"{portfolio_slug}_{report_date}"
-            file_ext = "md" if format == "md" else format
-            file_path = report_dir / f"portfolio_report.{file_ext}"
-            return str(file_path)
+        # Return file path or failure message
+        if format in file_paths:
+            return file_paths[format]
         
         return f"Report generation failed for format: {format}"
 
@@ -88,6 +117,59 @@ class ReportRequest:
     as_of: Optional[date] = None
     formats: Iterable[AllowedFormat] = ("md", "json", "csv")
     write_to_disk: bool = True  # Whether to write files to disk
+    use_cache: bool = True  # Serve collected data from the report data cache when present
+    parallel_queries: bool = False  # Collect on extra pooled connections; only for read-only sessions
+
+
+class ReportDataCache:
+    """TTL + LRU cache of collected report data keyed by (portfolio, anchor date).
+    
+    Report data is anchored on the latest snapshot on or before the requested
+    date, so the requested date is mapped to the anchor date it resolved to;
+    a repeated request is answered without any query. The batch invalidates a
+    portfolio before it recalculates it.
+    """
+    
+    def __init__(self, ttl_seconds: float = REPORT_DATA_CACHE_TTL, maxsize: int = REPORT_DATA_CACHE_MAXSIZE):
+        self._data = TTLCache(ttl_seconds, maxsize)
+        # (portfolio, requested date) -> anchor date
+        self._anchors = TTLCache(ttl_seconds, maxsize)
+    
+    def get(self, portfolio_id: str, as_of: date) -> Optional[Dict[str, Any]]:
+        _, anchor = self._anchors.get((str(portfolio_id), to_iso_date(as_of)))
+        # An unknown date looks up (portfolio, None), which counts as a miss
+        found, data = self._data.get((str(portfolio_id), anchor))
+        return data if found else None
+    
+    def set(self, portfolio_id: str, as_of: date, data: Dict[str, Any]) -> None:
+        anchor = data["meta"]["anchor_date"]
+        self._data.set((str(portfolio_id), anchor), data)
+        self._anchors.set((str(portfolio_id), to_iso_date(as_of)), anchor)
+    
+    def invalidate(self, portfolio_id: str) -> int:
+        """Drop all cached report data of a portfolio."""
+        self._anchors.invalidate_prefix(str(portfolio_id))
+        return self._data.invalidate_prefix(str(portfolio_id))
+    
+    def clear(self) -> None:
+        self._data.clear()
+        self._anchors.clear()
+    
+    def info(self) -> Dict[str, Any]:
+        return self._data.info()
+
+
+_report_data_cache = ReportDataCache()
+
+
+def invalidate_report_data(portfolio_id: str) -> int:
+    """Drop cached report data of a portfolio (e.g. before it is recalculated)."""
+    return _report_data_cache.invalidate(portfolio_id)
+
+
+def get_report_data_cache_stats() -> Dict[str, Any]:
+    """Hit/miss statistics of the report data cache."""
+    return _report_data_cache.info()
 
 
 def slugify(text: str) -> str:
@@ -170,10 +252,61 @@ async def generate_portfolio_report(
 
     Notes
     -----
-    - Collects data from all calculation engines
+    - Collects data from all calculation engines once (or serves it from the
+      report data cache) and renders every requested format from it
     - Generates reports in requested formats (md, json, csv)
     - Optionally writes files to disk in reports/{portfolio_name}_{date}/
     """
+    artifacts, _ = await _generate_report_files(db, request)
+    return artifacts
+
+
+def render_report_format(data: Mapping[str, Any], fmt: AllowedFormat) -> Any:
+    """Render one format from collected report data."""
+    if fmt == "md":
+        return build_markdown_report(data)
+    if fmt == "json":
+        return build_json_report(data)
+    return build_csv_report(data)
+
+
+def render_report_formats(data: Mapping[str, Any], formats: Iterable[AllowedFormat]) -> ReportArtifacts:
+    """Render several formats from collected report data in the calling thread or process."""
+    return {fmt: render_report_format(data, fmt) for fmt in formats}
+
+
+async def render_report_artifacts(
+    data: Mapping[str, Any],
+    formats: Iterable[AllowedFormat],
+    executor: Optional[Executor] = None,
+) -> ReportArtifacts:
+    """Render the requested formats from collected data.
+    
+    The builders are pure-Python string building, so without an executor the
+    formats are rendered inline (threads would only add hand-offs under the
+    GIL). With an executor (a ProcessPoolExecutor for bulk runs) the data is
+    shipped once and all formats are rendered in a single task.
+    """
+    requested = []
+    for fmt in dict.fromkeys(formats):
+        if fmt in ("md", "json", "csv"):
+            requested.append(fmt)
+        else:  # pragma: no cover - guarded by AllowedFormat Literal
+            logger.warning("Unknown format requested: %s", fmt)
+    
+    if executor is not None:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, render_report_formats, data, requested)
+    
+    return render_report_formats(data, requested)
+
+
+async def _generate_report_files(
+    db: "AsyncSession",
+    request: ReportRequest,
+    executor: Optional[Executor] = None,
+) -> Tuple[ReportArtifacts, Dict[str, Path]]:
+    """Collect (or reuse) report data, render all requested formats and write them in one pass."""
     logger.info(
         "Starting portfolio report generation: portfolio_id=%s, as_of=%s, formats=%s, write_to_disk=%s",
         request.portfolio_id,
@@ -181,34 +314,34 @@ async def generate_portfolio_report(
         list(request.formats),
         request.write_to_disk,
     )
+    report_date = request.as_of or date.today()
 
-    # Collect data from database
-    data = await _collect_report_data(db, portfolio_id=request.portfolio_id, as_of=request.as_of)
-    
-    # Check if we got valid data
-    if "error" in data.get("meta", {}):
-        logger.error(f"Failed to collect data: {data['meta']['error']}")
-        # Return empty artifacts for error case
-        return {}
-
-    artifacts: ReportArtifacts = {}
-    for fmt in request.formats:
-        if fmt == "md":
-            artifacts["md"] = build_markdown_report(data)
-        elif fmt == "json":
-            artifacts["json"] = build_json_report(data)
-        elif fmt == "csv":
-            artifacts["csv"] = build_csv_report(data)
-        else:  # pragma: no cover - guarded by AllowedFormat Literal
-            logger.warning("Unknown format requested: %s", fmt)
+    # Collect data from database (once for all formats)
+    data = _report_data_cache.get(request.portfolio_id, report_date) if request.use_cache else None
+    if data is None:
+        data = await _collect_report_data(
+            db, portfolio_id=request.portfolio_id, as_of=request.as_of, parallel=request.parallel_queries
+        )
+        
+        # Check if we got valid data
+        if "error" in data.get("meta", {}):
+            logger.error(f"Failed to collect data: {data['meta']['error']}")
+            # Return empty artifacts for error case
+            return {}, {}
+        _report_data_cache.set(request.portfolio_id, report_date, data)
+    else:
+        logger.info("Using cached report data for portfolio_id=%s, anchor_date=%s",
+                    request.portfolio_id, data["meta"]["anchor_date"])
+
+    artifacts = await render_report_artifacts(data, request.formats, executor)
 
     # Write to disk if requested
+    written_files: Dict[str, Path] = {}
     if request.write_to_disk and artifacts:
         portfolio_name = data.get("meta", {}).get("portfolio_name", "unknown")
-        report_date = request.as_of or date.today()
         
         report_dir = create_report_directory(portfolio_name, report_date)
-        written_files = write_report_files(report_dir, artifacts, portfolio_name)
+        written_files = await asyncio.to_thread(write_report_files, report_dir, artifacts, portfolio_name)
         
         logger.info(
             "Wrote %d report files to %s",
@@ -221,42 +354,180 @@ async def generate_portfolio_report(
         request.portfolio_id,
         list(artifacts.keys()),
     )
-    return artifacts
+    return artifacts, written_files
+
+
+@dataclass
+class ReportRunResult:
+    """Outcome and wall time of one portfolio in a bulk report run."""
+    
+    portfolio_id: str
+    seconds: float
+    files: Dict[str, str] = field(default_factory=dict)
+    formats: List[str] = field(default_factory=list)
+    error: Optional[str] = None
+    
+    @property
+    def success(self) -> bool:
+        return self.error is None
+
+
+async def generate_reports_bulk(
+    portfolio_ids: Iterable[str],
+    *,
+    as_of: Optional[date] = None,
+    formats: Iterable[AllowedFormat] = ("md", "json", "csv"),
+    write_to_disk: bool = True,
+    max_workers: int = REPORT_BULK_WORKERS,
+    render_processes: Optional[int] = None,
+    on_result: Optional[Callable[[ReportRunResult], None]] = None,
+) -> List[ReportRunResult]:
+    """Generate reports for many portfolios with a bounded pool of async workers.
+    
+    Each worker takes the next portfolio from a shared queue and generates it on
+    its own database session. Rendering runs on a process pool of
+    ``render_processes`` processes (default: one per CPU); pass 0 to render
+    inline in this process instead. A failing portfolio is recorded in its
+    result and does not stop the run.
+    
+    Args:
+        portfolio_ids: Portfolios to report on
+        as_of: Report date (default: today)
+        formats: Formats to generate for every portfolio
+        write_to_disk: Write files under reports/ (otherwise render only)
+        max_workers: Portfolios generated concurrently
+        render_processes: Size of the rendering process pool; 0 renders inline
+        on_result: Called with each result as soon as its portfolio finishes
+    
+    Returns:
+        One ReportRunResult per portfolio, in completion order
+    """
+    from app.database import AsyncSessionLocal
+    
+    queue: "asyncio.Queue[str]" = asyncio.Queue()
+    for portfolio_id in portfolio_ids:
+        queue.put_nowait(str(portfolio_id))
+    requested_formats = frozenset(formats)
+    results: List[ReportRunResult] = []
+    
+    async def worker(executor: Optional[Executor]) -> None:
+        while True:
+            try:
+                portfolio_id = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            
+            started = time.perf_counter()
+            request = ReportRequest(
+                portfolio_id=portfolio_id,
+                as_of=as_of,
+                formats=requested_formats,
+                write_to_disk=write_to_disk,
+                parallel_queries=True  # Fresh session per portfolio, never written to
+            )
+            try:
+                async with AsyncSessionLocal() as db:
+                    artifacts, written_files = await _generate_report_files(db, request, executor)
+                result = ReportRunResult(
+                    portfolio_id=portfolio_id,
+                    seconds=time.perf_counter() - started,
+                    files={fmt: str(path) for fmt, path in written_files.items()},
+                    formats=sorted(artifacts),
+                    error=None if artifacts else "no report data"
+                )
+            except Exception as e:
+                logger.error(f"Report generation failed for portfolio {portfolio_id}: {e}")
+                result = ReportRunResult(
+                    portfolio_id=portfolio_id,
+                    seconds=time.perf_counter() - started,
+                    error=str(e)
+                )
+            
+            results.append(result)
+            if on_result is not None:
+                on_result(result)
+    
+    worker_count = max(1, min(max_workers, queue.qsize()))
+    if render_processes == 0:
+        await asyncio.gather(*(worker(None) for _ in range(worker_count)))
+    else:
+        # Never fork this process: it runs threads, an event loop and a live connection pool
+        start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        with ProcessPoolExecutor(
+            max_workers=render_processes, mp_context=multiprocessing.get_context(start_method)
+        ) as executor:
+            await asyncio.gather(*(worker(executor) for _ in range(worker_count)))
+    
+    return results
 
 
 # ---------------------------------------------------------------------------
 # Data collection (stubs) — will be implemented in TODO2.md line 70
 # ---------------------------------------------------------------------------
+async def _run_queries(
+    db: "AsyncSession",
+    queries: Mapping[str, Callable[["AsyncSession"], Awaitable[Any]]],
+    parallel: bool = False,
+) -> Dict[str, Any]:
+    """Run independent read queries, concurrently on their own pooled connections when allowed.
+
+    Every query function must fully materialize its result. Queries run one
+    after another on ``db`` unless the caller opts in with ``parallel`` for a
+    read-only session. Even then they stay on ``db`` when the session is not
+    bound to an engine or has pending changes or an open transaction, which
+    may hold flushed, uncommitted writes that other connections would not see.
+    """
+    from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+    bind = db.bind if isinstance(db, AsyncSession) else None
+    if (not parallel or bind is None or db.in_transaction()
+            or db.new or db.dirty or db.deleted):
+        return {name: await query(db) for name, query in queries.items()}
+
+    session_factory = async_sessionmaker(bind, class_=AsyncSession, expire_on_commit=False)
+
+    async def run(query: Callable[["AsyncSession"], Awaitable[Any]]) -> Any:
+        async with session_factory() as session:
+            return await query(session)
+
+    results = await asyncio.gather(*(run(query) for query in queries.values()))
+    return dict(zip(queries, results))
+
+
 async def _collect_report_data(
     db: "AsyncSession",
     *,
     portfolio_id: str,
     as_of: Optional[date],
+    parallel: bool = False,
 ) -> Dict[str, Any]:
     """Collect data needed for all report formats.
 
     Uses snapshot date as anchor for cross-engine consistency.
     Maintains Decimal precision for financial calculations.
 
-    Fetches:
+    Fetches (one set-based query each; concurrently when ``parallel`` is set):
     - portfolio_snapshot: latest PortfolioSnapshot for as_of (or most recent)
     - correlation_summary: latest CorrelationCalculation summary
     - exposures: output from calculate_portfolio_exposures()
     - greeks: output from aggregate_portfolio_greeks()
-    - factors: PositionFactorExposure aggregated/selected for display
-    - positions: lightweight listing for CSV export
+    - factors: latest FactorExposure per factor for display
+    - positions: lightweight listing for CSV export, with sector/industry
+    - stress_test_results: StressTestResult rows for the anchor date
 
     Returns a dict to feed the format builders below.
     """
     from decimal import Decimal
     from sqlalchemy import select, and_, func
-    from sqlalchemy.orm import selectinload
     from uuid import UUID
     from app.models.users import Portfolio
     from app.models.positions import Position
     from app.models.snapshots import PortfolioSnapshot
     from app.models.correlations import CorrelationCalculation
-    from app.models.market_data import PositionFactorExposure, PositionGreeks
+    from app.models.market_data import (
+        FactorDefinition, FactorExposure, MarketDataCache, PositionGreeks,
+        StressTestResult, StressTestScenario
+    )
     from app.calculations.portfolio import (
         calculate_portfolio_exposures,
         aggregate_portfolio_greeks
@@ -274,97 +545,98 @@ async def _collect_report_data(
     # Initial report date (may be adjusted by snapshot)
     initial_date = as_of or date.today()
     
-    # 1. Fetch Portfolio with basic info
-    portfolio_result = await db.execute(
-        select(Portfolio)
-        .where(Portfolio.id == portfolio_uuid)
-        .options(selectinload(Portfolio.positions))
-    )
-    portfolio = portfolio_result.scalar_one_or_none()
+    # 1. Fetch Portfolio basic info and the latest Portfolio Snapshot (establishes anchor date)
+    async def fetch_portfolio(session):
+        result = await session.execute(
+            select(Portfolio.id, Portfolio.name, Portfolio.created_at).where(Portfolio.id == portfolio_uuid)
+        )
+        return result.one_or_none()
+    
+    async def fetch_snapshot(session):
+        result = await session.execute(
+            select(PortfolioSnapshot)
+            .where(
+                and_(
+                    PortfolioSnapshot.portfolio_id == portfolio_uuid,
+                    PortfolioSnapshot.snapshot_date <= initial_date
+                )
+            )
+            .order_by(PortfolioSnapshot.snapshot_date.desc())
+            .limit(1)
+        )
+        return result.scalar_one_or_none()
+    
+    anchors = await _run_queries(db, {"portfolio": fetch_portfolio, "snapshot": fetch_snapshot}, parallel)
+    portfolio = anchors["portfolio"]
+    snapshot = anchors["snapshot"]
     
     if not portfolio:
         logger.warning(f"Portfolio not found: {portfolio_id}")
         return {
             "meta": {
                 "portfolio_id": portfolio_id,
-                "as_of": to_iso_date(report_date),
+                "as_of": to_iso_date(initial_date),
                 "generated_at": to_utc_iso8601(utc_now()),
                 "error": "Portfolio not found"
             }
         }
     
-    # 2. Fetch latest Portfolio Snapshot (establishes anchor date)
-    snapshot_result = await db.execute(
-        select(PortfolioSnapshot)
-        .where(
-            and_(
-                PortfolioSnapshot.portfolio_id == portfolio_uuid,
-                PortfolioSnapshot.snapshot_date <= initial_date
-            )
-        )
-        .order_by(PortfolioSnapshot.snapshot_date.desc())
-        .limit(1)
-    )
-    snapshot = snapshot_result.scalar_one_or_none()
-    
     # IMPORTANT: Use snapshot date as anchor for all other queries
     anchor_date = snapshot.snapshot_date if snapshot else initial_date
     logger.info(f"Using anchor date {anchor_date} for all calculation engines")
     
-    # 3. Fetch latest Correlation Calculation (using anchor date)
-    correlation_result = await db.execute(
-        select(CorrelationCalculation)
-        .where(
-            and_(
-                CorrelationCalculation.portfolio_id == portfolio_uuid,
-                CorrelationCalculation.calculation_date <= anchor_date
-            )
-        )
-        .order_by(CorrelationCalculation.calculation_date.desc())
-        .limit(1)
+    # Active positions as of the anchor date; reused as a subquery by the Greeks and sector queries
+    position_filter = and_(
+        Position.portfolio_id == portfolio_uuid,
+        Position.entry_date <= anchor_date,
+        Position.deleted_at.is_(None)
     )
-    correlation = correlation_result.scalar_one_or_none()
-    
-    # 4. Fetch active positions (using anchor date)
-    positions_result = await db.execute(
-        select(Position)
-        .where(
-            and_(
-                Position.portfolio_id == portfolio_uuid,
-                Position.entry_date <= anchor_date,
-                Position.deleted_at.is_(None)
+    
+    # 2. Latest Correlation Calculation (using anchor date)
+    async def fetch_correlation(session):
+        result = await session.execute(
+            select(CorrelationCalculation)
+            .where(
+                and_(
+                    CorrelationCalculation.portfolio_id == portfolio_uuid,
+                    CorrelationCalculation.calculation_date <= anchor_date
+                )
             )
+            .order_by(CorrelationCalculation.calculation_date.desc())
+            .limit(1)
         )
-    )
-    positions = list(positions_result.scalars().all())
+        return result.scalar_one_or_none()
     
-    # 5. BULK FETCH all Greeks in one query (fixes N+1 problem)
-    greeks_by_position = {}
-    if positions:
-        position_ids = [p.id for p in positions]
-        
-        # Subquery to get max calculation_date per position
-        from sqlalchemy import select as sql_select
-        from sqlalchemy.sql import func as sql_func
-        
+    # 3. Active positions (using anchor date)
+    async def fetch_positions(session):
+        result = await session.execute(select(Position).where(position_filter))
+        return list(result.scalars().all())
+    
+    # 4. Latest Greeks per position in one query
+    async def fetch_greeks(session):
         latest_dates_subq = (
-            sql_select(
+            select(
                 PositionGreeks.position_id,
-                sql_func.max(PositionGreeks.calculation_date).label("max_date")
+                func.max(PositionGreeks.calculation_date).label("max_date")
             )
             .where(
                 and_(
-                    PositionGreeks.position_id.in_(position_ids),
+                    PositionGreeks.position_id.in_(select(Position.id).where(position_filter)),
                     PositionGreeks.calculation_date <= anchor_date
                 )
             )
             .group_by(PositionGreeks.position_id)
             .subquery()
         )
-        
-        # Fetch all latest Greeks in one query
-        greeks_result = await db.execute(
-            select(PositionGreeks)
+        result = await session.execute(
+            select(
+                PositionGreeks.position_id,
+                PositionGreeks.delta,
+                PositionGreeks.gamma,
+                PositionGreeks.theta,
+                PositionGreeks.vega,
+                PositionGreeks.rho
+            )
             .join(
                 latest_dates_subq,
                 and_(
@@ -373,42 +645,112 @@ async def _collect_report_data(
                 )
             )
         )
-        
-        for greek_record in greeks_result.scalars().all():
-            greeks_by_position[greek_record.position_id] = {
-                "delta": greek_record.delta,  # Keep as Decimal
-                "gamma": greek_record.gamma,  # Keep as Decimal
-                "theta": greek_record.theta,  # Keep as Decimal
-                "vega": greek_record.vega,    # Keep as Decimal
-                "rho": greek_record.rho       # Keep as Decimal
-            }
+        return result.all()
     
-    # 6. Fetch sector/industry data from MarketDataCache
-    from app.models.market_data import MarketDataCache
-    sector_industry_map = {}
-    if positions:
-        # Get unique symbols
-        symbols = list(set(p.symbol for p in positions))
-        
-        # Fetch latest market data for each symbol (includes sector/industry)
-        for symbol in symbols:
-            market_data_result = await db.execute(
-                select(MarketDataCache)
+    # 5. Sector/industry from the latest MarketDataCache row per position symbol in one query
+    async def fetch_sectors(session):
+        latest_dates_subq = (
+            select(
+                MarketDataCache.symbol,
+                func.max(MarketDataCache.date).label("max_date")
+            )
+            .where(
+                and_(
+                    MarketDataCache.symbol.in_(select(Position.symbol).where(position_filter)),
+                    MarketDataCache.date <= anchor_date
+                )
+            )
+            .group_by(MarketDataCache.symbol)
+            .subquery()
+        )
+        result = await session.execute(
+            select(MarketDataCache.symbol, MarketDataCache.sector, MarketDataCache.industry)
+            .join(
+                latest_dates_subq,
+                and_(
+                    MarketDataCache.symbol == latest_dates_subq.c.symbol,
+                    MarketDataCache.date == latest_dates_subq.c.max_date
+                )
+            )
+        )
+        return result.all()
+    
+    # 6. Portfolio-level factor exposures: the latest calculation of each factor (using anchor date)
+    # We calculate at portfolio level during batch processing
+    async def fetch_factors(session):
+        latest_dates_subq = (
+            select(
+                FactorExposure.factor_id,
+                func.max(FactorExposure.calculation_date).label("max_date")
+            )
+            .where(
+                and_(
+                    FactorExposure.portfolio_id == portfolio_uuid,
+                    FactorExposure.calculation_date <= anchor_date
+                )
+            )
+            .group_by(FactorExposure.factor_id)
+            .subquery()
+        )
+        result = await session.execute(
+            select(FactorExposure, FactorDefinition)
+            .join(FactorDefinition, FactorExposure.factor_id == FactorDefinition.id)
+            .join(
+                latest_dates_subq,
+                and_(
+                    FactorExposure.factor_id == latest_dates_subq.c.factor_id,
+                    FactorExposure.calculation_date == latest_dates_subq.c.max_date
+                )
+            )
+            .where(FactorExposure.portfolio_id == portfolio_uuid)
+            .order_by(func.abs(FactorExposure.exposure_value).desc())
+        )
+        return list(result.all())
+    
+    # 7. Stress test results if available
+    async def fetch_stress_results(session):
+        try:
+            result = await session.execute(
+                select(StressTestResult, StressTestScenario)
+                .join(StressTestScenario, StressTestResult.scenario_id == StressTestScenario.id)
                 .where(
                     and_(
-                        MarketDataCache.symbol == symbol,
-                        MarketDataCache.date <= anchor_date
+                        StressTestResult.portfolio_id == portfolio_uuid,
+                        StressTestResult.calculation_date == anchor_date
                     )
                 )
-                .order_by(MarketDataCache.date.desc())
-                .limit(1)
             )
-            market_data = market_data_result.scalar_one_or_none()
-            if market_data:
-                sector_industry_map[symbol] = {
-                    "sector": market_data.sector,
-                    "industry": market_data.industry
-                }
+            return list(result.all())
+        except Exception as e:
+            logger.warning(f"Could not fetch stress test results: {e}")
+            return []
+    
+    # Stress results last: a failure there must not affect the other queries on a shared session
+    collected = await _run_queries(db, {
+        "correlation": fetch_correlation,
+        "positions": fetch_positions,
+        "greeks": fetch_greeks,
+        "sectors": fetch_sectors,
+        "factors": fetch_factors,
+        "stress_results": fetch_stress_results,
+    }, parallel)
+    correlation = collected["correlation"]
+    positions = collected["positions"]
+    
+    greeks_by_position = {
+        row.position_id: {
+            "delta": row.delta,  # Keep as Decimal
+            "gamma": row.gamma,  # Keep as Decimal
+            "theta": row.theta,  # Keep as Decimal
+            "vega": row.vega,    # Keep as Decimal
+            "rho": row.rho       # Keep as Decimal
+        }
+        for row in collected["greeks"]
+    }
+    sector_industry_map = {
+        row.symbol: {"sector": row.sector, "industry": row.industry}
+        for row in collected["sectors"]
+    }
     
     # 7. Prepare position data with Decimal precision maintained
     position_data = []
@@ -461,72 +803,24 @@ async def _collect_report_data(
         exposures = calculate_portfolio_exposures(position_data)
         greeks_aggregated = aggregate_portfolio_greeks(position_data)
     
-    # 7. Fetch Factor Exposures (using anchor date)
-    from app.models.market_data import FactorDefinition, FactorExposure
-    
-    # Get portfolio-level factor exposures directly from FactorExposure table
-    # This is the correct approach - we calculate at portfolio level during batch processing
-    factors_result = await db.execute(
-        select(
-            FactorExposure,
-            FactorDefinition
-        )
-        .join(FactorDefinition, FactorExposure.factor_id == FactorDefinition.id)
-        .where(
-            and_(
-                FactorExposure.portfolio_id == portfolio_id,
-                FactorExposure.calculation_date <= anchor_date
-            )
-        )
-        .order_by(
-            FactorExposure.calculation_date.desc(),
-            func.abs(FactorExposure.exposure_value).desc()
-        )
-    )
-    all_factor_records = list(factors_result.all())
-    
-    # Get the most recent exposure for each factor
-    latest_factors = {}
-    for exposure, factor in all_factor_records:
-        if factor.id not in latest_factors:
-            latest_factors[factor.id] = (exposure, factor)
-    
     # Sort by exposure magnitude and take top 15
     factor_exposures = sorted(
-        latest_factors.values(),
+        collected["factors"],
         key=lambda x: abs(x[0].exposure_value) if x[0].exposure_value else 0,
         reverse=True
     )[:15]
     
-    # 8. Fetch stress test results if available
-    from app.models.market_data import StressTestResult, StressTestScenario
-    stress_test_results = []
-    try:
-        stress_stmt = (
-            select(StressTestResult, StressTestScenario)
-            .join(StressTestScenario, StressTestResult.scenario_id == StressTestScenario.id)
-            .where(
-                and_(
-                    StressTestResult.portfolio_id == portfolio_id,
-                    StressTestResult.calculation_date == anchor_date
-                )
-            )
-        )
-        stress_result = await db.execute(stress_stmt)
-        stress_test_data = stress_result.all()
-        
-        for result, scenario in stress_test_data:
-            stress_test_results.append({
-                'scenario_name': scenario.name,
-                'category': scenario.category,
-                'direct_pnl': float(result.direct_pnl),
-                'correlated_pnl': float(result.correlated_pnl),
-                'correlation_effect': float(result.correlation_effect),
-                'pnl_impact': float(result.correlated_pnl)  # Use correlated P&L as the main impact
-            })
-    except Exception as e:
-        logger.warning(f"Could not fetch stress test results: {e}")
-        stress_test_results = []
+    stress_test_results = [
+        {
+            'scenario_name': scenario.name,
+            'category': scenario.category,
+            'direct_pnl': float(result.direct_pnl),
+            'correlated_pnl': float(result.correlated_pnl),
+            'correlation_effect': float(result.correlation_effect),
+            'pnl_impact': float(result.correlated_pnl)  # Use correlated P&L as the main impact
+        }
+        for result, scenario in collected["stress_results"]
+    ]
     
     # 9. Build the complete data structure (maintaining Decimal precision)
     return {
@@ -12,11 +12,12 @@ from polygon import RESTClient
 # import yfinance as yf  # Removed - using FMP primary architecture
 import pandas as pd
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, insert, update
+from sqlalchemy import and_, func, select, insert, update
 from sqlalchemy.dialects.postgresql import insert as pg_insert
 
 from app.config import settings
 from app.models.market_data import MarketDataCache
+from app.core.data_version import mark_market_data_changed
 from app.core.logging import get_logger
 from app.services.rate_limiter import polygon_rate_limiter, ExponentialBackoff
 from app.clients import market_data_factory, DataType
@@ -623,6 +624,9 @@ class MarketDataService:
                 total_records += len(records_to_upsert)
                 updated_symbols += 1
         
+        if total_records:
+            # Advanced by the commit below, together with the prices
+            mark_market_data_changed(db)
         await db.commit()
         
         stats = {
@@ -654,26 +658,25 @@ class MarketDataService:
         if not target_date:
             target_date = date.today()
         
-        # Query cached prices
-        stmt = select(MarketDataCache).where(
-            MarketDataCache.symbol.in_([s.upper() for s in symbols]),
-            MarketDataCache.date <= target_date
-        ).order_by(MarketDataCache.symbol, MarketDataCache.date.desc())
+        # Query only the most recent cached row per symbol
+        latest = (
+            select(MarketDataCache.symbol, func.max(MarketDataCache.date).label('latest_date'))
+            .where(
+                MarketDataCache.symbol.in_([s.upper() for s in symbols]),
+                MarketDataCache.date <= target_date
+            )
+            .group_by(MarketDataCache.symbol)
+            .subquery()
+        )
+        stmt = select(MarketDataCache).join(
+            latest,
+            and_(MarketDataCache.symbol == latest.c.symbol, MarketDataCache.date == latest.c.latest_date)
+        )
         
         result = await db.execute(stmt)
-        cached_data = result.scalars().all()
-        
-        # Group by symbol and get most recent price
-        prices = {}
-        for symbol in symbols:
-            symbol_upper = symbol.upper()
-            symbol_data = [d for d in cached_data if d.symbol == symbol_upper]
-            if symbol_data:
-                prices[symbol] = symbol_data[0].close
-            else:
-                prices[symbol] = None
+        latest_close = {record.symbol: record.close for record in result.scalars().all()}
         
-        return prices
+        return {symbol: latest_close.get(symbol.upper()) for symbol in symbols}
     
     async def bulk_fetch_and_cache(
         self, 
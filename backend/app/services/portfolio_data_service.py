@@ -10,6 +10,7 @@ from datetime import datetime, timedelta
 from app.models.users import Portfolio
 from app.models.positions import Position, PositionType
 from app.models.market_data import MarketDataCache
+from app.models.snapshots import PortfolioSnapshot
 from app.schemas.data import (
     TopPositionsResponse, 
     PortfolioSummaryResponse, 
@@ -18,15 +19,100 @@ from app.schemas.data import (
     HistoricalPricesResponse,
     PricePoint
 )
-from app.core.datetime_utils import utc_now, to_utc_iso8601
+from app.core.data_version import get_data_version
+from app.core.datetime_utils import utc_now, to_utc_iso8601, to_iso_date
 from app.core.logging import get_logger
+from app.core.ttl_cache import TTLCache
 
 logger = get_logger(__name__)
 
+# Chat context per portfolio is served from memory for this long; a new batch
+# run for the portfolio (new data version) replaces it earlier
+PORTFOLIO_CONTEXT_CACHE_TTL = 300  # seconds
+PORTFOLIO_CONTEXT_CACHE_MAXSIZE = 1024  # portfolios
+
+
+# Keyed by (portfolio_id, data version); contexts of older versions are never
+# looked up again and age out through the TTL/LRU eviction
+_portfolio_context_cache = TTLCache(PORTFOLIO_CONTEXT_CACHE_TTL, PORTFOLIO_CONTEXT_CACHE_MAXSIZE, copy_value=dict)
+
 
 class PortfolioDataService:
     """Service layer for Agent-optimized portfolio data operations"""
     
+    async def get_portfolio_context(
+        self,
+        db: AsyncSession,
+        portfolio_id: UUID
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Get the lightweight portfolio summary used as chat context
+        
+        Reads the latest PortfolioSnapshot (precomputed by the batch snapshot
+        stage) in one indexed lookup, falling back to a single aggregate over
+        active positions for portfolios without snapshots. Results are cached
+        in memory until the TTL passes or the portfolio's data version advances.
+        
+        Args:
+            db: Database session
+            portfolio_id: Portfolio UUID
+            
+        Returns:
+            Dict with portfolio_id, total_value, position_count and as_of
+            (snapshot date, None for the fallback), or None if the portfolio
+            has neither snapshots nor active positions
+        """
+        cache_key = (str(portfolio_id), get_data_version(portfolio_id))
+        found, context = _portfolio_context_cache.get(cache_key)
+        if found:
+            return context
+        
+        snapshot_result = await db.execute(
+            select(
+                PortfolioSnapshot.snapshot_date,
+                PortfolioSnapshot.total_value,
+                PortfolioSnapshot.num_positions
+            )
+            .where(PortfolioSnapshot.portfolio_id == portfolio_id)
+            .order_by(desc(PortfolioSnapshot.snapshot_date))
+            .limit(1)
+        )
+        snapshot = snapshot_result.one_or_none()
+        
+        if snapshot is not None:
+            context = {
+                'portfolio_id': str(portfolio_id),
+                'total_value': float(snapshot.total_value),
+                'position_count': snapshot.num_positions,
+                'as_of': to_iso_date(snapshot.snapshot_date)
+            }
+        else:
+            positions_result = await db.execute(
+                select(
+                    func.count(Position.id),
+                    func.coalesce(func.sum(func.abs(Position.market_value)), 0)
+                )
+                .where(
+                    and_(
+                        Position.portfolio_id == portfolio_id,
+                        Position.exit_date.is_(None),
+                        Position.deleted_at.is_(None)
+                    )
+                )
+            )
+            position_count, total_value = positions_result.one()
+            if not position_count:
+                return None
+            context = {
+                'portfolio_id': str(portfolio_id),
+                'total_value': float(total_value),
+                'position_count': position_count,
+                'as_of': None
+            }
+        
+        _portfolio_context_cache.set(cache_key, context)
+        return context
+    
     async def get_top_positions(
         self,
         db: AsyncSession,
@@ -429,4 +515,9 @@ class PortfolioDataService:
             
         except Exception as e:
             logger.error(f"Error getting historical prices: {e}")
-            raise
\ No newline at end of file
+            raise
+
+
+def get_portfolio_context_cache_stats() -> Dict[str, Any]:
+    """Hit/miss statistics of the chat portfolio context cache."""
+    return _portfolio_context_cache.info()
@@ -0,0 +1,205 @@
+"""
+Treasury Yield Service - local store of FRED Treasury series for interest rate betas
+
+Observations are persisted in the treasury_yields table and synced
+incrementally: only dates after the last stored observation (or before the
+first, when a longer history is requested) are downloaded. Synced series are
+kept in memory, so every portfolio in a batch run reads the same aligned
+series without another FRED request or table read.
+
+With TREASURY_FIXTURE_DIR set, observations come from local <series_id>.csv
+files (FRED download format: date column, value column, '.' for missing)
+instead of FRED, e.g. for offline development and tests. Without a FRED key
+or fixtures, series are served from whatever is already stored.
+"""
+import asyncio
+from datetime import date, timedelta
+from decimal import Decimal
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import pandas as pd
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.core.logging import get_logger
+from app.models.market_data import TreasuryYield
+
+logger = get_logger(__name__)
+
+# A treasury yield row binds 6 parameters; stay well below the 32767 limit
+TREASURY_UPSERT_CHUNK_SIZE = 5000
+
+
+class TreasuryYieldService:
+    """Incrementally synced, memoized Treasury yield series"""
+
+    def __init__(self, api_key: Optional[str] = None, fixture_dir: Optional[str] = None):
+        self.api_key = settings.FRED_API_KEY if api_key is None else api_key
+        fixture_dir = settings.TREASURY_FIXTURE_DIR if fixture_dir is None else fixture_dir
+        self.fixture_dir = Path(fixture_dir) if fixture_dir else None
+        self._fred = None
+        self._lock = asyncio.Lock()
+        # series_id -> stored observations from _loaded_from onwards
+        self._series: Dict[str, pd.Series] = {}
+        self._loaded_from: Dict[str, date] = {}
+        # series_id -> (start, end) already synced with the source in this process
+        self._synced: Dict[str, Tuple[date, date]] = {}
+
+    @property
+    def data_source(self) -> Optional[str]:
+        """'fixture', 'fred' or None when only stored observations are available"""
+        if self.fixture_dir is not None:
+            return 'fixture'
+        if self.api_key:
+            return 'fred'
+        return None
+
+    def clear_cache(self) -> None:
+        """Forget in-memory series (stored observations are kept)"""
+        self._series.clear()
+        self._loaded_from.clear()
+        self._synced.clear()
+
+    async def get_series(
+        self,
+        db: AsyncSession,
+        series_id: str,
+        start_date: date,
+        end_date: date
+    ) -> pd.Series:
+        """
+        Yield observations of a series for [start_date, end_date]
+
+        Syncs the store with the source on first use for the range, then serves
+        from memory.
+
+        Args:
+            db: Database session
+            series_id: FRED series ID (e.g. 'DGS10')
+            start_date: First observation date
+            end_date: Last observation date
+
+        Returns:
+            Series of yields (percent) indexed by a DatetimeIndex; empty if none
+        """
+        async with self._lock:
+            synced = self._synced.get(series_id)
+            if synced is None or start_date < synced[0] or end_date > synced[1]:
+                if self.data_source is not None:
+                    await self.sync_series(db, series_id, start_date, end_date)
+                sync_start = min(start_date, synced[0]) if synced else start_date
+                sync_end = max(end_date, synced[1]) if synced else end_date
+                self._synced[series_id] = (sync_start, sync_end)
+                self._series.pop(series_id, None)
+
+            series = self._series.get(series_id)
+            if series is None or start_date < self._loaded_from[series_id]:
+                series = await self._load_stored(db, series_id, start_date)
+                self._series[series_id] = series
+                self._loaded_from[series_id] = start_date
+
+        return series.loc[pd.Timestamp(start_date):pd.Timestamp(end_date)]
+
+    async def sync_series(
+        self,
+        db: AsyncSession,
+        series_id: str,
+        start_date: date,
+        end_date: date
+    ) -> int:
+        """
+        Download and store the observations missing from [start_date, end_date]
+
+        Only the ranges before the first and after the last stored observation
+        are requested from the source.
+
+        Returns:
+            Number of observations stored
+        """
+        result = await db.execute(
+            select(func.min(TreasuryYield.date), func.max(TreasuryYield.date))
+            .where(TreasuryYield.series_id == series_id)
+        )
+        first_stored, last_stored = result.one()
+
+        if first_stored is None:
+            missing = [(start_date, end_date)]
+        else:
+            missing = []
+            if start_date < first_stored:
+                missing.append((start_date, first_stored - timedelta(days=1)))
+            if end_date > last_stored:
+                missing.append((last_stored + timedelta(days=1), end_date))
+
+        rows = []
+        for observation_start, observation_end in missing:
+            observations = await self._fetch_observations(series_id, observation_start, observation_end)
+            rows.extend(
+                {
+                    "series_id": series_id,
+                    "date": timestamp.date(),
+                    "value": Decimal(str(round(float(value), 4))),
+                    "data_source": self.data_source
+                }
+                for timestamp, value in observations.dropna().items()
+            )
+
+        for chunk_start in range(0, len(rows), TREASURY_UPSERT_CHUNK_SIZE):
+            stmt = pg_insert(TreasuryYield).values(rows[chunk_start:chunk_start + TREASURY_UPSERT_CHUNK_SIZE])
+            stmt = stmt.on_conflict_do_update(
+                constraint="uq_treasury_yields_series_date",
+                set_={"value": stmt.excluded.value, "data_source": stmt.excluded.data_source}
+            )
+            await db.execute(stmt)
+        if rows:
+            await db.commit()
+
+        logger.info(f"Synced {series_id} through {end_date}: {len(rows)} new observations")
+        return len(rows)
+
+    async def _load_stored(self, db: AsyncSession, series_id: str, start_date: date) -> pd.Series:
+        """Stored observations of a series from start_date onwards"""
+        result = await db.execute(
+            select(TreasuryYield.date, TreasuryYield.value)
+            .where(TreasuryYield.series_id == series_id, TreasuryYield.date >= start_date)
+            .order_by(TreasuryYield.date)
+        )
+        records = result.all()
+        return pd.Series(
+            [float(value) for _, value in records],
+            index=pd.DatetimeIndex([day for day, _ in records]),
+            name=series_id,
+            dtype=float
+        )
+
+    async def _fetch_observations(self, series_id: str, start_date: date, end_date: date) -> pd.Series:
+        """Observations from the local fixtures or FRED (the FRED client is blocking; run in a thread)"""
+        if self.fixture_dir is not None:
+            return self._read_fixture(series_id, start_date, end_date)
+
+        if self._fred is None:
+            from fredapi import Fred
+            self._fred = Fred(api_key=self.api_key)
+        return await asyncio.to_thread(
+            self._fred.get_series,
+            series_id,
+            observation_start=start_date,
+            observation_end=end_date
+        )
+
+    def _read_fixture(self, series_id: str, start_date: date, end_date: date) -> pd.Series:
+        path = self.fixture_dir / f"{series_id}.csv"
+        if not path.exists():
+            logger.warning(f"No Treasury fixture for {series_id} at {path}")
+            return pd.Series(dtype=float)
+
+        frame = pd.read_csv(path, index_col=0, parse_dates=True, na_values='.')
+        series = pd.to_numeric(frame.iloc[:, 0], errors='coerce')
+        return series.loc[pd.Timestamp(start_date):pd.Timestamp(end_date)]
+
+
+# Global instance shared by every portfolio in a batch run
+treasury_yield_service = TreasuryYieldService()
@@ -1,94 +1,226 @@
 """
 Trading calendar utilities for determining market trading days
+
+The exchange calendar is expanded once into a sorted array of trading days
+covering a horizon (TRADING_CALENDAR_START through the end of the year
+TRADING_CALENDAR_YEARS_AHEAD years from now) plus a per-calendar-day open
+flag. Lookups are then O(1) (is trading day) or a binary search (previous /
+next / offset / between), instead of a pandas_market_calendars query per
+date. The index is built lazily on first use and widened automatically if a
+query falls outside the horizon.
 """
 import logging
-from datetime import date, datetime, timedelta
-from typing import List, Optional
-import pandas as pd
-import pandas_market_calendars as mcal
-from functools import lru_cache
+import threading
+from datetime import date
+from typing import Iterable, List, NamedTuple, Optional, Union
+
+import numpy as np
 
 logger = logging.getLogger(__name__)
 
+# Default horizon of the precomputed trading-day index
+TRADING_CALENDAR_START = date(2000, 1, 1)
+TRADING_CALENDAR_YEARS_AHEAD = 2
+
+DateLike = Union[date, np.datetime64, str]
+
+
+class _TradingDayIndex(NamedTuple):
+    start: np.datetime64   # first calendar day covered
+    end: np.datetime64     # last calendar day covered
+    days: np.ndarray       # sorted trading days, datetime64[D]
+    is_open: np.ndarray    # bool per calendar day from start
+
+
+def _to_day(value: DateLike) -> np.datetime64:
+    return np.datetime64(value, "D")
+
+
+def _to_days(values: Iterable[DateLike]) -> np.ndarray:
+    return np.asarray(values, dtype="datetime64[D]")
+
 
 class TradingCalendar:
     """Utility class for working with trading calendars"""
-    
-    def __init__(self, exchange: str = "NYSE"):
+
+    def __init__(
+        self,
+        exchange: str = "NYSE",
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None
+    ):
         """
-        Initialize trading calendar
-        
+        Initialize trading calendar (the index itself is built on first use)
+
         Args:
             exchange: Exchange calendar to use (default: NYSE)
+            start_date: First date of the precomputed horizon (default: TRADING_CALENDAR_START)
+            end_date: Last date of the precomputed horizon
+                (default: end of the year TRADING_CALENDAR_YEARS_AHEAD years from now)
         """
         self.exchange = exchange
-        self.calendar = mcal.get_calendar(exchange)
-        logger.info(f"Initialized trading calendar for {exchange}")
-    
-    @lru_cache(maxsize=365)
+        self._horizon_start = start_date or TRADING_CALENDAR_START
+        self._horizon_end = end_date or date(date.today().year + TRADING_CALENDAR_YEARS_AHEAD, 12, 31)
+        self._calendar = None
+        self._index: Optional[_TradingDayIndex] = None
+        self._lock = threading.Lock()
+
+    @property
+    def calendar(self):
+        """Underlying pandas_market_calendars calendar (imported on first use; the import is slow)"""
+        if self._calendar is None:
+            import pandas_market_calendars as mcal
+            self._calendar = mcal.get_calendar(self.exchange)
+        return self._calendar
+
+    def _get_index(self, first: Optional[np.datetime64] = None, last: Optional[np.datetime64] = None) -> _TradingDayIndex:
+        """Return the trading-day index, building or widening it to cover [first, last]"""
+        index = self._index
+        if index is not None and (first is None or first >= index.start) and (last is None or last <= index.end):
+            return index
+
+        with self._lock:
+            if first is not None and first < _to_day(self._horizon_start):
+                self._horizon_start = date(first.astype(object).year, 1, 1)
+            if last is not None and last > _to_day(self._horizon_end):
+                self._horizon_end = date(last.astype(object).year, 12, 31)
+            index = self._index
+            if index is None or index.start != _to_day(self._horizon_start) or index.end != _to_day(self._horizon_end):
+                index = self._build_index(self._horizon_start, self._horizon_end)
+                self._index = index
+        return index
+
+    def _build_index(self, start_date: date, end_date: date) -> _TradingDayIndex:
+        valid_days = self.calendar.valid_days(start_date=start_date, end_date=end_date)
+        days = valid_days.tz_localize(None).values.astype("datetime64[D]")
+        start, end = _to_day(start_date), _to_day(end_date)
+        is_open = np.zeros((end - start).astype(int) + 1, dtype=bool)
+        is_open[(days - start).astype(int)] = True
+        logger.info(f"Built {self.exchange} trading calendar: {len(days)} trading days, {start_date} to {end_date}")
+        return _TradingDayIndex(start=start, end=end, days=days, is_open=is_open)
+
+    # Vectorized API
+
+    def trading_days_array(self, start_date: DateLike, end_date: DateLike) -> np.ndarray:
+        """
+        Trading days in [start_date, end_date] as a sorted datetime64[D] array
+        """
+        start, end = _to_day(start_date), _to_day(end_date)
+        index = self._get_index(start, end)
+        lo = np.searchsorted(index.days, start, side="left")
+        hi = np.searchsorted(index.days, end, side="right")
+        return index.days[lo:hi]
+
+    def is_trading_days(self, dates: Iterable[DateLike]) -> np.ndarray:
+        """
+        Vectorized is_trading_day
+
+        Args:
+            dates: Array-like of dates
+
+        Returns:
+            Boolean array, True where the date is a trading day
+        """
+        days = _to_days(dates)
+        if days.size == 0:
+            return np.zeros(days.shape, dtype=bool)
+        index = self._get_index(days.min(), days.max())
+        return index.is_open[(days - index.start).astype(np.int64)]
+
+    def offset_trading_days(self, dates: Iterable[DateLike], offset: int) -> np.ndarray:
+        """
+        Vectorized trading-day offset
+
+        offset > 0 is the offset-th trading day after each date, offset < 0 the
+        |offset|-th trading day before it, and 0 the latest trading day on or
+        before it. Results outside the horizon are NaT.
+
+        Args:
+            dates: Array-like of dates
+            offset: Number of trading days to move
+
+        Returns:
+            datetime64[D] array
+        """
+        days = _to_days(dates)
+        if days.size == 0:
+            return days
+        # Widen enough to cover the offset (~1.5 calendar days per trading day)
+        slack = np.timedelta64(abs(offset) * 3 // 2 + 10, "D")
+        index = self._get_index(days.min() - slack, days.max() + slack)
+        if offset >= 0:
+            position = np.searchsorted(index.days, days, side="right") - 1 + offset
+        else:
+            position = np.searchsorted(index.days, days, side="left") + offset
+        valid = (position >= 0) & (position < len(index.days))
+        result = np.full(days.shape, np.datetime64("NaT"), dtype="datetime64[D]")
+        result[valid] = index.days[position[valid]]
+        return result
+
+    def previous_trading_days(self, dates: Iterable[DateLike]) -> np.ndarray:
+        """Vectorized get_previous_trading_day (NaT where none)"""
+        return self.offset_trading_days(dates, -1)
+
+    # Scalar API
+
     def is_trading_day(self, check_date: date) -> bool:
         """
         Check if a given date is a trading day
-        
+
         Args:
             check_date: Date to check
-            
+
         Returns:
             True if trading day, False otherwise
         """
-        # Convert date to pandas timestamp
-        pd_date = pd.Timestamp(check_date)
-        
-        # Get valid trading days for the date range
-        schedule = self.calendar.valid_days(
-            start_date=pd_date,
-            end_date=pd_date
-        )
-        
-        return len(schedule) > 0
-    
+        day = _to_day(check_date)
+        index = self._get_index(day, day)
+        return bool(index.is_open[(day - index.start).astype(int)])
+
+    def offset_trading_day(self, from_date: date, offset: int) -> Optional[date]:
+        """
+        Move a number of trading days from a date (see offset_trading_days)
+
+        Args:
+            from_date: Date to start from
+            offset: Number of trading days to move (negative moves back)
+
+        Returns:
+            Resulting trading day or None if outside the calendar horizon
+        """
+        result = self.offset_trading_days([from_date], offset)[0]
+        return None if np.isnat(result) else result.astype(object)
+
     def get_previous_trading_day(self, from_date: date) -> Optional[date]:
         """
         Get the previous trading day before a given date
-        
+
         Args:
             from_date: Date to start from
-            
+
         Returns:
-            Previous trading day or None if none found in last 10 days
-        """
-        current = from_date - timedelta(days=1)
-        max_lookback = 10  # Don't look back more than 10 days
-        
-        for _ in range(max_lookback):
-            if self.is_trading_day(current):
-                return current
-            current -= timedelta(days=1)
-        
-        logger.warning(f"No trading day found in {max_lookback} days before {from_date}")
-        return None
-    
+            Previous trading day or None if none found
+        """
+        previous = self.offset_trading_day(from_date, -1)
+        if previous is None:
+            logger.warning(f"No trading day found before {from_date}")
+        return previous
+
     def get_next_trading_day(self, from_date: date) -> Optional[date]:
         """
         Get the next trading day after a given date
-        
+
         Args:
             from_date: Date to start from
-            
+
         Returns:
-            Next trading day or None if none found in next 10 days
-        """
-        current = from_date + timedelta(days=1)
-        max_lookahead = 10  # Don't look ahead more than 10 days
-        
-        for _ in range(max_lookahead):
-            if self.is_trading_day(current):
-                return current
-            current += timedelta(days=1)
-        
-        logger.warning(f"No trading day found in {max_lookahead} days after {from_date}")
-        return None
-    
+            Next trading day or None if none found
+        """
+        following = self.offset_trading_day(from_date, 1)
+        if following is None:
+            logger.warning(f"No trading day found after {from_date}")
+        return following
+
     def get_trading_days_between(
         self,
         start_date: date,
@@ -98,49 +230,55 @@ class TradingCalendar:
     ) -> List[date]:
         """
         Get all trading days between two dates
-        
+
         Args:
             start_date: Start date
             end_date: End date
             include_start: Whether to include start date if it's a trading day
             include_end: Whether to include end date if it's a trading day
-            
+
         Returns:
             List of trading days
         """
-        # Get schedule from calendar
-        schedule = self.calendar.valid_days(
-            start_date=pd.Timestamp(start_date),
-            end_date=pd.Timestamp(end_date)
-        )
-        
-        # Convert to dates
-        trading_days = [ts.date() for ts in schedule]
-        
+        trading_days = self.trading_days_array(start_date, end_date).tolist()
+
         # Handle inclusion flags
         if not include_start and trading_days and trading_days[0] == start_date:
             trading_days = trading_days[1:]
         if not include_end and trading_days and trading_days[-1] == end_date:
             trading_days = trading_days[:-1]
-        
+
         return trading_days
-    
+
+    def count_trading_days(self, start_date: date, end_date: date) -> int:
+        """
+        Number of trading days in [start_date, end_date]
+
+        Args:
+            start_date: Start date
+            end_date: End date
+
+        Returns:
+            Count of trading days (0 if end_date < start_date)
+        """
+        return len(self.trading_days_array(start_date, end_date))
+
     def should_run_batch_job(self, check_date: Optional[date] = None) -> bool:
         """
         Determine if batch jobs should run on a given date
-        
+
         Args:
             check_date: Date to check (default: today)
-            
+
         Returns:
             True if batch jobs should run, False otherwise
         """
         if check_date is None:
             check_date = date.today()
-        
+
         # Batch jobs run on trading days
         return self.is_trading_day(check_date)
 
 
 # Global instance for convenience
-trading_calendar = TradingCalendar()
\ No newline at end of file
+trading_calendar = TradingCalendar()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Rebuild portfolio snapshots for a date range
+
+Recomputes every trading day's PortfolioSnapshot from position history
+(entry_date/exit_date) and cached prices in one pass, e.g. after a price
+data fix. Daily and cumulative P&L are chained from the snapshot on the
+trading day before --start.
+
+Usage:
+    uv run python scripts/backfill_portfolio_snapshots.py --start 2025-01-02 --end 2025-06-30
+    uv run python scripts/backfill_portfolio_snapshots.py --start 2025-01-02 --portfolio <UUID>
+"""
+import argparse
+import asyncio
+import sys
+import time
+from datetime import date
+from pathlib import Path
+from uuid import UUID
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.calculations.bulk_snapshots import backfill_portfolio_snapshots
+from app.database import AsyncSessionLocal
+
+
+async def main(start_date: date, end_date: date, portfolio_ids):
+    print(f"🔄 Backfilling snapshots from {start_date} to {end_date}")
+    started = time.perf_counter()
+
+    async with AsyncSessionLocal() as db:
+        result = await backfill_portfolio_snapshots(db, start_date, end_date, portfolio_ids)
+
+    elapsed = time.perf_counter() - started
+    if not result["success"]:
+        print(f"❌ {result['message']}")
+        return 1
+
+    print(
+        f"✅ {result['snapshots_written']} snapshots written "
+        f"({result.get('portfolios', 0)} portfolios x {result.get('trading_days', 0)} trading days) "
+        f"in {elapsed:.2f}s"
+    )
+    for warning in result.get("warnings", []):
+        print(f"   ⚠️  {warning}")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild portfolio snapshots for a date range")
+    parser.add_argument("--start", type=date.fromisoformat, required=True, help="First date (YYYY-MM-DD)")
+    parser.add_argument("--end", type=date.fromisoformat, default=date.today(), help="Last date (default: today)")
+    parser.add_argument("--portfolio", type=UUID, action="append", dest="portfolios",
+                        help="Portfolio ID (repeatable; default: all portfolios)")
+    args = parser.parse_args()
+
+    sys.exit(asyncio.run(main(args.start, args.end, args.portfolios)))
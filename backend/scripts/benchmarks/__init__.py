@@ -0,0 +1,6 @@
+"""
+Performance benchmarks for SigmaSight calculation engines
+
+Generates synthetic portfolios into a local Postgres database and times each
+calculation engine against them. See run_benchmarks.py for usage.
+"""
@@ -0,0 +1,306 @@
+#!/usr/bin/env python
+"""
+Calculation engine benchmarks on synthetic portfolios
+
+Generates synthetic portfolios of increasing size into the configured local
+Postgres database, times every calculation engine against each of them and
+writes the results as JSON. Pass --compare to check a run against a saved
+baseline; the script exits non-zero if any engine slowed down by more than
+the tolerance.
+
+Prerequisites: migrated database with factor definitions and stress
+scenarios seeded (app/db/seed_factors.py, scripts/seed_stress_scenarios.py).
+
+Usage:
+    uv run python -m scripts.benchmarks.run_benchmarks --sizes 10 100 1000
+    uv run python -m scripts.benchmarks.run_benchmarks --output baseline.json
+    uv run python -m scripts.benchmarks.run_benchmarks --compare baseline.json
+"""
+import argparse
+import asyncio
+import json
+import platform
+import subprocess
+import sys
+import time
+from dataclasses import asdict, dataclass
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from app.core.datetime_utils import to_utc_iso8601, utc_now
+from app.core.logging import get_logger
+from app.core.query_counter import count_queries
+from app.database import get_async_session
+from app.utils.trading_calendar import trading_calendar
+from scripts.benchmarks.synthetic_data import (
+    SyntheticPortfolio,
+    create_synthetic_portfolio,
+    delete_synthetic_portfolio,
+)
+
+logger = get_logger(__name__)
+
+DEFAULT_SIZES = [10, 100, 1000, 10000]
+DEFAULT_OUTPUT = Path(__file__).parent / "results" / "latest.json"
+DEFAULT_TOLERANCE = 0.25  # 25% slower than baseline counts as a regression
+SCHEMA_VERSION = 1
+
+
+@dataclass
+class BenchmarkResult:
+    """Timing of one engine on one synthetic portfolio."""
+    engine: str
+    num_positions: int
+    history_days: int
+    seconds: float
+    query_count: int
+    status: str
+    error: Optional[str] = None
+
+
+def _benchmark_date() -> date:
+    """Most recent trading day, so snapshot and stress engines do not skip the run."""
+    today = date.today()
+    if trading_calendar.is_trading_day(today):
+        return today
+    return trading_calendar.get_previous_trading_day(today) or today
+
+
+async def _engine_portfolio_exposures(db, synthetic: SyntheticPortfolio, as_of: date):
+    from sqlalchemy import select
+    from app.calculations.portfolio import calculate_portfolio_exposures
+    from app.models.positions import Position
+
+    result = await db.execute(select(Position).where(Position.portfolio_id == synthetic.portfolio_id))
+    position_dicts = [
+        {
+            'symbol': p.symbol,
+            'quantity': float(p.quantity),
+            'market_value': float(p.market_value or 0),
+            'exposure': float(p.market_value or 0),
+            'position_type': p.position_type.value,
+        }
+        for p in result.scalars().all()
+    ]
+    return calculate_portfolio_exposures(position_dicts)
+
+
+async def _engine_factor_betas(db, synthetic: SyntheticPortfolio, as_of: date):
+    from app.calculations.factors import calculate_factor_betas_hybrid
+    return await calculate_factor_betas_hybrid(db, synthetic.portfolio_id, as_of)
+
+
+async def _engine_correlations(db, synthetic: SyntheticPortfolio, as_of: date):
+    from app.services.correlation_service import CorrelationService
+    service = CorrelationService(db)
+    return await service.calculate_portfolio_correlations(
+        synthetic.portfolio_id,
+        calculation_date=datetime.combine(as_of, datetime.min.time()),
+        force_recalculate=True
+    )
+
+
+async def _engine_stress_test(db, synthetic: SyntheticPortfolio, as_of: date):
+    from app.calculations.stress_testing import run_comprehensive_stress_test
+    return await run_comprehensive_stress_test(db, synthetic.portfolio_id, as_of)
+
+
+async def _engine_greeks(db, synthetic: SyntheticPortfolio, as_of: date):
+    from sqlalchemy import select
+    from app.calculations.greeks import bulk_update_portfolio_greeks
+    from app.models.positions import Position
+
+    result = await db.execute(
+        select(Position.symbol, Position.last_price).where(
+            Position.portfolio_id == synthetic.portfolio_id,
+            Position.underlying_symbol.is_(None)
+        )
+    )
+    market_data = {
+        symbol: {'current_price': float(price), 'implied_volatility': 0.25}
+        for symbol, price in result.all()
+    }
+    return await bulk_update_portfolio_greeks(db, str(synthetic.portfolio_id), market_data)
+
+
+async def _engine_snapshot(db, synthetic: SyntheticPortfolio, as_of: date):
+    from app.calculations.snapshots import create_portfolio_snapshot
+    return await create_portfolio_snapshot(db, synthetic.portfolio_id, as_of)
+
+
+async def _engine_bulk_snapshot(db, synthetic: SyntheticPortfolio, as_of: date):
+    from app.calculations.bulk_snapshots import create_portfolio_snapshots_bulk
+    return await create_portfolio_snapshots_bulk(db, as_of, [synthetic.portfolio_id])
+
+
+ENGINES: Dict[str, Callable[..., Awaitable[Any]]] = {
+    "calculate_portfolio_exposures": _engine_portfolio_exposures,
+    "calculate_factor_betas_hybrid": _engine_factor_betas,
+    "calculate_portfolio_correlations": _engine_correlations,
+    "run_comprehensive_stress_test": _engine_stress_test,
+    "bulk_update_portfolio_greeks": _engine_greeks,
+    "create_portfolio_snapshot": _engine_snapshot,
+    "create_portfolio_snapshots_bulk": _engine_bulk_snapshot,
+}
+
+
+async def _time_engine(
+    name: str,
+    synthetic: SyntheticPortfolio,
+    as_of: date
+) -> BenchmarkResult:
+    engine = ENGINES[name]
+    async with get_async_session() as db:
+        with count_queries(name) as stats:
+            start = time.perf_counter()
+            try:
+                await engine(db, synthetic, as_of)
+                status, error = "completed", None
+            except Exception as e:
+                logger.error(f"Benchmark {name} failed for {synthetic.num_positions} positions: {e}")
+                status, error = "failed", str(e)
+            elapsed = time.perf_counter() - start
+
+    return BenchmarkResult(
+        engine=name,
+        num_positions=synthetic.num_positions,
+        history_days=synthetic.history_days,
+        seconds=round(elapsed, 4),
+        query_count=stats.count,
+        status=status,
+        error=error,
+    )
+
+
+async def run_benchmarks(
+    sizes: List[int],
+    history_days: int,
+    option_ratio: float,
+    engines: List[str],
+    keep_data: bool = False
+) -> List[BenchmarkResult]:
+    as_of = _benchmark_date()
+    results: List[BenchmarkResult] = []
+
+    for size in sizes:
+        print(f"\n📦 Generating synthetic portfolio: {size} positions, {history_days} days of history")
+        async with get_async_session() as db:
+            synthetic = await create_synthetic_portfolio(
+                db, size, history_days=history_days, option_ratio=option_ratio, as_of=as_of
+            )
+
+        try:
+            for name in engines:
+                result = await _time_engine(name, synthetic, as_of)
+                results.append(result)
+                marker = "✅" if result.status == "completed" else "❌"
+                print(f"   {marker} {name:<36} {result.seconds:>9.3f}s  {result.query_count:>6} queries")
+        finally:
+            if not keep_data:
+                async with get_async_session() as db:
+                    await delete_synthetic_portfolio(db, synthetic)
+
+    return results
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except Exception:
+        return None
+
+
+def save_results(results: List[BenchmarkResult], path: Path, params: Dict[str, Any]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    payload = {
+        "schema_version": SCHEMA_VERSION,
+        "generated_at": to_utc_iso8601(utc_now()),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "parameters": params,
+        "results": [asdict(r) for r in results],
+    }
+    path.write_text(json.dumps(payload, indent=2))
+    print(f"\n💾 Results written to {path}")
+
+
+def compare_to_baseline(
+    results: List[BenchmarkResult],
+    baseline_path: Path,
+    tolerance: float
+) -> List[str]:
+    """Return a description of every engine/size that regressed beyond tolerance."""
+    baseline = json.loads(baseline_path.read_text())
+    baseline_times = {
+        (r["engine"], r["num_positions"]): r["seconds"]
+        for r in baseline.get("results", [])
+        if r.get("status") == "completed"
+    }
+
+    regressions = []
+    for result in results:
+        previous = baseline_times.get((result.engine, result.num_positions))
+        if previous is None or result.status != "completed" or previous <= 0:
+            continue
+        change = (result.seconds - previous) / previous
+        if change > tolerance:
+            regressions.append(
+                f"{result.engine} @ {result.num_positions} positions: "
+                f"{previous:.3f}s -> {result.seconds:.3f}s (+{change:.0%})"
+            )
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark calculation engines on synthetic portfolios")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+                        help="Portfolio sizes (number of positions)")
+    parser.add_argument("--history-days", type=int, default=252,
+                        help="Trading days of synthetic price history")
+    parser.add_argument("--option-ratio", type=float, default=0.2,
+                        help="Fraction of positions that are options")
+    parser.add_argument("--engines", nargs="+", choices=list(ENGINES), default=list(ENGINES),
+                        help="Engines to benchmark (default: all)")
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT,
+                        help="Where to write the JSON results")
+    parser.add_argument("--compare", type=Path,
+                        help="Baseline JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="Allowed slowdown vs baseline before failing (0.25 = 25%%)")
+    parser.add_argument("--keep-data", action="store_true",
+                        help="Keep synthetic portfolios in the database after the run")
+    args = parser.parse_args()
+
+    results = asyncio.run(run_benchmarks(
+        sizes=args.sizes,
+        history_days=args.history_days,
+        option_ratio=args.option_ratio,
+        engines=args.engines,
+        keep_data=args.keep_data,
+    ))
+
+    save_results(results, args.output, {
+        "sizes": args.sizes,
+        "history_days": args.history_days,
+        "option_ratio": args.option_ratio,
+        "engines": args.engines,
+    })
+
+    if args.compare:
+        regressions = compare_to_baseline(results, args.compare, args.tolerance)
+        if regressions:
+            print("\n⚠️  Performance regressions detected:")
+            for line in regressions:
+                print(f"   - {line}")
+            return 1
+        print(f"\n✅ No regressions beyond {args.tolerance:.0%} vs {args.compare}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,379 @@
+#!/usr/bin/env python
+"""
+Chat load test with the local LLM stand-in
+
+Drives concurrent conversations through POST /api/v1/chat/send. The FastAPI
+app is called directly over ASGI, with no server and no network.
+OpenAIService is switched to the scripted stand-in from
+app/agent/services/local_llm.py, so tool calls still run against the
+database and the results measure the chat stack rather than the model.
+Each turn records:
+- time to the first SSE event
+- time to the first message
+- streamed tokens per second
+- tool latencies
+- the number of SQL statements issued
+
+The script prints percentiles and writes every turn as JSON.
+
+Prerequisites: migrated and seeded database with the demo users
+(scripts/reset_and_seed.py).
+
+Usage:
+    uv run python -m scripts.benchmarks.run_chat_load_test --conversations 20 --turns 3
+    uv run python -m scripts.benchmarks.run_chat_load_test --token-rate 80 --first-token-ms 500
+    uv run python -m scripts.benchmarks.run_chat_load_test --script my_script.json --output chat.json
+"""
+import argparse
+import asyncio
+import json
+import platform
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import select
+
+from app.agent.services.local_llm import LocalChatClient, count_tokens, load_script
+from app.agent.services.openai_service import openai_service
+from app.core.datetime_utils import to_utc_iso8601, utc_now
+from app.core.logging import get_logger
+from app.core.query_counter import count_queries
+from app.database import get_async_session
+from app.main import app
+from app.models.users import Portfolio, User
+from scripts.benchmarks.run_benchmarks import _git_commit
+
+logger = get_logger(__name__)
+
+DEMO_USERS = [
+    "demo_individual@sigmasight.com",
+    "demo_hnw@sigmasight.com",
+    "demo_hedgefundstyle@sigmasight.com",
+]
+DEMO_PASSWORD = "demo12345"
+DEFAULT_MESSAGE = "Give me an overview of portfolio {portfolio_id}"
+DEFAULT_OUTPUT = Path(__file__).parent / "results" / "chat_latest.json"
+SCHEMA_VERSION = 1
+
+
+@dataclass
+class LoadTestUser:
+    """A logged-in demo user and the portfolio its messages refer to."""
+    email: str
+    token: str
+    portfolio_id: Optional[str]
+
+
+@dataclass
+class TurnResult:
+    """Timings of one message sent to /chat/send."""
+    conversation: int
+    turn: int
+    status: str
+    seconds: float
+    time_to_first_event: Optional[float] = None
+    time_to_first_token: Optional[float] = None
+    tokens: int = 0
+    tokens_per_second: Optional[float] = None
+    tool_latencies_ms: List[int] = field(default_factory=list)
+    statements: int = 0
+    error: Optional[str] = None
+
+
+async def _asgi_request(
+    method: str,
+    path: str,
+    payload: Optional[Dict[str, Any]] = None,
+    token: Optional[str] = None
+) -> Tuple[int, List[Tuple[float, bytes]]]:
+    """
+    Call the app over ASGI and return the status and body chunks.
+
+    Each chunk carries the time it was sent (unlike httpx's ASGITransport,
+    which buffers the whole response), so streaming latency stays visible.
+    """
+    body = json.dumps(payload).encode() if payload is not None else b""
+    headers = [
+        (b"host", b"loadtest"),
+        (b"content-type", b"application/json"),
+        (b"content-length", str(len(body)).encode()),
+    ]
+    if token:
+        headers.append((b"authorization", f"Bearer {token}".encode()))
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": headers,
+        "client": ("127.0.0.1", 0),
+        "server": ("loadtest", 80),
+    }
+    status = 0
+    chunks: List[Tuple[float, bytes]] = []
+    request_sent = False
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        # The client never disconnects; Starlette cancels this once the response is done
+        await asyncio.Event().wait()
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body" and message.get("body"):
+            chunks.append((time.perf_counter(), message["body"]))
+
+    await app(scope, receive, send)
+    return status, chunks
+
+
+def _json_body(chunks: List[Tuple[float, bytes]]) -> Any:
+    return json.loads(b"".join(data for _, data in chunks))
+
+
+def parse_sse(chunks: List[Tuple[float, bytes]]) -> List[Tuple[float, str, Dict[str, Any]]]:
+    """(time received, event, data) for every complete SSE frame."""
+    events = []
+    buffer = ""
+    for received_at, data in chunks:
+        buffer += data.decode()
+        while "\n\n" in buffer:
+            frame, buffer = buffer.split("\n\n", 1)
+            event, payload = "message", {}
+            for line in frame.split("\n"):
+                if line.startswith("event: "):
+                    event = line[len("event: "):]
+                elif line.startswith("data: "):
+                    payload = json.loads(line[len("data: "):])
+            events.append((received_at, event, payload))
+    return events
+
+
+async def login_users(emails: List[str], password: str) -> List[LoadTestUser]:
+    users = []
+    async with get_async_session() as db:
+        for email in emails:
+            status, chunks = await _asgi_request("POST", "/api/v1/auth/login", {"email": email, "password": password})
+            if status != 200:
+                raise RuntimeError(f"Login failed for {email} (HTTP {status})")
+            portfolio_id = await db.scalar(
+                select(Portfolio.id)
+                .join(User, User.id == Portfolio.user_id)
+                .where(User.email == email, Portfolio.deleted_at.is_(None))
+            )
+            users.append(LoadTestUser(
+                email=email,
+                token=_json_body(chunks)["access_token"],
+                portfolio_id=str(portfolio_id) if portfolio_id else None,
+            ))
+    return users
+
+
+async def run_turn(
+    conversation: int,
+    turn: int,
+    conversation_id: str,
+    user: LoadTestUser,
+    message: str
+) -> TurnResult:
+    text = message.format(portfolio_id=user.portfolio_id or "")
+    with count_queries(f"chat turn {conversation}/{turn}") as stats:
+        started = time.perf_counter()
+        try:
+            status, chunks = await _asgi_request(
+                "POST", "/api/v1/chat/send", {"conversation_id": conversation_id, "text": text}, user.token
+            )
+        except Exception as e:
+            return TurnResult(conversation, turn, "failed", round(time.perf_counter() - started, 4),
+                              statements=stats.count, error=str(e))
+        seconds = time.perf_counter() - started
+
+    if status != 200:
+        return TurnResult(conversation, turn, "failed", round(seconds, 4),
+                          statements=stats.count, error=f"HTTP {status}")
+
+    events = parse_sse(chunks)
+    messages = [(at, data) for at, event, data in events if event == "message"]
+    errors = [data.get("message") for _, event, data in events if event == "error"]
+    tokens = sum(count_tokens(data.get("delta", "")) for _, data in messages)
+    result = TurnResult(
+        conversation=conversation,
+        turn=turn,
+        status="failed" if errors else "completed",
+        seconds=round(seconds, 4),
+        tokens=tokens,
+        tool_latencies_ms=[data["duration_ms"] for _, event, data in events if event == "tool_finished"],
+        statements=stats.count,
+        error=errors[0] if errors else None,
+    )
+    if events:
+        result.time_to_first_event = round(events[0][0] - started, 4)
+    if messages:
+        first_token_at = messages[0][0]
+        result.time_to_first_token = round(first_token_at - started, 4)
+        streaming = messages[-1][0] - first_token_at
+        if streaming > 0:
+            result.tokens_per_second = round(tokens / streaming, 1)
+    return result
+
+
+async def run_conversation(index: int, user: LoadTestUser, turns: int, message: str) -> List[TurnResult]:
+    status, chunks = await _asgi_request("POST", "/api/v1/chat/conversations", {"mode": "green"}, user.token)
+    if status != 201:
+        return [TurnResult(index, 0, "failed", 0.0, error=f"Create conversation: HTTP {status}")]
+    conversation_id = _json_body(chunks)["conversation_id"]
+    return [await run_turn(index, turn, conversation_id, user, message) for turn in range(turns)]
+
+
+def _percentiles(values: List[float]) -> Dict[str, Optional[float]]:
+    if not values:
+        return {"p50": None, "p95": None, "max": None}
+    return {
+        "p50": round(float(np.percentile(values, 50)), 4),
+        "p95": round(float(np.percentile(values, 95)), 4),
+        "max": round(float(max(values)), 4),
+    }
+
+
+def summarize(results: List[TurnResult], wall_seconds: float) -> Dict[str, Any]:
+    completed = [r for r in results if r.status == "completed"]
+    tool_latencies = [ms for r in completed for ms in r.tool_latencies_ms]
+    return {
+        "turns": len(results),
+        "failed": len(results) - len(completed),
+        "wall_seconds": round(wall_seconds, 3),
+        "turns_per_second": round(len(completed) / wall_seconds, 3) if wall_seconds else None,
+        "tokens_per_second_total": round(sum(r.tokens for r in completed) / wall_seconds, 1) if wall_seconds else None,
+        "turn_seconds": _percentiles([r.seconds for r in completed]),
+        "time_to_first_event": _percentiles([r.time_to_first_event for r in completed if r.time_to_first_event is not None]),
+        "time_to_first_token": _percentiles([r.time_to_first_token for r in completed if r.time_to_first_token is not None]),
+        "tokens_per_second": _percentiles([r.tokens_per_second for r in completed if r.tokens_per_second is not None]),
+        "tool_latency_ms": _percentiles(tool_latencies),
+        "statements_per_turn": _percentiles([r.statements for r in completed]),
+    }
+
+
+async def run_load_test(
+    conversations: int,
+    turns: int,
+    emails: List[str],
+    password: str,
+    message: str,
+    client: LocalChatClient
+) -> Tuple[List[TurnResult], Dict[str, Any]]:
+    openai_service.client = client
+    users = await login_users(emails, password)
+
+    print(f"\n💬 {conversations} concurrent conversations x {turns} turns ({len(users)} users)")
+    started = time.perf_counter()
+    per_conversation = await asyncio.gather(*(
+        run_conversation(i, users[i % len(users)], turns, message) for i in range(conversations)
+    ))
+    wall_seconds = time.perf_counter() - started
+
+    results = [result for conversation in per_conversation for result in conversation]
+    for result in results:
+        if result.status != "completed":
+            logger.error(f"Conversation {result.conversation} turn {result.turn} failed: {result.error}")
+    return results, summarize(results, wall_seconds)
+
+
+def print_summary(summary: Dict[str, Any]) -> None:
+    def row(label: str, stats: Dict[str, Optional[float]], unit: str) -> None:
+        if stats["p50"] is None:
+            print(f"   {label:<24} {'-':>10}")
+            return
+        print(f"   {label:<24} p50 {stats['p50']:>10.3f}{unit}  p95 {stats['p95']:>10.3f}{unit}  max {stats['max']:>10.3f}{unit}")
+
+    marker = "✅" if not summary["failed"] else "❌"
+    print(f"\n{marker} {summary['turns'] - summary['failed']}/{summary['turns']} turns completed "
+          f"in {summary['wall_seconds']:.2f}s ({summary['turns_per_second']} turns/s, "
+          f"{summary['tokens_per_second_total']} tokens/s overall)")
+    row("turn duration", summary["turn_seconds"], "s")
+    row("time to first event", summary["time_to_first_event"], "s")
+    row("time to first token", summary["time_to_first_token"], "s")
+    row("tokens/s per turn", summary["tokens_per_second"], "")
+    row("tool latency", summary["tool_latency_ms"], "ms")
+    row("SQL statements/turn", summary["statements_per_turn"], "")
+
+
+def save_results(results: List[TurnResult], summary: Dict[str, Any], path: Path, params: Dict[str, Any]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    payload = {
+        "schema_version": SCHEMA_VERSION,
+        "generated_at": to_utc_iso8601(utc_now()),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "parameters": params,
+        "summary": summary,
+        "turns": [asdict(r) for r in results],
+    }
+    path.write_text(json.dumps(payload, indent=2))
+    print(f"\n💾 Results written to {path}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Load test /chat/send with the local LLM stand-in")
+    parser.add_argument("--conversations", type=int, default=10,
+                        help="Concurrent conversations")
+    parser.add_argument("--turns", type=int, default=3,
+                        help="Messages sent per conversation (sequentially)")
+    parser.add_argument("--users", nargs="+", default=DEMO_USERS,
+                        help="Emails of the users conversations are spread across")
+    parser.add_argument("--password", default=DEMO_PASSWORD,
+                        help="Password of the load test users")
+    parser.add_argument("--message", default=DEFAULT_MESSAGE,
+                        help="Message text; {portfolio_id} is replaced with the user's portfolio")
+    parser.add_argument("--script", type=Path,
+                        help="Stand-in script JSON (default: built-in tool call + answer)")
+    parser.add_argument("--token-rate", type=float, default=50.0,
+                        help="Stand-in tokens per second (0 = as fast as possible)")
+    parser.add_argument("--first-token-ms", type=int, default=300,
+                        help="Stand-in latency before the first chunk of each response")
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT,
+                        help="Where to write the JSON results")
+    args = parser.parse_args()
+
+    client = LocalChatClient(
+        script=load_script(str(args.script)) if args.script else None,
+        tokens_per_second=args.token_rate,
+        first_token_ms=args.first_token_ms,
+    )
+    results, summary = asyncio.run(run_load_test(
+        conversations=args.conversations,
+        turns=args.turns,
+        emails=args.users,
+        password=args.password,
+        message=args.message,
+        client=client,
+    ))
+
+    print_summary(summary)
+    save_results(results, summary, args.output, {
+        "conversations": args.conversations,
+        "turns": args.turns,
+        "users": args.users,
+        "script": str(args.script) if args.script else None,
+        "token_rate": args.token_rate,
+        "first_token_ms": args.first_token_ms,
+    })
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
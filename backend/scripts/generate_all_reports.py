@@ -3,9 +3,9 @@
 Generate portfolio reports for all three demo portfolios
 """
 import asyncio
+import time
 from datetime import date
-from app.database import get_async_session
-from app.reports.portfolio_report_generator import PortfolioReportGenerator
+from app.reports.portfolio_report_generator import ReportRunResult, generate_reports_bulk
 
 # Demo portfolio IDs (from TODO2.md)
 DEMO_PORTFOLIOS = {
@@ -15,45 +15,39 @@ DEMO_PORTFOLIOS = {
 }
 
 async def generate_all_reports():
-    """Generate reports for all demo portfolios"""
+    """Generate reports for all demo portfolios concurrently"""
     print("=" * 80)
     print("📊 Generating Portfolio Reports for All Demo Portfolios")
     print("=" * 80)
-    
-    async with get_async_session() as db:
-        generator = PortfolioReportGenerator(db)
-        report_date = date.today()
-        
-        for name, portfolio_id in DEMO_PORTFOLIOS.items():
-            print(f"\n📈 Generating reports for: {name}")
-            print(f"   Portfolio ID: {portfolio_id}")
-            print("-" * 40)
-            
-            try:
-                # The generate_portfolio_report function handles all formats and file writing
-                from app.reports.portfolio_report_generator import generate_portfolio_report, ReportRequest
-                
-                print(f"   Generating all formats (MD, JSON, CSV)...")
-                request = ReportRequest(
-                    portfolio_id=portfolio_id,
-                    as_of=report_date,
-                    formats=['md', 'json', 'csv'],
-                    write_to_disk=True
-                )
-                result = await generate_portfolio_report(db, request)
-                print(f"   ✅ All formats generated")
-                
-                # Create a nice folder name
-                folder_name = name.lower().replace(' ', '-').replace('investor-', '').replace('style-', '')
-                print(f"   📁 Reports saved to: reports/{folder_name}_{report_date}/")
-                
-            except Exception as e:
-                print(f"   ❌ Error: {str(e)}")
-    
+
+    names = {portfolio_id: name for name, portfolio_id in DEMO_PORTFOLIOS.items()}
+    report_date = date.today()
+
+    def report_progress(run: ReportRunResult):
+        print(f"\n📈 {names[run.portfolio_id]}")
+        print(f"   Portfolio ID: {run.portfolio_id}")
+        if run.success:
+            print(f"   ✅ All formats generated in {run.seconds:.2f}s")
+            for fmt, path in run.files.items():
+                print(f"   📁 {fmt.upper()}: {path}")
+        else:
+            print(f"   ❌ Error: {run.error}")
+
+    started = time.perf_counter()
+    runs = await generate_reports_bulk(
+        DEMO_PORTFOLIOS.values(),
+        as_of=report_date,
+        formats=['md', 'json', 'csv'],
+        write_to_disk=True,
+        on_result=report_progress
+    )
+    elapsed = time.perf_counter() - started
+
     print("\n" + "=" * 80)
-    print("✅ Report generation complete!")
+    print(f"✅ Report generation complete: {sum(run.success for run in runs)}/{len(runs)} portfolios "
+          f"in {elapsed:.2f}s")
     print("📁 All reports saved in: reports/")
     print("=" * 80)
 
 if __name__ == "__main__":
-    asyncio.run(generate_all_reports())
\ No newline at end of file
+    asyncio.run(generate_all_reports())
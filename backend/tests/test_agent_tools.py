@@ -0,0 +1,352 @@
+"""
+Unit tests for agent tool dispatch: in-process backend, concurrent calls and result cache
+"""
+import asyncio
+import json
+import pytest
+from datetime import datetime
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, Mock, create_autospec
+from uuid import uuid4
+
+from fastapi import HTTPException
+
+from app.agent.services.local_llm import LocalChatClient, ScriptStep, count_tokens, split_tokens
+from app.agent.services.openai_service import openai_service
+from app.agent.services.sse_stream import ChatTurn, MessageDeltaBuffer
+from app.agent.tools.handlers import PortfolioTools
+from app.agent.tools.in_process_backend import InProcessToolBackend
+from app.agent.tools.tool_cache import ToolResultCache
+from app.agent.tools.tool_registry import ToolRegistry
+from app.api.v1 import data as data_api
+from app.config import settings
+from app.core.data_version import MARKET_DATA_SCOPE, get_data_version, portfolio_scope, record_data_versions
+from app.schemas.auth import CurrentUser
+
+
+@pytest.fixture
+def current_user():
+    return CurrentUser(
+        id=uuid4(),
+        email="demo@example.com",
+        full_name="Demo User",
+        is_active=True,
+        created_at=datetime(2025, 1, 1)
+    )
+
+
+def session_factory(session):
+    """async_sessionmaker stand-in yielding the given session"""
+    factory = MagicMock()
+    factory.return_value.__aenter__.return_value = session
+    return factory
+
+
+class TestInProcessToolBackend:
+    """Test suite for dispatching tool requests to the data endpoints"""
+
+    def test_routes_tool_endpoints(self, current_user):
+        """Every endpoint used by the tools is served in-process"""
+        backend = InProcessToolBackend(current_user, session_factory=Mock())
+        portfolio_id = str(uuid4())
+
+        endpoint, path_params = backend.resolve("GET", f"/api/v1/data/positions/top/{portfolio_id}")
+
+        assert endpoint is data_api.get_top_positions
+        assert path_params == {"portfolio_id": portfolio_id}
+        assert backend.resolve("GET", "/api/v1/data/factors/etf-prices")[0] is data_api.get_factor_etf_prices
+        assert backend.resolve("POST", "/api/v1/data/factors/etf-prices") is None
+        assert backend.resolve("GET", "/api/v1/reports/portfolios") is None
+
+    def test_query_defaults_and_coercion(self):
+        """Missing parameters take the Query defaults; values are validated"""
+        portfolio_id = uuid4()
+
+        arguments = InProcessToolBackend._bind_arguments(
+            data_api.get_top_positions, {"portfolio_id": str(portfolio_id), "limit": "5"}
+        )
+
+        assert arguments == {"portfolio_id": portfolio_id, "limit": 5, "sort_by": "market_value", "as_of_date": None}
+        with pytest.raises(HTTPException) as error:
+            InProcessToolBackend._bind_arguments(data_api.get_top_positions, {"portfolio_id": "not-a-uuid"})
+        assert error.value.status_code == 422
+
+    @pytest.mark.asyncio
+    async def test_query_constraints_enforced(self, current_user):
+        """Values outside the endpoint's Query constraints are rejected with 422"""
+        backend = InProcessToolBackend(current_user, session_factory=session_factory(AsyncMock()))
+        endpoint = f"/api/v1/data/positions/top/{uuid4()}"
+
+        for params in ({"limit": 500}, {"sort_by": "symbol"}):
+            with pytest.raises(HTTPException) as error:
+                await backend.request("GET", endpoint, params)
+            assert error.value.status_code == 422
+        backend.session_factory.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_slow_endpoint_times_out(self, current_user, monkeypatch):
+        """An endpoint running past the timeout fails with 504 like the HTTP client would"""
+        async def slow_endpoint(**kwargs):
+            await asyncio.sleep(1)
+
+        etf_prices = create_autospec(data_api.get_factor_etf_prices, side_effect=slow_endpoint)
+        monkeypatch.setattr(data_api, "get_factor_etf_prices", etf_prices)
+        backend = InProcessToolBackend(current_user, session_factory=session_factory(AsyncMock()), timeout=0.01)
+
+        with pytest.raises(HTTPException) as error:
+            await backend.request("GET", "/api/v1/data/factors/etf-prices")
+
+        assert error.value.status_code == 504
+
+    @pytest.mark.asyncio
+    async def test_endpoint_called_as_caller(self, current_user):
+        """The endpoint runs on a pooled session as the authenticated user"""
+        result = Mock()
+        result.scalar_one_or_none.return_value = None
+        session = AsyncMock()
+        session.execute.return_value = result
+        session.__aenter__.return_value = session  # endpoints open the session they are given
+        backend = InProcessToolBackend(current_user, session_factory=session_factory(session))
+
+        with pytest.raises(HTTPException) as error:
+            await backend.request("GET", f"/api/v1/data/positions/top/{uuid4()}", {"limit": 5})
+
+        assert error.value.status_code == 404
+        statement = session.execute.await_args.args[0]
+        assert current_user.id in statement.compile().params.values()
+
+    @pytest.mark.asyncio
+    async def test_tools_use_backend_without_http(self, current_user, monkeypatch):
+        """Tool requests served in-process return JSON-encoded endpoint results"""
+        top_positions = create_autospec(
+            data_api.get_top_positions, return_value={"data": [{"symbol": "AAPL", "value": Decimal("10.5")}]}
+        )
+        prices = create_autospec(
+            data_api.get_historical_prices, return_value={"symbols": {"AAPL": {"dates": [datetime(2025, 1, 2)]}}}
+        )
+        monkeypatch.setattr(data_api, "get_top_positions", top_positions)
+        monkeypatch.setattr(data_api, "get_historical_prices", prices)
+        monkeypatch.setattr("app.agent.tools.handlers.httpx.AsyncClient", Mock(side_effect=AssertionError("HTTP used")))
+        backend = InProcessToolBackend(current_user, session_factory=session_factory(AsyncMock()))
+        tools = PortfolioTools(backend=backend)
+
+        response = await tools.get_prices_historical(portfolio_id=str(uuid4()), max_symbols=3)
+
+        assert response["symbols"]["AAPL"]["dates"] == ["2025-01-02T00:00:00"]
+        assert response["meta"]["symbols_selected"] == ["AAPL"]
+        assert top_positions.await_args.kwargs["current_user"] is current_user
+        assert top_positions.await_args.kwargs["limit"] == 3
+
+
+class TestConcurrentToolCalls:
+    """Test suite for running the tool calls of one model turn concurrently"""
+
+    @pytest.mark.asyncio
+    async def test_calls_overlap_and_finish_in_completion_order(self, monkeypatch):
+        """Calls run concurrently up to the cap; finished events carry real durations"""
+        monkeypatch.setattr(settings, "AGENT_MAX_CONCURRENT_TOOLS", 2)
+        running = {"now": 0, "peak": 0}
+
+        async def dispatch_tool_call(tool_name, payload, ctx=None):
+            running["now"] += 1
+            running["peak"] = max(running["peak"], running["now"])
+            await asyncio.sleep(payload["delay"])
+            running["now"] -= 1
+            return {"data": tool_name}
+
+        registry = Mock(dispatch_tool_call=dispatch_tool_call)
+        tool_calls = [
+            {"id": f"call_{i}", "function": {"name": f"tool_{i}", "arguments": json.dumps({"delay": delay})}}
+            for i, delay in enumerate([0.2, 0.05, 0.1])
+        ]
+        tool_calls.append({"id": "call_bad", "function": {"name": "tool_bad", "arguments": "{not json"}})
+        results = {}
+
+        events = [
+            event async for event in openai_service._execute_tool_calls(registry, tool_calls, results)
+        ]
+
+        finished = [json.loads(event.split("data: ")[1]) for event in events if event.startswith("event: tool_finished")]
+        assert len(events) == 8
+        assert running["peak"] == 2
+        assert [event["tool_name"] for event in finished] == ["tool_1", "tool_2", "tool_bad", "tool_0"]
+        assert finished[-1]["duration_ms"] >= 200
+        assert results["call_0"] == {"data": "tool_0"}
+        assert "Invalid tool arguments" in results["call_bad"]["error"]
+
+
+def _content_chunk(text, finish_reason=None):
+    delta = SimpleNamespace(content=text, tool_calls=None)
+    return SimpleNamespace(choices=[SimpleNamespace(delta=delta, finish_reason=finish_reason)])
+
+
+class TestCoalescedStreaming:
+    """Test suite for coalescing token deltas into SSE message events"""
+
+    def test_buffer_flushes_on_size(self):
+        buffer = MessageDeltaBuffer(max_chars=8, max_ms=60_000)
+
+        assert buffer.add("abc") is None
+        assert buffer.add("defgh") == "abcdefgh"
+        assert buffer.add("ij") is None
+        assert buffer.flush() == "ij"
+        assert buffer.flush() is None
+
+    def test_buffer_flushes_on_age(self):
+        buffer = MessageDeltaBuffer(max_chars=1000, max_ms=0)
+
+        assert buffer.add("a") == "a"
+
+    @pytest.mark.asyncio
+    async def test_stream_coalesces_deltas_and_records_turn(self, monkeypatch):
+        """Token deltas reach the client in few events; the turn holds the full text"""
+        tokens = [f"tok{i} " for i in range(50)]
+
+        async def stream():
+            for token in tokens:
+                yield _content_chunk(token)
+            yield _content_chunk(None, finish_reason="stop")
+
+        client = Mock()
+        client.chat.completions.create = AsyncMock(return_value=stream())
+        monkeypatch.setattr(openai_service, "client", client)
+        monkeypatch.setattr(
+            "app.agent.services.openai_service.MessageDeltaBuffer",
+            lambda: MessageDeltaBuffer(max_chars=64, max_ms=60_000)
+        )
+        turn = ChatTurn()
+
+        events = [
+            event async for event in openai_service.stream_chat_completion(
+                conversation_id="c1",
+                conversation_mode="green",
+                message_text="hi",
+                message_history=[],
+                turn=turn
+            )
+        ]
+
+        messages = [json.loads(event.split("data: ")[1]) for event in events if event.startswith("event: message")]
+        assert events[-1].startswith("event: done")
+        assert len(messages) < len(tokens) // 5
+        assert "".join(message["delta"] for message in messages) == "".join(tokens)
+        assert turn.content == "".join(tokens)
+        assert turn.tool_calls == []
+
+
+class TestLocalChatClient:
+    """Test suite for the scripted local LLM stand-in"""
+
+    @pytest.mark.asyncio
+    async def test_scripted_tool_round_through_chat_stack(self, monkeypatch):
+        """The stand-in streams a tool call, then answers the tool results"""
+        portfolio_id = str(uuid4())
+        client = LocalChatClient(
+            script=[
+                ScriptStep(content="Checking.", tool_calls=[
+                    {"name": "get_portfolio_complete", "arguments": {"portfolio_id": "{portfolio_id}"}}
+                ]),
+                ScriptStep(content="Your portfolio looks fine today."),
+            ],
+            tokens_per_second=0,
+            first_token_ms=0
+        )
+        monkeypatch.setattr(openai_service, "client", client)
+        dispatched = []
+
+        async def dispatch_tool_call(tool_name, payload, ctx=None):
+            dispatched.append((tool_name, payload))
+            return {"data": {"ok": True}}
+
+        turn = ChatTurn()
+        events = [
+            event async for event in openai_service.stream_chat_completion(
+                conversation_id="c1",
+                conversation_mode="green",
+                message_text=f"How is portfolio {portfolio_id}?",
+                message_history=[],
+                registry=Mock(dispatch_tool_call=dispatch_tool_call),
+                turn=turn
+            )
+        ]
+
+        assert client.requests == 2
+        assert dispatched == [("get_portfolio_complete", {"portfolio_id": portfolio_id})]
+        assert turn.content == "Checking.Your portfolio looks fine today."
+        assert [call["name"] for call in turn.tool_calls] == ["get_portfolio_complete"]
+        assert events[-1].startswith("event: done")
+
+    def test_token_counting(self):
+        assert split_tokens("Hello  world.\nBye") == ["Hello", "  world.", "\nBye"]
+        assert count_tokens("") == 0
+
+
+class CountingTools(PortfolioTools):
+    """PortfolioTools answering from memory and counting calls"""
+
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    async def get_portfolio_complete(self, portfolio_id: str, include_holdings: bool = True,
+                                     include_timeseries: bool = False, include_attrib: bool = False, **kwargs):
+        self.calls += 1
+        return {"portfolio": {"id": portfolio_id}, "meta": {"truncated": False}}
+
+    async def get_current_quotes(self, symbols: str, include_options: bool = False, **kwargs):
+        self.calls += 1
+        return {"quotes": symbols}
+
+
+class TestToolResultCache:
+    """Test suite for the per-conversation tool result cache"""
+
+    @pytest.fixture
+    def registry(self):
+        return ToolRegistry(tools=CountingTools(), cache=ToolResultCache(ttl_seconds=60, maxsize=8))
+
+    @pytest.mark.asyncio
+    async def test_repeated_call_served_from_cache(self, registry):
+        """Equivalent arguments in one conversation hit; meta reports hit/miss counts"""
+        portfolio_id = str(uuid4())
+        ctx = {"conversation_id": "c1"}
+
+        first = await registry.dispatch_tool_call("get_portfolio_complete", {"portfolio_id": portfolio_id}, ctx)
+        second = await registry.dispatch_tool_call(
+            "get_portfolio_complete", {"portfolio_id": portfolio_id.upper(), "include_holdings": True}, ctx
+        )
+        await registry.dispatch_tool_call("get_portfolio_complete", {"portfolio_id": portfolio_id}, {"conversation_id": "c2"})
+
+        assert registry.tools.calls == 2
+        assert first["meta"]["cache_hit"] is False
+        assert second["meta"]["cache_hit"] is True
+        assert second["meta"]["cache"] == {"hits": 1, "misses": 1}
+        assert second["data"] == first["data"]
+
+    @pytest.mark.asyncio
+    async def test_data_version_invalidates(self, registry):
+        """A batch run or price update for the data makes earlier results unreachable"""
+        portfolio_id = str(uuid4())
+        payload = {"portfolio_id": portfolio_id}
+        ctx = {"conversation_id": "c1"}
+
+        await registry.dispatch_tool_call("get_portfolio_complete", payload, ctx)
+        record_data_versions({portfolio_scope(portfolio_id): 1})
+        await registry.dispatch_tool_call("get_portfolio_complete", payload, ctx)
+        record_data_versions({MARKET_DATA_SCOPE: get_data_version()[0] + 1})
+        await registry.dispatch_tool_call("get_portfolio_complete", payload, ctx)
+        await registry.dispatch_tool_call("get_portfolio_complete", payload, ctx)
+
+        assert registry.tools.calls == 3
+
+    @pytest.mark.asyncio
+    async def test_live_tools_and_anonymous_calls_not_cached(self, registry):
+        """Quotes are never cached, nor are calls without a conversation"""
+        for _ in range(2):
+            quotes = await registry.dispatch_tool_call("get_current_quotes", {"symbols": "AAPL"}, {"conversation_id": "c1"})
+            await registry.dispatch_tool_call("get_portfolio_complete", {"portfolio_id": str(uuid4())})
+
+        assert registry.tools.calls == 4
+        assert quotes["meta"]["cache"] is None
+        assert registry.cache.info()["size"] == 0
@@ -0,0 +1,140 @@
+"""
+Unit tests for the authenticated user cache
+"""
+import pytest
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock, patch
+from uuid import uuid4
+
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+
+from app.core import auth_cache, ttl_cache
+from app.core.auth import create_access_token
+from app.core.auth_cache import AuthUserCache, DecodedTokenCache, invalidate_user, token_digest
+from app.core.datetime_utils import utc_now
+from app.core.dependencies import get_current_user
+from app.schemas.auth import CurrentUser
+
+
+@pytest.fixture(autouse=True)
+def user_cache(monkeypatch):
+    cache = AuthUserCache(ttl_seconds=60)
+    monkeypatch.setattr(auth_cache, "_auth_user_cache", cache)
+    return cache
+
+
+def make_user(is_active=True):
+    return SimpleNamespace(
+        id=uuid4(),
+        email="demo@sigmasight.com",
+        full_name="Demo User",
+        is_active=is_active,
+        created_at=datetime(2025, 1, 1),
+    )
+
+
+def make_db(user):
+    rows = Mock()
+    rows.scalar_one_or_none.return_value = user
+    return AsyncMock(execute=AsyncMock(return_value=rows))
+
+
+def bearer(user):
+    token = create_access_token({"sub": str(user.id), "email": user.email})
+    return HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+
+class TestAuthUserCache:
+    """Test suite for caching validated users in get_current_user"""
+
+    @pytest.mark.asyncio
+    async def test_repeat_requests_skip_user_lookup(self):
+        user = make_user()
+        db = make_db(user)
+        credentials = bearer(user)
+
+        first = await get_current_user(credentials, None, db)
+        second = await get_current_user(credentials, None, db)
+
+        assert db.execute.await_count == 1
+        assert second == first
+        assert second is not first
+
+    @pytest.mark.asyncio
+    async def test_tokens_are_cached_separately(self):
+        user = make_user()
+        db = make_db(user)
+
+        await get_current_user(bearer(user), None, db)
+        await get_current_user(bearer(user), None, db)
+
+        assert db.execute.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_invalidate_user_forces_lookup(self):
+        user = make_user()
+        db = make_db(user)
+        credentials = bearer(user)
+        await get_current_user(credentials, None, db)
+
+        assert invalidate_user(user.id) == 1
+        user.is_active = False
+        with pytest.raises(HTTPException) as exc_info:
+            await get_current_user(credentials, None, db)
+
+        assert exc_info.value.detail == "Inactive user"
+        assert db.execute.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_inactive_user_not_cached(self, user_cache):
+        user = make_user(is_active=False)
+        db = make_db(user)
+
+        with pytest.raises(HTTPException):
+            await get_current_user(bearer(user), None, db)
+
+        assert user_cache.info()["size"] == 0
+
+    def test_entries_expire(self, user_cache):
+        user = make_user()
+        key = (str(user.id), "jti")
+        user_cache.set(key, CurrentUser.model_validate(user))
+
+        later = utc_now() + timedelta(seconds=61)
+        with patch.object(ttl_cache, "utc_now", return_value=later):
+            assert user_cache.get(key) == (False, None)
+        assert user_cache.info()["size"] == 0
+
+
+class TestDecodedTokenCache:
+    """Test suite for caching decoded JWT payloads"""
+
+    def test_payload_served_until_expiry(self):
+        cache = DecodedTokenCache()
+        token = create_access_token({"sub": str(uuid4())}, expires_delta=timedelta(minutes=5))
+
+        with patch.object(auth_cache, "verify_token", wraps=auth_cache.verify_token) as verify:
+            assert cache.decode(token) == cache.decode(token)
+            assert verify.call_count == 1
+
+            expired = Mock(time=Mock(return_value=time.time() + 600))
+            with patch.object(auth_cache, "time", expired):
+                cache.decode(token)
+            assert verify.call_count == 2
+
+    def test_expiry_independent_of_local_timezone(self, monkeypatch):
+        """An expired payload is not served on a host ahead of UTC"""
+        monkeypatch.setenv("TZ", "Asia/Tokyo")
+        time.tzset()
+        try:
+            cache = DecodedTokenCache()
+            token = create_access_token({"sub": str(uuid4())})
+            cache._payloads.set(token_digest(token), {"sub": "stale", "exp": int(time.time()) - 60})
+
+            assert cache.decode(token)["sub"] != "stale"
+        finally:
+            monkeypatch.undo()
+            time.tzset()
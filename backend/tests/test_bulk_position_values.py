@@ -0,0 +1,76 @@
+"""
+Unit tests for set-based position valuation (calculate_position_values_bulk,
+update_position_market_values_bulk)
+"""
+import pytest
+from datetime import date
+from decimal import Decimal
+from unittest.mock import AsyncMock
+from uuid import uuid4
+
+from app.calculations.market_data import (
+    calculate_position_values_bulk,
+    update_position_market_values_bulk
+)
+from app.models.positions import Position, PositionType
+
+
+class TestBulkPositionValues:
+    """Test the set-based position valuation path"""
+    
+    def _position(self, symbol, position_type, quantity, entry_price, last_price=None):
+        return Position(
+            id=uuid4(),
+            portfolio_id=uuid4(),
+            symbol=symbol,
+            position_type=position_type,
+            quantity=Decimal(quantity),
+            entry_price=Decimal(entry_price),
+            entry_date=date(2025, 1, 2),
+            last_price=last_price
+        )
+    
+    def test_bulk_values_match_single_position_formulas(self):
+        """Market value, unrealized and daily P&L use the same multiplier rules"""
+        positions = [
+            self._position("AAPL", PositionType.LONG, "100", "150.00"),
+            self._position("SPY250919C00460000", PositionType.SC, "-2", "5.00"),
+        ]
+        
+        values = calculate_position_values_bulk(
+            positions,
+            current_prices=[Decimal("155.00"), Decimal("6.00")],
+            previous_prices=[Decimal("150.00"), None]
+        )
+        
+        assert values["market_value"].tolist() == [15500.0, -1200.0]
+        assert values["unrealized_pnl"].tolist() == [500.0, -200.0]
+        assert values["daily_pnl"].tolist() == [500.0, 0.0]
+        assert values["daily_return"][0] == pytest.approx(5 / 150)
+        assert values["has_previous"].tolist() == [True, False]
+    
+    @pytest.mark.asyncio
+    async def test_bulk_update_issues_single_update(self):
+        """Priced positions are written with one bulk UPDATE; unpriced ones are reported"""
+        mock_db = AsyncMock()
+        mock_db.sync_session.info = {}  # Session.info records the data version to advance
+        positions = [
+            self._position("AAPL", PositionType.LONG, "100", "150.00"),
+            self._position("MISSING", PositionType.LONG, "10", "20.00"),
+        ]
+        
+        results = await update_position_market_values_bulk(
+            mock_db, positions, {"AAPL": Decimal("155.00")}, previous_prices={}
+        )
+        
+        assert mock_db.execute.await_count == 1
+        params = mock_db.execute.call_args[0][1]
+        assert [row["id"] for row in params] == [positions[0].id]
+        assert params[0]["market_value"] == Decimal("15500.00")
+        assert results[0]["success"] is True
+        assert results[1] == {
+            "position_id": positions[1].id,
+            "symbol": "MISSING",
+            "success": False,
+            "error": "No price data available"
+        }
@@ -0,0 +1,80 @@
+"""
+Unit tests for database-backed data versions
+"""
+import pytest
+from unittest.mock import AsyncMock, Mock
+from uuid import uuid4
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from app.core.data_version import (
+    MARKET_DATA_SCOPE,
+    get_data_version,
+    mark_market_data_changed,
+    mark_portfolio_data_changed,
+    portfolio_scope,
+    refresh_data_versions,
+)
+from app.models.snapshots import DataVersion
+
+
+@pytest.fixture
+def engine():
+    """In-memory SQLite engine with the data_versions table"""
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    DataVersion.__table__.create(engine)
+    return engine
+
+
+def stored_versions(engine):
+    with Session(engine) as session:
+        return {row.scope: row.version for row in session.query(DataVersion)}
+
+
+class TestDataVersions:
+    """Test suite for advancing versions with the data's own commit"""
+
+    def test_version_advances_only_on_commit(self, engine):
+        portfolio_id = uuid4()
+        market_before = get_data_version()[0]
+
+        with Session(engine) as session:
+            mark_portfolio_data_changed(session, portfolio_id)
+            mark_portfolio_data_changed(session, portfolio_id)
+            assert get_data_version(portfolio_id)[1] == 0
+            session.commit()
+
+            assert get_data_version(portfolio_id)[1] == 1
+            session.add(DataVersion(scope="rolled-back-write", version=0))
+            session.flush()
+            mark_portfolio_data_changed(session, portfolio_id)
+            mark_market_data_changed(session)
+            session.rollback()
+            assert get_data_version(portfolio_id)[1] == 1
+
+            mark_portfolio_data_changed(session, portfolio_id)
+            session.commit()
+
+        assert get_data_version(portfolio_id)[1] == 2
+        assert stored_versions(engine) == {portfolio_scope(portfolio_id): 2}
+        assert get_data_version()[0] == market_before
+
+    @pytest.mark.asyncio
+    async def test_refresh_reads_versions_committed_elsewhere(self):
+        """Versions advanced by another process are picked up and never move backwards"""
+        portfolio_id = uuid4()
+        rows = Mock()
+        rows.all.return_value = [(portfolio_scope(portfolio_id), 7)]
+        db = AsyncMock()
+        db.execute.return_value = rows
+
+        await refresh_data_versions(db, [portfolio_id])
+        assert get_data_version(portfolio_id)[1] == 7
+
+        rows.all.return_value = [(portfolio_scope(portfolio_id), 3)]
+        await refresh_data_versions(db, [portfolio_id])
+        assert get_data_version(portfolio_id)[1] == 7
+        statement = db.execute.await_args.args[0]
+        assert MARKET_DATA_SCOPE in statement.compile().params["scope_1"]
@@ -0,0 +1,141 @@
+"""
+Unit tests for factor beta regressions
+"""
+import numpy as np
+import pandas as pd
+import pytest
+import statsmodels.api as sm
+
+from app.calculations.factors import _multivariate_factor_betas, _univariate_factor_betas
+from app.constants.factors import FACTOR_ETFS
+
+
+class TestFactorRegression:
+    """Test suite for univariate and multivariate factor betas"""
+    
+    @pytest.fixture
+    def returns(self):
+        """Synthetic factor returns and positions driven by known betas"""
+        rng = np.random.default_rng(7)
+        factor_returns = pd.DataFrame(
+            rng.normal(0, 0.01, (120, len(FACTOR_ETFS))), columns=list(FACTOR_ETFS)
+        )
+        true_betas = rng.normal(0, 0.8, (len(FACTOR_ETFS), 3))
+        position_returns = pd.DataFrame(
+            factor_returns.values @ true_betas + rng.normal(0, 0.002, (120, 3)),
+            columns=["p1", "p2", "p3"]
+        )
+        # One position with a shorter history gets its own mask
+        position_returns.iloc[:15, 2] = np.nan
+        return position_returns, factor_returns
+    
+    def test_multivariate_matches_statsmodels(self, returns):
+        """Shared factorization reproduces a per-position joint OLS"""
+        position_returns, factor_returns = returns
+        betas, stats = _multivariate_factor_betas(position_returns, factor_returns)
+        
+        for position_id in position_returns.columns:
+            data = pd.concat([position_returns[position_id], factor_returns], axis=1).dropna()
+            model = sm.OLS(
+                data[position_id].values, sm.add_constant(data[list(FACTOR_ETFS)].values)
+            ).fit()
+            
+            expected = np.clip(model.params[1:], -3, 3)
+            assert [betas[position_id][f] for f in FACTOR_ETFS] == pytest.approx(expected.tolist())
+            assert [stats[position_id][f]["std_err"] for f in FACTOR_ETFS] == pytest.approx(model.bse[1:].tolist())
+            assert stats[position_id]["Market"]["r_squared"] == pytest.approx(model.rsquared)
+    
+    def test_short_history_gets_zero_betas(self, returns):
+        """Both modes return zeros when fewer than MIN_REGRESSION_DAYS are usable"""
+        position_returns, factor_returns = returns
+        position_returns = position_returns.copy()
+        position_returns.iloc[30:, 0] = np.nan
+        
+        for regress in (_univariate_factor_betas, _multivariate_factor_betas):
+            betas, stats = regress(position_returns, factor_returns)
+            assert set(betas["p1"].values()) == {0.0}
+            assert stats["p1"]["Market"]["p_value"] == 1.0
+
+
+class TestRollingFactorBetas:
+    """Test suite for the cumulative-sum rolling beta engine"""
+    
+    def test_rolling_window_matches_univariate_regression(self):
+        """Each window's beta equals a fresh univariate OLS over the same rows"""
+        from app.calculations.rolling_betas import rolling_factor_betas
+        
+        rng = np.random.default_rng(11)
+        factor_returns = rng.normal(0, 0.01, (200, len(FACTOR_ETFS)))
+        position_returns = factor_returns @ rng.normal(0, 0.7, (len(FACTOR_ETFS), 2))
+        position_returns += rng.normal(0, 0.004, position_returns.shape)
+        position_returns[120:125, 1] = np.nan
+        
+        betas, observations = rolling_factor_betas(position_returns, factor_returns, window=90)
+        
+        for day in (89, 130, 199):
+            rows = slice(day - 89, day + 1)
+            expected, _ = _univariate_factor_betas(
+                pd.DataFrame(position_returns[rows], columns=["p1", "p2"]),
+                pd.DataFrame(factor_returns[rows], columns=list(FACTOR_ETFS))
+            )
+            for column, position_id in enumerate(["p1", "p2"]):
+                assert betas[day, column].tolist() == pytest.approx(
+                    [expected[position_id][f] for f in FACTOR_ETFS]
+                )
+        assert observations[130, 1, 0] == 85
+        assert np.isnan(betas[:59]).all()
+    
+    def test_beta_rows_skip_empty_days(self):
+        """Rows are only written where at least one factor has a beta"""
+        from datetime import date
+        from uuid import uuid4
+        from app.calculations.rolling_betas import _beta_rows
+        
+        betas = np.array([[[np.nan, np.nan]], [[0.51234567, np.nan]]])
+        observations = np.array([[[10, 10]], [[60, 59]]])
+        position_id = str(uuid4())
+        
+        rows = _beta_rows([position_id], ["Market", "Value"], [date(2025, 1, 2), date(2025, 1, 3)],
+                          60, betas, observations)
+        
+        assert len(rows) == 1
+        assert rows[0]["calculation_date"] == date(2025, 1, 3)
+        assert rows[0]["betas"] == {"Market": 0.512346}
+        assert rows[0]["observations"] == 59
+    
+    @pytest.mark.asyncio
+    async def test_chunked_calculation_matches_full_regression(self, monkeypatch):
+        """Chunking by position and skipping look-back rows leaves the betas unchanged"""
+        from datetime import date
+        from unittest.mock import AsyncMock
+        from uuid import uuid4
+        from app.calculations import rolling_betas
+        
+        rng = np.random.default_rng(5)
+        days = pd.bdate_range("2024-01-01", periods=160)
+        factor_returns = pd.DataFrame(
+            rng.normal(0, 0.01, (160, len(FACTOR_ETFS))), index=days, columns=list(FACTOR_ETFS)
+        )
+        position_ids = [f"p{i}" for i in range(5)]
+        position_returns = pd.DataFrame(
+            factor_returns.values @ rng.normal(0, 0.7, (len(FACTOR_ETFS), 5)) + rng.normal(0, 0.004, (160, 5)),
+            index=days, columns=position_ids
+        )
+        monkeypatch.setattr(rolling_betas, "fetch_factor_returns", AsyncMock(return_value=factor_returns))
+        monkeypatch.setattr(rolling_betas, "calculate_position_returns", AsyncMock(return_value=position_returns))
+        monkeypatch.setattr(rolling_betas, "ROLLING_BETA_POSITION_CHUNK_SIZE", 2)
+        
+        start_date = days[150].date()
+        result = await rolling_betas.calculate_rolling_factor_betas(
+            None, uuid4(), start_date, date(2024, 12, 31), windows=(60, 120), persist=False
+        )
+        
+        assert result["dates"] == [day.date() for day in days[150:]]
+        for window in (60, 120):
+            expected, _ = rolling_betas.rolling_factor_betas(
+                position_returns.to_numpy(), factor_returns.to_numpy(), window
+            )
+            for column, position_id in enumerate(position_ids):
+                np.testing.assert_allclose(
+                    result["betas"][window][position_id].to_numpy(), expected[150:, column]
+                )
@@ -0,0 +1,159 @@
+"""
+Unit tests for factor exposure storage and the shared factor run context
+"""
+import pytest
+from datetime import date
+from unittest.mock import AsyncMock, Mock
+from uuid import uuid4
+
+from sqlalchemy.dialects import postgresql
+
+from app.calculations.factors import (
+    FactorRunContext,
+    clear_factor_definition_cache,
+    get_factor_definition_ids,
+    store_position_factor_exposures,
+)
+from app.calculations.market_risk import calculate_portfolio_market_beta
+from app.calculations.position_frame import PositionFrame
+from app.calculations.stress_testing import calculate_direct_stress_impact
+from app.constants.factors import FACTOR_DEFINITION_NAMES
+
+
+class TestFactorExposureStorage:
+    """Test suite for cached factor definitions and bulk exposure writes"""
+    
+    @pytest.fixture
+    def mock_db(self):
+        """Session whose first query returns every factor definition"""
+        definitions = Mock()
+        definitions.all.return_value = [
+            (name, uuid4(), True) for name in FACTOR_DEFINITION_NAMES.values()
+        ]
+        db = AsyncMock()
+        db.execute.return_value = definitions
+        clear_factor_definition_cache()
+        yield db
+        clear_factor_definition_cache()
+    
+    @pytest.mark.asyncio
+    async def test_factor_definitions_queried_once(self, mock_db):
+        """Ids are keyed by model factor name and cached across calls"""
+        first = await get_factor_definition_ids(mock_db)
+        second = await get_factor_definition_ids(mock_db)
+        
+        assert set(first) == set(FACTOR_DEFINITION_NAMES)
+        assert first == second
+        assert mock_db.execute.await_count == 1
+    
+    @pytest.mark.asyncio
+    async def test_position_exposures_written_in_one_statement(self, mock_db):
+        """All position x factor rows go into a single INSERT ... ON CONFLICT"""
+        position_betas = {
+            str(uuid4()): {"Market": 1.1, "Value": 0.4},
+            str(uuid4()): {"Market": 0.9, "Value": 0.2, "Unknown": 2.0},
+        }
+        
+        results = await store_position_factor_exposures(mock_db, position_betas, date(2025, 1, 2))
+        
+        # Definitions query + stale-row delete + one upsert
+        assert mock_db.execute.await_count == 3
+        assert results["records_stored"] == 4
+        assert results["positions_processed"] == 2
+        upsert = mock_db.execute.await_args_list[2].args[0]
+        assert "ON CONFLICT ON CONSTRAINT uq_position_factor_date" in str(
+            upsert.compile(dialect=postgresql.dialect())
+        )
+    
+    @pytest.mark.asyncio
+    async def test_rerun_drops_factors_left_out(self, mock_db):
+        """Exposures of factors missing from a rerun are deleted for that date"""
+        position_betas = {
+            str(uuid4()): {"Market": 1.1, "Value": 0.4},
+            str(uuid4()): {"Market": 0.9},
+        }
+        factor_ids = await get_factor_definition_ids(mock_db)  # cached for the store below
+        
+        await store_position_factor_exposures(mock_db, position_betas, date(2025, 1, 2))
+        
+        deletes = [call.args[0] for call in mock_db.execute.await_args_list[1:3]]
+        kept = [
+            {
+                value for value in stmt.compile(compile_kwargs={"render_postcompile": True}).params.values()
+                if value in factor_ids.values()
+            }
+            for stmt in deletes
+        ]
+        assert all("NOT IN" in str(stmt) for stmt in deletes)
+        assert sorted(kept, key=len) == [
+            {factor_ids["Market"]}, {factor_ids["Market"], factor_ids["Value"]}
+        ]
+
+
+class TestFactorRunContext:
+    """Later batch stages reuse the positions and betas of the factor run"""
+    
+    @pytest.fixture
+    def context(self):
+        portfolio_id = uuid4()
+        frame = PositionFrame.from_rows(
+            [
+                (uuid4(), "AAPL", "LONG", 100, 200.0, 150.0, 20000.0),
+                (uuid4(), "SPY", "LONG", 50, 400.0, 390.0, 20000.0),
+            ],
+            portfolio_id=portfolio_id,
+        )
+        factor_analysis = {
+            "factor_betas": {"Market": 1.2, "Value": 0.3},
+            "data_quality": {"quality_flag": "full_history"},
+            "storage_results": {
+                "portfolio_storage": {
+                    "stored_exposures": {
+                        "Market Beta": {
+                            "exposure_value": 1.2,
+                            "exposure_dollar": 48000.0,
+                            "calculation_date": date(2025, 1, 2),
+                        }
+                    }
+                }
+            },
+        }
+        return FactorRunContext(
+            portfolio_id=portfolio_id,
+            calculation_date=date(2025, 1, 2),
+            position_frame=frame,
+            factor_analysis=factor_analysis,
+        )
+    
+    @pytest.mark.asyncio
+    async def test_market_beta_reuses_factor_run(self, context):
+        """No positions are loaded and no betas are recalculated"""
+        db = AsyncMock()
+        
+        result = await calculate_portfolio_market_beta(
+            db, context.portfolio_id, context.calculation_date, context=context
+        )
+        
+        db.execute.assert_not_awaited()
+        db.commit.assert_not_awaited()
+        assert result["market_beta"] == 1.2
+        assert result["portfolio_value"] == pytest.approx(40000.0)
+        assert result["positions_count"] == 2
+    
+    @pytest.mark.asyncio
+    async def test_stress_impact_uses_supplied_exposures(self, context):
+        """Exposures from the factor run replace the per-scenario query"""
+        db = AsyncMock()
+        scenario = {"name": "Market crash", "shocked_factors": {"Market": -0.1}}
+        
+        result = await calculate_direct_stress_impact(
+            db, context.portfolio_id, scenario, context.calculation_date,
+            position_frame=context.position_frame,
+            factor_exposures=context.latest_factor_exposures()
+        )
+        
+        db.execute.assert_not_awaited()
+        assert result["factor_impacts"]["Market"]["exposure_dollar"] == 48000.0
+        assert result["total_direct_pnl"] == pytest.approx(
+            40000.0 * 1.2 * -0.1
+        )
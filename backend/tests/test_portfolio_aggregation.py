@@ -5,11 +5,13 @@ Tests all functions in app/calculations/portfolio.py with various scenarios
 including edge cases, large portfolios, and missing data.
 """
 
+import logging
 import pytest
 from decimal import Decimal
 from datetime import datetime, timedelta
 import time
 from typing import List, Dict
+from uuid import uuid4
 
 from app.calculations.portfolio import (
     calculate_portfolio_exposures,
@@ -18,8 +20,11 @@ from app.calculations.portfolio import (
     aggregate_by_tags,
     aggregate_by_underlying,
     clear_portfolio_cache,
+    get_aggregation_cache_stats,
+    AggregationKey,
     timed_lru_cache
 )
+from app.core.data_version import portfolio_scope, record_data_versions
 
 
 class TestPortfolioExposures:
@@ -601,6 +606,41 @@ class TestCaching:
         # Actual cache clearing is tested indirectly through other tests
         clear_portfolio_cache()  # Should not raise any exceptions
 
+    def test_aggregation_cache_hits_until_data_version_changes(self):
+        """Keyed calls hit the cache until the portfolio's data version advances."""
+        clear_portfolio_cache()
+        portfolio_id = str(uuid4())
+        key = AggregationKey.for_portfolio("test", portfolio_id)
+        positions = [
+            {"id": "cache-1", "exposure": Decimal("1000"), "market_value": Decimal("1000"), "position_type": "LONG"},
+            {"id": "cache-2", "exposure": Decimal("-400"), "market_value": Decimal("-400"), "position_type": "SHORT"},
+        ]
+        before = get_aggregation_cache_stats()
+        
+        first = calculate_portfolio_exposures(positions, cache_key=key)
+        first["gross_exposure"] = Decimal("0")  # callers get their own copy
+        second = calculate_portfolio_exposures([dict(p) for p in positions], cache_key=key)
+        
+        after = get_aggregation_cache_stats()
+        assert second["gross_exposure"] == Decimal("1400.00")
+        assert after["misses"] - before["misses"] == 1
+        assert after["hits"] - before["hits"] == 1
+        
+        record_data_versions({portfolio_scope(portfolio_id): 1})
+        calculate_portfolio_exposures(positions, cache_key=key)
+        assert get_aggregation_cache_stats()["misses"] - after["misses"] == 1
+    
+    def test_unkeyed_calls_bypass_cache(self):
+        """Calls without a cache key are computed directly."""
+        positions = [{"exposure": Decimal("10"), "position_type": "LONG"}]
+        before = get_aggregation_cache_stats()
+        
+        calculate_portfolio_exposures(positions)
+        calculate_portfolio_exposures(positions)
+        
+        after = get_aggregation_cache_stats()
+        assert (after["hits"], after["misses"]) == (before["hits"], before["misses"])
+
 
 class TestLargePortfolio:
     """Performance tests with large portfolios."""
@@ -732,4 +772,31 @@ class TestEdgeCases:
         
         # Greeks aggregation should skip all
         greeks_result = aggregate_portfolio_greeks(positions)
-        assert greeks_result["metadata"]["positions_without_greeks"] == 3
\ No newline at end of file
+        assert greeks_result["metadata"]["positions_without_greeks"] == 3
+    
+    def test_invalid_values_are_logged(self, caplog):
+        """Test that invalid or NaN values count as zero but are reported."""
+        positions = [
+            {"exposure": "n/a", "position_type": "LONG"},
+            {"exposure": float("nan"), "position_type": "LONG"},
+            {"exposure": Decimal("100"), "position_type": "LONG"},
+        ]
+        
+        with caplog.at_level(logging.WARNING, logger="app.calculations.portfolio"):
+            result = calculate_portfolio_exposures(positions)
+        
+        assert result["gross_exposure"] == Decimal("100.00")
+        assert "2 invalid exposure value(s) treated as 0" in caplog.text
+    
+    def test_float_aggregation_matches_decimal_rounding(self):
+        """Test float64 sums quantize like Decimal sums at half-cent boundaries."""
+        positions = [
+            {"exposure": Decimal("0.1"), "position_type": "LONG", "symbol": "A", "tags": ["x"]},
+            {"exposure": Decimal("0.2"), "position_type": "LONG", "symbol": "A", "tags": ["x"]},
+            {"exposure": Decimal("0.005"), "position_type": "LONG", "symbol": "A", "tags": ["x"]}
+        ]
+        
+        # Decimal("0.305") rounds half-even to 0.30; a naive float sum is 0.30500000000000005
+        assert calculate_portfolio_exposures(positions)["gross_exposure"] == Decimal("0.30")
+        assert aggregate_by_tags(positions)["x"]["net_exposure"] == Decimal("0.30")
+        assert aggregate_by_underlying(positions)["A"]["long_exposure"] == Decimal("0.30")
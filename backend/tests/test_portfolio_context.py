@@ -0,0 +1,67 @@
+"""
+Unit tests for the cached chat portfolio context
+"""
+import pytest
+from datetime import date
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock
+from uuid import uuid4
+
+from app.core.data_version import portfolio_scope, record_data_versions
+from app.core.ttl_cache import TTLCache
+from app.services import portfolio_data_service as service_module
+from app.services.portfolio_data_service import PortfolioDataService
+
+
+def result(one_or_none=None, one=None):
+    rows = Mock()
+    rows.one_or_none.return_value = one_or_none
+    rows.one.return_value = one
+    return rows
+
+
+@pytest.fixture(autouse=True)
+def context_cache(monkeypatch):
+    cache = TTLCache(ttl_seconds=60, maxsize=8, copy_value=dict)
+    monkeypatch.setattr(service_module, "_portfolio_context_cache", cache)
+    return cache
+
+
+class TestPortfolioContext:
+    """Test suite for the snapshot-backed chat context"""
+
+    @pytest.mark.asyncio
+    async def test_snapshot_lookup_cached_until_new_version(self, context_cache):
+        """One snapshot query; repeats are served from memory until the batch lands"""
+        portfolio_id = uuid4()
+        snapshot = SimpleNamespace(snapshot_date=date(2025, 1, 3), total_value=Decimal("125000.50"), num_positions=12)
+        db = AsyncMock()
+        db.execute.return_value = result(one_or_none=snapshot)
+        service = PortfolioDataService()
+
+        first = await service.get_portfolio_context(db, portfolio_id)
+        second = await service.get_portfolio_context(db, portfolio_id)
+        record_data_versions({portfolio_scope(portfolio_id): 1})
+        await service.get_portfolio_context(db, portfolio_id)
+
+        assert first == second == {
+            "portfolio_id": str(portfolio_id),
+            "total_value": 125000.5,
+            "position_count": 12,
+            "as_of": "2025-01-03",
+        }
+        assert db.execute.await_count == 2
+        stats = context_cache.info()
+        assert (stats["hits"], stats["misses"]) == (1, 2)
+
+    @pytest.mark.asyncio
+    async def test_positions_fallback_without_snapshot(self):
+        """Portfolios without snapshots are summarized by one aggregate query"""
+        db = AsyncMock()
+        db.execute.side_effect = [result(one_or_none=None), result(one=(3, Decimal("900")))]
+
+        context = await PortfolioDataService().get_portfolio_context(db, uuid4())
+
+        assert context["total_value"] == 900.0 and context["position_count"] == 3
+        assert context["as_of"] is None
@@ -0,0 +1,74 @@
+"""
+Unit tests for the columnar PositionFrame
+"""
+import pytest
+from datetime import date
+from decimal import Decimal
+from uuid import uuid4
+
+from app.calculations.position_frame import PositionFrame
+from app.calculations.stress_testing import calculate_portfolio_market_value
+from app.models.positions import Position, PositionType
+
+
+class TestPositionFrame:
+    """Test suite for PositionFrame derived columns"""
+
+    @pytest.fixture
+    def positions(self):
+        """Long stock, short stock, short call and a long put without a market value"""
+        def make(symbol, position_type, quantity, last_price, market_value, entry_price="100"):
+            return Position(
+                id=uuid4(),
+                portfolio_id=uuid4(),
+                symbol=symbol,
+                position_type=position_type,
+                quantity=Decimal(quantity),
+                entry_price=Decimal(entry_price),
+                entry_date=date(2025, 1, 1),
+                last_price=Decimal(last_price) if last_price else None,
+                market_value=Decimal(market_value) if market_value else None
+            )
+
+        return [
+            make("AAPL", PositionType.LONG, "100", "155", "15500"),
+            make("GOOGL", PositionType.SHORT, "-50", "280", "-14000"),
+            make("SPY250919C00460000", PositionType.SC, "-2", "5", "-1000"),
+            make("SPY250919P00400000", PositionType.LP, "3", "4", None),
+        ]
+
+    def test_multiplier_and_sign(self, positions):
+        """Options get the contract multiplier; short types get a negative sign"""
+        frame = PositionFrame.from_positions(positions)
+
+        assert len(frame) == 4
+        assert frame.multiplier.tolist() == [1.0, 1.0, 100.0, 100.0]
+        assert frame.sign.tolist() == [1.0, -1.0, -1.0, 1.0]
+        assert frame.position_types == ["LONG", "SHORT", "SC", "LP"]
+        assert frame.signed_exposure.tolist() == [15500.0, -14000.0, -1000.0, 0.0]
+
+    def test_exposure_weights_sum_to_one(self, positions):
+        """Weights are proportional to |quantity x price x multiplier|"""
+        frame = PositionFrame.from_positions(positions)
+        weights = frame.exposure_weights()
+
+        notional = [15500.0, 14000.0, 1000.0, 1200.0]
+        assert sum(weights.values()) == pytest.approx(1.0)
+        assert weights[str(positions[0].id)] == pytest.approx(notional[0] / sum(notional))
+
+    def test_gross_market_value_matches_position_list(self, positions):
+        """Stress testing market value is the same from a frame or a Position list"""
+        frame = PositionFrame.from_positions(positions)
+
+        # Stored values sum to 500; the long put is priced at 3 x 4 x 100
+        assert calculate_portfolio_market_value(frame) == pytest.approx(1700.0)
+        assert calculate_portfolio_market_value(positions) == pytest.approx(1700.0)
+
+    def test_aggregation_records(self, positions):
+        """Records carry the fields the portfolio aggregations read"""
+        records = PositionFrame.from_positions(positions).aggregation_records()
+
+        assert records[1]["exposure"] == -14000.0
+        assert records[3]["market_value"] == 0.0
+        assert records[2]["position_type"] == "SC"
+        assert records[0]["id"] == str(positions[0].id)
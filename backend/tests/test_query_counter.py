@@ -0,0 +1,111 @@
+"""
+Unit tests for query counting and N+1 detection
+"""
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+
+from app.core.query_counter import (
+    QUERY_COUNT_HEADER,
+    QUERY_REPEATED_HEADER,
+    QueryBudgetExceeded,
+    assert_max_queries,
+    count_queries,
+    normalize_statement,
+    query_count_middleware,
+)
+
+
+@pytest.fixture
+def engine():
+    """In-memory SQLite engine with a small table"""
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE prices (symbol TEXT, close REAL)"))
+        conn.execute(text("INSERT INTO prices VALUES ('AAPL', 150.0), ('MSFT', 300.0)"))
+    return engine
+
+
+class TestNormalizeStatement:
+    """Statement shape normalization"""
+
+    def test_bind_params_and_literals_collapse(self):
+        a = normalize_statement("SELECT * FROM prices WHERE symbol = $1 AND close > 10")
+        b = normalize_statement("SELECT *  FROM prices\nWHERE symbol = 'AAPL' AND close > 20.5")
+        assert a == b
+
+    def test_in_lists_collapse(self):
+        a = normalize_statement("SELECT * FROM prices WHERE symbol IN (?, ?)")
+        b = normalize_statement("SELECT * FROM prices WHERE symbol IN (?, ?, ?, ?)")
+        assert a == b
+
+
+class TestCountQueries:
+    """Statement counting scopes"""
+
+    def test_counts_statements_in_scope(self, engine):
+        with count_queries("job") as stats:
+            with engine.connect() as conn:
+                for symbol in ["AAPL", "MSFT", "AAPL"]:
+                    conn.execute(text("SELECT close FROM prices WHERE symbol = :s"), {"s": symbol})
+                conn.execute(text("SELECT COUNT(*) FROM prices"))
+
+        assert stats.count == 4
+        assert len(stats.shapes) == 2
+        assert stats.repeated(threshold=3)[0][1] == 3
+        assert stats.repeated(threshold=4) == []
+
+    def test_statements_outside_scope_not_counted(self, engine):
+        with count_queries() as stats:
+            pass
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+        assert stats.count == 0
+
+    def test_nested_scope_counts_in_enclosing_scope(self, engine):
+        with count_queries("turn") as outer:
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+                with count_queries("request") as inner:
+                    conn.execute(text("SELECT 2"))
+        assert inner.count == 1
+        assert outer.count == 2
+
+    def test_budget_exceeded(self, engine):
+        with pytest.raises(QueryBudgetExceeded) as exc_info:
+            with assert_max_queries(1):
+                with engine.connect() as conn:
+                    conn.execute(text("SELECT 1"))
+                    conn.execute(text("SELECT 2"))
+        assert exc_info.value.stats.count == 2
+        assert "budget is 1" in str(exc_info.value)
+
+    def test_budget_respected(self, engine):
+        with assert_max_queries(1) as stats:
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+        assert stats.count == 1
+
+
+def test_middleware_reports_query_count(engine):
+    """Debug middleware adds query count headers"""
+    app = FastAPI()
+    app.middleware("http")(query_count_middleware)
+
+    @app.get("/prices")
+    def prices():
+        with engine.connect() as conn:
+            for _ in range(6):
+                conn.execute(text("SELECT close FROM prices WHERE symbol = 'AAPL'"))
+        return {"ok": True}
+
+    response = TestClient(app).get("/prices")
+    assert response.status_code == 200
+    assert response.headers[QUERY_COUNT_HEADER] == "6"
+    assert response.headers[QUERY_REPEATED_HEADER] == "1"
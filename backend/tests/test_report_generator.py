@@ -0,0 +1,183 @@
+"""
+Unit tests for multi-format report generation and the report data cache
+"""
+import asyncio
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, Mock
+from uuid import uuid4
+
+from app.reports import portfolio_report_generator as report_module
+from app.reports.portfolio_report_generator import (
+    PortfolioReportGenerator,
+    ReportDataCache,
+    ReportRequest,
+    generate_portfolio_report,
+)
+
+
+class TestMultiFormatReports:
+    """Test suite for collecting once and rendering every format"""
+
+    @pytest.fixture
+    def collected(self, monkeypatch, tmp_path):
+        """Stub data collection and builders; run in a temporary directory"""
+        portfolio_id = str(uuid4())
+        data = {"meta": {"portfolio_id": portfolio_id, "portfolio_name": "Demo Fund", "anchor_date": "2025-01-02"}}
+        collect = AsyncMock(return_value=data)
+        monkeypatch.setattr(report_module, "_collect_report_data", collect)
+        monkeypatch.setattr(report_module, "build_markdown_report", lambda d: "# report")
+        monkeypatch.setattr(report_module, "build_json_report", lambda d: {"meta": d["meta"]})
+        monkeypatch.setattr(report_module, "build_csv_report", lambda d: "a,b\n")
+        monkeypatch.setattr(report_module, "_report_data_cache", ReportDataCache())
+        monkeypatch.chdir(tmp_path)
+        return portfolio_id, collect
+
+    @pytest.mark.asyncio
+    async def test_all_formats_from_one_collection(self, collected):
+        """Three files are written from a single _collect_report_data call"""
+        portfolio_id, collect = collected
+        generator = PortfolioReportGenerator(db=AsyncMock())
+
+        paths = await generator.generate_reports(portfolio_id, date(2025, 1, 3))
+
+        assert collect.await_count == 1
+        assert set(paths) == {"md", "json", "csv"}
+        assert Path(paths["md"]).read_text() == "# report"
+        assert Path(paths["md"]).parent.name == "demo-fund_2025-01-03"
+
+    @pytest.mark.asyncio
+    async def test_rerun_served_from_cache(self, collected):
+        """A repeated request for the same date does not collect again"""
+        portfolio_id, collect = collected
+        request = ReportRequest(portfolio_id=portfolio_id, as_of=date(2025, 1, 3), formats={"csv"}, write_to_disk=False)
+
+        first = await generate_portfolio_report(AsyncMock(), request)
+        second = await generate_portfolio_report(AsyncMock(), request)
+        report_module.invalidate_report_data(portfolio_id)
+        await generate_portfolio_report(AsyncMock(), request)
+
+        assert first == second == {"csv": "a,b\n"}
+        assert collect.await_count == 2
+        assert report_module.get_report_data_cache_stats()["hits"] == 1
+
+
+class TestCollectReportData:
+    """Test suite for set-based report data collection"""
+
+    @pytest.mark.asyncio
+    async def test_fixed_number_of_queries(self):
+        """Collection issues eight queries regardless of position count"""
+        portfolio = Mock(id=uuid4(), created_at=None)
+        portfolio.name = "Demo Fund"
+        anchor = Mock()
+        anchor.one_or_none.return_value = portfolio
+        anchor.scalar_one_or_none.return_value = None
+        anchor.scalars.return_value.all.return_value = []
+        anchor.all.return_value = []
+        db = AsyncMock()
+        db.execute.return_value = anchor
+
+        data = await report_module._collect_report_data(db, portfolio_id=str(portfolio.id), as_of=date(2025, 1, 3))
+
+        assert db.execute.await_count == 8
+        assert data["meta"]["anchor_date"] == "2025-01-03"
+        assert data["positions"] == [] and data["factor_exposures"] == []
+
+    @pytest.mark.asyncio
+    async def test_missing_portfolio(self):
+        """An unknown portfolio returns an error payload dated as_of"""
+        missing = Mock()
+        missing.one_or_none.return_value = None
+        missing.scalar_one_or_none.return_value = None
+        db = AsyncMock()
+        db.execute.return_value = missing
+
+        data = await report_module._collect_report_data(db, portfolio_id=str(uuid4()), as_of=date(2025, 1, 3))
+
+        assert data["meta"]["error"] == "Portfolio not found"
+        assert data["meta"]["as_of"] == "2025-01-03"
+
+    @pytest.mark.asyncio
+    async def test_queries_stay_on_session_unless_parallel(self, monkeypatch):
+        """Parallel collection is opt-in and skipped while the session has a transaction open"""
+        from sqlalchemy.ext.asyncio import AsyncSession
+
+        session_factory = MagicMock()
+        monkeypatch.setattr("sqlalchemy.ext.asyncio.async_sessionmaker", session_factory)
+        db = Mock(spec=AsyncSession, bind=Mock(), new=(), dirty=(), deleted=())
+        db.in_transaction.return_value = True
+
+        async def query(session):
+            return session
+
+        assert await report_module._run_queries(db, {"a": query}) == {"a": db}
+        assert await report_module._run_queries(db, {"a": query}, parallel=True) == {"a": db}
+        session_factory.assert_not_called()
+
+        db.in_transaction.return_value = False
+        pooled = session_factory.return_value.return_value.__aenter__.return_value
+        assert await report_module._run_queries(db, {"a": query}, parallel=True) == {"a": pooled}
+
+
+class TestBulkReports:
+    """Test suite for the bounded bulk report worker pool"""
+
+    @pytest.mark.asyncio
+    async def test_bounded_concurrency_and_failures_recorded(self, monkeypatch):
+        """No more than max_workers portfolios run at once; a failure does not stop the run"""
+        running = {"now": 0, "peak": 0}
+
+        async def fake_generate(db, request, executor=None):
+            running["now"] += 1
+            running["peak"] = max(running["peak"], running["now"])
+            await asyncio.sleep(0.01)
+            running["now"] -= 1
+            if request.portfolio_id == "bad":
+                raise RuntimeError("boom")
+            return {"csv": "a,b\n"}, {}
+
+        monkeypatch.setattr(report_module, "_generate_report_files", fake_generate)
+        finished = []
+
+        runs = await report_module.generate_reports_bulk(
+            ["p1", "p2", "bad", "p3", "p4"],
+            formats={"csv"},
+            max_workers=2,
+            render_processes=0,
+            on_result=finished.append,
+        )
+
+        assert running["peak"] == 2
+        assert len(runs) == 5 and finished == runs
+        assert [run.portfolio_id for run in runs if not run.success] == ["bad"]
+        assert all(run.formats == ["csv"] and run.seconds > 0 for run in runs if run.success)
+
+    @pytest.mark.asyncio
+    async def test_executor_renders_all_formats_in_one_task(self, monkeypatch):
+        """With an executor the formats are rendered by a single submitted task"""
+        monkeypatch.setattr(report_module, "build_markdown_report", lambda d: "# report")
+        monkeypatch.setattr(report_module, "build_csv_report", lambda d: "a,b\n")
+        executor = Mock(wraps=ThreadPoolExecutor(max_workers=1))
+
+        artifacts = await report_module.render_report_artifacts({}, ["md", "csv"], executor)
+
+        assert artifacts == {"md": "# report", "csv": "a,b\n"}
+        assert executor.submit.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_render_processes_are_not_forked(self, monkeypatch):
+        """The rendering pool starts its processes without forking the running server"""
+        start_methods = []
+
+        async def fake_generate(db, request, executor=None):
+            start_methods.append(executor._mp_context.get_start_method())
+            return {"csv": "a,b\n"}, {}
+
+        monkeypatch.setattr(report_module, "_generate_report_files", fake_generate)
+
+        await report_module.generate_reports_bulk(["p1"], formats={"csv"}, render_processes=1)
+
+        assert start_methods and start_methods[0] != "fork"
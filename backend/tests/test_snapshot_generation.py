@@ -1,6 +1,7 @@
 """
 Unit tests for portfolio snapshot generation
 """
+import numpy as np
 import pytest
 from datetime import date, datetime, timedelta
 from decimal import Decimal
@@ -13,6 +14,7 @@ from app.calculations.snapshots import (
     _calculate_pnl,
     _count_positions
 )
+from app.calculations.bulk_snapshots import _price_panel, aggregate_snapshot_groups, chain_pnl, snapshot_rows
 from app.models.positions import Position, PositionType
 from app.models.snapshots import PortfolioSnapshot
 from app.models.market_data import PositionGreeks
@@ -308,4 +310,75 @@ class TestSnapshotGeneration:
         
         assert result["success"] is True
         assert len(result["statistics"]["warnings"]) == 1
-        assert "Missing Greeks" in result["statistics"]["warnings"][0]
\ No newline at end of file
+        assert "Missing Greeks" in result["statistics"]["warnings"][0]
+
+
+class TestBulkSnapshots:
+    """Test suite for the set-based snapshot kernel"""
+    
+    def test_grouped_aggregates_match_per_portfolio_rules(self):
+        """Unpriced positions count but add no exposure; Greeks only where present"""
+        nan_row = [np.nan] * 5
+        aggregates = aggregate_snapshot_groups(
+            group_codes=np.array([0, 0, 1, 1]),
+            n_groups=3,
+            exposure=np.array([15500.0, -14250.0, np.nan, 2000.0]),
+            greeks=np.array([nan_row, nan_row, [0.5] * 5, [0.25] * 5]),
+            quantity=np.array([100.0, -50.0, 10.0, 20.0])
+        )
+        
+        assert aggregates.gross_exposure.tolist() == [29750.0, 2000.0, 0.0]
+        assert aggregates.net_exposure.tolist() == [1250.0, 2000.0, 0.0]
+        assert aggregates.short_exposure.tolist() == [-14250.0, 0.0, 0.0]
+        assert aggregates.greeks[1].tolist() == [0.25] * 5
+        assert aggregates.num_positions.tolist() == [2, 2, 0]
+        assert aggregates.num_long.tolist() == [1, 2, 0]
+        assert aggregates.num_short.tolist() == [1, 0, 0]
+    
+    def test_snapshot_rows_are_quantized(self):
+        """Rows carry Decimal values at snapshot column precision"""
+        aggregates = aggregate_snapshot_groups(
+            np.array([0]), 1, np.array([1000.005]), np.full((1, 5), np.nan), np.array([1.0])
+        )
+        portfolio_id = uuid4()
+        rows = snapshot_rows(
+            [portfolio_id], [date(2025, 1, 2)], aggregates,
+            daily_pnl=np.array([10.0]), daily_return=np.array([0.0100001]), cumulative_pnl=np.array([25.0])
+        )
+        
+        assert rows[0]["portfolio_id"] == portfolio_id
+        assert rows[0]["total_value"] == Decimal("1000.00")
+        assert rows[0]["daily_return"] == Decimal("0.010000")
+        assert rows[0]["portfolio_delta"] == Decimal("0.0000")
+    
+    def test_chain_pnl_resets_at_zero_snapshots(self):
+        """Daily P&L chains from the seed; cumulative restarts after an empty day"""
+        daily_pnl, daily_return, cumulative_pnl = chain_pnl(
+            total_value=np.array([[1100.0, 1050.0, 0.0, 500.0, 600.0]]),
+            has_positions=np.array([[True, True, False, True, True]]),
+            seed_total=np.array([1000.0]),
+            seed_cumulative=np.array([40.0]),
+            has_seed=np.array([True])
+        )
+        
+        assert daily_pnl[0].tolist() == [100.0, -50.0, 0.0, 500.0, 100.0]
+        assert daily_return[0, 0] == pytest.approx(0.1)
+        assert daily_return[0, 3] == 0.0
+        assert cumulative_pnl[0].tolist() == [140.0, 90.0, 0.0, 500.0, 600.0]
+    
+    def test_price_panel_forward_fills(self):
+        """Each day uses the latest close on or before it, starting from the seed"""
+        trading_days = np.array(["2025-01-02", "2025-01-03", "2025-01-06"], dtype="datetime64[D]")
+        panel = _price_panel(
+            trading_days,
+            ["AAPL", "MSFT"],
+            seed_prices={"AAPL": 150.0},
+            price_rows=[
+                ("AAPL", date(2025, 1, 3), Decimal("152")),
+                ("MSFT", date(2025, 1, 4), Decimal("400")),
+            ]
+        )
+        
+        assert panel[0].tolist() == [150.0, 152.0, 152.0]
+        assert np.isnan(panel[1, :2]).all()
+        assert panel[1, 2] == 400.0
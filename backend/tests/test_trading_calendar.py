@@ -0,0 +1,51 @@
+"""
+Unit tests for the precomputed trading calendar index
+"""
+import pytest
+from datetime import date
+
+from app.utils.trading_calendar import TradingCalendar
+
+
+class TestTradingCalendar:
+    """Test suite for TradingCalendar lookups"""
+    
+    @pytest.fixture(scope="class")
+    def calendar(self):
+        """NYSE calendar with a small horizon"""
+        return TradingCalendar(start_date=date(2024, 1, 1), end_date=date(2025, 12, 31))
+    
+    def test_scalar_lookups_around_holidays(self, calendar):
+        """New Year's Day and weekends are skipped"""
+        assert calendar.is_trading_day(date(2025, 1, 2))
+        assert not calendar.is_trading_day(date(2025, 1, 1))
+        assert not calendar.is_trading_day(date(2025, 1, 4))
+        assert calendar.get_previous_trading_day(date(2025, 1, 2)) == date(2024, 12, 31)
+        assert calendar.get_next_trading_day(date(2025, 1, 3)) == date(2025, 1, 6)
+        assert calendar.get_trading_days_between(date(2025, 1, 1), date(2025, 1, 6)) == [
+            date(2025, 1, 2), date(2025, 1, 3), date(2025, 1, 6)
+        ]
+        assert calendar.count_trading_days(date(2025, 1, 1), date(2025, 1, 31)) == 20
+    
+    def test_offsets_from_non_trading_days(self, calendar):
+        """Offsets count from the surrounding trading days"""
+        saturday = date(2025, 1, 4)
+        
+        assert calendar.offset_trading_day(saturday, 0) == date(2025, 1, 3)
+        assert calendar.offset_trading_day(saturday, 1) == date(2025, 1, 6)
+        assert calendar.offset_trading_day(saturday, -2) == date(2025, 1, 2)
+    
+    def test_vectorized_matches_scalar(self, calendar):
+        """Array lookups agree with the scalar API"""
+        dates = [date(2025, 1, d) for d in range(1, 15)]
+        
+        flags = calendar.is_trading_days(dates)
+        previous = calendar.previous_trading_days(dates)
+        
+        assert flags.tolist() == [calendar.is_trading_day(d) for d in dates]
+        assert previous.tolist() == [calendar.get_previous_trading_day(d) for d in dates]
+    
+    def test_horizon_widens_on_demand(self, calendar):
+        """Queries outside the precomputed horizon still resolve"""
+        assert calendar.get_previous_trading_day(date(2024, 1, 2)) == date(2023, 12, 29)
+        assert calendar.trading_days_array("2026-01-02", "2026-01-02").tolist() == [date(2026, 1, 2)]
@@ -0,0 +1,91 @@
+"""
+Unit tests for the Treasury yield store and vectorized interest rate betas
+"""
+import pytest
+import numpy as np
+from datetime import date
+from unittest.mock import AsyncMock, Mock
+
+from sqlalchemy.dialects import postgresql
+
+from app.calculations.market_risk import _interest_rate_betas
+from app.services.treasury_yield_service import TreasuryYieldService
+
+
+class TestTreasuryYieldService:
+    """Test suite for incremental sync and in-memory series"""
+
+    @pytest.fixture
+    def service(self, tmp_path):
+        """Service in offline mode reading a local DGS10 fixture"""
+        (tmp_path / "DGS10.csv").write_text(
+            "observation_date,DGS10\n"
+            "2025-01-02,4.57\n"
+            "2025-01-03,4.60\n"
+            "2025-01-06,.\n"
+            "2025-01-07,4.68\n"
+        )
+        return TreasuryYieldService(api_key="", fixture_dir=str(tmp_path))
+
+    @pytest.mark.asyncio
+    async def test_series_synced_once_and_served_from_memory(self, service):
+        """Missing observations are stored once; later reads make no queries"""
+        stored_range = Mock()
+        stored_range.one.return_value = (None, None)
+        stored = Mock()
+        stored.all.return_value = [
+            (date(2025, 1, 2), 4.57), (date(2025, 1, 3), 4.60), (date(2025, 1, 7), 4.68)
+        ]
+        db = AsyncMock()
+        db.execute.side_effect = [stored_range, Mock(), stored]
+
+        first = await service.get_series(db, "DGS10", date(2025, 1, 1), date(2025, 1, 7))
+        second = await service.get_series(db, "DGS10", date(2025, 1, 3), date(2025, 1, 7))
+
+        # Range check + one upsert + one read, all on the first call
+        assert db.execute.await_count == 3
+        upsert = db.execute.await_args_list[1].args[0]
+        params = upsert.compile(dialect=postgresql.dialect()).params
+        assert sorted(value for key, value in params.items() if key.startswith("date_m")) == [
+            date(2025, 1, 2), date(2025, 1, 3), date(2025, 1, 7)  # '.' (missing) skipped
+        ]
+        db.commit.assert_awaited_once()
+        assert first.tolist() == [4.57, 4.60, 4.68]
+        assert second.tolist() == [4.60, 4.68]
+
+    @pytest.mark.asyncio
+    async def test_only_newer_observations_requested(self, service):
+        """A store holding data through Jan 3 only fetches later dates"""
+        stored_range = Mock()
+        stored_range.one.return_value = (date(2025, 1, 2), date(2025, 1, 3))
+        db = AsyncMock()
+        db.execute.return_value = stored_range
+
+        stored_count = await service.sync_series(db, "DGS10", date(2025, 1, 2), date(2025, 1, 7))
+
+        assert stored_count == 1  # Jan 7 (Jan 6 is missing in the source)
+
+
+class TestInterestRateBetas:
+    """Test suite for the vectorized interest rate regression"""
+
+    def test_matches_per_position_ols(self):
+        """Slopes and R² equal a per-position OLS with NaN days dropped"""
+        rng = np.random.default_rng(7)
+        changes = rng.normal(0, 5, 120)
+        returns = np.column_stack([
+            -0.002 * changes + rng.normal(0, 0.01, 120),
+            0.001 * changes + rng.normal(0, 0.02, 120),
+            np.full(120, np.nan),
+        ])
+        returns[:10, 1] = np.nan
+
+        betas, r_squared = _interest_rate_betas(returns, changes)
+
+        for column in range(2):
+            usable = ~np.isnan(returns[:, column])
+            slope = np.polyfit(changes[usable], returns[usable, column], 1)[0]
+            correlation = np.corrcoef(changes[usable], returns[usable, column])[0, 1]
+            assert betas[column] == pytest.approx(slope)
+            assert r_squared[column] == pytest.approx(correlation ** 2)
+        assert betas[2] == 0.0 and r_squared[2] == 0.0
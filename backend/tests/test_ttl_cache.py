@@ -0,0 +1,70 @@
+"""
+Unit tests for the shared TTL + LRU cache
+"""
+import copy
+import pytest
+from datetime import timedelta
+from unittest.mock import patch
+
+from app.core import ttl_cache
+from app.core.datetime_utils import utc_now
+from app.core.ttl_cache import TTLCache
+
+
+class TestTTLCache:
+    """Test suite for expiry, eviction, invalidation and copying"""
+
+    def test_entries_expire_after_ttl(self):
+        cache = TTLCache(ttl_seconds=60, maxsize=4)
+        cache.set(("p1", "exposures"), 1)
+
+        assert cache.get(("p1", "exposures")) == (True, 1)
+        with patch.object(ttl_cache, "utc_now", return_value=utc_now() + timedelta(seconds=61)):
+            assert cache.get(("p1", "exposures")) == (False, None)
+
+        stats = cache.info()
+        assert (stats["hits"], stats["misses"], stats["expirations"], stats["size"]) == (1, 1, 1, 0)
+
+    def test_least_recently_used_entry_evicted(self):
+        cache = TTLCache(ttl_seconds=60, maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("b") == (False, None)
+        assert cache.get("a") == (True, 1)
+        assert cache.info()["evictions"] == 1
+
+    def test_invalidate_prefix(self):
+        cache = TTLCache(ttl_seconds=60, maxsize=8)
+        cache.set(("p1", "2025-01-02"), 1)
+        cache.set(("p1", "2025-01-03"), 2)
+        cache.set(("p2", "2025-01-02"), 3)
+
+        assert cache.invalidate_prefix("p1") == 2
+        assert len(cache) == 1
+        assert cache.invalidate(("p2", "2025-01-02")) is True
+
+    def test_copies_and_size_limit(self):
+        cache = TTLCache(ttl_seconds=60, maxsize=8, copy_value=copy.deepcopy, max_entry_size=3, sizeof=len)
+        value = {"a": [1]}
+        cache.set("k", value)
+        value["a"].append(2)
+        _, cached = cache.get("k")
+        cached["a"].append(3)
+
+        assert cache.get("k") == (True, {"a": [1]})
+        assert cache.set("big", [1, 2, 3, 4]) is False
+        assert cache.info()["oversized"] == 1
+
+    def test_zero_ttl_disables(self):
+        cache = TTLCache(ttl_seconds=0, maxsize=8)
+
+        assert cache.set("k", 1) is False
+        assert cache.get("k") == (False, None)
+        assert cache.info()["misses"] == 0
+
+    def test_size_limit_requires_sizeof(self):
+        with pytest.raises(ValueError):
+            TTLCache(ttl_seconds=60, maxsize=8, max_entry_size=10)